@@ -5,11 +5,13 @@ Integrates LlamaIndex, Haystack Enterprise, and cutting-edge RAG technologies
 """
 
 import asyncio
+import base64
 import os
 import json
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Union
+from typing import AsyncIterator, Dict, List, Optional, Any, Tuple, Union
 from dataclasses import dataclass
 from enum import Enum
 
@@ -34,8 +36,16 @@ from llama_index.multi_modal_llms.openai import OpenAIMultiModal
 from llama_index.core.schema import ImageDocument
 
 # Graph database imports
-from neo4j import GraphDatabase
 import networkx as nx
+from libs.graph import GraphStore, create_graph_store
+from libs.ingestion import (
+    CheckpointedBatcher,
+    IngestionCheckpoint,
+    chunk_records,
+    format_business_row,
+    iter_structured_frames,
+    summary_record,
+)
 
 # Vector database
 from qdrant_client import QdrantClient
@@ -78,12 +88,44 @@ class RAGConfig:
     embedding_dimensions: int = 3072
     chunk_size: int = 1024
     chunk_overlap: int = 200
+    structured_rows_per_document: int = 50
+    structured_chunk_rows: int = 50_000
+    structured_max_rows: Optional[int] = None
+    graph_batch_size: int = 1000
+    graph_cache_size: int = 1024
+
+# Process-pool workers: module-level so they can be pickled, returning plain dicts
+def parse_pdf_file(file_path: str, extract_images: bool) -> Dict[str, List[Dict[str, Any]]]:
+    """Extract page text (and embedded image references) from a PDF"""
+    pages = []
+    images = []
+    with fitz.open(file_path) as doc:
+        for page_num in range(len(doc)):
+            page = doc.load_page(page_num)
+            text = page.get_text()
+            
+            if text.strip():
+                pages.append({
+                    "text": text,
+                    "metadata": {
+                        "source": file_path,
+                        "page": page_num + 1,
+                        "document_type": "pdf"
+                    }
+                })
+            
+            if extract_images:
+                for img_index, img in enumerate(page.get_images()):
+                    images.append({"page_num": page_num, "img_index": img_index, "xref": img[0]})
+    
+    return {"pages": pages, "images": images}
 
 class AdvancedDocumentProcessor:
     """Advanced document processing with multi-modal capabilities"""
     
-    def __init__(self, config: RAGConfig):
+    def __init__(self, config: RAGConfig, max_concurrent_images: int = 8):
         self.config = config
+        self.image_semaphore = asyncio.Semaphore(max_concurrent_images)
         self.setup_processors()
     
     def setup_processors(self):
@@ -112,23 +154,109 @@ class AdvancedDocumentProcessor:
     
     async def process_documents(self, file_paths: List[str]) -> List[Document]:
         """Process multiple documents with appropriate handlers"""
-        documents = []
-        
-        for file_path in file_paths:
-            doc_type = self.identify_document_type(file_path)
+        return [document async for document in self.iter_documents(file_paths)]
+    
+    async def iter_documents(
+        self,
+        file_paths: List[str],
+        max_workers: Optional[int] = None,
+        max_files_in_flight: Optional[int] = None
+    ) -> AsyncIterator[Document]:
+        """Process documents in parallel, yielding them as each file completes"""
+        async for _, docs, _ in self.iter_files(file_paths, max_workers, max_files_in_flight):
+            for document in docs:
+                yield document
+    
+    async def iter_files(
+        self,
+        file_paths: List[str],
+        max_workers: Optional[int] = None,
+        max_files_in_flight: Optional[int] = None,
+        checkpoint: Optional[IngestionCheckpoint] = None
+    ) -> AsyncIterator[Tuple[str, List[Document], bool]]:
+        """
+        Process documents in parallel, yielding (file_path, documents, complete).
+        
+        PDFs and structured files are parsed in a process pool, text files in
+        threads and images on the event loop. Structured files are yielded a
+        chunk at a time; every other file in one piece. complete is True on a
+        file's last item, which may carry no documents. At most
+        max_files_in_flight files are parsed or waiting to be consumed at once,
+        so memory stays bounded by that many files (or chunks) rather than the
+        whole corpus. Files already recorded in checkpoint (same size and
+        mtime) are skipped; recording files is left to the consumer, once
+        their documents are actually indexed. Files that fail are logged and
+        never yielded as complete.
+        """
+        max_workers = max_workers or os.cpu_count() or 4
+        max_files_in_flight = max_files_in_flight or max_workers * 2
+        pending = [path for path in file_paths if not (checkpoint and checkpoint.is_done(path))]
+        if checkpoint and len(pending) < len(file_paths):
+            logger.info(f"Skipping {len(file_paths) - len(pending)} already ingested files")
+        
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(max_files_in_flight)
+        results: asyncio.Queue = asyncio.Queue(maxsize=max_files_in_flight)
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            async def run(file_path: str):
+                try:
+                    if self.identify_document_type(file_path) == DocumentType.STRUCTURED:
+                        async for docs in self.iter_structured_documents(file_path, pool, loop):
+                            await results.put((file_path, docs, False, None))
+                        await results.put((file_path, [], True, None))
+                    else:
+                        docs = await self.process_file(file_path, pool, loop)
+                        await results.put((file_path, docs, True, None))
+                except Exception as e:
+                    await results.put((file_path, None, True, e))
             
-            if doc_type == DocumentType.PDF:
-                docs = await self.process_pdf_document(file_path)
-            elif doc_type == DocumentType.IMAGE:
-                docs = await self.process_image_document(file_path)
-            elif doc_type == DocumentType.STRUCTURED:
-                docs = await self.process_structured_document(file_path)
-            else:
-                docs = await self.process_text_document(file_path)
+            async def dispatch():
+                for file_path in pending:
+                    # Released once the consumer has taken the file's documents
+                    await slots.acquire()
+                    task = asyncio.create_task(run(file_path))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
             
-            documents.extend(docs)
-        
-        return documents
+            tasks: set = set()
+            dispatcher = asyncio.create_task(dispatch())
+            try:
+                completed = 0
+                while completed < len(pending):
+                    file_path, docs, complete, error = await results.get()
+                    try:
+                        if error:
+                            logger.error(f"Failed to process {file_path}: {error}")
+                            continue
+                        yield file_path, docs, complete
+                    finally:
+                        if complete:
+                            completed += 1
+                            slots.release()
+            finally:
+                dispatcher.cancel()
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(dispatcher, *tasks, return_exceptions=True)
+    
+    async def process_file(
+        self,
+        file_path: str,
+        pool: Optional[ProcessPoolExecutor] = None,
+        loop: Optional[asyncio.AbstractEventLoop] = None
+    ) -> List[Document]:
+        """Process one file with the handler for its type"""
+        doc_type = self.identify_document_type(file_path)
+        
+        if doc_type == DocumentType.PDF:
+            return await self.process_pdf_document(file_path, pool, loop)
+        elif doc_type == DocumentType.IMAGE:
+            return await self.process_image_document(file_path)
+        elif doc_type == DocumentType.STRUCTURED:
+            return await self.process_structured_document(file_path, pool, loop)
+        else:
+            return await self.process_text_document(file_path)
     
     def identify_document_type(self, file_path: str) -> DocumentType:
         """Identify document type from file extension"""
@@ -139,15 +267,18 @@ class AdvancedDocumentProcessor:
             return DocumentType.PDF
         elif suffix in ['.png', '.jpg', '.jpeg', '.gif', '.bmp']:
             return DocumentType.IMAGE
-        elif suffix in ['.csv', '.xlsx', '.xls']:
+        elif suffix in ['.csv', '.parquet', '.xlsx', '.xls']:
             return DocumentType.STRUCTURED
         else:
             return DocumentType.TEXT
     
-    async def process_pdf_document(self, file_path: str) -> List[Document]:
+    async def process_pdf_document(
+        self,
+        file_path: str,
+        pool: Optional[ProcessPoolExecutor] = None,
+        loop: Optional[asyncio.AbstractEventLoop] = None
+    ) -> List[Document]:
         """Process PDF with advanced parsing"""
-        documents = []
-        
         if self.llama_parse and self.config.tier != RAGTier.BASIC:
             # Use LlamaParse for advanced PDF processing
             try:
@@ -156,35 +287,51 @@ class AdvancedDocumentProcessor:
             except Exception as e:
                 logger.warning(f"LlamaParse failed for {file_path}: {e}, falling back to standard processing")
         
-        # Standard PDF processing
-        doc = fitz.open(file_path)
-        for page_num in range(len(doc)):
-            page = doc.load_page(page_num)
-            text = page.get_text()
-            
-            if text.strip():
-                document = Document(
-                    text=text,
-                    metadata={
-                        "source": file_path,
-                        "page": page_num + 1,
-                        "document_type": "pdf"
-                    }
-                )
-                documents.append(document)
-            
-            # Extract images if multi-modal processing is enabled
-            if self.config.tier in [RAGTier.ENTERPRISE, RAGTier.ADVANCED]:
-                images = page.get_images()
-                for img_index, img in enumerate(images):
-                    # Process embedded images
-                    image_doc = await self.process_embedded_image(page, img, file_path, page_num, img_index)
-                    if image_doc:
-                        documents.append(image_doc)
-        
-        doc.close()
+        # Standard PDF processing, off the event loop
+        loop = loop or asyncio.get_running_loop()
+        extract_images = self.config.tier in [RAGTier.ENTERPRISE, RAGTier.ADVANCED]
+        parsed = await loop.run_in_executor(pool, parse_pdf_file, file_path, extract_images)
+        documents = [Document(text=page["text"], metadata=page["metadata"]) for page in parsed["pages"]]
+        
+        # Analyze embedded images concurrently (multi-modal tiers only)
+        if parsed["images"]:
+            image_docs = await asyncio.gather(*(
+                self.process_embedded_image(file_path, image["page_num"], image["img_index"], image["xref"])
+                for image in parsed["images"]
+            ))
+            documents.extend(doc for doc in image_docs if doc)
+        
         return documents
     
+    def _extract_image_base64(self, file_path: str, xref: int) -> str:
+        with fitz.open(file_path) as doc:
+            return base64.b64encode(doc.extract_image(xref)["image"]).decode()
+    
+    async def process_embedded_image(
+        self, file_path: str, page_num: int, img_index: int, xref: int
+    ) -> Optional[Document]:
+        """Analyze an image embedded in a PDF page"""
+        async with self.image_semaphore:
+            try:
+                image_data = await asyncio.to_thread(self._extract_image_base64, file_path, xref)
+                response = await self.mm_llm.acomplete(
+                    prompt="Describe this image from a business document, including any metrics, charts or tables.",
+                    image_documents=[ImageDocument(image=image_data)]
+                )
+            except Exception as e:
+                logger.warning(f"Failed to analyze image {img_index} on page {page_num + 1} of {file_path}: {e}")
+                return None
+        
+        return Document(
+            text=response.text,
+            metadata={
+                "source": file_path,
+                "page": page_num + 1,
+                "image_index": img_index,
+                "document_type": "pdf_image"
+            }
+        )
+    
     async def process_image_document(self, file_path: str) -> List[Document]:
         """Process image document with business intelligence focus"""
         if self.config.tier not in [RAGTier.ENTERPRISE, RAGTier.ADVANCED]:
@@ -228,79 +375,57 @@ class AdvancedDocumentProcessor:
             logger.error(f"Failed to analyze image {file_path}: {e}")
             return []
     
-    async def process_structured_document(self, file_path: str) -> List[Document]:
-        """Process structured data (CSV, Excel) as business documents"""
-        documents = []
-        
-        # Load structured data
-        if file_path.endswith('.csv'):
-            df = pd.read_csv(file_path)
-        else:
-            df = pd.read_excel(file_path)
-        
-        # Create summary document
-        summary_text = f"""
-        Structured Data Summary for {Path(file_path).name}:
-        
-        Dataset Overview:
-        - Total Records: {len(df)}
-        - Columns: {list(df.columns)}
-        - Data Types: {df.dtypes.to_dict()}
-        
-        Statistical Summary:
-        {df.describe().to_string()}
-        
-        Sample Data:
-        {df.head().to_string()}
+    async def process_structured_document(
+        self,
+        file_path: str,
+        pool: Optional[ProcessPoolExecutor] = None,
+        loop: Optional[asyncio.AbstractEventLoop] = None
+    ) -> List[Document]:
+        """Process structured data (CSV, Parquet, Excel) as business documents"""
+        return [
+            document
+            async for docs in self.iter_structured_documents(file_path, pool, loop)
+            for document in docs
+        ]
+    
+    async def iter_structured_documents(
+        self,
+        file_path: str,
+        pool: Optional[ProcessPoolExecutor] = None,
+        loop: Optional[asyncio.AbstractEventLoop] = None
+    ) -> AsyncIterator[List[Document]]:
         """
+        Yield a structured file's documents one chunk at a time, then its summary.
         
-        documents.append(Document(
-            text=summary_text,
-            metadata={
-                "source": file_path,
-                "document_type": "structured_summary",
-                "record_count": len(df),
-                "columns": list(df.columns)
-            }
-        ))
-        
-        # Create documents for significant rows (if dataset is small enough)
-        if len(df) <= 1000:  # Only for manageable datasets
-            for idx, row in df.iterrows():
-                row_text = self.create_business_row_document(row, file_path, idx)
-                documents.append(Document(
-                    text=row_text,
-                    metadata={
-                        "source": file_path,
-                        "document_type": "structured_row",
-                        "row_index": idx
-                    }
-                ))
+        Chunks are read in a thread and formatted in the process pool, so only
+        one chunk per file is held in memory or sent between processes.
+        """
+        loop = loop or asyncio.get_running_loop()
+        frames = iter_structured_frames(file_path, self.config.structured_chunk_rows, self.config.structured_max_rows)
+        first_frame = None
+        total_rows = 0
+        while True:
+            frame = await asyncio.to_thread(next, frames, None)
+            if frame is None:
+                break
+            if first_frame is None:
+                first_frame = frame
+            total_rows += len(frame)
+            records = await loop.run_in_executor(
+                pool, chunk_records, frame, file_path, self.config.structured_rows_per_document
+            )
+            yield [Document(text=record["text"], metadata=record["metadata"]) for record in records]
         
-        return documents
+        summary = await asyncio.to_thread(summary_record, file_path, first_frame, total_rows)
+        yield [Document(text=summary["text"], metadata=summary["metadata"])]
     
     def create_business_row_document(self, row: pd.Series, file_path: str, row_index: int) -> str:
         """Create business-focused document from data row"""
-        doc_text = f"Data Record {row_index + 1} from {Path(file_path).name}:\n\n"
-        
-        for column, value in row.items():
-            if pd.notna(value):
-                # Format based on likely business context
-                if any(keyword in column.lower() for keyword in ['revenue', 'sales', 'amount', 'price', 'cost']):
-                    doc_text += f"• {column}: ${value:,.2f}\n" if isinstance(value, (int, float)) else f"• {column}: {value}\n"
-                elif any(keyword in column.lower() for keyword in ['date', 'time']):
-                    doc_text += f"• {column}: {value}\n"
-                elif any(keyword in column.lower() for keyword in ['rate', 'percent', '%']):
-                    doc_text += f"• {column}: {value}%\n" if isinstance(value, (int, float)) else f"• {column}: {value}\n"
-                else:
-                    doc_text += f"• {column}: {value}\n"
-        
-        return doc_text
+        return format_business_row(row, Path(file_path).name, row_index)
     
     async def process_text_document(self, file_path: str) -> List[Document]:
         """Process standard text document"""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        content = await asyncio.to_thread(Path(file_path).read_text, encoding='utf-8')
         
         return [Document(
             text=content,
@@ -378,6 +503,14 @@ class LlamaIndexRAGSystem:
         
         return index
     
+    async def insert_documents(self, index: VectorStoreIndex, documents: List[Document]):
+        """Add documents to an existing index"""
+        def insert_all():
+            for document in documents:
+                index.insert(document)
+        
+        await asyncio.to_thread(insert_all)
+    
     async def advanced_query(
         self, 
         query: str, 
@@ -596,38 +729,20 @@ class HaystackEnterpriseRAG:
 class GraphEnhancedRAG:
     """Graph-enhanced RAG for complex business relationships"""
     
-    def __init__(self, config: RAGConfig):
+    def __init__(self, config: RAGConfig, graph_store: Optional[GraphStore] = None):
         self.config = config
-        if config.neo4j_uri:
-            self.neo4j_driver = GraphDatabase.driver(
-                config.neo4j_uri,
-                auth=(config.neo4j_user, config.neo4j_password)
-            )
-            self.setup_business_graph()
-        else:
-            self.neo4j_driver = None
+        self.graph_store = graph_store or create_graph_store(
+            config.neo4j_uri,
+            config.neo4j_user,
+            config.neo4j_password,
+            batch_size=config.graph_batch_size,
+            cache_size=config.graph_cache_size
+        )
     
-    def setup_business_graph(self):
+    async def setup_business_graph(self):
         """Setup Pay Ready business knowledge graph"""
-        if not self.neo4j_driver:
-            return
-        
-        with self.neo4j_driver.session() as session:
-            # Create constraints
-            session.run("""
-                CREATE CONSTRAINT business_entity_name IF NOT EXISTS 
-                FOR (e:BusinessEntity) REQUIRE e.name IS UNIQUE
-            """)
-            
-            # Create Pay Ready specific entity types
-            session.run("""
-                MERGE (customer:EntityType {name: 'Customer', domain: 'pay_ready'})
-                MERGE (product:EntityType {name: 'Product', domain: 'pay_ready'})
-                MERGE (metric:EntityType {name: 'Metric', domain: 'pay_ready'})
-                MERGE (process:EntityType {name: 'Process', domain: 'pay_ready'})
-                MERGE (person:EntityType {name: 'Person', domain: 'pay_ready'})
-                MERGE (system:EntityType {name: 'System', domain: 'pay_ready'})
-            """)
+        if self.graph_store:
+            await self.graph_store.setup()
     
     async def create_business_knowledge_graph(
         self, 
@@ -635,35 +750,14 @@ class GraphEnhancedRAG:
         relationships: List[Dict]
     ):
         """Create business knowledge graph from extracted entities"""
-        if not self.neo4j_driver:
-            logger.warning("Neo4j not configured, skipping graph creation")
+        if not self.graph_store:
+            logger.warning("Graph store not configured, skipping graph creation")
             return
         
-        with self.neo4j_driver.session() as session:
-            # Create business entities
-            for entity in entities:
-                session.run("""
-                    MERGE (e:BusinessEntity {name: $name})
-                    SET e.type = $type,
-                        e.description = $description,
-                        e.confidence = $confidence,
-                        e.data_sources = $data_sources,
-                        e.domain = 'pay_ready',
-                        e.created_at = datetime(),
-                        e.updated_at = datetime()
-                """, **entity)
-            
-            # Create relationships
-            for rel in relationships:
-                session.run("""
-                    MATCH (a:BusinessEntity {name: $source})
-                    MATCH (b:BusinessEntity {name: $target})
-                    MERGE (a)-[r:BUSINESS_RELATIONSHIP {type: $rel_type}]->(b)
-                    SET r.strength = $strength,
-                        r.evidence_count = $evidence_count,
-                        r.created_at = datetime(),
-                        r.updated_at = datetime()
-                """, **rel)
+        # Entities first so every relationship endpoint can be matched
+        entity_count = await self.graph_store.upsert_entities(entities)
+        relationship_count = await self.graph_store.upsert_relationships(relationships)
+        logger.info(f"Upserted {entity_count} entities and {relationship_count} relationships into {self.graph_store.name} graph")
     
     async def graph_enhanced_query(
         self, 
@@ -672,28 +766,15 @@ class GraphEnhancedRAG:
     ) -> Dict[str, Any]:
         """Execute graph-enhanced RAG query"""
         
-        if not self.neo4j_driver:
+        if not self.graph_store:
             # Fallback to vector-only RAG
             return await vector_rag_system.advanced_query(query, {}, vector_rag_system.index)
         
         # Extract entities from query
         query_entities = await self.extract_entities_from_query(query)
         
-        # Find related entities in graph
-        with self.neo4j_driver.session() as session:
-            graph_context = session.run("""
-                MATCH (e:BusinessEntity)
-                WHERE e.name IN $entities
-                OPTIONAL MATCH (e)-[r:BUSINESS_RELATIONSHIP]-(related:BusinessEntity)
-                RETURN e.name as entity, 
-                       e.type as entity_type,
-                       collect({
-                           name: related.name, 
-                           type: related.type,
-                           relationship: r.type,
-                           strength: r.strength
-                       }) as related_entities
-            """, entities=query_entities).data()
+        # Find related entities in graph (served from the neighborhood cache when warm)
+        graph_context = await self.graph_store.neighborhoods(query_entities) if query_entities else []
         
         # Enhance query with graph context
         enhanced_query = self.build_graph_enhanced_query(query, graph_context)
@@ -788,22 +869,36 @@ class AdvancedRAGOrchestrator:
         if self.config.tier == RAGTier.ADVANCED:
             self.graph_rag = GraphEnhancedRAG(self.config)
     
-    async def initialize(self, document_paths: List[str]):
+    async def initialize(self, document_paths: List[str], index_batch_size: int = 256):
         """Initialize the RAG system with documents"""
         logger.info(f"Initializing Advanced RAG System (Tier: {self.config.tier.value})")
         
-        # Process documents
-        documents = await self.llama_rag.doc_processor.process_documents(document_paths)
-        logger.info(f"Processed {len(documents)} documents")
+        # Process documents as they stream out of the ingestion pool, indexing in batches;
+        # a file is checkpointed only once the batch holding its last document is indexed
+        self.index = None
+        checkpoint_path = os.getenv("SOPHIA_RAG_INGEST_CHECKPOINT")
+        checkpoint = IngestionCheckpoint(checkpoint_path) if checkpoint_path else None
         
-        # Create index
-        self.index = await self.llama_rag.create_advanced_index(documents)
-        logger.info("Created advanced index")
+        async def write(batch: List[Document]):
+            if self.index is None:
+                self.index = await self.llama_rag.create_advanced_index(batch)
+            else:
+                await self.llama_rag.insert_documents(self.index, batch)
+        
+        batcher = CheckpointedBatcher(write, index_batch_size, checkpoint)
+        async for file_path, docs, complete in self.llama_rag.doc_processor.iter_files(
+            document_paths, checkpoint=checkpoint
+        ):
+            await batcher.add_file(file_path, docs, complete)
+        await batcher.flush()
+        if self.index is None:
+            await write([])
+        logger.info(f"Processed and indexed {batcher.written} documents")
         
         # Setup graph if advanced tier
         if self.config.tier == RAGTier.ADVANCED and hasattr(self, 'graph_rag'):
-            # Extract entities and relationships for graph
-            entities, relationships = await self.extract_business_entities_and_relationships(documents)
+            # Extract entities and relationships for graph (fixed business taxonomy, not document contents)
+            entities, relationships = await self.extract_business_entities_and_relationships([])
             await self.graph_rag.create_business_knowledge_graph(entities, relationships)
             logger.info("Created business knowledge graph")
     
@@ -13,6 +13,8 @@ from dataclasses import dataclass, asdict
 from enum import Enum
 import hashlib
 import re
+import uuid
+from contextlib import asynccontextmanager
 
 import asyncpg
 from qdrant_client import QdrantClient
@@ -20,6 +22,10 @@ from qdrant_client.models import Distance, VectorParams, CreateCollection, Point
 import openai
 from loguru import logger
 
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIMENSIONS = 1536
+EMBEDDING_BATCH_SIZE = 2048  # OpenAI's limit on inputs per embeddings request
+
 class KnowledgeType(Enum):
     BUSINESS_ENTITY = "business_entity"
     BUSINESS_PROCESS = "business_process"
@@ -60,6 +66,36 @@ class KnowledgeItem:
     embedding_vector: Optional[List[float]] = None
     created_at: datetime = None
 
+def vector_point_id(key: str) -> str:
+    """Stable Qdrant point id (a UUID) for a string key such as an embedding_id"""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, key))
+
+def merge_duplicate_entities(entities: List[BusinessEntity]) -> List[BusinessEntity]:
+    """
+    Collapse entities sharing (entity_type, name) the same way the database
+    upsert would, so a single multi-row INSERT never touches a row twice.
+    """
+    merged: Dict[Tuple[str, str], BusinessEntity] = {}
+    for entity in entities:
+        key = (entity.entity_type, entity.name)
+        existing = merged.get(key)
+        if existing is None:
+            merged[key] = BusinessEntity(**asdict(entity))
+            continue
+        existing.description = entity.description
+        existing.attributes.update(entity.attributes)
+        existing.data_sources.extend(s for s in entity.data_sources if s not in existing.data_sources)
+        existing.confidence_score = max(existing.confidence_score, entity.confidence_score)
+        existing.embedding_id = entity.embedding_id or existing.embedding_id
+    return list(merged.values())
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
 class PayReadyEntityRecognizer:
     """Recognizes Pay Ready specific business entities from text"""
     
@@ -143,7 +179,7 @@ class KnowledgeExtractor:
     """Extracts structured knowledge from conversations"""
     
     def __init__(self, openai_api_key: str):
-        self.openai_client = openai.OpenAI(api_key=openai_api_key)
+        self.openai_client = openai.AsyncOpenAI(api_key=openai_api_key)
     
     async def extract_knowledge(
         self, 
@@ -316,27 +352,55 @@ class EnhancedKnowledgeDatabase:
         
         logger.info("Enhanced knowledge database schema created")
     
-    async def store_business_entity(self, entity: BusinessEntity) -> int:
+    @asynccontextmanager
+    async def connection(self, conn: Optional[asyncpg.Connection] = None):
+        """Use the caller's connection (e.g. inside its transaction) or acquire one from the pool"""
+        if conn is not None:
+            yield conn
+        else:
+            async with self.pool.acquire() as pooled:
+                yield pooled
+    
+    async def store_business_entity(self, entity: BusinessEntity, conn: Optional[asyncpg.Connection] = None) -> int:
         """Store or update business entity"""
-        async with self.pool.acquire() as conn:
-            # Try to insert, update if exists
-            result = await conn.fetchrow("""
+        return (await self.store_business_entities([entity], conn))[0]
+    
+    async def store_business_entities(
+        self, 
+        entities: List[BusinessEntity], 
+        conn: Optional[asyncpg.Connection] = None
+    ) -> List[int]:
+        """Store or update many business entities in one statement; returns ids in input order"""
+        if not entities:
+            return []
+        
+        rows = merge_duplicate_entities(entities)
+        async with self.connection(conn) as conn:
+            # One multi-row upsert: parallel arrays unnested into rows (JSON columns travel as text)
+            results = await conn.fetch("""
                 INSERT INTO business_entities 
                 (entity_type, entity_name, description, attributes, data_sources, confidence_score, embedding_id)
-                VALUES ($1, $2, $3, $4, $5, $6, $7)
+                SELECT t.entity_type, t.entity_name, t.description, t.attributes::jsonb,
+                       ARRAY(SELECT jsonb_array_elements_text(t.data_sources::jsonb)),
+                       t.confidence_score, t.embedding_id
+                FROM unnest($1::text[], $2::text[], $3::text[], $4::text[], $5::text[], $6::float8[], $7::text[])
+                    AS t(entity_type, entity_name, description, attributes, data_sources, confidence_score, embedding_id)
                 ON CONFLICT (entity_type, entity_name) 
                 DO UPDATE SET 
                     description = EXCLUDED.description,
                     attributes = business_entities.attributes || EXCLUDED.attributes,
                     data_sources = array(SELECT DISTINCT unnest(business_entities.data_sources || EXCLUDED.data_sources)),
                     confidence_score = GREATEST(business_entities.confidence_score, EXCLUDED.confidence_score),
+                    embedding_id = COALESCE(EXCLUDED.embedding_id, business_entities.embedding_id),
                     updated_at = CURRENT_TIMESTAMP
-                RETURNING id
-            """, entity.entity_type, entity.name, entity.description, 
-                json.dumps(entity.attributes), entity.data_sources, 
-                entity.confidence_score, entity.embedding_id)
-            
-            return result['id']
+                RETURNING id, entity_type, entity_name
+            """,
+                [e.entity_type for e in rows], [e.name for e in rows], [e.description for e in rows],
+                [json.dumps(e.attributes) for e in rows], [json.dumps(e.data_sources) for e in rows],
+                [e.confidence_score for e in rows], [e.embedding_id for e in rows])
+        
+        ids = {(row['entity_type'], row['entity_name']): row['id'] for row in results}
+        return [ids[(e.entity_type, e.name)] for e in entities]
     
     async def store_knowledge_interaction(
         self, 
@@ -344,10 +408,11 @@ class EnhancedKnowledgeDatabase:
         content: str, 
         extracted_knowledge: List[KnowledgeItem],
         entities_mentioned: List[str],
-        user_id: str = None
+        user_id: str = None,
+        conn: Optional[asyncpg.Connection] = None
     ) -> int:
         """Store knowledge interaction"""
-        async with self.pool.acquire() as conn:
+        async with self.connection(conn) as conn:
             # Calculate average confidence
             avg_confidence = sum(
                 0.8 if item.confidence_level == ConfidenceLevel.HIGH else
@@ -362,7 +427,7 @@ class EnhancedKnowledgeDatabase:
                 VALUES ($1, $2, $3, $4, $5, $6)
                 RETURNING id
             """, session_id, user_id, content, 
-                json.dumps([asdict(item) for item in extracted_knowledge]), 
+                json.dumps([asdict(item) for item in extracted_knowledge], default=_json_default), 
                 entities_mentioned, avg_confidence)
             
             return result['id']
@@ -416,7 +481,7 @@ class ContinuousLearningOrchestrator:
         )
         
         # Initialize embedding client
-        self.embedding_client = openai.OpenAI(api_key=config['openai_api_key'])
+        self.embedding_client = openai.AsyncOpenAI(api_key=config['openai_api_key'])
     
     async def initialize(self):
         """Initialize all components"""
@@ -464,32 +529,29 @@ class ContinuousLearningOrchestrator:
             )
             logger.info(f"Extracted {len(knowledge_items)} knowledge items")
             
-            # Store entities in database and vector store
-            entity_ids = []
+            # Embed every entity and knowledge item in one batched request
             for entity in entities:
-                # Generate embedding for entity
-                embedding = await self.generate_embedding(
-                    f"{entity.name} {entity.description} {entity.entity_type}"
-                )
                 entity.embedding_id = f"entity_{hashlib.md5(entity.name.encode()).hexdigest()}"
-                
-                # Store in database
-                entity_id = await self.database.store_business_entity(entity)
-                entity_ids.append(entity_id)
-                
-                # Store in vector database
-                await self.store_entity_vector(entity, embedding)
-            
-            # Store knowledge interaction
-            interaction_id = await self.database.store_knowledge_interaction(
-                session_id, user_message, knowledge_items, 
-                [e.name for e in entities], user_id
+            embeddings = await self.generate_embeddings(
+                [f"{e.name} {e.description} {e.entity_type}" for e in entities] +
+                [k.content for k in knowledge_items]
             )
+            entity_embeddings = embeddings[:len(entities)]
+            knowledge_embeddings = embeddings[len(entities):]
             
-            # Store knowledge items in vector store
-            for knowledge_item in knowledge_items:
-                embedding = await self.generate_embedding(knowledge_item.content)
-                await self.store_knowledge_vector(knowledge_item, embedding, interaction_id)
+            # One transaction: a single entity upsert, the interaction row and the vector batches.
+            # A failed vector write rolls the rows back, so Postgres never references missing vectors.
+            async with self.database.pool.acquire() as conn:
+                async with conn.transaction():
+                    await self.database.store_business_entities(entities, conn)
+                    interaction_id = await self.database.store_knowledge_interaction(
+                        session_id, user_message, knowledge_items, 
+                        [e.name for e in entities], user_id, conn
+                    )
+                    await self.store_vectors(
+                        [self._entity_point(e, v) for e, v in zip(entities, entity_embeddings)],
+                        [self._knowledge_point(k, v, interaction_id) for k, v in zip(knowledge_items, knowledge_embeddings)]
+                    )
             
             return {
                 "interaction_id": interaction_id,
@@ -512,36 +574,66 @@ class ContinuousLearningOrchestrator:
     
     async def generate_embedding(self, text: str) -> List[float]:
         """Generate embedding for text"""
-        try:
-            response = await self.embedding_client.embeddings.create(
-                model="text-embedding-3-small",
-                input=text
-            )
-            return response.data[0].embedding
-        except Exception as e:
-            logger.error(f"Failed to generate embedding: {e}")
-            return [0.0] * 1536  # Return zero vector as fallback
+        return (await self.generate_embeddings([text]))[0]
+    
+    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings for many texts, EMBEDDING_BATCH_SIZE inputs per request"""
+        embeddings = []
+        for start in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+            batch = texts[start:start + EMBEDDING_BATCH_SIZE]
+            try:
+                response = await self.embedding_client.embeddings.create(
+                    model=EMBEDDING_MODEL,
+                    input=batch
+                )
+                embeddings.extend(item.embedding for item in sorted(response.data, key=lambda item: item.index))
+            except Exception as e:
+                logger.error(f"Failed to generate embeddings: {e}")
+                embeddings.extend([0.0] * EMBEDDING_DIMENSIONS for _ in batch)  # Zero vectors as fallback
+        return embeddings
+    
+    def _entity_point(self, entity: BusinessEntity, embedding: List[float]) -> PointStruct:
+        return PointStruct(
+            id=vector_point_id(entity.embedding_id),
+            vector=embedding,
+            payload={
+                "name": entity.name,
+                "type": entity.entity_type,
+                "description": entity.description,
+                "confidence": entity.confidence_score,
+                "data_sources": entity.data_sources,
+                "attributes": entity.attributes
+            }
+        )
+    
+    def _knowledge_point(self, knowledge_item: KnowledgeItem, embedding: List[float], interaction_id: int) -> PointStruct:
+        vector_id = f"knowledge_{interaction_id}_{hashlib.md5(knowledge_item.content.encode()).hexdigest()[:8]}"
+        return PointStruct(
+            id=vector_point_id(vector_id),
+            vector=embedding,
+            payload={
+                "content": knowledge_item.content,
+                "type": knowledge_item.knowledge_type.value,
+                "confidence": knowledge_item.confidence_level.value,
+                "entities_mentioned": knowledge_item.entities_mentioned,
+                "interaction_id": interaction_id,
+                "metadata": knowledge_item.metadata
+            }
+        )
+    
+    async def store_vectors(self, entity_points: List[PointStruct], knowledge_points: List[PointStruct]):
+        """Upsert entity and knowledge vectors, one batch per collection, both in flight at once"""
+        writes = [
+            asyncio.to_thread(self.vector_client.upsert, collection_name=collection, points=points)
+            for collection, points in (("pay_ready_entities", entity_points), ("knowledge_items", knowledge_points))
+            if points
+        ]
+        await asyncio.gather(*writes)
     
     async def store_entity_vector(self, entity: BusinessEntity, embedding: List[float]):
         """Store entity vector in Qdrant"""
         try:
-            self.vector_client.upsert(
-                collection_name="pay_ready_entities",
-                points=[
-                    PointStruct(
-                        id=entity.embedding_id,
-                        vector=embedding,
-                        payload={
-                            "name": entity.name,
-                            "type": entity.entity_type,
-                            "description": entity.description,
-                            "confidence": entity.confidence_score,
-                            "data_sources": entity.data_sources,
-                            "attributes": entity.attributes
-                        }
-                    )
-                ]
-            )
+            await self.store_vectors([self._entity_point(entity, embedding)], [])
         except Exception as e:
             logger.error(f"Failed to store entity vector: {e}")
     
@@ -553,25 +645,7 @@ class ContinuousLearningOrchestrator:
     ):
         """Store knowledge item vector in Qdrant"""
         try:
-            vector_id = f"knowledge_{interaction_id}_{hashlib.md5(knowledge_item.content.encode()).hexdigest()[:8]}"
-            
-            self.vector_client.upsert(
-                collection_name="knowledge_items",
-                points=[
-                    PointStruct(
-                        id=vector_id,
-                        vector=embedding,
-                        payload={
-                            "content": knowledge_item.content,
-                            "type": knowledge_item.knowledge_type.value,
-                            "confidence": knowledge_item.confidence_level.value,
-                            "entities_mentioned": knowledge_item.entities_mentioned,
-                            "interaction_id": interaction_id,
-                            "metadata": knowledge_item.metadata
-                        }
-                    )
-                ]
-            )
+            await self.store_vectors([], [self._knowledge_point(knowledge_item, embedding, interaction_id)])
         except Exception as e:
             logger.error(f"Failed to store knowledge vector: {e}")
     
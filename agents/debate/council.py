@@ -4,15 +4,25 @@ SOPHIA Planning Council - Agent Debate System
 Multi-agent planning with critics and consensus building
 """
 import asyncio
+import hashlib
 import json
 import logging
-from dataclasses import dataclass
+import re
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
 
 logger = logging.getLogger(__name__)
 
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+_INITIAL_VOTE = re.compile(r"INITIAL_VOTE\W*(APPROVE|REJECT|MODIFY|ABSTAIN)", re.IGNORECASE)
+_CONFIDENCE = re.compile(r"CONFIDENCE\W*([01](?:\.\d+)?)", re.IGNORECASE)
+
 
 class VoteType(Enum):
     APPROVE = "approve"
@@ -59,14 +69,21 @@ class DebateSession:
     consensus_threshold: float = 0.7
     started_at: datetime = None
     ended_at: Optional[datetime] = None
+    early_stop_phase: Optional[str] = None
 
 
 class PlanningCouncil:
     """Orchestrates multi-agent planning debates"""
 
-    def __init__(self, openrouter_api_key: str):
+    def __init__(self, openrouter_api_key: str, cache_size: int = 128, request_timeout: float = 60.0):
         self.openrouter_api_key = openrouter_api_key
         self.active_sessions: Dict[str, DebateSession] = {}
+        self.request_timeout = request_timeout
+        self._client: Optional[httpx.AsyncClient] = None
+
+        # Per-proposal results keyed by proposal hash, so unchanged proposals are not re-debated
+        self.cache_size = cache_size
+        self._debate_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
 
         # Council members with their roles
         self.council_members = {
@@ -114,43 +131,215 @@ class PlanningCouncil:
 
         return session_id
 
-    async def conduct_debate(self, session_id: str) -> DebateSession:
-        """Conduct the full debate process"""
+    async def conduct_debate(self, session_id: str, adaptive: bool = True) -> DebateSession:
+        """
+        Conduct the debate process.
+
+        With adaptive=True each phase streams results as they arrive and the
+        debate stops as soon as the outcome under consensus_threshold can no
+        longer change: outstanding calls are cancelled and later phases are
+        skipped. Members state an initial vote in their analysis, so a council
+        that already agrees never reaches cross-examination.
+        """
         if session_id not in self.active_sessions:
             raise ValueError(f"Session {session_id} not found")
 
         session = self.active_sessions[session_id]
+        cache = self._proposal_cache(session.proposal)
+        total = len(session.participants)
+        threshold = session.consensus_threshold if adaptive else None
 
         # Phase 1: Individual analysis
         logger.info(f"Phase 1: Individual analysis for {session_id}")
-        analysis_tasks = []
-        for agent_id in session.participants:
-            task = self._get_agent_analysis(agent_id, session.proposal)
-            analysis_tasks.append(task)
+        analyses, decided = await self._gather_until_decided(
+            {
+                agent_id: self._cached(cache["analyses"], agent_id, self._get_agent_analysis, agent_id, session.proposal)
+                for agent_id in session.participants
+            },
+            self._initial_vote,
+            total,
+            threshold,
+            on_error=lambda agent_id, error: self._failed_analysis(agent_id, error),
+        )
 
-        analyses = await asyncio.gather(*analysis_tasks)
+        if decided is not None:
+            session.votes = [v for v in (self._initial_vote(analyses[a]) for a in session.participants if a in analyses) if v]
+            return self._finish_session(session, decided, early_stop_phase="analysis")
+
+        ordered_analyses = [analyses[agent_id] for agent_id in session.participants]
 
         # Phase 2: Cross-examination
         logger.info(f"Phase 2: Cross-examination for {session_id}")
-        cross_exam_results = await self._conduct_cross_examination(session.proposal, analyses)
+        cross_exam_results = await self._cached(
+            cache, "cross_exam", self._conduct_cross_examination, session.proposal, ordered_analyses
+        )
 
         # Phase 3: Final voting
         logger.info(f"Phase 3: Final voting for {session_id}")
-        voting_tasks = []
-        for i, agent_id in enumerate(session.participants):
-            task = self._get_final_vote(agent_id, session.proposal, analyses[i], cross_exam_results)
-            voting_tasks.append(task)
-
-        votes = await asyncio.gather(*voting_tasks)
-        session.votes = votes
+        votes, decided = await self._gather_until_decided(
+            {
+                agent_id: self._cached(
+                    cache["votes"], agent_id, self._get_final_vote,
+                    agent_id, session.proposal, analyses[agent_id], cross_exam_results,
+                )
+                for agent_id in session.participants
+            },
+            lambda vote: vote,
+            total,
+            threshold,
+            on_error=lambda agent_id, error: self._failed_vote(agent_id, error),
+        )
+        session.votes = [votes[agent_id] for agent_id in session.participants if agent_id in votes]
 
         # Phase 4: Consensus determination
-        session.final_decision = self._determine_consensus(votes, session.consensus_threshold)
+        if decided is None:
+            decided = self._determine_consensus(session.votes, session.consensus_threshold)
+        return self._finish_session(
+            session, decided, early_stop_phase="voting" if len(session.votes) < total else None
+        )
+
+    def _finish_session(
+        self, session: DebateSession, decision: VoteType, early_stop_phase: Optional[str] = None
+    ) -> DebateSession:
+        session.final_decision = decision
+        session.early_stop_phase = early_stop_phase
         session.ended_at = datetime.now()
 
-        logger.info(f"Debate completed for {session_id}. Decision: {session.final_decision}")
+        stopped = f" (decided during {early_stop_phase})" if early_stop_phase else ""
+        logger.info(f"Debate completed for {session.session_id}. Decision: {session.final_decision}{stopped}")
         return session
 
+    @staticmethod
+    def proposal_hash(proposal: Proposal) -> str:
+        """Stable hash of the parts of a proposal the council reviews."""
+        content = {k: v for k, v in asdict(proposal).items() if k not in ("id", "created_at")}
+        return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _proposal_cache(self, proposal: Proposal) -> Dict[str, Any]:
+        key = self.proposal_hash(proposal)
+        entry = self._debate_cache.get(key)
+        if entry is None:
+            entry = {"analyses": {}, "votes": {}}
+            self._debate_cache[key] = entry
+            while len(self._debate_cache) > self.cache_size:
+                self._debate_cache.popitem(last=False)
+        else:
+            self._debate_cache.move_to_end(key)
+        return entry
+
+    @staticmethod
+    async def _cached(store: Dict[str, Any], key: str, func: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        if key not in store:
+            store[key] = await func(*args)
+        return store[key]
+
+    async def _gather_until_decided(
+        self,
+        jobs: Dict[str, Awaitable[Any]],
+        vote_of: Callable[[Any], Optional[Vote]],
+        total: int,
+        threshold: Optional[float],
+        on_error: Callable[[str, Exception], Any],
+    ) -> Tuple[Dict[str, Any], Optional[VoteType]]:
+        """
+        Run member jobs concurrently, collecting results as they complete.
+
+        Returns (results by agent, decided outcome). When threshold is given and
+        the votes seen so far decide the outcome, the remaining jobs are
+        cancelled; otherwise every job runs and the outcome is None. A member
+        whose job fails gets on_error(agent_id, error) as its result, so one
+        failed call does not end the debate.
+        """
+        tasks = {asyncio.ensure_future(job): agent_id for agent_id, job in jobs.items()}
+        pending = set(tasks)
+        results: Dict[str, Any] = {}
+        votes: List[Vote] = []
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        logger.error(f"Council member {tasks[task]} failed, counting as abstention: {e}")
+                        result = on_error(tasks[task], e)
+                    results[tasks[task]] = result
+                    vote = vote_of(result)
+                    if vote is not None:
+                        votes.append(vote)
+                if threshold is not None and pending:
+                    decided = self._decided_outcome(votes, total, threshold)
+                    if decided is not None:
+                        logger.info(f"Outcome {decided.value} decided after {len(results)}/{total} responses")
+                        return results, decided
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        return results, None
+
+    def _decided_outcome(self, votes: List[Vote], total: int, threshold: float) -> Optional[VoteType]:
+        """
+        Return the consensus outcome if the remaining votes cannot change it.
+
+        A vote type's weighted score is the sum of its confidences over the
+        total number of voters, so scores only grow as votes arrive. With a
+        threshold above 0.5 at most one type can reach it.
+        """
+        if not votes or threshold <= 0.5 or any(not 0.0 <= v.confidence <= 1.0 for v in votes):
+            return None
+
+        remaining = total - len(votes)
+        confidence_by_type: Dict[VoteType, float] = {}
+        for vote in votes:
+            confidence_by_type[vote.vote_type] = confidence_by_type.get(vote.vote_type, 0.0) + vote.confidence
+
+        for vote_type, confidence in confidence_by_type.items():
+            if confidence / total >= threshold:
+                return vote_type
+
+        # No type can still reach the threshold and a MODIFY vote is already in
+        unreachable = all(
+            (confidence_by_type.get(vote_type, 0.0) + remaining) / total < threshold for vote_type in VoteType
+        )
+        if unreachable and VoteType.MODIFY in confidence_by_type:
+            return VoteType.MODIFY
+
+        return None
+
+    def _failed_analysis(self, agent_id: str, error: Exception) -> Dict[str, Any]:
+        """Stand-in analysis for a member whose call failed."""
+        return {
+            "agent_id": agent_id,
+            "role": self.council_members[agent_id]["role"],
+            "analysis": f"Analysis unavailable: {error}",
+            "error": str(error),
+            "timestamp": datetime.now(),
+        }
+
+    @staticmethod
+    def _failed_vote(agent_id: str, error: Exception) -> Vote:
+        """Zero-confidence abstention for a member whose call failed."""
+        return Vote(agent_id=agent_id, vote_type=VoteType.ABSTAIN, reasoning=f"Vote failed: {error}", confidence=0.0)
+
+    @staticmethod
+    def _initial_vote(analysis: Dict[str, Any]) -> Optional[Vote]:
+        """Parse the initial vote a member states at the end of its analysis."""
+        text = analysis.get("analysis") or ""
+        if analysis.get("error"):
+            return Vote(agent_id=analysis["agent_id"], vote_type=VoteType.ABSTAIN, reasoning=text, confidence=0.0)
+        vote_match = _INITIAL_VOTE.search(text)
+        if not vote_match:
+            return None
+        confidence_match = _CONFIDENCE.search(text, vote_match.end())
+        return Vote(
+            agent_id=analysis["agent_id"],
+            vote_type=VoteType(vote_match.group(1).lower()),
+            reasoning=text,
+            confidence=float(confidence_match.group(1)) if confidence_match else 0.8,
+        )
+
     async def _get_agent_analysis(self, agent_id: str, proposal: Proposal) -> Dict[str, Any]:
         """Get individual agent analysis of proposal"""
         member = self.council_members[agent_id]
@@ -172,11 +361,12 @@ Please provide your analysis in the following format:
 3. RECOMMENDATIONS: Specific recommendations for improvement
 4. RISK_LEVEL: Rate the risk level (LOW/MEDIUM/HIGH) from your perspective
 5. IMPLEMENTATION_NOTES: Technical notes about implementation
+6. INITIAL_VOTE: APPROVE, REJECT, MODIFY or ABSTAIN
+7. CONFIDENCE: Your confidence in that vote, from 0.0 to 1.0
 
 Be thorough but concise. Focus on your area of expertise.
 """
 
-        # Simulate API call to OpenRouter (replace with actual implementation)
         response = await self._call_openrouter(member["model"], prompt)
 
         return {"agent_id": agent_id, "role": member["role"], "analysis": response, "timestamp": datetime.now()}
@@ -297,11 +487,37 @@ Be decisive but thoughtful. Consider the full context.
         # Otherwise, no consensus
         return VoteType.ABSTAIN
 
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared OpenRouter client, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=OPENROUTER_BASE_URL,
+                headers={"Authorization": f"Bearer {self.openrouter_api_key}"},
+                timeout=self.request_timeout,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            )
+        return self._client
+
     async def _call_openrouter(self, model: str, prompt: str) -> str:
-        """Call OpenRouter API (placeholder implementation)"""
-        # This would be replaced with actual OpenRouter API call
-        # For now, return a mock response
-        return f"Mock response for {model}: Analysis of the proposal shows various considerations..."
+        """Call OpenRouter over the pooled client (mock response when no API key is configured)"""
+        if not self.openrouter_api_key:
+            return f"Mock response for {model}: Analysis of the proposal shows various considerations..."
+
+        response = await self._get_client().post(
+            "/chat/completions",
+            json={
+                "model": model if "/" in model else f"openai/{model}",
+                "messages": [{"role": "user", "content": prompt}],
+            },
+        )
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"]
+
+    async def close(self):
+        """Close the pooled OpenRouter client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     def get_session_summary(self, session_id: str) -> Dict[str, Any]:
         """Get summary of debate session"""
@@ -329,15 +545,17 @@ Be decisive but thoughtful. Consider the full context.
                 (session.ended_at - session.started_at).total_seconds() / 60 if session.ended_at else None
             ),
             "consensus_reached": session.final_decision != VoteType.ABSTAIN if session.final_decision else False,
+            "early_stop_phase": session.early_stop_phase,
         }
 
 
 # Example usage
 if __name__ == "__main__":
     import asyncio
+    import os
 
     async def test_council():
-        council = PlanningCouncil("test-api-key")
+        council = PlanningCouncil(os.getenv("OPENROUTER_API_KEY", ""))
 
         # Create test proposal
         proposal = Proposal(
@@ -359,6 +577,7 @@ if __name__ == "__main__":
         # Get summary
         summary = council.get_session_summary(session_id)
         print(json.dumps(summary, indent=2, default=str))
+        await council.close()
 
     # Run test
     asyncio.run(test_council())
@@ -1,20 +1,54 @@
 # agents/persona_manager.py
-from qdrant_client import QdrantClient
+from qdrant_client import QdrantClient, models
 import redis.asyncio as redis
 import os
+import re
 import json
 import time
-import hashlib
-from typing import Dict, List, Optional
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 import asyncio
 
+from libs.embeddings import Embedder, VectorIndex, get_embedder
+
+
+def embedding_space(embedder: Embedder) -> str:
+    """Collection-name suffix identifying the embedding model and dimension"""
+    backend = embedder.backend
+    model = getattr(backend, "model_name", None) or getattr(backend, "model_id", None) or backend.name
+    return re.sub(r"[^a-z0-9]+", "_", f"{model}_{embedder.dimensions}".lower()).strip("_")
+
+
 class PersonaManager:
-    def __init__(self):
-        self.qdrant = QdrantClient(
+    def __init__(
+        self,
+        embedder: Optional[Embedder] = None,
+        qdrant: Optional[QdrantClient] = None,
+        redis_client=None,
+        context_window: int = 200,
+        max_active_users: int = 1000,
+        index_refresh_interval: float = 300.0
+    ):
+        self.qdrant = qdrant or QdrantClient(
             url="https://a2a5dc3b-bf37-4907-9398-d49f5c6813ed.us-west-2-0.aws.cloud.qdrant.io", 
             api_key=os.getenv("QDRANT_API_KEY")
         )
-        self.redis = redis.from_url(os.getenv("REDIS_URL", "redis://sophia-cache.fly.dev"))
+        self.redis = redis_client or redis.from_url(os.getenv("REDIS_URL", "redis://sophia-cache.fly.dev"))
+        self.embedder = embedder or get_embedder()
+        
+        # Interaction vectors are only comparable within one embedding model, so each
+        # model gets its own collection. Profiles are looked up by ID and share one
+        # collection, which still has to match the embedder's dimension
+        self.interactions_collection = f"interactions_{embedding_space(self.embedder)}"
+        self.profiles_collection = "user_profiles"
+        
+        # Per-user in-memory index of recent interactions, written through to Qdrant
+        self.context_window = context_window
+        self.max_active_users = max_active_users
+        self.index_refresh_interval = index_refresh_interval
+        self._user_indexes: "OrderedDict[str, Tuple[VectorIndex, float]]" = OrderedDict()
+        self._index_locks: Dict[str, asyncio.Lock] = {}
         
         # SOPHIA's badass persona - neon cowboy tech vibe
         self.persona = {
@@ -43,62 +77,121 @@ class PersonaManager:
             collections = await asyncio.to_thread(self.qdrant.get_collections)
             collection_names = [col.name for col in collections.collections]
             
-            if "interactions" not in collection_names:
+            if self.interactions_collection not in collection_names:
                 await asyncio.to_thread(
                     self.qdrant.create_collection,
-                    collection_name="interactions",
-                    vectors_config={"size": 384, "distance": "Cosine"}
+                    collection_name=self.interactions_collection,
+                    vectors_config={"size": self.embedder.dimensions, "distance": "Cosine"}
+                )
+                # user_id filters and timestamp ordering for loading a user's latest interactions
+                await asyncio.to_thread(
+                    self.qdrant.create_payload_index,
+                    collection_name=self.interactions_collection,
+                    field_name="user_id",
+                    field_schema=models.PayloadSchemaType.KEYWORD
+                )
+                await asyncio.to_thread(
+                    self.qdrant.create_payload_index,
+                    collection_name=self.interactions_collection,
+                    field_name="timestamp",
+                    field_schema=models.PayloadSchemaType.FLOAT
                 )
+            else:
+                await self._check_dimensions(self.interactions_collection)
             
-            if "user_profiles" not in collection_names:
+            if self.profiles_collection not in collection_names:
                 await asyncio.to_thread(
                     self.qdrant.create_collection,
-                    collection_name="user_profiles",
-                    vectors_config={"size": 384, "distance": "Cosine"}
+                    collection_name=self.profiles_collection,
+                    vectors_config={"size": self.embedder.dimensions, "distance": "Cosine"}
                 )
+            else:
+                await self._check_dimensions(self.profiles_collection)
+        except ValueError:
+            raise
         except Exception as e:
             print(f"Error initializing collections: {str(e)}")
     
+    async def _check_dimensions(self, collection_name: str):
+        """Fail clearly when an existing collection was built for another vector size"""
+        info = await asyncio.to_thread(self.qdrant.get_collection, collection_name)
+        size = info.config.params.vectors.size
+        if size != self.embedder.dimensions:
+            raise ValueError(
+                f"Qdrant collection '{collection_name}' stores {size}-d vectors but the embedder "
+                f"produces {self.embedder.dimensions}-d vectors; recreate or migrate the collection"
+            )
+    
     async def generate_vector(self, text: str) -> List[float]:
-        """Generate vector embedding for text (simplified - in production use proper embedding model)"""
-        # Simple hash-based vector for demo - replace with actual embedding model
-        hash_obj = hashlib.md5(text.encode())
-        hash_hex = hash_obj.hexdigest()
-        
-        # Convert hex to normalized vector of size 384
-        vector = []
-        for i in range(0, len(hash_hex), 2):
-            byte_val = int(hash_hex[i:i+2], 16)
-            vector.append((byte_val - 127.5) / 127.5)  # Normalize to [-1, 1]
-        
-        # Pad or truncate to 384 dimensions
-        while len(vector) < 384:
-            vector.extend(vector[:min(384-len(vector), len(vector))])
+        """Generate vector embedding for text (batched and cached by the shared embedder)"""
+        return await self.embedder.embed_one(text)
+    
+    async def generate_vectors(self, texts: List[str]) -> List[List[float]]:
+        """Generate vector embeddings for several texts in one batch"""
+        return await self.embedder.embed(texts)
+    
+    async def _load_user_index(self, user_id: str) -> VectorIndex:
+        """Build a user's index from their most recent interactions in Qdrant"""
+        index = VectorIndex(self.embedder.dimensions, self.context_window)
+        points, _ = await asyncio.to_thread(
+            self.qdrant.scroll,
+            collection_name=self.interactions_collection,
+            scroll_filter=models.Filter(
+                must=[models.FieldCondition(key="user_id", match=models.MatchValue(value=user_id))]
+            ),
+            order_by=models.OrderBy(key="timestamp", direction=models.Direction.DESC),
+            limit=self.context_window,
+            with_payload=True,
+            with_vectors=True
+        )
+        # newest first from Qdrant; the ring buffer expects oldest first
+        for point in reversed(points):
+            index.add(point.vector, point.payload)
+        return index
+    
+    async def _get_user_index(self, user_id: str) -> VectorIndex:
+        """Return the user's in-memory index, loading it from Qdrant when missing or stale"""
+        entry = self._user_indexes.get(user_id)
+        if entry and time.monotonic() - entry[1] < self.index_refresh_interval:
+            self._user_indexes.move_to_end(user_id)
+            return entry[0]
         
-        return vector[:384]
+        lock = self._index_locks.setdefault(user_id, asyncio.Lock())
+        async with lock:
+            entry = self._user_indexes.get(user_id)
+            if entry and time.monotonic() - entry[1] < self.index_refresh_interval:
+                return entry[0]
+            
+            index = await self._load_user_index(user_id)
+            self._user_indexes[user_id] = (index, time.monotonic())
+            self._user_indexes.move_to_end(user_id)
+            while len(self._user_indexes) > self.max_active_users:
+                evicted, _ = self._user_indexes.popitem(last=False)
+                self._index_locks.pop(evicted, None)
+            return index
     
     async def store_interaction(self, user_id: str, query: str, response: Dict):
         """Store user interaction in long-term memory"""
         try:
             interaction_text = f"{query} -> {json.dumps(response)}"
             vector = await self.generate_vector(interaction_text)
+            payload = {
+                "user_id": user_id,
+                "query": query,
+                "response": response,
+                "timestamp": time.time(),
+                "interaction_type": "chat"
+            }
             
-            point_id = f"{user_id}_{int(time.time())}"
+            # Write through: the active user's index sees the interaction immediately
+            entry = self._user_indexes.get(user_id)
+            if entry:
+                entry[0].add(vector, payload)
             
             await asyncio.to_thread(
                 self.qdrant.upsert,
-                collection_name="interactions",
-                points=[{
-                    "id": point_id,
-                    "vector": vector,
-                    "payload": {
-                        "user_id": user_id,
-                        "query": query,
-                        "response": response,
-                        "timestamp": time.time(),
-                        "interaction_type": "chat"
-                    }
-                }]
+                collection_name=self.interactions_collection,
+                points=[models.PointStruct(id=str(uuid.uuid4()), vector=vector, payload=payload)]
             )
             
             # Also store in Redis for quick access
@@ -108,7 +201,7 @@ class PersonaManager:
                 json.dumps({
                     "query": query, 
                     "response": response, 
-                    "timestamp": time.time()
+                    "timestamp": payload["timestamp"]
                 })
             )
             
@@ -118,24 +211,19 @@ class PersonaManager:
     async def get_context(self, user_id: str, query: str = "") -> List[Dict]:
         """Get relevant context from user's interaction history"""
         try:
-            # Try Redis first for recent interactions
-            cached = await self.redis.get(f"interaction:{user_id}:last")
-            recent_context = []
-            if cached:
-                recent_context = [json.loads(cached)]
+            # Active users are served from memory; others are loaded from Qdrant once
+            index = await self._get_user_index(user_id)
+            recent_context = [
+                {"query": item["query"], "response": item["response"], "timestamp": item["timestamp"]}
+                for item in index.latest(1)
+            ]
             
-            # Search Qdrant for relevant past interactions
+            # Search the user's interactions for relevant past context
             if query:
                 query_vector = await self.generate_vector(query)
-                results = await asyncio.to_thread(
-                    self.qdrant.search,
-                    collection_name="interactions",
-                    query_vector=query_vector,
-                    query_filter={"must": [{"key": "user_id", "match": {"value": user_id}}]},
-                    limit=3
-                )
+                results = index.search(query_vector, limit=3, skip_latest=len(recent_context))
                 
-                historical_context = [point.payload for point in results]
+                historical_context = [payload for _, payload in results]
                 return recent_context + historical_context
             
             return recent_context
@@ -196,7 +284,7 @@ class PersonaManager:
             
             await asyncio.to_thread(
                 self.qdrant.upsert,
-                collection_name="user_profiles",
+                collection_name=self.profiles_collection,
                 points=[{
                     "id": user_id,
                     "vector": profile_vector,
@@ -216,7 +304,7 @@ class PersonaManager:
         try:
             results = await asyncio.to_thread(
                 self.qdrant.retrieve,
-                collection_name="user_profiles",
+                collection_name=self.profiles_collection,
                 ids=[user_id]
             )
             
@@ -4,6 +4,7 @@ Base Agent Class for SOPHIA Intel Agent Swarm
 Provides common functionality for all specialized agents in the swarm.
 """
 
+import asyncio
 import logging
 import uuid
 from abc import ABC, abstractmethod
@@ -58,12 +59,14 @@ class AgentTask:
     status: TaskStatus = TaskStatus.PENDING
     assigned_agent: Optional[str] = None
     created_at: datetime = field(default_factory=datetime.utcnow)
+    queued_at: Optional[datetime] = None
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     result: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
     dependencies: List[str] = field(default_factory=list)
     artifacts: List[str] = field(default_factory=list)
+    timeout: Optional[float] = None  # seconds; falls back to the agent's task_timeout
 
 
 @dataclass
@@ -87,6 +90,7 @@ class BaseAgent(ABC):
     - Communication with other agents
     - AI model integration via router
     - Logging and monitoring
+    - Concurrent task execution bounded by a per-agent semaphore
     """
 
     def __init__(
@@ -96,6 +100,8 @@ class BaseAgent(ABC):
         description: str,
         capabilities: List[AgentCapability],
         ai_router_url: str = "http://localhost:5000/api/ai/route",
+        max_concurrency: int = 4,
+        task_timeout: Optional[float] = 300.0,
     ):
         self.agent_type = agent_type
         self.name = name
@@ -108,13 +114,32 @@ class BaseAgent(ABC):
         self.completed_tasks: List[AgentTask] = []
         self.failed_tasks: List[AgentTask] = []
 
+        # Concurrency control: tasks are mostly I/O-bound LLM calls, so run
+        # up to max_concurrency at once instead of awaiting them one by one
+        self.max_concurrency = max_concurrency
+        self.task_timeout = task_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._running: Dict[str, asyncio.Task] = {}
+
         # Communication
         self.message_queue: List[Dict[str, Any]] = []
         self.collaborators: Dict[str, "BaseAgent"] = {}
 
         # Monitoring
         self.logger = logging.getLogger(f"agent.{self.agent_type.value}")
-        self.metrics = {"tasks_completed": 0, "tasks_failed": 0, "average_completion_time": 0.0, "success_rate": 0.0}
+        self.metrics = {
+            "tasks_completed": 0,
+            "tasks_failed": 0,
+            "tasks_timed_out": 0,
+            "tasks_cancelled": 0,
+            "average_completion_time": 0.0,
+            "average_queue_wait_time": 0.0,
+            "average_execution_time": 0.0,
+            "success_rate": 0.0,
+        }
+        self._total_queue_wait = 0.0
+        self._total_execution_time = 0.0
+        self._timed_tasks = 0
 
         # HTTP session for AI router communication
         self.session: Optional[aiohttp.ClientSession] = None
@@ -126,6 +151,10 @@ class BaseAgent(ABC):
 
     async def shutdown(self) -> None:
         """Shutdown the agent gracefully"""
+        for runner in list(self._running.values()):
+            runner.cancel()
+        if self._running:
+            await asyncio.gather(*self._running.values(), return_exceptions=True)
         if self.session:
             await self.session.close()
         self.logger.info(f"Agent {self.name} shutdown complete")
@@ -175,31 +204,91 @@ class BaseAgent(ABC):
 
         task.assigned_agent = self.name
         task.status = TaskStatus.PENDING
+        task.queued_at = datetime.utcnow()
         self.current_tasks[task.id] = task
 
         self.logger.info(f"Accepted task {task.id}: {task.description}")
         return True
 
     async def process_tasks(self) -> None:
-        """Process all pending tasks"""
-        pending_tasks = [task for task in self.current_tasks.values() if task.status == TaskStatus.PENDING]
+        """
+        Process all pending tasks concurrently.
+
+        Tasks are dispatched highest priority first (FIFO within a priority);
+        at most max_concurrency run at once. Returns when every dispatched
+        task has completed, failed, timed out or been cancelled.
+        """
+        pending_tasks = [
+            task
+            for task in self.current_tasks.values()
+            if task.status == TaskStatus.PENDING and task.id not in self._running
+        ]
 
         # Sort by priority
-        pending_tasks.sort(key=lambda t: t.priority.value, reverse=True)
+        pending_tasks.sort(key=lambda t: (-t.priority.value, t.created_at))
+
+        dispatched: List[asyncio.Task] = []
+        try:
+            for task in pending_tasks:
+                # Acquire before spawning so slots are handed out in priority order
+                await self._semaphore.acquire()
+                if task.status != TaskStatus.PENDING or task.id not in self.current_tasks:
+                    # Cancelled while waiting for a slot
+                    self._semaphore.release()
+                    continue
+                runner = asyncio.create_task(self._execute_task_with_monitoring(task))
+                # Done callbacks run even if the task is cancelled before it starts
+                runner.add_done_callback(lambda _, task_id=task.id: self._release_slot(task_id))
+                self._running[task.id] = runner
+                dispatched.append(runner)
+
+            await asyncio.gather(*dispatched, return_exceptions=True)
+        except asyncio.CancelledError:
+            for runner in dispatched:
+                runner.cancel()
+            raise
+
+    def _release_slot(self, task_id: str) -> None:
+        """Release the concurrency slot held by a dispatched task"""
+        self._running.pop(task_id, None)
+        self._semaphore.release()
+
+    async def cancel_task(self, task_id: str) -> bool:
+        """
+        Cancel a pending or running task.
+
+        Args:
+            task_id: ID of the task to cancel
+
+        Returns:
+            True if the task was cancelled, False if it is unknown or already finished
+        """
+        runner = self._running.get(task_id)
+        if runner is not None:
+            runner.cancel()
+            await asyncio.gather(runner, return_exceptions=True)
+
+        # Not yet dispatched, or cancelled before its coroutine got to run
+        task = self.current_tasks.get(task_id)
+        if task is not None and task.status == TaskStatus.PENDING:
+            self._fail_task(task, "Task cancelled")
+            self.metrics["tasks_cancelled"] += 1
+            self._update_metrics()
+            return True
 
-        for task in pending_tasks:
-            await self._execute_task_with_monitoring(task)
+        return runner is not None
 
     async def _execute_task_with_monitoring(self, task: AgentTask) -> None:
-        """Execute a task with monitoring and error handling"""
+        """Execute a task with monitoring, timeout and error handling"""
         task.status = TaskStatus.IN_PROGRESS
         task.started_at = datetime.utcnow()
+        timeout = task.timeout if task.timeout is not None else self.task_timeout
 
         try:
             self.logger.info(f"Starting task {task.id}: {task.description}")
 
             # Execute the task
-            result = await self.execute_task(task)
+            result = await asyncio.wait_for(self.execute_task(task), timeout=timeout)
 
             # Mark as completed
             task.status = TaskStatus.COMPLETED
@@ -212,26 +301,57 @@ class BaseAgent(ABC):
 
             # Update metrics
             self.metrics["tasks_completed"] += 1
+            self._record_timing(task)
             self._update_metrics()
 
             self.logger.info(f"Completed task {task.id} successfully")
 
-        except Exception as e:
-            # Mark as failed
-            task.status = TaskStatus.FAILED
-            task.completed_at = datetime.utcnow()
-            task.error = str(e)
+        except asyncio.TimeoutError:
+            self._fail_task(task, f"Task timed out after {timeout}s")
+            self.metrics["tasks_timed_out"] += 1
+            self._record_timing(task)
+            self._update_metrics()
 
-            # Move to failed tasks
-            self.failed_tasks.append(task)
-            del self.current_tasks[task.id]
+            self.logger.error(f"Task {task.id} timed out after {timeout}s")
 
-            # Update metrics
-            self.metrics["tasks_failed"] += 1
+        except asyncio.CancelledError:
+            self._fail_task(task, "Task cancelled")
+            self.metrics["tasks_cancelled"] += 1
+            self._record_timing(task)
+            self._update_metrics()
+
+            self.logger.warning(f"Task {task.id} cancelled")
+            raise
+
+        except Exception as e:
+            self._fail_task(task, str(e))
+            self._record_timing(task)
             self._update_metrics()
 
             self.logger.error(f"Task {task.id} failed: {e}")
 
+    def _fail_task(self, task: AgentTask, error: str) -> None:
+        """Mark a task as failed and move it to the failed list"""
+        task.status = TaskStatus.FAILED
+        task.completed_at = datetime.utcnow()
+        task.error = error
+
+        # Move to failed tasks
+        self.failed_tasks.append(task)
+        self.current_tasks.pop(task.id, None)
+
+        # Update metrics
+        self.metrics["tasks_failed"] += 1
+
+    def _record_timing(self, task: AgentTask) -> None:
+        """Accumulate queue wait (queued -> started) and execution (started -> finished) time"""
+        if not (task.started_at and task.completed_at):
+            return
+        queued_at = task.queued_at or task.created_at
+        self._total_queue_wait += max((task.started_at - queued_at).total_seconds(), 0.0)
+        self._total_execution_time += (task.completed_at - task.started_at).total_seconds()
+        self._timed_tasks += 1
+
     async def communicate_with_ai(
         self, prompt: str, task_type: str = "code_generation", context: Optional[Dict[str, Any]] = None
     ) -> str:
@@ -314,6 +434,10 @@ class BaseAgent(ABC):
             total_time = sum((t.completed_at - t.started_at).total_seconds() for t in completed_tasks)
             self.metrics["average_completion_time"] = total_time / len(completed_tasks)
 
+        if self._timed_tasks:
+            self.metrics["average_queue_wait_time"] = self._total_queue_wait / self._timed_tasks
+            self.metrics["average_execution_time"] = self._total_execution_time / self._timed_tasks
+
     def get_status(self) -> Dict[str, Any]:
         """Get current agent status"""
         return {
@@ -321,6 +445,8 @@ class BaseAgent(ABC):
             "type": self.agent_type.value,
             "description": self.description,
             "current_tasks": len(self.current_tasks),
+            "running_tasks": len(self._running),
+            "max_concurrency": self.max_concurrency,
             "completed_tasks": len(self.completed_tasks),
             "failed_tasks": len(self.failed_tasks),
             "metrics": self.metrics,
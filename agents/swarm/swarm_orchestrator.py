@@ -300,9 +300,8 @@ class SwarmOrchestrator:
                 for mission in self.active_missions.values():
                     await self._process_mission_tasks(mission)
 
-                # Process agent task queues
-                for agent in self.agent_pool:
-                    await agent.process_tasks()
+                # Process agent task queues (each agent bounds its own concurrency)
+                await asyncio.gather(*(agent.process_tasks() for agent in self.agent_pool))
 
                 await asyncio.sleep(self.task_scheduler_interval)
 
@@ -1,19 +1,27 @@
 # agents/swarm_manager.py
 from typing import List, Dict, Optional
-from github import Github, GithubException
 import os
-import json
 import time
 import asyncio
 import hashlib
 from datetime import datetime
 
+from .swarm_store import GitHubSwarmExporter, SwarmStore, create_swarm_store
+
 class SwarmManager:
-    def __init__(self):
-        self.github_client = Github(os.getenv("GH_FINE_GRAINED_TOKEN"))
+    def __init__(self, store: Optional[SwarmStore] = None, github_export: Optional[bool] = None):
         self.repo_name = "ai-cherry/sophia-intel"
         self.swarm_configs_path = "swarm_configs"
         
+        # Swarm state lives in a local database; GitHub is an optional, batched audit trail
+        self.store = store or create_swarm_store()
+        if github_export is None:
+            github_export = os.getenv("SWARM_GITHUB_EXPORT", "false").lower() == "true"
+        self.exporter = GitHubSwarmExporter(self.repo_name, self.swarm_configs_path) if github_export else None
+        self.export_batch_size = int(os.getenv("SWARM_EXPORT_BATCH_SIZE", "20"))
+        self._export_lock = asyncio.Lock()
+        self._export_task: Optional[asyncio.Task] = None
+        
         # Available agent types and their capabilities
         self.agent_types = {
             "research": {
@@ -72,19 +80,20 @@ class SwarmManager:
                 "coordination_logs": []
             }
             
-            # Deploy agents
-            deployment_results = {}
+            # Deploy agents concurrently
             coordination_logs = [f"Task analyzed, {len(valid_agents)} agents required"]
+            agent_ids = {
+                agent_type: f"{agent_type}_{hashlib.md5(f'{agent_type}{time.time()}'.encode()).hexdigest()[:8]}"
+                for agent_type in valid_agents
+            }
+            deployments = await asyncio.gather(*(
+                self.deploy_agent(agent_type, agent_ids[agent_type], task, objective)
+                for agent_type in valid_agents
+            ))
+            deployment_results = dict(zip(valid_agents, deployments))
             
-            for agent_type in valid_agents:
-                agent_id = f"{agent_type}_{hashlib.md5(f'{agent_type}{time.time()}'.encode()).hexdigest()[:8]}"
-                
-                # Simulate agent deployment
-                await asyncio.sleep(0.1)  # Simulate deployment time
-                
-                agent_result = await self.deploy_agent(agent_type, agent_id, task, objective)
-                deployment_results[agent_type] = agent_result
-                
+            for agent_type, agent_result in deployment_results.items():
+                agent_id = agent_ids[agent_type]
                 swarm_config["agents"][agent_type] = {
                     "agent_id": agent_id,
                     "type": agent_type,
@@ -116,7 +125,7 @@ class SwarmManager:
             swarm_config["status"] = "completed" if success_count > 0 else "failed"
             swarm_config["completed_at"] = datetime.now().isoformat()
             
-            # Store swarm configuration in GitHub
+            # Store swarm configuration
             await self.store_swarm_config(coordinator_id, swarm_config)
             
             return {
@@ -311,78 +320,62 @@ class SwarmManager:
         }
     
     async def store_swarm_config(self, coordinator_id: str, config: Dict):
-        """Store swarm configuration in GitHub repository"""
+        """Store swarm configuration in the swarm state store"""
         try:
-            repo = self.github_client.get_repo(self.repo_name)
-            config_path = f"{self.swarm_configs_path}/{coordinator_id}.json"
-            commit_message = f"Deploy swarm {coordinator_id} for {config.get('objective', 'unknown objective')}"
-            
-            config_content = json.dumps(config, indent=2)
-            
-            try:
-                # Try to update existing file
-                contents = repo.get_contents(config_path, ref="main")
-                repo.update_file(
-                    config_path, 
-                    commit_message, 
-                    config_content, 
-                    contents.sha, 
-                    branch="main"
-                )
-            except GithubException:
-                # File doesn't exist, create it
-                repo.create_file(
-                    config_path, 
-                    commit_message, 
-                    config_content, 
-                    branch="main"
-                )
-            
+            await self.store.save({**config, "coordinator_id": coordinator_id})
+            self._schedule_export()
         except Exception as e:
             print(f"Error storing swarm config: {str(e)}")
     
+    def _schedule_export(self):
+        """Start a background GitHub export once a full batch is pending"""
+        if self.exporter is None or (self._export_task and not self._export_task.done()):
+            return
+        self._export_task = asyncio.create_task(self.flush_export(min_batch=self.export_batch_size))
+    
+    async def flush_export(self, min_batch: int = 1) -> int:
+        """Export pending swarm configs to GitHub in batches; returns the number exported"""
+        if self.exporter is None:
+            return 0
+        
+        exported = 0
+        async with self._export_lock:
+            while True:
+                pending = await self.store.pending_exports(limit=max(self.export_batch_size, min_batch))
+                if not pending or len(pending) < min_batch:
+                    return exported
+                try:
+                    await self.exporter.export(pending)
+                except Exception as e:
+                    print(f"Error exporting swarm configs to GitHub: {str(e)}")
+                    return exported
+                await self.store.mark_exported([config["coordinator_id"] for config in pending])
+                exported += len(pending)
+    
     async def get_swarm_status(self, coordinator_id: str) -> Optional[Dict]:
         """Get status of a specific swarm"""
         try:
-            repo = self.github_client.get_repo(self.repo_name)
-            config_path = f"{self.swarm_configs_path}/{coordinator_id}.json"
-            
-            contents = repo.get_contents(config_path, ref="main")
-            config = json.loads(contents.decoded_content.decode())
-            
-            return config
-            
+            return await self.store.get(coordinator_id)
         except Exception as e:
             print(f"Error getting swarm status: {str(e)}")
             return None
     
-    async def list_active_swarms(self) -> List[Dict]:
-        """List all active swarms"""
+    async def list_swarms(self, status: Optional[str] = None, limit: int = 50, cursor: Optional[str] = None) -> Dict:
+        """List swarms newest first, one page at a time"""
+        return await self.store.list(status=status, limit=limit, cursor=cursor)
+    
+    async def list_active_swarms(self, status: Optional[str] = None, limit: int = 50, cursor: Optional[str] = None) -> List[Dict]:
+        """List swarms (first page unless a cursor from list_swarms is given)"""
         try:
-            repo = self.github_client.get_repo(self.repo_name)
-            
-            try:
-                contents = repo.get_contents(self.swarm_configs_path, ref="main")
-                swarms = []
-                
-                for item in contents:
-                    if item.name.endswith('.json'):
-                        config = json.loads(item.decoded_content.decode())
-                        swarms.append({
-                            "coordinator_id": config.get("coordinator_id"),
-                            "status": config.get("status"),
-                            "created_at": config.get("created_at"),
-                            "task": config.get("task"),
-                            "agents_count": len(config.get("agents", {}))
-                        })
-                
-                return swarms
-                
-            except GithubException:
-                # Directory doesn't exist yet
-                return []
-            
+            page = await self.list_swarms(status=status, limit=limit, cursor=cursor)
+            return page["swarms"]
         except Exception as e:
             print(f"Error listing swarms: {str(e)}")
             return []
-
+    
+    async def close(self):
+        """Flush pending exports and close the state store"""
+        if self._export_task:
+            await asyncio.gather(self._export_task, return_exceptions=True)
+        await self.flush_export()
+        await self.store.close()
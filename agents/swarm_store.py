@@ -0,0 +1,332 @@
+# agents/swarm_store.py
+"""
+Swarm state store.
+
+Swarm configs live in a local database (SQLite by default, Postgres when
+SWARM_STORE_URL points at one) so creating and looking up swarms never touches
+the GitHub API. GitHub is kept as an optional audit trail: unexported swarms are
+written in batches, one commit per batch.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_URL = "sqlite:///swarm_state.db"
+MAX_PAGE_SIZE = 500
+
+_SUMMARY_COLUMNS = "coordinator_id, task_id, task, user_id, status, created_at, completed_at, agents_count"
+
+
+def _row_values(config: Dict[str, Any]) -> Tuple:
+    return (
+        config["coordinator_id"],
+        config.get("task_id"),
+        config.get("task"),
+        config.get("objective"),
+        config.get("user_id"),
+        config.get("status", "unknown"),
+        config.get("created_at"),
+        config.get("completed_at"),
+        len(config.get("agents", {})),
+        json.dumps(config),
+    )
+
+
+def encode_cursor(created_at: str, coordinator_id: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([created_at, coordinator_id]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        created_at, coordinator_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return created_at, coordinator_id
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def _page(rows: List[Dict[str, Any]], limit: int) -> Dict[str, Any]:
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["coordinator_id"]) if has_more else None
+    return {"swarms": rows, "next_cursor": next_cursor}
+
+
+class SwarmStore:
+    """Interface shared by the swarm store backends."""
+
+    async def save(self, config: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    async def get(self, coordinator_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    async def list(self, status: Optional[str] = None, limit: int = 50, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Newest-first page of swarm summaries plus ``next_cursor`` (None on the last page)."""
+        raise NotImplementedError
+
+    async def pending_exports(self, limit: int = 100) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    async def mark_exported(self, coordinator_ids: List[str]) -> None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class SQLiteSwarmStore(SwarmStore):
+    """SQLite backend. Queries run in a worker thread so the event loop never blocks."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS swarms (
+            coordinator_id TEXT PRIMARY KEY,
+            task_id TEXT,
+            task TEXT,
+            objective TEXT,
+            user_id TEXT,
+            status TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            completed_at TEXT,
+            agents_count INTEGER NOT NULL DEFAULT 0,
+            config TEXT NOT NULL,
+            exported INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_swarms_status_created ON swarms(status, created_at, coordinator_id);
+        CREATE INDEX IF NOT EXISTS idx_swarms_created ON swarms(created_at, coordinator_id);
+        CREATE INDEX IF NOT EXISTS idx_swarms_unexported ON swarms(exported) WHERE exported = 0;
+    """
+
+    def __init__(self, path: str = "swarm_state.db"):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            if self.path != ":memory:":
+                conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self.SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    async def _run(self, fn, *args):
+        def call():
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    return fn(conn, *args)
+        return await asyncio.to_thread(call)
+
+    async def save(self, config: Dict[str, Any]) -> None:
+        def save(conn, values):
+            conn.execute(
+                """
+                INSERT INTO swarms (coordinator_id, task_id, task, objective, user_id, status,
+                                    created_at, completed_at, agents_count, config, exported)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
+                ON CONFLICT(coordinator_id) DO UPDATE SET
+                    status = excluded.status, completed_at = excluded.completed_at,
+                    agents_count = excluded.agents_count, config = excluded.config, exported = 0
+                """,
+                values,
+            )
+        await self._run(save, _row_values(config))
+
+    async def get(self, coordinator_id: str) -> Optional[Dict[str, Any]]:
+        def get(conn, coordinator_id):
+            row = conn.execute("SELECT config FROM swarms WHERE coordinator_id = ?", (coordinator_id,)).fetchone()
+            return json.loads(row["config"]) if row else None
+        return await self._run(get, coordinator_id)
+
+    async def list(self, status: Optional[str] = None, limit: int = 50, cursor: Optional[str] = None) -> Dict[str, Any]:
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        clauses, params = [], []
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if cursor:
+            clauses.append("(created_at, coordinator_id) < (?, ?)")
+            params.extend(decode_cursor(cursor))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        query = (
+            f"SELECT {_SUMMARY_COLUMNS} FROM swarms {where} "
+            f"ORDER BY created_at DESC, coordinator_id DESC LIMIT ?"
+        )
+
+        def list_rows(conn, params):
+            return [dict(row) for row in conn.execute(query, params).fetchall()]
+        return _page(await self._run(list_rows, (*params, limit + 1)), limit)
+
+    async def pending_exports(self, limit: int = 100) -> List[Dict[str, Any]]:
+        def pending(conn, limit):
+            rows = conn.execute(
+                "SELECT config FROM swarms WHERE exported = 0 ORDER BY created_at LIMIT ?", (limit,)
+            ).fetchall()
+            return [json.loads(row["config"]) for row in rows]
+        return await self._run(pending, limit)
+
+    async def mark_exported(self, coordinator_ids: List[str]) -> None:
+        def mark(conn, ids):
+            conn.executemany("UPDATE swarms SET exported = 1 WHERE coordinator_id = ?", [(i,) for i in ids])
+        await self._run(mark, coordinator_ids)
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            await asyncio.to_thread(conn.close)
+
+
+class PostgresSwarmStore(SwarmStore):
+    """Postgres backend using an asyncpg pool."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS swarms (
+            coordinator_id VARCHAR(64) PRIMARY KEY,
+            task_id VARCHAR(64),
+            task TEXT,
+            objective TEXT,
+            user_id VARCHAR(255),
+            status VARCHAR(32) NOT NULL,
+            created_at TEXT NOT NULL,
+            completed_at TEXT,
+            agents_count INTEGER NOT NULL DEFAULT 0,
+            config JSONB NOT NULL,
+            exported BOOLEAN NOT NULL DEFAULT FALSE
+        );
+        CREATE INDEX IF NOT EXISTS idx_swarms_status_created ON swarms(status, created_at, coordinator_id);
+        CREATE INDEX IF NOT EXISTS idx_swarms_created ON swarms(created_at, coordinator_id);
+        CREATE INDEX IF NOT EXISTS idx_swarms_unexported ON swarms(exported) WHERE NOT exported;
+    """
+
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self._pool = None
+
+    async def _get_pool(self):
+        if self._pool is None:
+            import asyncpg
+
+            self._pool = await asyncpg.create_pool(self.dsn, min_size=1, max_size=5, command_timeout=30)
+            async with self._pool.acquire() as conn:
+                await conn.execute(self.SCHEMA)
+        return self._pool
+
+    async def save(self, config: Dict[str, Any]) -> None:
+        pool = await self._get_pool()
+        await pool.execute(
+            """
+            INSERT INTO swarms (coordinator_id, task_id, task, objective, user_id, status,
+                                created_at, completed_at, agents_count, config, exported)
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10::jsonb, FALSE)
+            ON CONFLICT (coordinator_id) DO UPDATE SET
+                status = EXCLUDED.status, completed_at = EXCLUDED.completed_at,
+                agents_count = EXCLUDED.agents_count, config = EXCLUDED.config, exported = FALSE
+            """,
+            *_row_values(config),
+        )
+
+    async def get(self, coordinator_id: str) -> Optional[Dict[str, Any]]:
+        pool = await self._get_pool()
+        config = await pool.fetchval("SELECT config::text FROM swarms WHERE coordinator_id = $1", coordinator_id)
+        return json.loads(config) if config else None
+
+    async def list(self, status: Optional[str] = None, limit: int = 50, cursor: Optional[str] = None) -> Dict[str, Any]:
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        clauses, params = [], []
+        if status:
+            params.append(status)
+            clauses.append(f"status = ${len(params)}")
+        if cursor:
+            params.extend(decode_cursor(cursor))
+            clauses.append(f"(created_at, coordinator_id) < (${len(params) - 1}, ${len(params)})")
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        params.append(limit + 1)
+
+        pool = await self._get_pool()
+        rows = await pool.fetch(
+            f"SELECT {_SUMMARY_COLUMNS} FROM swarms {where} "
+            f"ORDER BY created_at DESC, coordinator_id DESC LIMIT ${len(params)}",
+            *params,
+        )
+        return _page([dict(row) for row in rows], limit)
+
+    async def pending_exports(self, limit: int = 100) -> List[Dict[str, Any]]:
+        pool = await self._get_pool()
+        rows = await pool.fetch(
+            "SELECT config::text AS config FROM swarms WHERE NOT exported ORDER BY created_at LIMIT $1", limit
+        )
+        return [json.loads(row["config"]) for row in rows]
+
+    async def mark_exported(self, coordinator_ids: List[str]) -> None:
+        pool = await self._get_pool()
+        await pool.execute("UPDATE swarms SET exported = TRUE WHERE coordinator_id = ANY($1::text[])", coordinator_ids)
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+
+def create_swarm_store(url: Optional[str] = None) -> SwarmStore:
+    """
+    Build a store from a URL (default: SWARM_STORE_URL, else a local SQLite file).
+
+    ``sqlite:///path/to/file.db`` or ``sqlite:///:memory:`` select SQLite;
+    ``postgres://`` / ``postgresql://`` DSNs select Postgres.
+    """
+    url = url or os.getenv("SWARM_STORE_URL", DEFAULT_STORE_URL)
+    if url.startswith("sqlite:///"):
+        return SQLiteSwarmStore(url[len("sqlite:///"):])
+    if url.startswith(("postgres://", "postgresql://")):
+        return PostgresSwarmStore(url)
+    raise ValueError(f"Unsupported swarm store URL: {url}")
+
+
+class GitHubSwarmExporter:
+    """
+    Writes swarm configs to GitHub as an audit trail, one commit per batch.
+
+    Uses the git data API with inline tree content, so a batch of any size costs
+    four API calls instead of two per swarm.
+    """
+
+    def __init__(self, repo_name: str, path: str = "swarm_configs", branch: str = "main", token: Optional[str] = None):
+        self.repo_name = repo_name
+        self.path = path
+        self.branch = branch
+        self.token = token or os.getenv("GH_FINE_GRAINED_TOKEN")
+        self._client = None
+
+    def _export_sync(self, configs: List[Dict[str, Any]]) -> str:
+        from github import Github, InputGitTreeElement
+
+        if self._client is None:
+            self._client = Github(self.token)
+        repo = self._client.get_repo(self.repo_name)
+        ref = repo.get_git_ref(f"heads/{self.branch}")
+        base_commit = repo.get_git_commit(ref.object.sha)
+
+        elements = [
+            InputGitTreeElement(
+                f"{self.path}/{config['coordinator_id']}.json", "100644", "blob",
+                content=json.dumps(config, indent=2),
+            )
+            for config in configs
+        ]
+        tree = repo.create_git_tree(elements, base_commit.tree)
+        commit = repo.create_git_commit(f"Export {len(configs)} swarm configs", tree, [base_commit])
+        ref.edit(commit.sha)
+        return commit.sha
+
+    async def export(self, configs: List[Dict[str, Any]]) -> str:
+        return await asyncio.to_thread(self._export_sync, configs)
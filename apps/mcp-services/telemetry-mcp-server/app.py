@@ -15,6 +15,9 @@ sys.path.append('/app/shared')
 # Import shared secret manager
 from secret_manager import SecretManager
 
+# Shared Prometheus instrumentation (libs/metrics, shipped in the image)
+from libs.metrics.wsgi import init_wsgi_metrics
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -32,6 +35,9 @@ def create_app():
     # Get service name from environment or directory
     service_name = os.getenv('MCP_SERVICE_NAME', 'unknown')
     
+    # Expose the same /metrics contract as the FastAPI MCP servers
+    init_wsgi_metrics(app, f"{service_name}-mcp", "1.0.0")
+    
     # Initialize secret manager
     secret_manager = SecretManager(service_name)
     
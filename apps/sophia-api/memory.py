@@ -3,10 +3,13 @@ from qdrant_client.models import Distance, VectorParams, PointStruct
 import json
 import logging
 from datetime import datetime
-import hashlib
+import asyncio
 import os
 from sentence_transformers import SentenceTransformer
 
+from libs.chunking import Chunker
+from libs.vectors import get_vector_writer, point_id
+
 logger = logging.getLogger(__name__)
 
 class SophiaMemory:
@@ -16,7 +19,10 @@ class SophiaMemory:
             api_key=os.getenv("QDRANT_API_KEY")
         )
         self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        # all-MiniLM-L6-v2 truncates input at 256 word pieces
+        self.chunker = Chunker(max_tokens=256, overlap_tokens=32)
         self.collection_name = "sophia_memory"
+        self.writer = get_vector_writer(self.qdrant)
         self._ensure_collection()
 
     def _ensure_collection(self):
@@ -32,71 +38,82 @@ class SophiaMemory:
         except Exception as e:
             logger.error(f"Collection setup failed: {e}")
 
-    def _chunk_text(self, text: str, chunk_size: int = 512, overlap: int = 50):
-        """Chunk text into smaller pieces with overlap"""
-        chunks = []
-        start = 0
-        while start < len(text):
-            end = start + chunk_size
-            chunk = text[start:end]
-            chunks.append(chunk)
-            start = end - overlap
-        return chunks
+    def _chunk_text(self, text: str):
+        """Chunk text into token-budgeted pieces with overlap"""
+        return [chunk.text for chunk in self.chunker.chunk(text, kind="text")]
+
+    def _build_points(self, context: str, data: dict, tags: list = None):
+        """Chunk, tag and embed data into points (one encode call for all chunks)"""
+        # Prepare content for chunking
+        content = json.dumps(data) if isinstance(data, dict) else str(data)
+        chunks = self._chunk_text(content)
+
+        # Generate hierarchical tags
+        base_tags = [f"ctx:{context}"]
+        if tags:
+            base_tags.extend(tags)
+
+        # Add automatic tags based on data structure
+        if isinstance(data, dict):
+            if "type" in data:
+                base_tags.append(f"type:{data['type']}")
+            if "category" in data:
+                base_tags.append(f"cat:{data['category']}")
+            if "source" in data:
+                base_tags.append(f"src:{data['source']}")
+            if "priority" in data:
+                base_tags.append(f"pri:{data['priority']}")
+
+        vectors = self.model.encode(chunks).tolist() if chunks else []
+        timestamp = datetime.now().isoformat()
+
+        # Ids depend only on context and content, so re-storing (or retrying) overwrites instead of duplicating
+        points = [
+            PointStruct(
+                id=point_id(context, i, chunk),
+                vector=vector,
+                payload={
+                    "context": context,
+                    "chunk": chunk,
+                    "chunk_index": i,
+                    "total_chunks": len(chunks),
+                    "tags": base_tags,
+                    "timestamp": timestamp,
+                    "source": data.get("source", "unknown") if isinstance(data, dict) else "unknown",
+                    "metadata": data if isinstance(data, dict) else {"content": str(data)}
+                }
+            )
+            for i, (chunk, vector) in enumerate(zip(chunks, vectors))
+        ]
+        return points, base_tags
 
     def store(self, context: str, data: dict, tags: list = None):
         """Store context with hierarchical meta-tagging"""
         try:
-            # Prepare content for chunking
-            content = json.dumps(data) if isinstance(data, dict) else str(data)
-            chunks = self._chunk_text(content)
-            
-            # Generate hierarchical tags
-            base_tags = [f"ctx:{context}"]
-            if tags:
-                base_tags.extend(tags)
-            
-            # Add automatic tags based on data structure
-            if isinstance(data, dict):
-                if "type" in data:
-                    base_tags.append(f"type:{data['type']}")
-                if "category" in data:
-                    base_tags.append(f"cat:{data['category']}")
-                if "source" in data:
-                    base_tags.append(f"src:{data['source']}")
-                if "priority" in data:
-                    base_tags.append(f"pri:{data['priority']}")
-            
-            # Create points for each chunk
-            points = []
-            for i, chunk in enumerate(chunks):
-                chunk_id = hashlib.md5(f"{context}_{i}_{chunk}".encode()).hexdigest()
-                vector = self.model.encode(chunk).tolist()
-                
-                point = PointStruct(
-                    id=chunk_id,
-                    vector=vector,
-                    payload={
-                        "context": context,
-                        "chunk": chunk,
-                        "chunk_index": i,
-                        "total_chunks": len(chunks),
-                        "tags": base_tags,
-                        "timestamp": datetime.now().isoformat(),
-                        "source": data.get("source", "unknown") if isinstance(data, dict) else "unknown",
-                        "metadata": data if isinstance(data, dict) else {"content": str(data)}
-                    }
-                )
-                points.append(point)
-            
+            points, base_tags = self._build_points(context, data, tags)
+
             # Store in Qdrant
             self.qdrant.upsert(
                 collection_name=self.collection_name,
                 points=points
             )
-            
-            logger.info(f"Stored {len(chunks)} chunks for context: {context}")
-            return {"status": "stored", "chunks": len(chunks), "tags": base_tags}
-        
+
+            logger.info(f"Stored {len(points)} chunks for context: {context}")
+            return {"status": "stored", "chunks": len(points), "tags": base_tags}
+
+        except Exception as e:
+            logger.error(f"Memory storage failed: {e}")
+            return {"status": "error", "error": str(e)}
+
+    async def astore(self, context: str, data: dict, tags: list = None):
+        """Async store; concurrent calls share batched upserts through the vector writer"""
+        try:
+            points, base_tags = await asyncio.to_thread(self._build_points, context, data, tags)
+            await self.writer.write(self.collection_name, points)
+
+            logger.info(f"Stored {len(points)} chunks for context: {context}")
+            return {"status": "stored", "chunks": len(points), "tags": base_tags}
+
         except Exception as e:
             logger.error(f"Memory storage failed: {e}")
             return {"status": "error", "error": str(e)}
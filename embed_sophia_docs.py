@@ -7,10 +7,11 @@ Chunks and embeds key documentation into the vector database for SOPHIA's knowle
 import os
 import json
 import asyncio
-import hashlib
 from pathlib import Path
 from typing import List, Dict, Any
 
+from libs.chunking import Chunker
+
 # Configuration
 DOCS_TO_EMBED = [
     "README.md",
@@ -22,68 +23,32 @@ DOCS_TO_EMBED = [
     "secrets_audit.md"
 ]
 
-CHUNK_SIZE = 600  # words per chunk
-OVERLAP = 50      # word overlap between chunks
+CHUNK_SIZE = 800  # tokens per chunk
+OVERLAP = 64      # token overlap between chunks
 
 class SOPHIADocumentEmbedder:
     def __init__(self):
         self.embedded_chunks = []
         self.total_chunks = 0
+        self.chunker = Chunker(max_tokens=CHUNK_SIZE, overlap_tokens=OVERLAP)
         
     def chunk_document(self, content: str, source_file: str) -> List[Dict[str, Any]]:
-        """Split document into overlapping chunks with metadata"""
-        
-        # Split into paragraphs first
-        paragraphs = [p.strip() for p in content.split('\n\n') if p.strip()]
-        
-        chunks = []
-        current_chunk = ""
-        current_words = 0
-        chunk_index = 0
-        
-        for para in paragraphs:
-            para_words = len(para.split())
-            
-            # If adding this paragraph would exceed chunk size, finalize current chunk
-            if current_words + para_words > CHUNK_SIZE and current_chunk:
-                chunks.append({
-                    "text": current_chunk.strip(),
-                    "metadata": {
-                        "source_file": source_file,
-                        "chunk_index": chunk_index,
-                        "word_count": current_words,
-                        "chunk_id": hashlib.md5(f"{source_file}_{chunk_index}".encode()).hexdigest()[:8],
-                        "collection": "sophia-docs"
-                    }
-                })
-                
-                # Start new chunk with overlap
-                overlap_words = current_chunk.split()[-OVERLAP:] if current_words > OVERLAP else []
-                current_chunk = " ".join(overlap_words) + "\n\n" + para
-                current_words = len(overlap_words) + para_words
-                chunk_index += 1
-            else:
-                # Add paragraph to current chunk
-                if current_chunk:
-                    current_chunk += "\n\n" + para
-                else:
-                    current_chunk = para
-                current_words += para_words
-        
-        # Add final chunk if it exists
-        if current_chunk.strip():
-            chunks.append({
-                "text": current_chunk.strip(),
+        """Split document into overlapping, heading-aware chunks with metadata"""
+        return [
+            {
+                "text": chunk.text,
                 "metadata": {
                     "source_file": source_file,
-                    "chunk_index": chunk_index,
-                    "word_count": current_words,
-                    "chunk_id": hashlib.md5(f"{source_file}_{chunk_index}".encode()).hexdigest()[:8],
+                    "chunk_index": chunk.index,
+                    "word_count": len(chunk.text.split()),
+                    "token_count": chunk.token_count,
+                    "headings": chunk.symbols,
+                    "chunk_id": chunk.id,
                     "collection": "sophia-docs"
                 }
-            })
-        
-        return chunks
+            }
+            for chunk in self.chunker.chunk(content, source=source_file)
+        ]
     
     async def embed_chunk(self, chunk: Dict[str, Any]) -> bool:
         """Simulate embedding chunk to vector database"""
@@ -0,0 +1,28 @@
+"""
+SOPHIA shared chunking.
+
+One token-budgeted chunking engine for every indexer: Python is split at
+function and class boundaries from the AST, prose at headings and
+paragraphs, and every chunk carries a stable content-hash id.
+"""
+
+from .chunker import Chunk, Chunker, chunk_id, detect_kind
+from .tokenizer import (
+    RegexTokenizer,
+    TiktokenTokenizer,
+    Tokenizer,
+    get_tokenizer,
+    tokenizer_for_model,
+)
+
+__all__ = [
+    "Chunk",
+    "Chunker",
+    "chunk_id",
+    "detect_kind",
+    "RegexTokenizer",
+    "TiktokenTokenizer",
+    "Tokenizer",
+    "get_tokenizer",
+    "tokenizer_for_model",
+]
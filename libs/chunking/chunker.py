@@ -0,0 +1,304 @@
+"""
+Structure-aware, token-budgeted chunking.
+
+Source is first cut into structural units: top-level functions, classes and
+the module code between them for Python (from the AST), headings and
+paragraphs for Markdown and other prose, blank-line separated blocks for
+everything else. Units are then packed greedily into chunks of at most
+max_tokens. A unit is only split when it is larger than the budget on its
+own: a class into its methods, anything else by lines, then sentences,
+then tokens.
+"""
+
+import ast
+import hashlib
+import os
+import re
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .tokenizer import Tokenizer, get_tokenizer
+
+PYTHON_EXTENSIONS = {".py", ".pyi"}
+PROSE_EXTENSIONS = {".md", ".markdown", ".mdx", ".rst", ".txt"}
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_DEFINITIONS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+def detect_kind(source: str) -> str:
+    """Chunking strategy for a path: "code", "prose" or "text"."""
+    extension = os.path.splitext(source)[1].lower()
+    if extension in PYTHON_EXTENSIONS:
+        return "code"
+    if extension in PROSE_EXTENSIONS:
+        return "prose"
+    return "text"
+
+
+def chunk_id(source: str, text: str) -> str:
+    """Stable id (a UUID string, usable as a Qdrant point id) from the source path and chunk content."""
+    digest = hashlib.sha256(f"{source}\0{text}".encode()).digest()
+    return str(uuid.UUID(bytes=digest[:16]))
+
+
+@dataclass
+class Chunk:
+    """A chunk of a source, with the 1-based line range it came from."""
+    id: str
+    text: str
+    source: str
+    index: int
+    kind: str
+    start_line: int
+    end_line: int
+    token_count: int
+    symbols: List[str] = field(default_factory=list)  # definitions (code) or headings (prose)
+
+    def to_metadata(self) -> Dict[str, Any]:
+        return {
+            "chunk_id": self.id,
+            "source": self.source,
+            "chunk_index": self.index,
+            "kind": self.kind,
+            "start_line": self.start_line,
+            "end_line": self.end_line,
+            "token_count": self.token_count,
+            "symbols": self.symbols,
+        }
+
+
+@dataclass
+class _Unit:
+    text: str
+    start_line: int
+    end_line: int
+    tokens: int
+    section: str = ""            # overlap is only carried between units of the same section
+    symbol: Optional[str] = None
+    boundary: bool = False       # start a new chunk here unless the current one is still small
+    joiner: Optional[str] = None  # separator from a preceding piece of the same line
+
+
+class Chunker:
+    """
+    Token-budgeted chunker shared by the indexers.
+
+    overlap_tokens of trailing context (whole lines, sentences or paragraphs)
+    are repeated at the start of the next chunk when both continue the same
+    function or section. Headings start a new chunk once the current chunk
+    holds at least min_tokens. Chunks are yielded lazily; chunk_file streams
+    prose and text files line by line.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 512,
+        overlap_tokens: int = 64,
+        min_tokens: Optional[int] = None,
+        tokenizer: Optional[Tokenizer] = None
+    ):
+        if max_tokens <= 0 or not 0 <= overlap_tokens < max_tokens:
+            raise ValueError("Need max_tokens > 0 and 0 <= overlap_tokens < max_tokens")
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.min_tokens = max_tokens // 8 if min_tokens is None else min_tokens
+        self.tokenizer = tokenizer or get_tokenizer()
+
+    def chunk(self, text: str, source: str = "", kind: Optional[str] = None) -> Iterator[Chunk]:
+        """Chunk in-memory text; kind defaults to detect_kind(source)."""
+        kind = kind or detect_kind(source)
+        if kind == "code":
+            units = self._python_units(text)
+        else:
+            units = self._block_units(text.splitlines(), headings=kind == "prose")
+        return self._pack(units, source, kind)
+
+    def chunk_file(self, path: str, kind: Optional[str] = None, encoding: str = "utf-8",
+                   source: Optional[str] = None) -> Iterator[Chunk]:
+        """
+        Chunk a file; only Python source is read whole (the AST needs the full module).
+
+        source (default: path) is what chunk ids and metadata refer to, e.g. a
+        repository-relative path so ids do not depend on the checkout location.
+        """
+        kind = kind or detect_kind(path)
+        source = source or path
+        with open(path, encoding=encoding, errors="replace") as f:
+            if kind == "code":
+                yield from self.chunk(f.read(), source, kind)
+            else:
+                yield from self._pack(self._block_units(f, headings=kind == "prose"), source, kind)
+
+    # Units
+
+    def _unit(self, lines: List[str], start: int, end: int, section: str, symbol: Optional[str] = None,
+              boundary: bool = False, offset: int = 0) -> Optional[_Unit]:
+        """Unit for 1-based lines start..end (reported offset lines later) with surrounding blank lines trimmed."""
+        while start <= end and not lines[start - 1].strip():
+            start += 1
+        while end >= start and not lines[end - 1].strip():
+            end -= 1
+        if start > end:
+            return None
+        text = "\n".join(lines[start - 1:end])
+        return _Unit(text, start + offset, end + offset, self.tokenizer.count(text), section, symbol, boundary)
+
+    def _python_units(self, text: str) -> Iterator[_Unit]:
+        try:
+            tree = ast.parse(text)
+        except (SyntaxError, ValueError):
+            yield from self._block_units(text.splitlines(), headings=False)
+            return
+        lines = text.splitlines()
+        yield from self._definition_units(tree.body, lines, 1, len(lines), owner=None)
+
+    def _definition_units(self, body: List[ast.stmt], lines: List[str], first: int, last: int,
+                          owner: Optional[str]) -> Iterator[_Unit]:
+        """One unit per function/class in body, plus one for each run of other code between them."""
+        prefix = f"{owner}." if owner else ""
+        glue_start = first
+        for node in body:
+            if not isinstance(node, _DEFINITIONS):
+                continue
+            start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+            while start - 1 >= glue_start and lines[start - 2].lstrip().startswith("#"):
+                start -= 1  # leading comments belong to the definition
+            glue = self._unit(lines, glue_start, start - 1, f"{prefix}:{glue_start}", owner)
+            if glue:
+                yield from self._fit(glue)
+            name = prefix + node.name
+            unit = self._unit(lines, start, node.end_lineno, name, name)
+            if unit.tokens > self.max_tokens and isinstance(node, ast.ClassDef):
+                yield from self._definition_units(node.body, lines, start, node.end_lineno, owner=name)
+            else:
+                yield from self._fit(unit)
+            glue_start = node.end_lineno + 1
+        glue = self._unit(lines, glue_start, last, f"{prefix}:{glue_start}", owner)
+        if glue:
+            yield from self._fit(glue)
+
+    def _block_units(self, lines: Iterable[str], headings: bool) -> Iterator[_Unit]:
+        """Paragraph units (blank-line separated, fenced code kept whole); Markdown headings open sections."""
+        titles: List[tuple] = []  # (level, title) of the enclosing headings
+        section = ""
+        block: List[str] = []
+        start = 1
+        in_fence = False
+        boundary = False
+        heading_only = False  # a heading stays in the same unit as the paragraph after it
+        for number, line in enumerate(lines, 1):
+            line = line.rstrip("\r\n")
+            if _FENCE.match(line):
+                in_fence = not in_fence
+            heading = _HEADING.match(line) if headings and not in_fence else None
+            if not line.strip() and heading_only:
+                block.append(line)
+                continue
+            heading_only = bool(heading)
+            if heading or (not line.strip() and not in_fence):
+                unit = self._unit(block, 1, len(block), section, section or None, boundary, start - 1)
+                if unit:
+                    yield from self._fit(unit)
+                block, boundary = [], False
+                if not heading:
+                    continue
+                level = len(heading.group(1))
+                titles = [t for t in titles if t[0] < level] + [(level, heading.group(2))]
+                section = " > ".join(title for _, title in titles)
+                boundary = True
+            if not block:
+                start = number
+            block.append(line)
+        unit = self._unit(block, 1, len(block), section, section or None, boundary, start - 1)
+        if unit:
+            yield from self._fit(unit)
+
+    def _fit(self, unit: _Unit) -> Iterator[_Unit]:
+        """Yield the unit, or its lines (sentences, token runs) as separate units when it exceeds the budget."""
+        if unit.tokens <= self.max_tokens:
+            yield unit
+            return
+        first = True
+        for text, number, tokens, joiner in self._atoms(unit):
+            # the start of an oversized unit opens a chunk rather than filling the previous one
+            yield _Unit(text, number, number, tokens, unit.section, unit.symbol,
+                        first, None if joiner == "\n" else joiner)
+            first = False
+
+    def _atoms(self, unit: _Unit) -> Iterator[tuple]:
+        """(text, line, tokens, joiner) for each line, or its sentences / token runs when a line is too long."""
+        for offset, line in enumerate(unit.text.split("\n")):
+            number = unit.start_line + offset
+            tokens = self.tokenizer.count(line)
+            if tokens <= self.max_tokens:
+                yield line, number, tokens, "\n"
+                continue
+            joiner = "\n"
+            for sentence in _SENTENCE_END.split(line):
+                tokens = self.tokenizer.count(sentence)
+                if tokens <= self.max_tokens:
+                    yield sentence, number, tokens, joiner
+                    joiner = " "
+                    continue
+                for part in self.tokenizer.split(sentence, self.max_tokens):
+                    yield part, number, self.tokenizer.count(part), joiner
+                    joiner = ""
+                joiner = " "
+
+    # Packing
+
+    def _pack(self, units: Iterable[_Unit], source: str, kind: str) -> Iterator[Chunk]:
+        current: List[_Unit] = []
+        tokens = 0
+        index = 0
+        for unit in units:
+            full = tokens + unit.tokens + 1 > self.max_tokens
+            if current and (full or (unit.boundary and tokens >= self.min_tokens)):
+                yield self._chunk(current, source, kind, index)
+                index += 1
+                current = self._overlap(current, unit)
+                tokens = sum(u.tokens + 1 for u in current)
+            current.append(unit)
+            tokens += unit.tokens + 1
+        if current:
+            yield self._chunk(current, source, kind, index)
+
+    def _overlap(self, previous: List[_Unit], unit: _Unit) -> List[_Unit]:
+        """Trailing units of the previous chunk to repeat before unit (never the whole chunk)."""
+        budget = min(self.overlap_tokens, self.max_tokens - unit.tokens - 1)
+        carry: List[_Unit] = []
+        total = 0
+        for candidate in reversed(previous[1:]):
+            if candidate.section != unit.section or total + candidate.tokens + 1 > budget:
+                break
+            carry.insert(0, candidate)
+            total += candidate.tokens + 1
+        return carry
+
+    def _chunk(self, units: List[_Unit], source: str, kind: str, index: int) -> Chunk:
+        parts = [units[0].text]
+        for previous, unit in zip(units, units[1:]):
+            if unit.joiner is not None and unit.start_line == previous.end_line:
+                parts.append(unit.joiner)
+            elif unit.start_line <= previous.end_line + 1:
+                parts.append("\n")
+            else:
+                parts.append("\n\n")
+            parts.append(unit.text)
+        text = "".join(parts)
+        symbols = list(dict.fromkeys(u.symbol for u in units if u.symbol))
+        return Chunk(
+            id=chunk_id(source, text),
+            text=text,
+            source=source,
+            index=index,
+            kind=kind,
+            start_line=units[0].start_line,
+            end_line=units[-1].end_line,
+            token_count=sum(u.tokens for u in units) + len(units) - 1,
+            symbols=symbols,
+        )
@@ -0,0 +1,93 @@
+"""
+Token counting for chunk budgets.
+
+Uses tiktoken's BPE encodings when the package (and its encoding file) is
+available; otherwise falls back to a word/punctuation tokenizer whose counts
+track BPE counts closely enough for budgeting.
+"""
+
+import logging
+import re
+from functools import lru_cache
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENCODING = "cl100k_base"
+
+_FALLBACK_TOKEN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+
+class Tokenizer:
+    """Interface for tokenizers used by the chunker."""
+
+    name = "base"
+
+    def count(self, text: str) -> int:
+        raise NotImplementedError
+
+    def split(self, text: str, max_tokens: int) -> List[str]:
+        """Cut text into consecutive pieces of at most max_tokens tokens."""
+        raise NotImplementedError
+
+
+class TiktokenTokenizer(Tokenizer):
+    """BPE tokenizer from tiktoken."""
+
+    def __init__(self, encoding: str = DEFAULT_ENCODING):
+        import tiktoken
+
+        self.name = encoding
+        self._encoding = tiktoken.get_encoding(encoding)
+
+    def count(self, text: str) -> int:
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+    def split(self, text: str, max_tokens: int) -> List[str]:
+        tokens = self._encoding.encode(text, disallowed_special=())
+        return [self._encoding.decode(tokens[i:i + max_tokens]) for i in range(0, len(tokens), max_tokens)]
+
+
+class RegexTokenizer(Tokenizer):
+    """Words and punctuation marks as tokens; dependency-free fallback."""
+
+    name = "regex"
+
+    def count(self, text: str) -> int:
+        return sum(1 for _ in _FALLBACK_TOKEN.finditer(text))
+
+    def split(self, text: str, max_tokens: int) -> List[str]:
+        starts = [match.start() for match in _FALLBACK_TOKEN.finditer(text)]
+        cuts = [0] + starts[max_tokens::max_tokens] + [len(text)]
+        return [text[a:b] for a, b in zip(cuts, cuts[1:]) if text[a:b]]
+
+
+@lru_cache(maxsize=None)
+def get_tokenizer(encoding: str = DEFAULT_ENCODING) -> Tokenizer:
+    """Shared tokenizer for an encoding, falling back to RegexTokenizer."""
+    try:
+        return TiktokenTokenizer(encoding)
+    except ImportError:
+        logger.warning("tiktoken not installed, approximating token counts")
+    except Exception as e:  # encoding download or lookup failed
+        logger.warning(f"tiktoken encoding {encoding} unavailable ({e}), approximating token counts")
+    return RegexTokenizer()
+
+
+@lru_cache(maxsize=None)
+def tokenizer_for_model(model: str) -> Tokenizer:
+    """
+    Tokenizer for a model name (e.g. "gpt-4o" -> o200k_base).
+
+    Models tiktoken does not know (other providers) get the default encoding,
+    which is close enough for budgeting.
+    """
+    try:
+        import tiktoken
+
+        return get_tokenizer(tiktoken.encoding_for_model(model).name)
+    except ImportError:
+        return get_tokenizer()
+    except KeyError:
+        logger.debug(f"No tiktoken encoding for {model}, using {DEFAULT_ENCODING}")
+        return get_tokenizer()
@@ -0,0 +1,19 @@
+"""
+SOPHIA shared context packing.
+
+Fits retrieved passages into a prompt's token budget: tokens are counted
+with the target model's tokenizer, near-duplicate passages are dropped with
+MinHash, the highest-value passages are packed whole and the overflow is
+compressed to its most relevant sentences.
+"""
+
+from .minhash import MinHasher
+from .packer import ContextPacker, PackedContext, Passage, pack_sources
+
+__all__ = [
+    "MinHasher",
+    "ContextPacker",
+    "PackedContext",
+    "Passage",
+    "pack_sources",
+]
@@ -0,0 +1,52 @@
+"""
+MinHash signatures for near-duplicate detection.
+
+Each text becomes a set of word shingles; a signature keeps, for each of
+num_perm universal hash functions, the minimum hash over the set. The share
+of positions where two signatures agree estimates the Jaccard similarity of
+the shingle sets.
+"""
+
+import hashlib
+import re
+
+import numpy as np
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_PRIME = (1 << 61) - 1
+_MASK = (1 << 32) - 1
+
+
+def _hash32(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=4).digest(), "little")
+
+
+class MinHasher:
+    """MinHash signatures over word shingles of a fixed size."""
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        # a, b < 2^32 and hashes < 2^32, so a * h + b stays below 2^64
+        self._a = rng.randint(1, _MASK, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, _MASK, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> set:
+        words = _WORD.findall(text.lower())
+        if len(words) < self.shingle_size:
+            return set(words)
+        return {" ".join(words[i:i + self.shingle_size]) for i in range(len(words) - self.shingle_size + 1)}
+
+    def signature(self, text: str) -> np.ndarray:
+        shingles = self.shingles(text)
+        if not shingles:
+            return np.full(self.num_perm, _MASK, dtype=np.uint64)
+        hashes = np.array([_hash32(s) for s in shingles], dtype=np.uint64)
+        permuted = (np.outer(hashes, self._a) + self._b) % np.uint64(_PRIME) & np.uint64(_MASK)
+        return permuted.min(axis=0)
+
+    @staticmethod
+    def similarity(first: np.ndarray, second: np.ndarray) -> float:
+        """Estimated Jaccard similarity of the texts behind two signatures."""
+        return float(np.mean(first == second))
@@ -0,0 +1,188 @@
+"""
+Token-budgeted context packing.
+
+Passages are ranked by score, near-duplicates are dropped (MinHash), and
+whole passages are packed greedily until the budget measured with the target
+model's tokenizer is used up. Passages that did not fit are then compressed
+to their most query-relevant sentences and packed into whatever budget is
+left, so the prompt carries as much distinct evidence as the budget allows
+instead of the first N characters of the first N sources.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from libs.chunking import Tokenizer, get_tokenizer, tokenizer_for_model
+
+from .minhash import MinHasher
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+@dataclass
+class Passage:
+    """A candidate piece of context; higher score is more valuable."""
+    text: str
+    score: float = 0.0
+    source: str = ""
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class PackedContext:
+    """Packing result: the passages kept (in rank order) and the rendered text."""
+    passages: List[Passage]
+    text: str
+    tokens: int
+    dropped: int = 0  # did not fit, even compressed
+    duplicates: int = 0
+    compressed: int = 0
+
+
+class ContextPacker:
+    """
+    Pack passages into at most max_tokens tokens of prompt context.
+
+    Each passage is rendered with template, which can use {index} (1-based
+    position in the packed context), {source}, {text} and any metadata key;
+    rendered passages are joined with separator.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int,
+        tokenizer: Optional[Tokenizer] = None,
+        model: Optional[str] = None,
+        dedupe_threshold: float = 0.8,
+        min_passage_tokens: int = 24,
+        separator: str = "\n\n",
+        template: str = "{source}: {text}"
+    ):
+        self.max_tokens = max_tokens
+        self.tokenizer = tokenizer or (tokenizer_for_model(model) if model else get_tokenizer())
+        self.dedupe_threshold = dedupe_threshold
+        self.min_passage_tokens = min_passage_tokens
+        self.separator = separator
+        self.template = template
+        self.hasher = MinHasher()
+
+    def _render(self, passage: Passage, index: int, text: Optional[str] = None) -> str:
+        return self.template.format(
+            **{**passage.metadata, "index": index, "source": passage.source,
+               "text": passage.text if text is None else text}
+        )
+
+    def _dedupe(self, passages: List[Passage]) -> Tuple[List[Passage], int]:
+        kept, signatures = [], []
+        for passage in passages:
+            signature = self.hasher.signature(passage.text)
+            if any(self.hasher.similarity(signature, s) >= self.dedupe_threshold for s in signatures):
+                continue
+            kept.append(passage)
+            signatures.append(signature)
+        return kept, len(passages) - len(kept)
+
+    def compress(self, text: str, max_tokens: int, query: Optional[str] = None) -> str:
+        """
+        Extractive compression: the highest-value sentences that fit in
+        max_tokens, in their original order. Sentences are valued by query-term
+        overlap, with a bonus for the leading sentence.
+        """
+        sentences = [s.strip() for s in _SENTENCE_END.split(text) if s.strip()]
+        query_terms = set(_WORD.findall(query.lower())) if query else set()
+
+        def value(i: int) -> float:
+            overlap = len(query_terms & set(_WORD.findall(sentences[i].lower())))
+            return overlap + (0.5 if i == 0 else 0.0)
+
+        chosen, used = [], 0
+        for i in sorted(range(len(sentences)), key=value, reverse=True):
+            cost = self.tokenizer.count(sentences[i]) + (1 if chosen else 0)
+            if used + cost <= max_tokens:
+                chosen.append(i)
+                used += cost
+        return " ".join(sentences[i] for i in sorted(chosen))
+
+    def pack(self, passages: Iterable[Passage], query: Optional[str] = None) -> PackedContext:
+        ranked = sorted((p for p in passages if p.text and p.text.strip()), key=lambda p: p.score, reverse=True)
+        unique, duplicates = self._dedupe(ranked)
+        separator_tokens = self.tokenizer.count(self.separator)
+
+        # whole passages first, best first; the rest is overflow
+        selected: Dict[int, Passage] = {}
+        overflow, used = [], 0
+        for rank, passage in enumerate(unique):
+            cost = self.tokenizer.count(self._render(passage, len(selected) + 1))
+            cost += separator_tokens if selected else 0
+            if used + cost <= self.max_tokens:
+                selected[rank] = passage
+                used += cost
+            else:
+                overflow.append((rank, passage))
+
+        # then the most relevant sentences of the overflow, into what is left
+        compressed = 0
+        for rank, passage in overflow:
+            overhead = self.tokenizer.count(self._render(passage, len(selected) + 1, text=""))
+            overhead += separator_tokens if selected else 0
+            room = self.max_tokens - used - overhead
+            if room < self.min_passage_tokens:
+                continue
+            text = self.compress(passage.text, room, query)
+            if not text:
+                continue
+            cost = self.tokenizer.count(self._render(passage, len(selected) + 1, text=text))
+            used += cost + (separator_tokens if selected else 0)
+            selected[rank] = Passage(text, passage.score, passage.source,
+                                     {**passage.metadata, "compressed": True})
+            compressed += 1
+
+        # indexes shift once passages are back in rank order; trim if that tipped the budget
+        kept = [selected[rank] for rank in sorted(selected)]
+        text = self.separator.join(self._render(p, i) for i, p in enumerate(kept, 1))
+        tokens = self.tokenizer.count(text)
+        while kept and tokens > self.max_tokens:
+            if kept.pop().metadata.get("compressed"):
+                compressed -= 1
+            text = self.separator.join(self._render(p, i) for i, p in enumerate(kept, 1))
+            tokens = self.tokenizer.count(text)
+
+        return PackedContext(
+            passages=kept,
+            text=text,
+            tokens=tokens,
+            dropped=len(unique) - len(kept),
+            duplicates=duplicates,
+            compressed=compressed,
+        )
+
+
+def pack_sources(
+    sources: Iterable[Dict[str, Any]],
+    max_tokens: int,
+    query: Optional[str] = None,
+    model: Optional[str] = None,
+    template: str = "{title}: {text}",
+    separator: str = "\n\n"
+) -> PackedContext:
+    """
+    Pack ranked research sources within max_tokens of model's tokenizer.
+
+    Sources are dicts as returned by the research masters (content or
+    snippet, title, url, name), best first, so each is scored by its rank.
+    Templates can use {title}, {url}, {source} (the upper-cased name) and
+    {text}.
+    """
+    packer = ContextPacker(max_tokens=max_tokens, model=model, separator=separator, template=template)
+    passages = [
+        Passage(
+            text=source.get("content") or source.get("snippet", ""),
+            score=-rank,  # sources arrive ranked
+            source=source.get("name", "Unknown").upper(),
+            metadata={"title": source.get("title", "No title"), "url": source.get("url", "No URL")}
+        )
+        for rank, source in enumerate(sources)
+    ]
+    return packer.pack(passages, query=query)
@@ -0,0 +1,30 @@
+"""
+SOPHIA shared embeddings.
+
+Embedding backends (local sentence-transformer, embedding MCP server, hashing
+fallback), a coalescing and caching Embedder used by agents and RAG code, and
+a small in-memory vector index for hot per-user sets.
+"""
+
+from .embedder import Embedder, get_embedder
+from .encoders import (
+    EmbeddingBackend,
+    HashingBackend,
+    MCPEmbeddingBackend,
+    SentenceTransformerBackend,
+    create_backend,
+    normalize,
+)
+from .index import VectorIndex
+
+__all__ = [
+    "Embedder",
+    "get_embedder",
+    "EmbeddingBackend",
+    "HashingBackend",
+    "MCPEmbeddingBackend",
+    "SentenceTransformerBackend",
+    "create_backend",
+    "normalize",
+    "VectorIndex",
+]
@@ -0,0 +1,141 @@
+"""
+Batched, cached embedding front end.
+
+Concurrent callers are coalesced into backend batches (flushed when a batch
+fills or after a few milliseconds), identical texts are embedded once, and
+results are kept in an LRU cache keyed by text hash.
+"""
+
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+from .encoders import EmbeddingBackend, create_backend
+
+logger = logging.getLogger(__name__)
+
+
+class Embedder:
+    """Coalescing, caching wrapper around an EmbeddingBackend."""
+
+    def __init__(
+        self,
+        backend: EmbeddingBackend,
+        cache_size: int = 10_000,
+        max_batch_size: int = 64,
+        max_wait: float = 0.005,
+        max_concurrent_batches: int = 2,
+    ):
+        self.backend = backend
+        self.cache_size = cache_size
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._queue: List[Tuple[str, str]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batches: Set[asyncio.Task] = set()
+        self._semaphore = asyncio.Semaphore(max_concurrent_batches)
+        self.hits = 0
+        self.misses = 0
+        self.backend_calls = 0
+
+    @property
+    def dimensions(self) -> int:
+        return self.backend.dimensions
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, reusing cached vectors and joining in-flight batches."""
+        loop = asyncio.get_running_loop()
+        results: Dict[str, List[float]] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+
+        for text in dict.fromkeys(texts):
+            key = self._key(text)
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                results[text] = cached
+                continue
+
+            self.misses += 1
+            future = self._pending.get(key)
+            if future is None:
+                future = loop.create_future()
+                self._pending[key] = future
+                self._queue.append((key, text))
+                if len(self._queue) >= self.max_batch_size:
+                    self._flush()
+                elif self._flush_handle is None:
+                    self._flush_handle = loop.call_later(self.max_wait, self._flush)
+            waiting[text] = future
+
+        if waiting:
+            vectors = await asyncio.gather(*waiting.values())
+            results.update(zip(waiting, vectors))
+        return [results[text] for text in texts]
+
+    async def embed_one(self, text: str) -> List[float]:
+        return (await self.embed([text]))[0]
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        while self._queue:
+            batch, self._queue = self._queue[: self.max_batch_size], self._queue[self.max_batch_size :]
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, str]]) -> None:
+        try:
+            async with self._semaphore:
+                self.backend_calls += 1
+                vectors = await self.backend.embed([text for _, text in batch])
+        except Exception as e:
+            logger.error(f"Embedding batch of {len(batch)} failed: {e}")
+            for key, _ in batch:
+                future = self._pending.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+
+        for (key, _), vector in zip(batch, vectors):
+            self._cache[key] = vector
+            future = self._pending.pop(key, None)
+            if future is not None and not future.done():
+                future.set_result(vector)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "cached": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "backend_calls": self.backend_calls,
+        }
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+
+_default_embedder: Optional[Embedder] = None
+
+
+def get_embedder() -> Embedder:
+    """Return the process-wide embedder, creating it from the environment on first use."""
+    global _default_embedder
+    if _default_embedder is None:
+        backend = create_backend()
+        logger.info(f"Using {backend.name} embeddings ({backend.dimensions} dimensions)")
+        _default_embedder = Embedder(backend)
+    return _default_embedder
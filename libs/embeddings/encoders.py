@@ -0,0 +1,141 @@
+"""
+Embedding backends.
+
+A local sentence-transformer, the embedding MCP server's batch endpoint, and a
+feature-hashing fallback for environments with neither. Every backend takes a
+list of texts and returns L2-normalized vectors of a fixed dimension.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import os
+import re
+from typing import List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOCAL_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+_TOKEN = re.compile(r"\w+")
+
+
+def normalize(vector: List[float]) -> List[float]:
+    """Scale a vector to unit length (zero vectors are returned unchanged)."""
+    norm = math.sqrt(sum(v * v for v in vector))
+    return [v / norm for v in vector] if norm else vector
+
+
+class EmbeddingBackend:
+    """Interface for embedding backends."""
+
+    name = "base"
+    dimensions = 0
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """
+    Local sentence-transformers model, run in a worker thread.
+
+    The model is loaded on construction so that dimensions is the model's
+    real output size before anything sizes a collection or index from it.
+    """
+
+    name = "sentence-transformers"
+
+    def __init__(self, model_name: str = DEFAULT_LOCAL_MODEL, device: Optional[str] = None):
+        from sentence_transformers import SentenceTransformer
+
+        self.model_name = model_name
+        self.device = device
+        self._model = SentenceTransformer(model_name, device=device)
+        self.dimensions = self._model.get_sentence_embedding_dimension()
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        vectors = self._model.encode(texts, batch_size=len(texts), normalize_embeddings=True)
+        return [vector.tolist() for vector in vectors]
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        return await asyncio.to_thread(self._encode, texts)
+
+
+class MCPEmbeddingBackend(EmbeddingBackend):
+    """Embedding MCP server (``POST /api/v1/embed/batch``) over a pooled HTTP client."""
+
+    name = "embedding-mcp"
+
+    def __init__(self, base_url: str, model_id: Optional[str] = None, dimensions: int = 768, timeout: float = 30.0):
+        self.base_url = base_url.rstrip("/")
+        self.model_id = model_id
+        self.dimensions = dimensions
+        self._client = httpx.AsyncClient(base_url=self.base_url, timeout=timeout)
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        response = await self._client.post("/api/v1/embed/batch", json={"texts": texts, "model_id": self.model_id})
+        response.raise_for_status()
+        data = response.json()
+        if data.get("errors"):
+            raise RuntimeError(f"Embedding server failed for {len(data['errors'])} of {len(texts)} texts")
+        by_index = {item["index"]: item["embedding"] for item in data.get("results", [])}
+        return [normalize(by_index[i]) for i in range(len(texts))]
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class HashingBackend(EmbeddingBackend):
+    """
+    Signed feature hashing of word unigrams and bigrams.
+
+    Not semantic, but texts sharing words land near each other, which keeps
+    similarity search meaningful when no embedding model is available.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dimensions: int = 384):
+        self.dimensions = dimensions
+
+    def _vector(self, text: str) -> List[float]:
+        tokens = _TOKEN.findall(text.lower())
+        vector = [0.0] * self.dimensions
+        for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+            digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+            index = int.from_bytes(digest[:4], "little") % self.dimensions
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+        return normalize(vector)
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        return [self._vector(text) for text in texts]
+
+
+def create_backend(dimensions: int = 384) -> EmbeddingBackend:
+    """
+    Pick an embedding backend from the environment.
+
+    SOPHIA_EMBEDDING_URL selects the embedding MCP server (with
+    SOPHIA_EMBEDDING_MODEL / SOPHIA_EMBEDDING_DIMENSIONS); otherwise a local
+    sentence-transformer is used, falling back to feature hashing. dimensions
+    only sizes the hashing fallback; a local model reports its own.
+    """
+    url = os.getenv("SOPHIA_EMBEDDING_URL")
+    if url:
+        return MCPEmbeddingBackend(
+            url,
+            model_id=os.getenv("SOPHIA_EMBEDDING_MODEL"),
+            dimensions=int(os.getenv("SOPHIA_EMBEDDING_DIMENSIONS", "768")),
+        )
+    try:
+        return SentenceTransformerBackend(os.getenv("SOPHIA_EMBEDDING_MODEL", DEFAULT_LOCAL_MODEL))
+    except ImportError:
+        logger.warning("sentence-transformers not installed, using hashing embeddings")
+        return HashingBackend(dimensions)
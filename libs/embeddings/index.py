@@ -0,0 +1,53 @@
+"""
+In-memory vector index.
+
+A fixed-capacity ring buffer of normalized vectors searched with one matrix
+product. Meant for small, hot sets (a user's recent interactions), where an
+exact scan is faster than building and querying a graph ANN index.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class VectorIndex:
+    """Most-recent-N vector store with exact cosine search."""
+
+    def __init__(self, dimensions: int, capacity: int = 200):
+        self.dimensions = dimensions
+        self.capacity = capacity
+        self._vectors = np.zeros((capacity, dimensions), dtype=np.float32)
+        self._payloads: List[Optional[Dict[str, Any]]] = [None] * capacity
+        self._order = np.zeros(capacity, dtype=np.int64)
+        self._count = 0
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    def add(self, vector: List[float], payload: Dict[str, Any]) -> None:
+        """Insert a vector, evicting the oldest entry once the index is full."""
+        slot = self._count % self.capacity
+        self._vectors[slot] = vector
+        self._payloads[slot] = payload
+        self._order[slot] = self._count
+        self._count += 1
+
+    def search(self, vector: List[float], limit: int = 3, skip_latest: int = 0) -> List[Tuple[float, Dict[str, Any]]]:
+        """Return up to limit (score, payload) pairs by cosine similarity, newest-first on ties."""
+        size = len(self)
+        if size == 0 or limit <= 0:
+            return []
+        scores = self._vectors[:size] @ np.asarray(vector, dtype=np.float32)
+        if skip_latest:
+            scores[np.argsort(self._order[:size])[-skip_latest:]] = -np.inf
+        limit = min(limit, size)
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = sorted(top, key=lambda i: (-scores[i], -self._order[i]))
+        return [(float(scores[i]), self._payloads[i]) for i in top if np.isfinite(scores[i])]
+
+    def latest(self, n: int = 1) -> List[Dict[str, Any]]:
+        """Return the n most recently added payloads, newest first."""
+        size = len(self)
+        newest = np.argsort(self._order[:size])[::-1][:n]
+        return [self._payloads[i] for i in newest]
@@ -0,0 +1,23 @@
+"""
+SOPHIA graph access layer.
+
+Business knowledge graph stores (Neo4j with batched UNWIND upserts, or an
+in-memory adjacency graph) behind one interface, with cached entity
+neighborhoods that are invalidated on write.
+"""
+
+from .store import (
+    GraphStore,
+    InMemoryGraphStore,
+    NeighborhoodCache,
+    Neo4jGraphStore,
+    create_graph_store,
+)
+
+__all__ = [
+    "GraphStore",
+    "InMemoryGraphStore",
+    "NeighborhoodCache",
+    "Neo4jGraphStore",
+    "create_graph_store",
+]
@@ -0,0 +1,355 @@
+"""
+Graph stores.
+
+A Neo4j backend that writes entities and relationships with batched
+``UNWIND`` statements over the async driver, and an in-memory adjacency-dict
+backend for tests and small deployments. Both serve entity neighborhoods
+through an LRU that is invalidated by writes touching a cached entity.
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+ENTITY_TYPES = ["Customer", "Product", "Metric", "Process", "Person", "System"]
+
+MERGE_ENTITIES = """
+UNWIND $rows AS row
+MERGE (e:BusinessEntity {name: row.name})
+ON CREATE SET e.created_at = datetime()
+SET e.type = row.type,
+    e.description = row.description,
+    e.confidence = row.confidence,
+    e.data_sources = row.data_sources,
+    e.domain = 'pay_ready',
+    e.updated_at = datetime()
+"""
+
+MERGE_RELATIONSHIPS = """
+UNWIND $rows AS row
+MATCH (a:BusinessEntity {name: row.source})
+MATCH (b:BusinessEntity {name: row.target})
+MERGE (a)-[r:BUSINESS_RELATIONSHIP {type: row.rel_type}]->(b)
+ON CREATE SET r.created_at = datetime()
+SET r.strength = row.strength,
+    r.evidence_count = row.evidence_count,
+    r.updated_at = datetime()
+"""
+
+NEIGHBORHOODS = """
+MATCH (e:BusinessEntity)
+WHERE e.name IN $entities
+OPTIONAL MATCH (e)-[r:BUSINESS_RELATIONSHIP]-(related:BusinessEntity)
+RETURN e.name AS entity,
+       e.type AS entity_type,
+       collect(CASE WHEN related IS NULL THEN NULL ELSE {
+           name: related.name,
+           type: related.type,
+           relationship: r.type,
+           strength: r.strength
+       } END) AS related_entities
+"""
+
+
+def _entity_row(entity: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "name": entity["name"],
+        "type": entity.get("type"),
+        "description": entity.get("description"),
+        "confidence": entity.get("confidence"),
+        "data_sources": entity.get("data_sources") or [],
+    }
+
+
+def _relationship_row(rel: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "source": rel["source"],
+        "target": rel["target"],
+        "rel_type": rel["rel_type"],
+        "strength": rel.get("strength"),
+        "evidence_count": rel.get("evidence_count"),
+    }
+
+
+def _chunks(rows: List[Dict[str, Any]], size: int) -> Iterable[List[Dict[str, Any]]]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+class NeighborhoodCache:
+    """
+    LRU of entity name -> neighborhood (None for entities not in the graph).
+
+    Each entry remembers every entity name it mentions, so a write to any of
+    them drops exactly the neighborhoods that could have changed.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Optional[Dict[str, Any]]]" = OrderedDict()
+        self._mentions: Dict[str, Set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        if name not in self._entries:
+            self.misses += 1
+            return False, None
+        self._entries.move_to_end(name)
+        self.hits += 1
+        return True, self._entries[name]
+
+    def put(self, name: str, neighborhood: Optional[Dict[str, Any]]):
+        if self.max_entries <= 0:
+            return
+        self._drop(name)
+        self._entries[name] = neighborhood
+        for mentioned in self._mentioned(name, neighborhood):
+            self._mentions.setdefault(mentioned, set()).add(name)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+
+    def invalidate(self, names: Iterable[str]):
+        for name in names:
+            for key in list(self._mentions.get(name, ())):
+                self._drop(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._mentions.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    @staticmethod
+    def _mentioned(name: str, neighborhood: Optional[Dict[str, Any]]) -> Set[str]:
+        names = {name}
+        if neighborhood:
+            names.update(rel["name"] for rel in neighborhood["related_entities"] if rel.get("name"))
+        return names
+
+    def _drop(self, key: str):
+        if key not in self._entries:
+            return
+        for mentioned in self._mentioned(key, self._entries.pop(key)):
+            keys = self._mentions.get(mentioned)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._mentions[mentioned]
+
+
+class GraphStore:
+    """
+    Interface for business knowledge graph backends.
+
+    Subclasses implement the ``_write_*`` and ``_fetch_neighborhoods``
+    primitives; this class handles row normalization and the neighborhood
+    cache. Neighborhoods have the shape ``{"entity", "entity_type",
+    "related_entities": [{"name", "type", "relationship", "strength"}]}``.
+    """
+
+    name = "base"
+
+    def __init__(self, cache_size: int = 1024):
+        self.cache = NeighborhoodCache(cache_size)
+
+    async def setup(self):
+        pass
+
+    async def upsert_entities(self, entities: List[Dict[str, Any]]) -> int:
+        """Create or update entities by name; returns the number written."""
+        rows = [_entity_row(entity) for entity in entities]
+        if not rows:
+            return 0
+        await self._write_entities(rows)
+        self.cache.invalidate(row["name"] for row in rows)
+        return len(rows)
+
+    async def upsert_relationships(self, relationships: List[Dict[str, Any]]) -> int:
+        """Create or update relationships between existing entities; returns the number submitted."""
+        rows = [_relationship_row(rel) for rel in relationships]
+        if not rows:
+            return 0
+        await self._write_relationships(rows)
+        self.cache.invalidate({name for row in rows for name in (row["source"], row["target"])})
+        return len(rows)
+
+    async def neighborhoods(self, names: List[str]) -> List[Dict[str, Any]]:
+        """Return the neighborhood of each named entity that exists in the graph, in input order."""
+        names = list(dict.fromkeys(names))
+        found: Dict[str, Optional[Dict[str, Any]]] = {}
+        missing = []
+        for name in names:
+            cached, neighborhood = self.cache.get(name)
+            if cached:
+                found[name] = neighborhood
+            else:
+                missing.append(name)
+        if missing:
+            fetched = {item["entity"]: item for item in await self._fetch_neighborhoods(missing)}
+            for name in missing:
+                found[name] = fetched.get(name)
+                self.cache.put(name, found[name])
+        return [found[name] for name in names if found[name] is not None]
+
+    async def close(self):
+        pass
+
+    async def _write_entities(self, rows: List[Dict[str, Any]]):
+        raise NotImplementedError
+
+    async def _write_relationships(self, rows: List[Dict[str, Any]]):
+        raise NotImplementedError
+
+    async def _fetch_neighborhoods(self, names: List[str]) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+
+class InMemoryGraphStore(GraphStore):
+    """Adjacency-dict graph with the same merge semantics as the Neo4j store."""
+
+    name = "memory"
+
+    def __init__(self, cache_size: int = 1024):
+        super().__init__(cache_size)
+        self.entities: Dict[str, Dict[str, Any]] = {}
+        # name -> {(other, rel_type, outgoing): properties}
+        self.adjacency: Dict[str, Dict[Tuple[str, str, bool], Dict[str, Any]]] = {}
+
+    async def _write_entities(self, rows: List[Dict[str, Any]]):
+        for row in rows:
+            self.entities.setdefault(row["name"], {}).update(row)
+            self.adjacency.setdefault(row["name"], {})
+
+    async def _write_relationships(self, rows: List[Dict[str, Any]]):
+        for row in rows:
+            source, target = row["source"], row["target"]
+            if source not in self.entities or target not in self.entities:
+                continue
+            properties = {"strength": row["strength"], "evidence_count": row["evidence_count"]}
+            self.adjacency[source][(target, row["rel_type"], True)] = properties
+            self.adjacency[target][(source, row["rel_type"], False)] = properties
+
+    async def _fetch_neighborhoods(self, names: List[str]) -> List[Dict[str, Any]]:
+        return [
+            {
+                "entity": name,
+                "entity_type": self.entities[name]["type"],
+                "related_entities": [
+                    {
+                        "name": other,
+                        "type": self.entities[other]["type"],
+                        "relationship": rel_type,
+                        "strength": properties["strength"],
+                    }
+                    for (other, rel_type, _), properties in self.adjacency[name].items()
+                ],
+            }
+            for name in names
+            if name in self.entities
+        ]
+
+
+class Neo4jGraphStore(GraphStore):
+    """
+    Neo4j over the async driver.
+
+    Upserts are sent as ``UNWIND $rows`` statements, batch_size rows per
+    write transaction, instead of one round trip per entity. The uniqueness
+    constraint on BusinessEntity.name, created on first use, backs the
+    MERGE lookups with an index.
+    """
+
+    name = "neo4j"
+
+    def __init__(
+        self,
+        uri: str,
+        user: Optional[str] = None,
+        password: Optional[str] = None,
+        database: Optional[str] = None,
+        batch_size: int = 1000,
+        cache_size: int = 1024
+    ):
+        from neo4j import AsyncGraphDatabase
+
+        super().__init__(cache_size)
+        auth = (user, password) if user else None
+        self.driver = AsyncGraphDatabase.driver(uri, auth=auth)
+        self.database = database
+        self.batch_size = batch_size
+        self._ready = False
+        self._setup_lock = asyncio.Lock()
+
+    async def setup(self):
+        """Create the entity-name constraint and the Pay Ready entity types (idempotent)."""
+        if self._ready:
+            return
+        async with self._setup_lock:
+            if self._ready:
+                return
+            async with self.driver.session(database=self.database) as session:
+                await session.run("""
+                    CREATE CONSTRAINT business_entity_name IF NOT EXISTS
+                    FOR (e:BusinessEntity) REQUIRE e.name IS UNIQUE
+                """)
+                await session.run("""
+                    UNWIND $names AS name
+                    MERGE (:EntityType {name: name, domain: 'pay_ready'})
+                """, names=ENTITY_TYPES)
+            self._ready = True
+
+    async def _write_batched(self, query: str, rows: List[Dict[str, Any]]):
+        await self.setup()
+
+        async def write(tx, batch):
+            result = await tx.run(query, rows=batch)
+            await result.consume()
+
+        async with self.driver.session(database=self.database) as session:
+            for batch in _chunks(rows, self.batch_size):
+                await session.execute_write(write, batch)
+
+    async def _write_entities(self, rows: List[Dict[str, Any]]):
+        await self._write_batched(MERGE_ENTITIES, rows)
+
+    async def _write_relationships(self, rows: List[Dict[str, Any]]):
+        await self._write_batched(MERGE_RELATIONSHIPS, rows)
+
+    async def _fetch_neighborhoods(self, names: List[str]) -> List[Dict[str, Any]]:
+        await self.setup()
+
+        async def read(tx):
+            result = await tx.run(NEIGHBORHOODS, entities=names)
+            return await result.data()
+
+        async with self.driver.session(database=self.database) as session:
+            return await session.execute_read(read)
+
+    async def close(self):
+        await self.driver.close()
+
+
+def create_graph_store(uri: Optional[str], user: Optional[str] = None, password: Optional[str] = None,
+                       **kwargs) -> Optional[GraphStore]:
+    """
+    Build a graph store from a URI.
+
+    ``memory://`` selects the in-memory store; any other URI is passed to the
+    Neo4j driver. Neo4j-only options (batch_size, database) are ignored by
+    the in-memory store. Returns None when no URI is configured or the neo4j
+    package is not installed.
+    """
+    if not uri:
+        return None
+    if uri.startswith("memory:"):
+        return InMemoryGraphStore(**{key: value for key, value in kwargs.items() if key == "cache_size"})
+    try:
+        return Neo4jGraphStore(uri, user, password, **kwargs)
+    except ImportError:
+        logger.warning("neo4j not installed. Run: pip install neo4j")
+        return None
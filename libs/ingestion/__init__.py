@@ -0,0 +1,30 @@
+"""
+SOPHIA shared file ingestion.
+
+A checkpoint of fully ingested files and a batcher that only records a file
+once the index batch holding its last document has been written, so
+interrupted ingestion runs resume without losing or re-reading files; and
+chunked conversion of structured data (CSV, Parquet, Excel) into business
+documents.
+"""
+
+from .checkpoint import CheckpointedBatcher, IngestionCheckpoint
+from .structured import (
+    chunk_records,
+    classify_columns,
+    format_business_row,
+    iter_structured_frames,
+    iter_structured_records,
+    summary_record,
+)
+
+__all__ = [
+    "CheckpointedBatcher",
+    "IngestionCheckpoint",
+    "chunk_records",
+    "classify_columns",
+    "format_business_row",
+    "iter_structured_frames",
+    "iter_structured_records",
+    "summary_record",
+]
@@ -0,0 +1,100 @@
+"""
+Resumable file ingestion.
+
+IngestionCheckpoint is an append-only log of fully ingested files keyed by
+path, size and mtime. CheckpointedBatcher groups parsed documents into index
+batches and records a file in the checkpoint only after the batch holding
+its last document has been written, so an interrupted run never skips a
+file whose documents were still waiting in an unwritten batch.
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+class IngestionCheckpoint:
+    """Append-only log of fully ingested files, keyed by path, size and mtime"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.completed: Dict[str, List[Any]] = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self.completed[entry["path"]] = entry["signature"]
+                    except (json.JSONDecodeError, KeyError):
+                        continue
+
+    @staticmethod
+    def signature(file_path: str) -> List[Any]:
+        stat = os.stat(file_path)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def is_done(self, file_path: str) -> bool:
+        try:
+            return self.completed.get(file_path) == self.signature(file_path)
+        except OSError:
+            return False
+
+    def mark_done(self, file_path: str, document_count: int):
+        signature = self.signature(file_path)
+        self.completed[file_path] = signature
+        with open(self.path, "a") as f:
+            f.write(json.dumps({
+                "path": file_path,
+                "signature": signature,
+                "documents": document_count,
+                "completed_at": datetime.now().isoformat()
+            }) + "\n")
+
+
+class CheckpointedBatcher:
+    """
+    Collect documents file by file and hand them to write in batches of
+    batch_size. A file is marked done once the write holding its last
+    document returns; if a write fails, its files stay pending and are
+    parsed again on the next run.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[List[Any]], Awaitable[None]],
+        batch_size: int = 256,
+        checkpoint: Optional[IngestionCheckpoint] = None
+    ):
+        self.write = write
+        self.batch_size = batch_size
+        self.checkpoint = checkpoint
+        self.batch: List[Any] = []
+        self.written = 0
+        # Files whose last document is in the current batch
+        self._waiting: List[Tuple[str, int]] = []
+        self._counts: Dict[str, int] = {}
+
+    async def add_file(self, file_path: str, documents: Sequence[Any], complete: bool = True):
+        """
+        Add a file's documents. Files parsed in pieces are added once per piece,
+        with complete=True only on the last one.
+        """
+        for document in documents:
+            self.batch.append(document)
+            if len(self.batch) >= self.batch_size:
+                await self.flush()
+        self._counts[file_path] = self._counts.get(file_path, 0) + len(documents)
+        if complete:
+            self._waiting.append((file_path, self._counts.pop(file_path)))
+
+    async def flush(self):
+        """Write the current batch (if any), then checkpoint the files it completed"""
+        if self.batch:
+            batch, self.batch = self.batch, []
+            await self.write(batch)
+            self.written += len(batch)
+        waiting, self._waiting = self._waiting, []
+        if self.checkpoint:
+            for file_path, document_count in waiting:
+                self.checkpoint.mark_done(file_path, document_count)
@@ -11,10 +11,12 @@ import base64
 import asyncio
 import aiohttp
 import logging
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union, AsyncIterator
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 
+from libs.ratelimit import get_limiter
+
 # Import schemas
 from schemas.gong import (
     CallTranscript, CallInsight, CallSummary, CallTopic, 
@@ -59,7 +61,9 @@ class GongMCPClient:
         # Session management
         self._session: Optional[aiohttp.ClientSession] = None
         self._auth_header: Optional[str] = None
-        self._rate_limit_reset: Optional[datetime] = None
+        
+        # Same quota as sophia.integrations.gong_client so both clients share one budget
+        self._limiter = get_limiter("gong", rate=100, period=60, burst=10, default_retry_after=60)
         
         # Validate credentials
         if not self.access_key or not self.client_secret:
@@ -98,13 +102,6 @@ class GongMCPClient:
         
         return self._auth_header
     
-    async def _check_rate_limit(self):
-        """Check if we're rate limited"""
-        if self._rate_limit_reset and datetime.now() < self._rate_limit_reset:
-            wait_seconds = (self._rate_limit_reset - datetime.now()).total_seconds()
-            logger.warning(f"Rate limited. Waiting {wait_seconds:.1f} seconds...")
-            await asyncio.sleep(wait_seconds)
-    
     async def _make_request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
         """
         Make authenticated request to Gong API with MCP error handling.
@@ -121,7 +118,6 @@ class GongMCPClient:
             MCPError: For various API errors
         """
         await self._ensure_session()
-        await self._check_rate_limit()
         
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
         headers = {
@@ -130,42 +126,42 @@ class GongMCPClient:
             **kwargs.pop('headers', {})
         }
         
-        try:
-            async with self._session.request(method, url, headers=headers, **kwargs) as response:
-                # Handle rate limiting
-                if response.status == 429:
-                    retry_after = int(response.headers.get('Retry-After', 60))
-                    self._rate_limit_reset = datetime.now() + timedelta(seconds=retry_after)
-                    raise MCPError("rate_limit_exceeded", f"Rate limited. Retry after {retry_after}s", 429)
+        async with self._limiter.slot():
+            try:
+                async with self._session.request(method, url, headers=headers, **kwargs) as response:
+                    # Handle rate limiting; the shared limiter holds back later calls until Retry-After
+                    retry_after = await self._limiter.on_response(response.status, response.headers)
+                    if retry_after is not None:
+                        raise MCPError("rate_limit_exceeded", f"Rate limited. Retry after {retry_after:.0f}s", 429)
                 
-                # Handle authentication errors
-                if response.status == 401:
-                    raise MCPError("authentication_error", "Invalid Gong credentials", 401)
+                    # Handle authentication errors
+                    if response.status == 401:
+                        raise MCPError("authentication_error", "Invalid Gong credentials", 401)
                 
-                # Handle not found
-                if response.status == 404:
-                    raise MCPError("not_found", "Resource not found", 404)
+                    # Handle not found
+                    if response.status == 404:
+                        raise MCPError("not_found", "Resource not found", 404)
                 
-                # Handle other client errors
-                if 400 <= response.status < 500:
-                    error_text = await response.text()
-                    raise MCPError("client_error", f"Client error: {error_text}", response.status)
+                    # Handle other client errors
+                    if 400 <= response.status < 500:
+                        error_text = await response.text()
+                        raise MCPError("client_error", f"Client error: {error_text}", response.status)
                 
-                # Handle server errors
-                if response.status >= 500:
-                    error_text = await response.text()
-                    raise MCPError("server_error", f"Server error: {error_text}", response.status)
+                    # Handle server errors
+                    if response.status >= 500:
+                        error_text = await response.text()
+                        raise MCPError("server_error", f"Server error: {error_text}", response.status)
                 
-                # Success - parse JSON
-                if response.content_type == 'application/json':
-                    return await response.json()
-                else:
-                    return {"data": await response.text()}
+                    # Success - parse JSON
+                    if response.content_type == 'application/json':
+                        return await response.json()
+                    else:
+                        return {"data": await response.text()}
                     
-        except aiohttp.ClientError as e:
-            raise MCPError("network_error", f"Network error: {str(e)}", 500)
-        except asyncio.TimeoutError:
-            raise MCPError("timeout_error", "Request timeout", 408)
+            except aiohttp.ClientError as e:
+                raise MCPError("network_error", f"Network error: {str(e)}", 500)
+            except asyncio.TimeoutError:
+                raise MCPError("timeout_error", "Request timeout", 408)
     
     # Core API Methods
     
@@ -199,7 +195,7 @@ class GongMCPClient:
             return PaginatedResponse(
                 data=data.get('calls', []),
                 meta={
-                    "has_more": data.get('records', {}).get('totalRecords', 0) > limit,
+                    "has_more": bool(data.get('records', {}).get('cursor')),
                     "next_cursor": data.get('records', {}).get('cursor')
                 }
             )
@@ -210,6 +206,27 @@ class GongMCPClient:
             logger.error(f"Unexpected error in get_calls: {e}")
             raise MCPError("unexpected_error", str(e), 500)
     
+    async def iter_calls(self, filters: Optional[Dict] = None, cursor: Optional[str] = None,
+                         page_size: int = 100) -> AsyncIterator[PaginatedResponse]:
+        """
+        Follow the pagination cursor through every page of calls.
+        
+        Args:
+            filters: Optional filters (e.g., date range, participants)
+            cursor: Cursor to resume from
+            page_size: Calls per request (capped at the Gong API limit)
+            
+        Yields:
+            One paginated response per page
+        """
+        while True:
+            response = await self.get_calls(limit=page_size, cursor=cursor, filters=filters)
+            yield response
+            next_cursor = response.meta.next_cursor
+            if not next_cursor or next_cursor == cursor:
+                return
+            cursor = next_cursor
+    
     async def get_call_transcript(self, call_id: str) -> CallTranscript:
         """
         Get detailed transcript for a specific call.
@@ -426,8 +443,9 @@ class GongMCPClient:
                 'toDateTime': datetime.now().isoformat()
             }
             
-            response = await self.get_calls(limit=50, filters=filters)
-            calls = response.data
+            calls = []
+            async for page in self.iter_calls(filters=filters):
+                calls.extend(page.data)
             
             # Generate summary statistics
             total_calls = len(calls)
@@ -0,0 +1,53 @@
+"""
+Shared instrumentation for SOPHIA MCP services.
+
+Every server exposes the same /metrics contract whether it runs on FastAPI
+(``init_metrics``) or Flask (``init_wsgi_metrics``). Framework adapters are
+optional so Flask-only images don't need FastAPI installed and vice versa.
+"""
+
+from .registry import (
+    DEPENDENCY_LATENCY,
+    REQUEST_COUNT,
+    REQUEST_LATENCY,
+    REQUEST_SIZE,
+    REQUESTS_IN_FLIGHT,
+    RESPONSE_SIZE,
+    UNMATCHED_ROUTE,
+)
+from .outbound import (
+    aiohttp_trace_config,
+    instrument_httpx_client,
+    instrument_requests_session,
+    track_dependency,
+)
+
+try:
+    from .asgi import init_metrics, register_healthz_if_missing, route_template
+except ImportError:
+    init_metrics = None
+    register_healthz_if_missing = None
+    route_template = None
+
+try:
+    from .wsgi import init_wsgi_metrics
+except ImportError:
+    init_wsgi_metrics = None
+
+__all__ = [
+    "REQUEST_COUNT",
+    "REQUEST_LATENCY",
+    "REQUESTS_IN_FLIGHT",
+    "REQUEST_SIZE",
+    "RESPONSE_SIZE",
+    "DEPENDENCY_LATENCY",
+    "UNMATCHED_ROUTE",
+    "init_metrics",
+    "register_healthz_if_missing",
+    "route_template",
+    "init_wsgi_metrics",
+    "aiohttp_trace_config",
+    "instrument_httpx_client",
+    "instrument_requests_session",
+    "track_dependency",
+]
@@ -0,0 +1,65 @@
+"""ASGI (FastAPI/Starlette) adapter for the shared MCP metrics contract."""
+from fastapi import FastAPI, Request
+from fastapi.responses import Response, JSONResponse, PlainTextResponse
+import time
+
+from .registry import (
+    CONTENT_TYPE_LATEST,
+    REQUESTS_IN_FLIGHT,
+    UNMATCHED_ROUTE,
+    observe_request,
+    parse_content_length,
+    render_latest,
+)
+
+
+def route_template(request: Request) -> str:
+    """Return the matched route template, prefixed with any mount root_path."""
+    route = request.scope.get("route")
+    template = getattr(route, "path", None)
+    if not template:
+        return UNMATCHED_ROUTE
+    return f"{request.scope.get('root_path', '')}{template}"
+
+
+def init_metrics(app: FastAPI, service_name: str, version: str = "4.2.0") -> None:
+    """Attach /metrics and request instrumentation to a FastAPI app."""
+    @app.middleware("http")
+    async def _metrics_middleware(request: Request, call_next):
+        if request.url.path == "/metrics":
+            return await call_next(request)
+
+        in_flight = REQUESTS_IN_FLIGHT.labels(service_name)
+        in_flight.inc()
+        start = time.perf_counter()
+        status_code = 500
+        response_size = None
+        try:
+            response: Response = await call_next(request)
+            status_code = response.status_code
+            response_size = parse_content_length(response.headers.get("content-length"))
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            in_flight.dec()
+            observe_request(
+                service_name,
+                request.method,
+                route_template(request),
+                status_code,
+                elapsed,
+                request_size=parse_content_length(request.headers.get("content-length")),
+                response_size=response_size,
+            )
+
+    @app.get("/metrics", include_in_schema=False)
+    def _metrics():
+        return PlainTextResponse(render_latest(), media_type=CONTENT_TYPE_LATEST)
+
+def register_healthz_if_missing(app: FastAPI, service_name: str, version: str = "4.2.0") -> None:
+    """Ensure GET /healthz exists with the v4.2 contract."""
+    exists = any(getattr(r, "path", None) == "/healthz" for r in app.routes)
+    if not exists:
+        @app.get("/healthz")
+        def _healthz():
+            return JSONResponse({"status": "ok", "service": service_name, "version": version})
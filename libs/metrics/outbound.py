@@ -0,0 +1,120 @@
+"""
+Outbound dependency latency instrumentation.
+
+Hooks for the three HTTP clients used across the MCP services (httpx, aiohttp,
+requests) plus a context manager for SDK calls that don't expose hooks
+(Qdrant, Redis, asyncpg). Everything records into DEPENDENCY_LATENCY, labelled
+by dependency name (defaults to the target host), method and status class.
+"""
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from urllib.parse import urlsplit
+
+from .registry import DEPENDENCY_LATENCY, status_class
+
+_START_KEY = "sophia_metrics_start"
+
+
+def _dependency_name(dependency: Optional[str], url) -> str:
+    if dependency:
+        return dependency
+    return urlsplit(str(url)).hostname or "unknown"
+
+
+def observe_dependency(dependency: str, method: str, status: str, elapsed: float) -> None:
+    """Record a single outbound call."""
+    DEPENDENCY_LATENCY.labels(dependency, method.upper(), status).observe(elapsed)
+
+
+@contextmanager
+def track_dependency(dependency: str, method: str = "CALL") -> Iterator[None]:
+    """Time a block of work against a dependency; raised exceptions are labelled 'error'."""
+    start = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except Exception:
+        status = "error"
+        raise
+    finally:
+        observe_dependency(dependency, method, status, time.perf_counter() - start)
+
+
+def instrument_httpx_client(client, dependency: Optional[str] = None):
+    """Add latency event hooks to an httpx.Client or httpx.AsyncClient (returned for chaining)."""
+    import httpx
+
+    def _on_request(request):
+        request.extensions[_START_KEY] = time.perf_counter()
+
+    def _on_response(response):
+        start = response.request.extensions.get(_START_KEY)
+        if start is None:
+            return
+        observe_dependency(
+            _dependency_name(dependency, response.request.url),
+            response.request.method,
+            status_class(response.status_code),
+            time.perf_counter() - start,
+        )
+
+    if isinstance(client, httpx.AsyncClient):
+        async def _async_on_request(request):
+            _on_request(request)
+
+        async def _async_on_response(response):
+            _on_response(response)
+
+        client.event_hooks["request"].append(_async_on_request)
+        client.event_hooks["response"].append(_async_on_response)
+    else:
+        client.event_hooks["request"].append(_on_request)
+        client.event_hooks["response"].append(_on_response)
+    return client
+
+
+def aiohttp_trace_config(dependency: Optional[str] = None):
+    """Build an aiohttp.TraceConfig; pass it via ClientSession(trace_configs=[...])."""
+    import aiohttp
+
+    async def _on_start(session, ctx, params):
+        setattr(ctx, _START_KEY, time.perf_counter())
+
+    async def _on_end(session, ctx, params):
+        observe_dependency(
+            _dependency_name(dependency, params.url),
+            params.method,
+            status_class(params.response.status),
+            time.perf_counter() - getattr(ctx, _START_KEY),
+        )
+
+    async def _on_exception(session, ctx, params):
+        observe_dependency(
+            _dependency_name(dependency, params.url),
+            params.method,
+            "error",
+            time.perf_counter() - getattr(ctx, _START_KEY),
+        )
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(_on_start)
+    trace_config.on_request_end.append(_on_end)
+    trace_config.on_request_exception.append(_on_exception)
+    return trace_config
+
+
+def instrument_requests_session(session, dependency: Optional[str] = None):
+    """Add a latency response hook to a requests.Session (returned for chaining)."""
+
+    def _on_response(response, *args, **kwargs):
+        observe_dependency(
+            _dependency_name(dependency, response.url),
+            response.request.method,
+            status_class(response.status_code),
+            response.elapsed.total_seconds(),
+        )
+        return response
+
+    session.hooks["response"].append(_on_response)
+    return session
@@ -0,0 +1,112 @@
+"""
+Shared Prometheus metric definitions for every MCP service.
+
+All adapters (ASGI, WSGI, outbound clients) record into the same collectors so
+each service exposes an identical /metrics contract. Route labels are always the
+matched route *template* (e.g. ``/code/plans/{plan_id}``), never the raw path.
+"""
+from typing import Optional
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+
+# Label used when no route matched (404s, scanners) so junk paths share one series
+UNMATCHED_ROUTE = "__unmatched__"
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+REQUEST_COUNT = Counter(
+    "sophia_requests_total",
+    "Total HTTP requests",
+    labelnames=("service", "method", "path", "status"),
+)
+REQUEST_LATENCY = Histogram(
+    "sophia_request_latency_seconds",
+    "HTTP request latency in seconds",
+    labelnames=("service", "method", "path"),
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "sophia_requests_in_flight",
+    "HTTP requests currently being served",
+    labelnames=("service",),
+)
+REQUEST_SIZE = Histogram(
+    "sophia_request_size_bytes",
+    "HTTP request body size in bytes",
+    labelnames=("service", "method", "path"),
+    buckets=SIZE_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    "sophia_response_size_bytes",
+    "HTTP response body size in bytes",
+    labelnames=("service", "method", "path"),
+    buckets=SIZE_BUCKETS,
+)
+DEPENDENCY_LATENCY = Histogram(
+    "sophia_dependency_latency_seconds",
+    "Outbound dependency call latency in seconds",
+    labelnames=("dependency", "method", "status"),
+    buckets=LATENCY_BUCKETS,
+)
+
+
+def status_class(status_code: Optional[int]) -> str:
+    """Collapse a status code into 2xx/4xx/5xx; 'error' when no response was received."""
+    if not status_code:
+        return "error"
+    return f"{int(status_code) // 100}xx"
+
+
+def observe_request(
+    service: str,
+    method: str,
+    route: str,
+    status_code: int,
+    elapsed: float,
+    request_size: Optional[int] = None,
+    response_size: Optional[int] = None,
+) -> None:
+    """Record one served request. Sizes are skipped when unknown (e.g. streamed bodies)."""
+    REQUEST_COUNT.labels(service, method, route, str(status_code)).inc()
+    REQUEST_LATENCY.labels(service, method, route).observe(elapsed)
+    if request_size is not None:
+        REQUEST_SIZE.labels(service, method, route).observe(request_size)
+    if response_size is not None:
+        RESPONSE_SIZE.labels(service, method, route).observe(response_size)
+
+
+def parse_content_length(value: Optional[str]) -> Optional[int]:
+    """Parse a Content-Length header, returning None when missing or malformed."""
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def render_latest() -> bytes:
+    """Serialize the default registry in Prometheus text format."""
+    return generate_latest()
+
+
+__all__ = [
+    "CONTENT_TYPE_LATEST",
+    "UNMATCHED_ROUTE",
+    "REQUEST_COUNT",
+    "REQUEST_LATENCY",
+    "REQUESTS_IN_FLIGHT",
+    "REQUEST_SIZE",
+    "RESPONSE_SIZE",
+    "DEPENDENCY_LATENCY",
+    "status_class",
+    "observe_request",
+    "parse_content_length",
+    "render_latest",
+]
@@ -0,0 +1,51 @@
+"""WSGI (Flask) adapter for the shared MCP metrics contract."""
+import time
+
+from flask import Flask, Response, g, request
+
+from .registry import (
+    CONTENT_TYPE_LATEST,
+    REQUESTS_IN_FLIGHT,
+    UNMATCHED_ROUTE,
+    observe_request,
+    render_latest,
+)
+
+
+def init_wsgi_metrics(app: Flask, service_name: str, version: str = "1.0.0") -> None:
+    """Attach /metrics and request instrumentation to a Flask app."""
+
+    @app.before_request
+    def _metrics_start():
+        if request.path == "/metrics":
+            return None
+        g._metrics_start = time.perf_counter()
+        g._metrics_in_flight = True
+        REQUESTS_IN_FLIGHT.labels(service_name).inc()
+        return None
+
+    @app.after_request
+    def _metrics_record(response):
+        start = g.pop("_metrics_start", None)
+        if start is None:
+            return response
+        rule = request.url_rule
+        observe_request(
+            service_name,
+            request.method,
+            rule.rule if rule is not None else UNMATCHED_ROUTE,
+            response.status_code,
+            time.perf_counter() - start,
+            request_size=request.content_length,
+            response_size=None if response.is_streamed else response.content_length,
+        )
+        return response
+
+    @app.teardown_request
+    def _metrics_finish(exc):
+        if g.pop("_metrics_in_flight", False):
+            REQUESTS_IN_FLIGHT.labels(service_name).dec()
+
+    @app.route("/metrics", methods=["GET"])
+    def _metrics():
+        return Response(render_latest(), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,30 @@
+"""
+SOPHIA shared rate limiting.
+
+GCRA quotas (optionally shared across replicas through Redis), adaptive
+concurrency driven by 429 feedback, and a Retry-After aware retry loop used by
+the integration clients.
+"""
+
+from .gcra import GCRA, RedisGCRA
+from .limiter import (
+    AdaptiveConcurrency,
+    RateLimiter,
+    get_limiter,
+    parse_retry_after,
+    reset_limiters,
+)
+from .retry import RETRYABLE_STATUSES, backoff_delay, send_with_retry
+
+__all__ = [
+    "GCRA",
+    "RedisGCRA",
+    "AdaptiveConcurrency",
+    "RateLimiter",
+    "get_limiter",
+    "parse_retry_after",
+    "reset_limiters",
+    "RETRYABLE_STATUSES",
+    "backoff_delay",
+    "send_with_retry",
+]
@@ -0,0 +1,116 @@
+"""
+GCRA (generic cell rate algorithm) backends.
+
+GCRA stores a single "theoretical arrival time" per limiter, so checking or
+reserving a slot is O(1) regardless of the quota size. Callers reserve a slot
+and are told how long to wait for it, which spreads concurrent bursts evenly
+across the window instead of letting them all sleep until the same instant.
+"""
+
+import logging
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class GCRA:
+    """In-process GCRA limiter."""
+
+    def __init__(self, rate: float, period: float = 1.0, burst: int = 1, clock=time.monotonic):
+        if rate <= 0 or period <= 0:
+            raise ValueError("rate and period must be positive")
+        self.emission_interval = period / rate
+        self.burst = max(1, int(burst))
+        self.tolerance = (self.burst - 1) * self.emission_interval
+        self._clock = clock
+        self._tat: Optional[float] = None
+
+    def reserve_nowait(self) -> float:
+        """Reserve the next slot and return how many seconds to wait before using it."""
+        now = self._clock()
+        tat = now if self._tat is None else max(self._tat, now)
+        delay = max(0.0, tat - self.tolerance - now)
+        self._tat = tat + self.emission_interval
+        return delay
+
+    def penalize_nowait(self, seconds: float) -> None:
+        """Block every slot for ``seconds`` (e.g. after a 429 with Retry-After)."""
+        blocked_tat = self._clock() + seconds + self.tolerance
+        if self._tat is None or blocked_tat > self._tat:
+            self._tat = blocked_tat
+
+    async def reserve(self) -> float:
+        return self.reserve_nowait()
+
+    async def penalize(self, seconds: float) -> None:
+        self.penalize_nowait(seconds)
+
+
+# Both scripts use the Redis server clock so replicas with skewed clocks agree.
+_RESERVE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local delay = tat - tolerance - now
+if delay < 0 then delay = 0 end
+tat = tat + interval
+redis.call('SET', KEYS[1], string.format('%.6f', tat), 'PX', math.ceil((tat - now) * 1000) + 1000)
+return string.format('%.6f', delay)
+"""
+
+_PENALIZE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local blocked = now + tonumber(ARGV[1]) + tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or 0)
+if blocked > tat then
+    redis.call('SET', KEYS[1], string.format('%.6f', blocked), 'PX', math.ceil((blocked - now) * 1000) + 1000)
+end
+return 1
+"""
+
+
+class RedisGCRA:
+    """
+    GCRA whose state lives in Redis so several replicas share one provider quota.
+
+    If Redis becomes unreachable the limiter falls back to the local GCRA, so a
+    cache outage degrades to per-process limits rather than failing requests.
+    """
+
+    def __init__(self, redis_url: str, key: str, rate: float, period: float = 1.0, burst: int = 1):
+        import redis.asyncio as redis
+
+        self.key = key
+        self.local = GCRA(rate, period, burst)
+        self._redis = redis.from_url(redis_url)
+        self._reserve = self._redis.register_script(_RESERVE_SCRIPT)
+        self._penalize = self._redis.register_script(_PENALIZE_SCRIPT)
+        self._degraded = False
+
+    def _fallback(self, error: Exception) -> None:
+        if not self._degraded:
+            logger.warning(f"Redis rate limiter for {self.key} unavailable, using local limits: {error}")
+            self._degraded = True
+
+    async def reserve(self) -> float:
+        try:
+            delay = float(await self._reserve(
+                keys=[self.key], args=[self.local.emission_interval, self.local.tolerance]
+            ))
+            self._degraded = False
+            return delay
+        except Exception as e:
+            self._fallback(e)
+            return self.local.reserve_nowait()
+
+    async def penalize(self, seconds: float) -> None:
+        self.local.penalize_nowait(seconds)
+        try:
+            await self._penalize(keys=[self.key], args=[seconds, self.local.tolerance])
+        except Exception as e:
+            self._fallback(e)
@@ -0,0 +1,219 @@
+"""
+Provider rate limiters.
+
+A RateLimiter combines a GCRA quota (local or Redis-backed), an AIMD
+concurrency limit that halves on 429s and 5xx and creeps back up on success, and
+Retry-After handling that blocks every caller sharing the quota. Limiters are
+registered per provider name so all clients in a process share one quota.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Dict, Mapping, Optional
+
+from .gcra import GCRA, RedisGCRA
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_STATUSES = (429,)
+
+
+def is_congestion(status: int) -> bool:
+    """429s and server errors both mean the provider is overloaded."""
+    return status in THROTTLE_STATUSES or status >= 500
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Parse ``Retry-After`` as delta-seconds or an HTTP date; None when absent or invalid."""
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD concurrency limit.
+
+    Each success raises the limit by ``1 / limit`` (about +1 per window of
+    requests); each throttle halves it. The limit never leaves
+    ``[minimum, maximum]``.
+    """
+
+    def __init__(self, initial: int, minimum: int = 1, maximum: Optional[int] = None):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum or initial)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.in_flight = 0
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _cond(self) -> asyncio.Condition:
+        # Limiters are process-wide but asyncio primitives are loop-bound; start
+        # fresh if we are now running on a different loop (asyncio.run per job).
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+            self.in_flight = 0
+        return self._condition
+
+    async def acquire(self) -> None:
+        cond = self._cond()
+        async with cond:
+            await cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self) -> None:
+        cond = self._cond()
+        async with cond:
+            self.in_flight -= 1
+            cond.notify()
+
+    async def on_success(self) -> None:
+        previous = int(self.limit)
+        self.limit = min(float(self.maximum), self.limit + 1.0 / self.limit)
+        if int(self.limit) > previous:
+            cond = self._cond()
+            async with cond:
+                cond.notify()
+
+    def on_throttle(self) -> None:
+        self.limit = max(float(self.minimum), self.limit / 2)
+
+
+class RateLimiter:
+    """Shared quota, adaptive concurrency and Retry-After handling for one provider."""
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        period: float = 1.0,
+        burst: Optional[int] = None,
+        max_concurrency: int = 10,
+        min_concurrency: int = 1,
+        redis_url: Optional[str] = None,
+        default_retry_after: float = 1.0,
+        max_retry_after: float = 300.0,
+    ):
+        self.name = name
+        self.rate = rate
+        self.period = period
+        self.burst = burst or 1
+        self.default_retry_after = default_retry_after
+        self.max_retry_after = max_retry_after
+        self.concurrency = AdaptiveConcurrency(max_concurrency, min_concurrency, max_concurrency)
+
+        self.backend = None
+        if redis_url:
+            try:
+                self.backend = RedisGCRA(redis_url, f"sophia:ratelimit:{name}", rate, period, self.burst)
+            except ImportError:
+                logger.warning(f"redis is not installed; {name} rate limits are per-process")
+        if self.backend is None:
+            self.backend = GCRA(rate, period, self.burst)
+
+        self.requests = 0
+        self.throttled = 0
+        self.server_errors = 0
+        self.total_wait = 0.0
+
+    async def acquire(self) -> float:
+        """Wait for the next quota slot; returns the seconds waited."""
+        delay = await self.backend.reserve()
+        self.requests += 1
+        if delay > 0:
+            self.total_wait += delay
+            await asyncio.sleep(delay)
+        return delay
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold a concurrency slot and a quota slot for the duration of one request."""
+        await self.concurrency.acquire()
+        try:
+            await self.acquire()
+            yield
+        finally:
+            await self.concurrency.release()
+
+    async def on_response(self, status: int, headers: Mapping[str, str]) -> Optional[float]:
+        """
+        Feed a response back into the limiter.
+
+        Returns the enforced back-off in seconds when the provider throttled us,
+        otherwise None. Throttling blocks the shared quota until Retry-After has
+        passed, so retries simply re-enter ``slot()``. Server errors shrink
+        concurrency like a throttle but leave the quota alone.
+        """
+        if not is_congestion(status):
+            await self.concurrency.on_success()
+            return None
+        if status not in THROTTLE_STATUSES:
+            self.server_errors += 1
+            self.concurrency.on_throttle()
+            logger.warning(
+                f"{self.name} returned HTTP {status}; concurrency now {int(self.concurrency.limit)}"
+            )
+            return None
+
+        retry_after = parse_retry_after(headers)
+        delay = min(self.max_retry_after, self.default_retry_after if retry_after is None else retry_after)
+        self.throttled += 1
+        self.concurrency.on_throttle()
+        await self.backend.penalize(delay)
+        logger.warning(
+            f"{self.name} throttled us (HTTP {status}); backing off {delay:.1f}s, "
+            f"concurrency now {int(self.concurrency.limit)}"
+        )
+        return delay
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "rate": self.rate,
+            "period_seconds": self.period,
+            "burst": self.burst,
+            "concurrency_limit": int(self.concurrency.limit),
+            "in_flight": self.concurrency.in_flight,
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "server_errors": self.server_errors,
+            "total_wait_seconds": round(self.total_wait, 3),
+            "shared": isinstance(self.backend, RedisGCRA),
+        }
+
+
+_limiters: Dict[str, RateLimiter] = {}
+
+
+def get_limiter(name: str, rate: float, period: float = 1.0, **kwargs: Any) -> RateLimiter:
+    """
+    Return the process-wide limiter for a provider, creating it on first use.
+
+    Set SOPHIA_RATE_LIMIT_REDIS_URL to share quotas across replicas.
+    """
+    limiter = _limiters.get(name)
+    if limiter is None:
+        kwargs.setdefault("redis_url", os.getenv("SOPHIA_RATE_LIMIT_REDIS_URL"))
+        limiter = RateLimiter(name, rate, period, **kwargs)
+        _limiters[name] = limiter
+    return limiter
+
+
+def reset_limiters() -> None:
+    """Forget all registered limiters (tests, or after reconfiguring quotas)."""
+    _limiters.clear()
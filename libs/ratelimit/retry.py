@@ -0,0 +1,60 @@
+"""
+Retry loop for httpx requests made through a RateLimiter.
+"""
+
+import asyncio
+import logging
+import random
+from typing import Awaitable, Callable, Collection
+
+import httpx
+
+from .limiter import THROTTLE_STATUSES, RateLimiter
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES = (500, 502, 503, 504)
+
+
+def backoff_delay(attempt: int, base: float = 0.5, maximum: float = 30.0) -> float:
+    """Exponential back-off with full jitter."""
+    return random.uniform(0, min(maximum, base * (2 ** attempt)))
+
+
+async def send_with_retry(
+    limiter: RateLimiter,
+    send: Callable[[], Awaitable[httpx.Response]],
+    retries: int = 3,
+    retry_statuses: Collection[int] = RETRYABLE_STATUSES,
+    backoff_base: float = 0.5,
+    backoff_max: float = 30.0,
+) -> httpx.Response:
+    """
+    Send a request under ``limiter``, retrying throttles, 5xx and transport errors.
+
+    Throttled responses (429) are not slept on here: the limiter blocks its
+    shared quota until Retry-After has passed, so the next ``slot()`` waits
+    for exactly as long as the provider asked. Other 4xx responses are
+    returned immediately, and the final response is returned as-is, so
+    callers keep using ``raise_for_status()``.
+    """
+    for attempt in range(retries + 1):
+        async with limiter.slot():
+            try:
+                response = await send()
+            except httpx.RequestError as e:
+                if attempt == retries:
+                    logger.error(f"{limiter.name} request error after {retries} retries: {e}")
+                    raise
+                response = None
+
+        if response is not None:
+            throttled = await limiter.on_response(response.status_code, response.headers)
+            if attempt == retries or (throttled is None and response.status_code not in retry_statuses):
+                return response
+            if response.status_code in THROTTLE_STATUSES:
+                continue
+
+        await asyncio.sleep(backoff_delay(attempt, backoff_base, backoff_max))
+
+    raise RuntimeError("unreachable")
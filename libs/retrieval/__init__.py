@@ -0,0 +1,49 @@
+"""
+SOPHIA shared retrieval.
+
+Hybrid search: dense embeddings plus BM25 sparse vectors, queried together
+with payload filters pushed down and fused with reciprocal rank fusion, on
+Qdrant or an in-memory index with identical scoring; and an optional
+cross-encoder reranking stage for the fused candidates.
+"""
+
+from .hybrid import (
+    DEFAULT_HYBRID_COLLECTION,
+    DENSE_VECTOR,
+    SPARSE_VECTOR,
+    HybridIndex,
+    InMemoryHybridIndex,
+    QdrantHybridIndex,
+    SearchHit,
+    hybrid_collection,
+    matches,
+    qdrant_filter,
+    reciprocal_rank_fusion,
+)
+from .rerank import (
+    CrossEncoderScorer,
+    Reranker,
+    SentenceTransformerCrossEncoder,
+    get_reranker,
+)
+from .sparse import BM25Encoder, tokenize
+
+__all__ = [
+    "DEFAULT_HYBRID_COLLECTION",
+    "DENSE_VECTOR",
+    "SPARSE_VECTOR",
+    "HybridIndex",
+    "InMemoryHybridIndex",
+    "QdrantHybridIndex",
+    "SearchHit",
+    "hybrid_collection",
+    "matches",
+    "qdrant_filter",
+    "reciprocal_rank_fusion",
+    "CrossEncoderScorer",
+    "Reranker",
+    "SentenceTransformerCrossEncoder",
+    "get_reranker",
+    "BM25Encoder",
+    "tokenize",
+]
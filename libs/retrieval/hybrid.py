@@ -0,0 +1,285 @@
+"""
+Hybrid dense + sparse retrieval with reciprocal rank fusion.
+
+Each index stores a dense embedding and a BM25 sparse vector per document.
+A search runs both legs (with payload filters applied inside each leg, so
+filtering never shrinks the result set after the fact), then fuses the two
+rankings with RRF. QdrantHybridIndex sends both legs in one batch request;
+InMemoryHybridIndex implements the same scoring for offline use and tests.
+
+Hybrid points use named vectors, so they live in their own collection
+(QDRANT_HYBRID_COLLECTION, default "repo_hybrid") rather than the unnamed
+384-d collection the legacy indexers write.
+"""
+
+import asyncio
+import inspect
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from libs.embeddings import Embedder
+
+from .sparse import BM25Encoder, SparseVector, idf
+
+DENSE_VECTOR = "dense"
+SPARSE_VECTOR = "sparse"
+FILTER_FIELDS = ("repo", "path", "knowledge_type")
+RRF_K = 60
+DEFAULT_HYBRID_COLLECTION = "repo_hybrid"
+
+# (id, text, payload)
+Document = Tuple[str, str, Dict[str, Any]]
+
+
+@dataclass
+class SearchHit:
+    """A fused result; ranks are 1-based positions in each leg (None when absent)."""
+    id: str
+    score: float
+    payload: Dict[str, Any]
+    dense_rank: Optional[int] = None
+    sparse_rank: Optional[int] = None
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = RRF_K) -> List[Tuple[str, float]]:
+    """Fuse ranked id lists: score(d) = sum over lists of 1 / (k + rank of d)."""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, 1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def hybrid_collection() -> str:
+    """Collection holding hybrid (named dense + sparse) points."""
+    return os.getenv("QDRANT_HYBRID_COLLECTION", DEFAULT_HYBRID_COLLECTION)
+
+
+def matches(payload: Dict[str, Any], filters: Optional[Dict[str, Any]]) -> bool:
+    """Filter semantics shared by both indexes: every key must match; a list value means any of."""
+    for key, expected in (filters or {}).items():
+        value = payload.get(key)
+        if isinstance(expected, (list, tuple, set)):
+            if value not in expected:
+                return False
+        elif value != expected:
+            return False
+    return True
+
+
+def qdrant_filter(filters: Optional[Dict[str, Any]]):
+    """The same filter as a Qdrant Filter (None when there is nothing to filter on)."""
+    from qdrant_client.models import FieldCondition, Filter, MatchAny, MatchValue
+
+    if not filters:
+        return None
+    conditions = []
+    for key, expected in filters.items():
+        if isinstance(expected, (list, tuple, set)):
+            conditions.append(FieldCondition(key=key, match=MatchAny(any=list(expected))))
+        else:
+            conditions.append(FieldCondition(key=key, match=MatchValue(value=expected)))
+    return Filter(must=conditions)
+
+
+def _fuse(dense: List[Tuple[str, Dict[str, Any]]], sparse: List[Tuple[str, Dict[str, Any]]], k: int) -> List[SearchHit]:
+    payloads = {doc_id: payload for doc_id, payload in dense + sparse}
+    dense_ranks = {doc_id: rank for rank, (doc_id, _) in enumerate(dense, 1)}
+    sparse_ranks = {doc_id: rank for rank, (doc_id, _) in enumerate(sparse, 1)}
+    fused = reciprocal_rank_fusion([[d for d, _ in dense], [d for d, _ in sparse]])
+    return [
+        SearchHit(doc_id, score, payloads[doc_id], dense_ranks.get(doc_id), sparse_ranks.get(doc_id))
+        for doc_id, score in fused[:k]
+    ]
+
+
+class HybridIndex:
+    """Interface shared by the Qdrant and in-memory hybrid indexes."""
+
+    def __init__(self, embedder: Embedder, sparse_encoder: Optional[BM25Encoder] = None):
+        self.embedder = embedder
+        self.sparse_encoder = sparse_encoder or BM25Encoder()
+
+    async def upsert(self, documents: List[Document]):
+        raise NotImplementedError
+
+    async def search(self, query: str, k: int = 8, filters: Optional[Dict[str, Any]] = None,
+                     candidates: Optional[int] = None) -> List[SearchHit]:
+        """Top k fused hits; each leg retrieves candidates (default max(4k, 20)) before fusion."""
+        raise NotImplementedError
+
+    def _candidates(self, k: int, candidates: Optional[int]) -> int:
+        return candidates or max(4 * k, 20)
+
+
+class QdrantHybridIndex(HybridIndex):
+    """Hybrid index on a Qdrant collection with named "dense" and "sparse" (IDF) vectors."""
+
+    def __init__(self, client: Any, collection: str, embedder: Embedder,
+                 sparse_encoder: Optional[BM25Encoder] = None):
+        super().__init__(embedder, sparse_encoder)
+        self.client = client
+        self.collection = collection
+        self._async_client = inspect.iscoroutinefunction(getattr(client, "upsert", None))
+
+    async def _call(self, method: str, **kwargs):
+        if self._async_client:
+            return await getattr(self.client, method)(**kwargs)
+        return await asyncio.to_thread(getattr(self.client, method), **kwargs)
+
+    async def ensure_collection(self, payload_indexes: Sequence[str] = FILTER_FIELDS):
+        """
+        Create the collection with both vectors and keyword indexes on the filterable fields.
+
+        An existing collection must already have this schema; anything else
+        (such as a collection of unnamed vectors) raises ValueError rather
+        than mixing incompatible points.
+        """
+        from qdrant_client.models import Distance, Modifier, PayloadSchemaType, SparseVectorParams, VectorParams
+
+        if await self._call("collection_exists", collection_name=self.collection):
+            await self.validate_collection()
+            return
+        await self._call(
+            "create_collection",
+            collection_name=self.collection,
+            vectors_config={DENSE_VECTOR: VectorParams(size=self.embedder.dimensions, distance=Distance.COSINE)},
+            sparse_vectors_config={SPARSE_VECTOR: SparseVectorParams(modifier=Modifier.IDF)}
+        )
+        for field_name in payload_indexes:
+            await self._call(
+                "create_payload_index",
+                collection_name=self.collection,
+                field_name=field_name,
+                field_schema=PayloadSchemaType.KEYWORD
+            )
+
+    async def validate_collection(self):
+        """Raise ValueError unless the collection has this index's named dense and sparse vectors."""
+        info = await self._call("get_collection", collection_name=self.collection)
+        vectors = info.config.params.vectors
+        sparse = info.config.params.sparse_vectors or {}
+        dense = vectors.get(DENSE_VECTOR) if isinstance(vectors, dict) else None
+        if dense is None or SPARSE_VECTOR not in sparse:
+            raise ValueError(
+                f"Qdrant collection '{self.collection}' is not a hybrid collection (needs named "
+                f"'{DENSE_VECTOR}' and '{SPARSE_VECTOR}' vectors); use another collection "
+                f"(QDRANT_HYBRID_COLLECTION) or recreate it"
+            )
+        if dense.size != self.embedder.dimensions:
+            raise ValueError(
+                f"Qdrant collection '{self.collection}' stores {dense.size}-d dense vectors but the embedder "
+                f"produces {self.embedder.dimensions}-d vectors; use another collection or recreate it"
+            )
+
+    def _sparse(self, vector: SparseVector):
+        from qdrant_client.models import SparseVector as QdrantSparseVector
+
+        return QdrantSparseVector(indices=list(vector), values=list(vector.values()))
+
+    async def to_points(self, documents: List[Document]) -> list:
+        """Points carrying both vectors, with one embedding call for all documents."""
+        from qdrant_client.models import PointStruct
+
+        dense = await self.embedder.embed([text for _, text, _ in documents])
+        return [
+            PointStruct(
+                id=doc_id,
+                vector={DENSE_VECTOR: vector, SPARSE_VECTOR: self._sparse(self.sparse_encoder.encode_document(text))},
+                payload=payload
+            )
+            for (doc_id, text, payload), vector in zip(documents, dense)
+        ]
+
+    async def upsert(self, documents: List[Document]):
+        if documents:
+            await self._call("upsert", collection_name=self.collection, points=await self.to_points(documents))
+
+    async def search(self, query: str, k: int = 8, filters: Optional[Dict[str, Any]] = None,
+                     candidates: Optional[int] = None) -> List[SearchHit]:
+        from qdrant_client.models import QueryRequest
+
+        limit = self._candidates(k, candidates)
+        query_filter = qdrant_filter(filters)
+        dense_query = await self.embedder.embed_one(query)
+        sparse_query = self.sparse_encoder.encode_query(query)
+        requests = [QueryRequest(query=dense_query, using=DENSE_VECTOR, filter=query_filter,
+                                 limit=limit, with_payload=True)]
+        if sparse_query:
+            requests.append(QueryRequest(query=self._sparse(sparse_query), using=SPARSE_VECTOR,
+                                         filter=query_filter, limit=limit, with_payload=True))
+        responses = await self._call("query_batch_points", collection_name=self.collection, requests=requests)
+        legs = [[(str(point.id), point.payload or {}) for point in response.points] for response in responses]
+        return _fuse(legs[0], legs[1] if len(legs) > 1 else [], k)
+
+
+class InMemoryHybridIndex(HybridIndex):
+    """Exact in-process implementation of QdrantHybridIndex scoring, for offline use and tests."""
+
+    def __init__(self, embedder: Embedder, sparse_encoder: Optional[BM25Encoder] = None):
+        super().__init__(embedder, sparse_encoder)
+        self._ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._payloads: List[Dict[str, Any]] = []
+        self._sparse: List[SparseVector] = []
+        self._dense = np.zeros((0, embedder.dimensions), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    async def upsert(self, documents: List[Document]):
+        documents = list({doc_id: (doc_id, text, payload) for doc_id, text, payload in documents}.values())
+        if not documents:
+            return
+        vectors = await self.embedder.embed([text for _, text, _ in documents])
+        new_rows = []
+        for (doc_id, text, payload), vector in zip(documents, vectors):
+            row = np.asarray(vector, dtype=np.float32)
+            norm = np.linalg.norm(row)
+            row = row / norm if norm else row
+            sparse = self.sparse_encoder.encode_document(text)
+            position = self._positions.get(doc_id)
+            if position is None:
+                self._positions[doc_id] = len(self._ids)
+                self._ids.append(doc_id)
+                self._payloads.append(payload)
+                self._sparse.append(sparse)
+                new_rows.append(row)
+            else:
+                self._payloads[position], self._sparse[position] = payload, sparse
+                self._dense[position] = row
+        if new_rows:
+            self._dense = np.vstack([self._dense, np.stack(new_rows)])
+
+    async def search(self, query: str, k: int = 8, filters: Optional[Dict[str, Any]] = None,
+                     candidates: Optional[int] = None) -> List[SearchHit]:
+        limit = self._candidates(k, candidates)
+        allowed = [i for i, payload in enumerate(self._payloads) if matches(payload, filters)]
+        if not allowed:
+            return []
+
+        query_vector = np.asarray(await self.embedder.embed_one(query), dtype=np.float32)
+        norm = np.linalg.norm(query_vector)
+        similarities = self._dense[allowed] @ (query_vector / norm if norm else query_vector)
+        dense_order = [allowed[i] for i in np.argsort(-similarities, kind="stable")[:limit]]
+
+        # IDF over the whole collection, as Qdrant computes it
+        sparse_query = self.sparse_encoder.encode_query(query)
+        frequencies = {term: sum(term in doc for doc in self._sparse) for term in sparse_query}
+        sparse_scores = []
+        for i in allowed:
+            doc = self._sparse[i]
+            score = sum(idf(len(self._sparse), frequencies[term]) * doc[term] for term in sparse_query if term in doc)
+            if score > 0:
+                sparse_scores.append((score, i))
+        sparse_scores.sort(key=lambda item: item[0], reverse=True)
+        sparse_order = [i for _, i in sparse_scores[:limit]]
+
+        return _fuse(
+            [(self._ids[i], self._payloads[i]) for i in dense_order],
+            [(self._ids[i], self._payloads[i]) for i in sparse_order],
+            k
+        )
@@ -0,0 +1,241 @@
+"""
+Cross-encoder reranking.
+
+The top_n fused candidates are scored against the query by a small local
+cross-encoder in one batched forward pass on a dedicated worker thread.
+Scores are cached per (query, document content) pair. If scoring does not
+finish within time_budget, the candidates are returned in their original
+order (the scores still land in the cache when the pass completes). Only
+one pass runs at a time: while one is still running, further calls keep
+their original order instead of queueing behind it. The model is loaded
+and warmed up on the worker when the process-wide reranker is created, so
+the first query does not pay for it.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RERANK_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+
+class CrossEncoderScorer:
+    """Interface: relevance of each document to the query, higher is better."""
+
+    name = "base"
+
+    def score(self, query: str, documents: List[str]) -> List[float]:
+        raise NotImplementedError
+
+    def warm(self):
+        """Load the model and run one forward pass ahead of the first query."""
+        self.score("warm up", ["warm up"])
+
+
+class SentenceTransformerCrossEncoder(CrossEncoderScorer):
+    """sentence-transformers CrossEncoder on CPU, loaded on first use."""
+
+    def __init__(self, model_name: str = DEFAULT_RERANK_MODEL, device: str = "cpu", max_length: int = 512):
+        from sentence_transformers import CrossEncoder  # noqa: F401  (fail early if unavailable)
+
+        self.name = model_name
+        self.device = device
+        self.max_length = max_length
+        self._model = None
+
+    def score(self, query: str, documents: List[str]) -> List[float]:
+        if self._model is None:
+            from sentence_transformers import CrossEncoder
+
+            self._model = CrossEncoder(self.name, device=self.device, max_length=self.max_length)
+            logger.info(f"Loaded reranking model {self.name}")
+        pairs = [(query, document) for document in documents]
+        return [float(s) for s in self._model.predict(pairs, batch_size=len(pairs), show_progress_bar=False)]
+
+
+def _content(candidate: Any) -> str:
+    if isinstance(candidate, dict):
+        return candidate.get("content") or candidate.get("text") or ""
+    return str(candidate)
+
+
+class Reranker:
+    """
+    Batched, cached, time-bounded reranking of retrieval candidates.
+
+    rerank() reorders the first top_n candidates by cross-encoder score and
+    keeps the rest in their original order after them. Dict candidates are
+    returned as copies with a "rerank_score" key.
+    """
+
+    def __init__(
+        self,
+        scorer: CrossEncoderScorer,
+        top_n: int = 20,
+        time_budget: float = 0.3,
+        cache_size: int = 10_000
+    ):
+        self.scorer = scorer
+        self.top_n = top_n
+        self.time_budget = time_budget
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        # scores are stored from the worker thread while the event loop reads
+        self._cache_lock = threading.Lock()
+        # one pass at a time: the model already uses every core
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rerank")
+        self._running: Optional[Future] = None
+        self.calls = 0
+        self.hits = 0
+        self.misses = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.skipped = 0
+        self.total_seconds = 0.0
+
+    @property
+    def busy(self) -> bool:
+        """True while a scoring pass (or the warm-up) is still running on the worker."""
+        return self._running is not None and not self._running.done()
+
+    def warm(self) -> Future:
+        """Start loading the model on the worker; rerank() keeps the original order until it is done."""
+        if not self.busy:
+            self._running = self._executor.submit(self._warm)
+        return self._running
+
+    def _warm(self):
+        started = time.monotonic()
+        try:
+            self.scorer.warm()
+        except Exception as e:
+            logger.error(f"Warming up reranking model {self.scorer.name} failed: {e}")
+            return
+        logger.info(f"Reranking model {self.scorer.name} warmed up in {time.monotonic() - started:.1f}s")
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def _store(self, query_key: str, doc_keys: List[str], scores: List[float]):
+        with self._cache_lock:
+            for doc_key, score in zip(doc_keys, scores):
+                self._cache[(query_key, doc_key)] = score
+                self._cache.move_to_end((query_key, doc_key))
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    async def rerank(
+        self,
+        query: str,
+        candidates: Sequence[Any],
+        k: Optional[int] = None,
+        text: Callable[[Any], str] = _content
+    ) -> List[Any]:
+        """Top k candidates after reranking (all of them when k is None)."""
+        started = time.monotonic()
+        self.calls += 1
+        head, tail = list(candidates[:self.top_n]), list(candidates[self.top_n:])
+        k = len(candidates) if k is None else k
+        if len(head) < 2:
+            return (head + tail)[:k]
+
+        query_key = self._key(query)
+        texts = [text(candidate) for candidate in head]
+        doc_keys = [self._key(t) for t in texts]
+        scores: Dict[str, float] = {}
+        missing: Dict[str, str] = {}
+        with self._cache_lock:
+            for doc_key, t in zip(doc_keys, texts):
+                cached = self._cache.get((query_key, doc_key))
+                if cached is not None:
+                    self._cache.move_to_end((query_key, doc_key))
+                    scores[doc_key] = cached
+                elif doc_key not in missing:
+                    missing[doc_key] = t
+        self.hits += len(scores)
+        self.misses += len(missing)
+
+        if missing:
+            if self.busy:
+                # a timed-out pass or the warm-up still holds the worker; don't queue behind it
+                self.skipped += 1
+                return (head + tail)[:k]
+            keys, documents = list(missing), list(missing.values())
+            self._running = self._executor.submit(self.scorer.score, query, documents)
+            self._running.add_done_callback(
+                lambda f: self._store(query_key, keys, f.result()) if not f.cancelled() and not f.exception() else None
+            )
+            try:
+                future = asyncio.wrap_future(self._running)
+                scores.update(zip(keys, await asyncio.wait_for(asyncio.shield(future), self.time_budget)))
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                logger.warning(
+                    f"Reranking {len(documents)} candidates exceeded {self.time_budget}s, keeping fused order"
+                )
+                return (head + tail)[:k]
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Reranking failed, keeping fused order: {e}")
+                return (head + tail)[:k]
+
+        order = sorted(range(len(head)), key=lambda i: scores[doc_keys[i]], reverse=True)
+        reranked = []
+        for i in order:
+            candidate = head[i]
+            if isinstance(candidate, dict):
+                candidate = {**candidate, "rerank_score": scores[doc_keys[i]]}
+            reranked.append(candidate)
+        self.total_seconds += time.monotonic() - started
+        return (reranked + tail)[:k]
+
+    def stats(self) -> Dict[str, Any]:
+        scored = self.calls - self.timeouts - self.failures - self.skipped
+        return {
+            "model": self.scorer.name,
+            "calls": self.calls,
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "cached": len(self._cache),
+            "avg_seconds": round(self.total_seconds / scored, 4) if scored > 0 else None,
+        }
+
+
+@lru_cache(maxsize=None)
+def get_reranker() -> Optional[Reranker]:
+    """
+    Process-wide reranker from the environment, or None when reranking is off.
+
+    Reranking is opt-in: SOPHIA_RERANK=true enables it (it downloads and
+    loads a cross-encoder); SOPHIA_RERANK_MODEL, SOPHIA_RERANK_TOP_N and
+    SOPHIA_RERANK_BUDGET_MS tune it. Without sentence-transformers
+    installed, reranking is skipped. The model starts warming up in the
+    background as soon as the reranker is created.
+    """
+    if os.getenv("SOPHIA_RERANK", "false").lower() not in ("1", "true", "yes", "on"):
+        return None
+    try:
+        scorer = SentenceTransformerCrossEncoder(os.getenv("SOPHIA_RERANK_MODEL", DEFAULT_RERANK_MODEL))
+    except ImportError:
+        logger.info("sentence-transformers not installed, results are not reranked")
+        return None
+    reranker = Reranker(
+        scorer,
+        top_n=int(os.getenv("SOPHIA_RERANK_TOP_N", "20")),
+        time_budget=int(os.getenv("SOPHIA_RERANK_BUDGET_MS", "300")) / 1000
+    )
+    reranker.warm()
+    return reranker
@@ -0,0 +1,66 @@
+"""
+BM25 sparse vectors.
+
+Documents are encoded as hashed-term -> saturated term frequency, queries as
+hashed-term -> 1. Qdrant multiplies in the IDF (sparse vectors configured
+with Modifier.IDF); InMemoryHybridIndex applies the same IDF itself.
+"""
+
+import hashlib
+import math
+import re
+from collections import Counter
+from typing import Dict, List
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_CAMEL = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+SparseVector = Dict[int, float]
+
+
+def term_index(term: str) -> int:
+    """Stable 31-bit index for a term (identical across processes, unlike hash())."""
+    return int.from_bytes(hashlib.blake2b(term.encode(), digest_size=4).digest(), "little") & 0x7FFFFFFF
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased words; identifiers also yield their snake_case / camelCase parts."""
+    terms = []
+    for match in _TOKEN.finditer(text):
+        word = match.group()
+        terms.append(word.lower())
+        parts = [p for piece in word.split("_") for p in _CAMEL.findall(piece)]
+        if len(parts) > 1:
+            terms.extend(p.lower() for p in parts)
+    return terms
+
+
+def idf(document_count: int, document_frequency: int) -> float:
+    """BM25 IDF as Qdrant computes it for Modifier.IDF."""
+    return math.log((document_count - document_frequency + 0.5) / (document_frequency + 0.5) + 1)
+
+
+class BM25Encoder:
+    """
+    BM25 term weights without corpus statistics at encode time.
+
+    Length normalisation uses a fixed avg_doc_length (in terms) instead of
+    the collection average, so documents can be encoded one batch at a time.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, avg_doc_length: float = 256.0):
+        self.k1 = k1
+        self.b = b
+        self.avg_doc_length = avg_doc_length
+
+    def encode_document(self, text: str) -> SparseVector:
+        terms = tokenize(text)
+        norm = self.k1 * (1 - self.b + self.b * len(terms) / self.avg_doc_length)
+        vector: SparseVector = {}
+        for term, tf in Counter(terms).items():
+            index = term_index(term)
+            vector[index] = vector.get(index, 0.0) + tf * (self.k1 + 1) / (tf + norm)
+        return vector
+
+    def encode_query(self, text: str) -> SparseVector:
+        return {term_index(term): 1.0 for term in tokenize(text)}
@@ -0,0 +1,53 @@
+"""
+SOPHIA distributed tracing.
+
+OpenTelemetry-style spans with W3C ``traceparent`` propagation, exported to a
+local JSONL file or an OTLP/HTTP collector. See ``configure_tracing`` for the
+environment knobs (exporter, sample rate).
+"""
+
+from .tracer import (
+    Span,
+    SpanContext,
+    Tracer,
+    TraceIdRatioSampler,
+    configure_tracing,
+    current_span_context,
+    extract,
+    get_tracer,
+    inject,
+    traced,
+)
+from .exporters import (
+    BatchSpanProcessor,
+    FileSpanExporter,
+    InMemorySpanExporter,
+    OTLPHttpSpanExporter,
+    SimpleSpanProcessor,
+)
+from .httpx_transport import TracingTransport
+
+try:
+    from .asgi import init_tracing
+except ImportError:
+    init_tracing = None
+
+__all__ = [
+    "Span",
+    "SpanContext",
+    "Tracer",
+    "TraceIdRatioSampler",
+    "configure_tracing",
+    "current_span_context",
+    "extract",
+    "get_tracer",
+    "inject",
+    "traced",
+    "BatchSpanProcessor",
+    "FileSpanExporter",
+    "InMemorySpanExporter",
+    "OTLPHttpSpanExporter",
+    "SimpleSpanProcessor",
+    "TracingTransport",
+    "init_tracing",
+]
@@ -0,0 +1,40 @@
+"""FastAPI middleware that continues incoming traces and opens a SERVER span per request."""
+
+from fastapi import FastAPI, Request
+
+from .tracer import configure_tracing, extract, get_tracer
+
+
+def init_tracing(app: FastAPI, service_name: str) -> None:
+    """Configure the process tracer for ``service_name`` and instrument ``app``."""
+    configure_tracing(service_name=service_name)
+
+    @app.middleware("http")
+    async def _tracing_middleware(request: Request, call_next):
+        if request.url.path in ("/metrics", "/healthz", "/health"):
+            return await call_next(request)
+
+        tracer = get_tracer()
+        with tracer.start_span(
+            f"{request.method} {request.url.path}",
+            kind="SERVER",
+            parent=extract(request.headers),
+            attributes={
+                "http.method": request.method,
+                "http.target": request.url.path,
+                "http.user_agent": request.headers.get("user-agent"),
+            },
+        ) as span:
+            response = await call_next(request)
+
+            route = getattr(request.scope.get("route"), "path", None)
+            if route:
+                http_route = f"{request.scope.get('root_path', '')}{route}"
+                span.name = f"{request.method} {http_route}"
+                span.set_attribute("http.route", http_route)
+            span.set_attribute("http.status_code", response.status_code)
+            if response.status_code >= 500:
+                span.set_status("ERROR", f"HTTP {response.status_code}")
+
+            response.headers["X-Trace-Id"] = span.context.trace_id
+            return response
@@ -0,0 +1,240 @@
+"""
+Span processors and exporters.
+
+Finished spans are queued and shipped from a background thread so exporting
+never blocks the event loop. Exporters write either JSON lines to a local file
+or OTLP/HTTP JSON to a collector (Jaeger, Tempo, the OTel collector, ...).
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+from typing import Any, Dict, List, Optional
+
+from .tracer import Span
+
+logger = logging.getLogger(__name__)
+
+
+class InMemorySpanExporter:
+    """Keeps exported spans in a list (tests and local debugging)."""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        with self._lock:
+            self.spans.extend(spans)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+
+    def shutdown(self) -> None:
+        pass
+
+
+class FileSpanExporter:
+    """Appends spans as JSON lines to a local file."""
+
+    def __init__(self, path: str = "traces.jsonl"):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        lines = "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+    def shutdown(self) -> None:
+        pass
+
+
+_OTLP_KINDS = {"INTERNAL": 1, "SERVER": 2, "CLIENT": 3, "PRODUCER": 4, "CONSUMER": 5}
+_OTLP_STATUS = {"UNSET": 0, "OK": 1, "ERROR": 2}
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+class OTLPHttpSpanExporter:
+    """Sends spans to an OTLP/HTTP collector using the JSON encoding."""
+
+    def __init__(
+        self,
+        endpoint: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 10.0,
+    ):
+        base = endpoint or os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318")
+        self.endpoint = base.rstrip("/") if base.rstrip("/").endswith("/v1/traces") else f"{base.rstrip('/')}/v1/traces"
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self.timeout = timeout
+        self._client = None
+
+    def _payload(self, spans: List[Span]) -> Dict[str, Any]:
+        by_service: Dict[str, List[Span]] = {}
+        for span in spans:
+            by_service.setdefault(span.service_name, []).append(span)
+
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": _otlp_attributes({"service.name": service})},
+                    "scopeSpans": [{
+                        "scope": {"name": "sophia.tracing"},
+                        "spans": [
+                            {
+                                "traceId": span.context.trace_id,
+                                "spanId": span.context.span_id,
+                                "parentSpanId": span.parent_span_id or "",
+                                "name": span.name,
+                                "kind": _OTLP_KINDS.get(span.kind, 1),
+                                "startTimeUnixNano": str(span.start_time_ns),
+                                "endTimeUnixNano": str(span.end_time_ns or span.start_time_ns),
+                                "attributes": _otlp_attributes(span.attributes),
+                                "events": [
+                                    {
+                                        "name": event["name"],
+                                        "timeUnixNano": str(event["time_ns"]),
+                                        "attributes": _otlp_attributes(event["attributes"]),
+                                    }
+                                    for event in span.events
+                                ],
+                                "status": {
+                                    "code": _OTLP_STATUS.get(span.status, 0),
+                                    "message": span.status_message,
+                                },
+                            }
+                            for span in service_spans
+                        ],
+                    }],
+                }
+                for service, service_spans in by_service.items()
+            ]
+        }
+
+    def export(self, spans: List[Span]) -> None:
+        import httpx
+
+        if self._client is None:
+            self._client = httpx.Client(timeout=self.timeout)
+        response = self._client.post(self.endpoint, headers=self.headers, json=self._payload(spans))
+        if response.status_code >= 400:
+            logger.warning(f"OTLP export failed: {response.status_code} {response.text[:200]}")
+
+    def shutdown(self) -> None:
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+
+class SimpleSpanProcessor:
+    """Exports every span synchronously as it ends. Intended for tests."""
+
+    def __init__(self, exporter):
+        self.exporter = exporter
+
+    def on_end(self, span: Span) -> None:
+        self.exporter.export([span])
+
+    def force_flush(self) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        self.exporter.shutdown()
+
+
+class BatchSpanProcessor:
+    """
+    Buffers finished spans and exports them from a daemon thread.
+
+    Spans are dropped (and counted) rather than blocking callers when the queue
+    is full, so a slow or unreachable collector can't stall request handling.
+    """
+
+    def __init__(
+        self,
+        exporter,
+        max_queue_size: int = 2048,
+        max_batch_size: int = 512,
+        schedule_delay: float = 5.0,
+    ):
+        self.exporter = exporter
+        self.max_batch_size = max_batch_size
+        self.schedule_delay = schedule_delay
+        self.dropped_spans = 0
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=max_queue_size)
+        self._flush_requested = threading.Event()
+        self._flushed = threading.Event()
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="sophia-span-exporter", daemon=True)
+        self._worker.start()
+
+    def on_end(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped_spans += 1
+            return
+        if self._queue.qsize() >= self.max_batch_size:
+            self._flush_requested.set()
+
+    def _drain(self) -> None:
+        while not self._queue.empty():
+            batch: List[Span] = []
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self.exporter.export(batch)
+                except Exception as e:
+                    logger.warning(f"Span export failed ({len(batch)} spans): {e}")
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._flush_requested.wait(self.schedule_delay)
+            self._flush_requested.clear()
+            self._drain()
+            self._flushed.set()
+        self._drain()
+
+    def force_flush(self, timeout: float = 5.0) -> None:
+        self._flushed.clear()
+        self._flush_requested.set()
+        self._flushed.wait(timeout)
+
+    def shutdown(self) -> None:
+        self._stopped.set()
+        self._flush_requested.set()
+        self._worker.join(timeout=5.0)
+        self.exporter.shutdown()
+
+
+def build_processor(exporter: str, service_name: str):
+    """Build a batch processor for a named exporter; returns None when tracing export is off."""
+    exporter = (exporter or "none").lower()
+    if exporter == "file":
+        return BatchSpanProcessor(FileSpanExporter(os.getenv("SOPHIA_TRACE_FILE", "traces.jsonl")))
+    if exporter == "otlp":
+        return BatchSpanProcessor(OTLPHttpSpanExporter())
+    if exporter not in ("none", ""):
+        logger.warning(f"Unknown tracing exporter '{exporter}' for {service_name}; spans will not be exported")
+    return None
@@ -0,0 +1,39 @@
+"""httpx transport that opens a CLIENT span per request and propagates trace context."""
+
+from typing import Optional
+
+import httpx
+
+from .tracer import Tracer, get_tracer, inject
+
+
+class TracingTransport(httpx.AsyncBaseTransport):
+    """
+    Wraps another async transport. Use as
+    ``httpx.AsyncClient(transport=TracingTransport())``.
+    """
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None, tracer: Optional[Tracer] = None):
+        self._transport = transport or httpx.AsyncHTTPTransport()
+        self._tracer = tracer
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        tracer = self._tracer or get_tracer()
+        with tracer.start_span(
+            f"HTTP {request.method} {request.url.host}",
+            kind="CLIENT",
+            attributes={
+                "http.method": request.method,
+                "http.url": str(request.url.copy_with(query=None)),
+                "net.peer.name": request.url.host,
+            },
+        ) as span:
+            inject(request.headers)
+            response = await self._transport.handle_async_request(request)
+            span.set_attribute("http.status_code", response.status_code)
+            if response.status_code >= 500:
+                span.set_status("ERROR", f"HTTP {response.status_code}")
+            return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
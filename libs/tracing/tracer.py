@@ -0,0 +1,281 @@
+"""
+Lightweight OpenTelemetry-style tracer.
+
+Spans carry W3C trace context (``traceparent``) so traces started in the chat
+API continue through SOPHIAMCPClient into the MCP servers and out to providers.
+Sampling is parent-based with a trace-id ratio for root spans, so every service
+makes the same keep/drop decision for a given trace.
+"""
+
+import functools
+import inspect
+import logging
+import os
+import random
+import time
+import traceback
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_HEADER = "traceparent"
+
+_current_context: ContextVar[Optional["SpanContext"]] = ContextVar("sophia_trace_context", default=None)
+
+
+@dataclass(frozen=True)
+class SpanContext:
+    """Identifies a span within a trace."""
+    trace_id: str  # 32 hex chars
+    span_id: str  # 16 hex chars
+    sampled: bool = True
+    remote: bool = False
+
+
+@dataclass
+class Span:
+    """A single timed operation."""
+    name: str
+    context: SpanContext
+    service_name: str
+    parent_span_id: Optional[str] = None
+    kind: str = "INTERNAL"
+    start_time_ns: int = field(default_factory=time.time_ns)
+    end_time_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    status: str = "UNSET"
+    status_message: str = ""
+
+    @property
+    def is_recording(self) -> bool:
+        return self.context.sampled and self.end_time_ns is None
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_time_ns is None:
+            return None
+        return (self.end_time_ns - self.start_time_ns) / 1_000_000
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if self.is_recording and value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, attributes: Mapping[str, Any]) -> None:
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> None:
+        if self.is_recording:
+            self.events.append({"name": name, "time_ns": time.time_ns(), "attributes": attributes or {}})
+
+    def set_status(self, status: str, message: str = "") -> None:
+        self.status = status
+        self.status_message = message
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.add_event("exception", {
+            "exception.type": type(exc).__name__,
+            "exception.message": str(exc),
+            "exception.stacktrace": "".join(traceback.format_exception(type(exc), exc, exc.__traceback__)),
+        })
+        self.set_status("ERROR", str(exc))
+
+    def end(self) -> None:
+        if self.end_time_ns is None:
+            self.end_time_ns = time.time_ns()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_span_id": self.parent_span_id,
+            "service": self.service_name,
+            "kind": self.kind,
+            "start_time_ns": self.start_time_ns,
+            "end_time_ns": self.end_time_ns,
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+            "events": self.events,
+            "status": self.status,
+            "status_message": self.status_message,
+        }
+
+
+class TraceIdRatioSampler:
+    """Keeps a deterministic fraction of traces based on the trace id."""
+
+    def __init__(self, rate: float = 1.0):
+        self.rate = max(0.0, min(1.0, rate))
+        self._bound = int(self.rate * (1 << 64))
+
+    def should_sample(self, trace_id: str) -> bool:
+        return int(trace_id[-16:], 16) < self._bound
+
+
+class Tracer:
+    """Creates spans and hands sampled, finished spans to a span processor."""
+
+    def __init__(self, service_name: str, sample_rate: float = 1.0, processor=None):
+        self.service_name = service_name
+        self.sampler = TraceIdRatioSampler(sample_rate)
+        self.processor = processor
+
+    @contextmanager
+    def start_span(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        kind: str = "INTERNAL",
+        parent: Optional[SpanContext] = None,
+    ) -> Iterator[Span]:
+        """Start a span as a child of ``parent`` or the current span, and make it current."""
+        parent = parent or _current_context.get()
+        if parent is not None:
+            trace_id, sampled = parent.trace_id, parent.sampled
+        else:
+            trace_id = _random_hex(128)
+            sampled = self.sampler.should_sample(trace_id)
+
+        span = Span(
+            name=name,
+            context=SpanContext(trace_id=trace_id, span_id=_random_hex(64), sampled=sampled),
+            service_name=self.service_name,
+            parent_span_id=parent.span_id if parent else None,
+            kind=kind,
+        )
+        span.set_attributes(attributes or {})
+
+        token = _current_context.set(span.context)
+        try:
+            yield span
+        except BaseException as exc:
+            span.record_exception(exc)
+            raise
+        finally:
+            _current_context.reset(token)
+            span.end()
+            if sampled and self.processor is not None:
+                try:
+                    self.processor.on_end(span)
+                except Exception as e:
+                    logger.debug(f"Span processor failed: {e}")
+
+    def shutdown(self) -> None:
+        if self.processor is not None:
+            self.processor.shutdown()
+
+
+def _random_hex(bits: int) -> str:
+    value = 0
+    while value == 0:  # all-zero ids are invalid in W3C trace context
+        value = random.getrandbits(bits)
+    return f"{value:0{bits // 4}x}"
+
+
+# ---------------------------------------------------------------------------
+# Context propagation (W3C trace context)
+# ---------------------------------------------------------------------------
+
+def current_span_context() -> Optional[SpanContext]:
+    """Return the active span context, if any."""
+    return _current_context.get()
+
+
+def inject(headers):
+    """Write the active context into a mutable headers mapping as ``traceparent``."""
+    ctx = _current_context.get()
+    if ctx is not None:
+        headers[TRACEPARENT_HEADER] = f"00-{ctx.trace_id}-{ctx.span_id}-{'01' if ctx.sampled else '00'}"
+    return headers
+
+
+def extract(headers: Mapping[str, str]) -> Optional[SpanContext]:
+    """Parse an incoming ``traceparent`` header; returns None when missing or malformed."""
+    value = headers.get(TRACEPARENT_HEADER)
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    version, trace_id, span_id, flags = parts[:4]
+    try:
+        int(trace_id, 16), int(span_id, 16)
+        sampled = bool(int(flags, 16) & 0x01)
+    except ValueError:
+        return None
+    if version == "ff" or set(trace_id) == {"0"} or set(span_id) == {"0"}:
+        return None
+    return SpanContext(trace_id=trace_id, span_id=span_id, sampled=sampled, remote=True)
+
+
+# ---------------------------------------------------------------------------
+# Global tracer
+# ---------------------------------------------------------------------------
+
+_tracer: Optional[Tracer] = None
+
+
+def configure_tracing(
+    service_name: Optional[str] = None,
+    exporter: Optional[str] = None,
+    sample_rate: Optional[float] = None,
+    processor=None,
+) -> Tracer:
+    """
+    Configure the process-wide tracer.
+
+    Unset arguments fall back to the environment:
+        OTEL_SERVICE_NAME         service name (default "sophia")
+        SOPHIA_TRACING_EXPORTER   none | file | otlp (default none)
+        SOPHIA_TRACE_SAMPLE_RATE  fraction of root traces kept, 0.0-1.0 (default 1.0)
+        SOPHIA_TRACE_FILE         JSONL path for the file exporter (default traces.jsonl)
+        OTEL_EXPORTER_OTLP_ENDPOINT  collector base URL for the otlp exporter
+    """
+    global _tracer
+    from .exporters import build_processor
+
+    service_name = service_name or os.getenv("OTEL_SERVICE_NAME", "sophia")
+    if sample_rate is None:
+        sample_rate = float(os.getenv("SOPHIA_TRACE_SAMPLE_RATE", "1.0"))
+    if processor is None:
+        processor = build_processor(exporter or os.getenv("SOPHIA_TRACING_EXPORTER", "none"), service_name)
+
+    if _tracer is not None:
+        _tracer.shutdown()
+    _tracer = Tracer(service_name, sample_rate=sample_rate, processor=processor)
+    logger.info(f"Tracing configured for {service_name} (sample_rate={sample_rate})")
+    return _tracer
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer, configuring it from the environment on first use."""
+    if _tracer is None:
+        return configure_tracing()
+    return _tracer
+
+
+def traced(name: Optional[str] = None, **attributes: Any) -> Callable:
+    """Decorator that wraps a sync or async function in a span."""
+
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with get_tracer().start_span(span_name, attributes=attributes):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with get_tracer().start_span(span_name, attributes=attributes):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
@@ -0,0 +1,17 @@
+"""
+SOPHIA shared vector writes.
+
+An async writer that coalesces points from any number of producers into
+batched, concurrent, retried Qdrant upserts behind a bounded queue (one
+shared instance per process), plus deterministic point ids that make those
+retries idempotent.
+"""
+
+from .writer import VectorWriter, get_vector_writer, point_id, to_point
+
+__all__ = [
+    "VectorWriter",
+    "get_vector_writer",
+    "point_id",
+    "to_point",
+]
@@ -0,0 +1,297 @@
+"""
+Batched, back-pressured Qdrant writes.
+
+Producers hand points to a VectorWriter; a single consumer coalesces them per
+collection into batches (flushed when a batch fills or max_wait after its
+first point) and upserts up to max_in_flight batches concurrently. The input
+queue is bounded, so producers slow down to the rate Qdrant accepts instead of
+buffering without limit. Upserts by point id are idempotent, so a failed batch
+is simply sent again. get_vector_writer() returns the process-wide writer for a
+Qdrant server, so every component writing there shares the same batches and
+in-flight limit.
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointStruct, UpdateResult
+
+from libs.ratelimit import backoff_delay
+
+logger = logging.getLogger(__name__)
+
+POINT_NAMESPACE = uuid.UUID("5b1f2a9e-3c4d-4f6a-9e8b-7a6c5d4e3f21")
+
+Point = Union[PointStruct, Dict[str, Any]]
+
+
+def point_id(*parts: Any) -> str:
+    """Deterministic point id (a UUID string) for the given key parts."""
+    return str(uuid.uuid5(POINT_NAMESPACE, "\0".join(str(part) for part in parts)))
+
+
+def to_point(point: Point) -> PointStruct:
+    if isinstance(point, PointStruct):
+        return point
+    return PointStruct(id=point["id"], vector=point["vector"], payload=point.get("payload") or {})
+
+
+@dataclass
+class _Ticket:
+    """Completion of one write() call, resolved once all of its points are stored."""
+    remaining: int
+    future: Optional[asyncio.Future] = None
+
+    def done(self, count: int, result: Optional[UpdateResult]):
+        self.remaining -= count
+        if self.remaining <= 0 and self.future is not None and not self.future.done():
+            self.future.set_result(result)
+
+    def fail(self, error: BaseException):
+        if self.future is not None and not self.future.done():
+            self.future.set_exception(error)
+
+
+@dataclass
+class _Control:
+    """Queue marker: dispatch everything pending, wait for in-flight batches, then resolve (or stop)."""
+    stop: bool
+    future: Optional[asyncio.Future] = None
+
+
+@dataclass
+class _Batch:
+    collection: str
+    points: List[PointStruct] = field(default_factory=list)
+    tickets: List[Tuple[_Ticket, int]] = field(default_factory=list)
+    deadline: float = 0.0
+
+
+class VectorWriter:
+    """
+    Shared async writer for one Qdrant client (sync QdrantClient or AsyncQdrantClient).
+
+    write() waits until Qdrant has applied its points (accepted only, with
+    wait=False) and returns Qdrant's UpdateResult for the batch that stored
+    the last of them; it raises if a batch failed after all retries.
+    submit() only waits for queue space; its failures are logged and counted
+    in stats().
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        batch_size: int = 256,
+        max_wait: float = 0.05,
+        max_in_flight: int = 4,
+        queue_size: int = 4096,
+        retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 10.0,
+        wait: bool = True
+    ):
+        self.client = client
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.max_in_flight = max_in_flight
+        self.queue_size = queue_size
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.wait = wait
+        self._async_client = inspect.iscoroutinefunction(getattr(client, "upsert", None))
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._consumer: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._in_flight: Set[asyncio.Task] = set()
+        self._batches: Dict[str, _Batch] = {}
+        self._started_at: Optional[float] = None
+        self._last_write_at: Optional[float] = None
+        self.points_written = 0
+        self.batches_written = 0
+        self.retried_batches = 0
+        self.failed_points = 0
+
+    # Producers
+
+    async def write(self, collection: str, points: Iterable[Point]) -> Optional[UpdateResult]:
+        """Queue points and wait until they are stored."""
+        points = [to_point(p) for p in points]
+        if not points:
+            return None
+        ticket = _Ticket(len(points), asyncio.get_running_loop().create_future())
+        await self._put(collection, points, ticket)
+        return await ticket.future
+
+    async def submit(self, collection: str, points: Iterable[Point]):
+        """Queue points without waiting for the upsert (only for queue space)."""
+        points = [to_point(p) for p in points]
+        if points:
+            await self._put(collection, points, _Ticket(len(points)))
+
+    async def flush(self):
+        """Wait until everything queued so far is stored (or has failed)."""
+        if self._consumer is None:
+            return
+        done = asyncio.get_running_loop().create_future()
+        await self._queue.put(_Control(stop=False, future=done))
+        await done
+
+    async def close(self):
+        """Flush and stop the consumer."""
+        if self._consumer is None:
+            return
+        await self._queue.put(_Control(stop=True))
+        await self._consumer
+        self._consumer = None
+
+    async def _put(self, collection: str, points: List[PointStruct], ticket: _Ticket):
+        self._start()
+        for point in points:
+            await self._queue.put((collection, point, ticket))
+
+    def _start(self):
+        loop = asyncio.get_running_loop()
+        if self._consumer is None or self._consumer.done() or self._loop is not loop:
+            # A consumer from another (possibly closed) event loop can never run here
+            self._loop = loop
+            self._batches = {}
+            self._in_flight = set()
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+            self._consumer = asyncio.create_task(self._consume())
+
+    # Consumer
+
+    async def _consume(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            timeout = None
+            if self._batches:
+                timeout = max(0.0, min(b.deadline for b in self._batches.values()) - loop.time())
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                now = loop.time()
+                for batch in [b for b in self._batches.values() if b.deadline <= now]:
+                    await self._dispatch(batch)
+                continue
+
+            if isinstance(item, _Control):
+                for batch in list(self._batches.values()):
+                    await self._dispatch(batch)
+                if self._in_flight:
+                    await asyncio.gather(*list(self._in_flight))
+                if item.stop:
+                    return
+                item.future.set_result(None)
+                continue
+
+            collection, point, ticket = item
+            batch = self._batches.get(collection)
+            if batch is None:
+                batch = self._batches[collection] = _Batch(collection, deadline=loop.time() + self.max_wait)
+            batch.points.append(point)
+            if batch.tickets and batch.tickets[-1][0] is ticket:
+                batch.tickets[-1] = (ticket, batch.tickets[-1][1] + 1)
+            else:
+                batch.tickets.append((ticket, 1))
+            if len(batch.points) >= self.batch_size:
+                await self._dispatch(batch)
+
+    async def _dispatch(self, batch: _Batch):
+        """Start upserting a batch once an in-flight slot is free (this is where back-pressure starts)."""
+        del self._batches[batch.collection]
+        await self._slots.acquire()
+        task = asyncio.create_task(self._write_batch(batch))
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    async def _write_batch(self, batch: _Batch):
+        try:
+            if self._started_at is None:
+                self._started_at = time.monotonic()
+            for attempt in range(self.retries + 1):
+                try:
+                    result = await self._upsert(batch.collection, batch.points)
+                    break
+                except Exception as e:
+                    if attempt == self.retries:
+                        logger.error(f"Upsert of {len(batch.points)} points into {batch.collection} failed "
+                                     f"after {self.retries} retries: {e}")
+                        self.failed_points += len(batch.points)
+                        for ticket, _ in batch.tickets:
+                            ticket.fail(e)
+                        return
+                    self.retried_batches += 1
+                    await asyncio.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_max))
+
+            self.points_written += len(batch.points)
+            self.batches_written += 1
+            self._last_write_at = time.monotonic()
+            for ticket, count in batch.tickets:
+                ticket.done(count, result)
+        finally:
+            self._slots.release()
+
+    async def _upsert(self, collection: str, points: List[PointStruct]) -> Optional[UpdateResult]:
+        if self._async_client:
+            return await self.client.upsert(collection_name=collection, points=points, wait=self.wait)
+        return await asyncio.to_thread(self.client.upsert, collection_name=collection, points=points, wait=self.wait)
+
+    def stats(self) -> Dict[str, Any]:
+        elapsed = (self._last_write_at or 0.0) - (self._started_at or 0.0)
+        return {
+            "points_written": self.points_written,
+            "batches_written": self.batches_written,
+            "retried_batches": self.retried_batches,
+            "failed_points": self.failed_points,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "in_flight_batches": len(self._in_flight),
+            "points_per_second": round(self.points_written / elapsed, 1) if elapsed > 0 else None,
+        }
+
+
+_writers: Dict[Any, VectorWriter] = {}
+_default_client: Optional[QdrantClient] = None
+
+
+def _server_key(client: Any) -> Any:
+    """Clients of the same Qdrant server share a key; local and unknown clients are keyed by identity."""
+    options = getattr(client, "init_options", None) or {}
+    location = options.get("url") or options.get("host") or options.get("location")
+    if isinstance(location, str) and location != ":memory:":
+        return (location, options.get("port"), options.get("prefix"), options.get("api_key"))
+    return id(client)
+
+
+def get_vector_writer(client: Any = None) -> VectorWriter:
+    """
+    Return the process-wide writer for client's Qdrant server, creating it on first use.
+
+    Components that build their own clients for the same server share one
+    writer (the first such client is the one it writes through); a client for
+    another server, or an in-memory one, gets its own writer. Without a
+    client, one is built from QDRANT_URL / QDRANT_API_KEY.
+    """
+    global _default_client
+    if client is None:
+        if _default_client is None:
+            _default_client = QdrantClient(
+                url=os.getenv("QDRANT_URL", "http://localhost:6333"),
+                api_key=os.getenv("QDRANT_API_KEY")
+            )
+        client = _default_client
+    key = _server_key(client)
+    if key not in _writers:
+        # identity keys stay unique because the writer keeps its client alive
+        _writers[key] = VectorWriter(client)
+    return _writers[key]
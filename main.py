@@ -20,6 +20,8 @@ from fastapi.responses import HTMLResponse, JSONResponse
 from pydantic import BaseModel
 import uvicorn
 
+from libs.tracing import get_tracer, init_tracing, inject, traced
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -35,6 +37,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Distributed tracing (exporter and sampling via SOPHIA_TRACING_EXPORTER / SOPHIA_TRACE_SAMPLE_RATE)
+init_tracing(app, "sophia-api")
+
 class ChatRequest(BaseModel):
     message: str
     user_id: str = "human"
@@ -114,12 +119,18 @@ class SophiaUltimate:
             }
             
             if self.api_keys['openrouter']:
-                response = requests.post(
-                    "https://openrouter.ai/api/v1/chat/completions",
-                    headers=headers,
-                    json=payload,
-                    timeout=30
-                )
+                with get_tracer().start_span(
+                    "call_model",
+                    kind="CLIENT",
+                    attributes={"llm.provider": "openrouter", "llm.model": model_config["model"], "task.type": task_type},
+                ) as span:
+                    response = requests.post(
+                        "https://openrouter.ai/api/v1/chat/completions",
+                        headers=inject(headers),
+                        json=payload,
+                        timeout=30
+                    )
+                    span.set_attribute("http.status_code", response.status_code)
                 
                 if response.status_code == 200:
                     result = response.json()
@@ -354,6 +365,7 @@ if __name__ == "__main__":
             logger.error(f"Infrastructure error: {e}")
             return {"status": "error", "message": f"Infrastructure error: {str(e)}"}
     
+    @traced("chat.process_request")
     async def process_ultimate_request(self, message: str, user_id: str) -> Dict:
         """Process any request with ultimate AI capabilities"""
         try:
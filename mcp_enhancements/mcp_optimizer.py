@@ -15,6 +15,8 @@ from qdrant_client import QdrantClient
 from qdrant_client.models import Distance, VectorParams, PointStruct
 import redis.asyncio as redis
 
+from libs.vectors import get_vector_writer, point_id
+
 logger = logging.getLogger(__name__)
 
 class MCPOptimizer:
@@ -28,6 +30,9 @@ class MCPOptimizer:
             url=os.getenv("QDRANT_URL", "http://localhost:6333"),
             api_key=os.getenv("QDRANT_API_KEY")
         )
+        # Concurrent context writes share the process-wide batching writer
+        self.vector_writer = get_vector_writer(self.qdrant_client)
+        self._ready_collections = set()
         self.redis_client = redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379"))
         self.n8n_mcp_enabled = os.getenv("N8N_MCP_ENABLED", "true").lower() == "true"
         
@@ -130,10 +135,10 @@ class MCPOptimizer:
             # Generate embedding (simplified - would use actual embedding model)
             embedding = await self._generate_embedding(content)
             
-            # Create point
-            point_id = hash(content + str(datetime.now().timestamp()))
+            # Create point; the id is derived from the content so retried or repeated writes are idempotent
+            context_id = point_id(context_type, content)
             point = PointStruct(
-                id=point_id,
+                id=context_id,
                 vector=embedding,
                 payload={
                     "content": content,
@@ -145,15 +150,12 @@ class MCPOptimizer:
             )
             
             # Store in Qdrant
-            self.qdrant_client.upsert(
-                collection_name=collection_name,
-                points=[point]
-            )
+            await self.vector_writer.write(collection_name, [point])
             
             return {
                 "storage": "qdrant",
                 "collection": collection_name,
-                "point_id": point_id,
+                "point_id": context_id,
                 "status": "stored"
             }
             
@@ -214,14 +216,18 @@ class MCPOptimizer:
     
     async def _ensure_qdrant_collection(self, collection_name: str):
         """Ensure Qdrant collection exists"""
+        if collection_name in self._ready_collections:
+            return
         try:
-            collections = self.qdrant_client.get_collections().collections
+            collections = (await asyncio.to_thread(self.qdrant_client.get_collections)).collections
             if not any(c.name == collection_name for c in collections):
-                self.qdrant_client.create_collection(
+                await asyncio.to_thread(
+                    self.qdrant_client.create_collection,
                     collection_name=collection_name,
                     vectors_config=VectorParams(size=384, distance=Distance.COSINE)
                 )
                 logger.info(f"Created Qdrant collection: {collection_name}")
+            self._ready_collections.add(collection_name)
         except Exception as e:
             logger.warning(f"Qdrant collection setup error: {e}")
     
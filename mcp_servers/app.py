@@ -18,6 +18,8 @@ from .context_server import router as context_router
 from .memory_server import router as memory_router
 from .research_router import router as research_router
 from .business_server import router as business_router
+from libs.metrics import init_metrics
+from libs.tracing import init_tracing
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -87,7 +89,12 @@ def create_app(service: str = None) -> FastAPI:
         app.include_router(feedback_router, prefix="/feedback", tags=["Feedback Management"])
         
     elif service == "code":
-        # Mount the code app directly since it's a FastAPI app, not a router
+        # Serve the code app directly since it's a FastAPI app, not a router.
+        # It is a module-level singleton, so only instrument it once.
+        if not getattr(code_app.state, "instrumented", False):
+            init_metrics(code_app, "sophia-mcp-code", "4.2.0")
+            init_tracing(code_app, "sophia-mcp-code")
+            code_app.state.instrumented = True
         return code_app
     elif service == "context":
         app.include_router(context_router, prefix="", tags=["Context Management"])
@@ -143,14 +150,9 @@ def create_app(service: str = None) -> FastAPI:
         """Readiness check endpoint."""
         return {"status": "ready", "service": f"sophia-mcp-{service}"}
 
-    @app.get("/metrics")
-    async def metrics():
-        """Basic metrics endpoint."""
-        return {
-            "service": f"sophia-mcp-{service}",
-            "uptime": "operational",
-            "version": "1.0.0"
-        }
+    # Prometheus /metrics with route-template labels (shared MCP contract)
+    init_metrics(app, f"sophia-mcp-{service}", "1.0.0")
+    init_tracing(app, f"sophia-mcp-{service}")
     
     return app
 
@@ -5,7 +5,8 @@ import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .context_server import router
-from .common.metrics import init_metrics, register_healthz_if_missing
+from libs.metrics import init_metrics, register_healthz_if_missing
+from libs.tracing import init_tracing
 
 # Create FastAPI app
 app = FastAPI(
@@ -29,6 +30,7 @@ app.include_router(router, prefix="", tags=["Context"])
 # v4.2 platform invariants
 register_healthz_if_missing(app, "sophia-context-mcp", "4.2.0")
 init_metrics(app, "sophia-context-mcp", "4.2.0")
+init_tracing(app, "sophia-context-mcp")
 
 @app.get("/")
 async def root():
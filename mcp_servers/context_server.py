@@ -15,6 +15,8 @@ from pydantic import BaseModel
 from fastapi import APIRouter, HTTPException
 import httpx
 
+from libs.tracing import traced
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -167,6 +169,7 @@ async def index_repository(request: CodeIndexRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/search", response_model=CodeSearchResponse)
+@traced("vector.search_code")
 async def search_code(request: CodeSearchRequest):
     """Search indexed code using semantic and keyword matching"""
     try:
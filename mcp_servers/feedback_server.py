@@ -8,6 +8,7 @@ import logging
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 import asyncio
 
@@ -243,16 +244,24 @@ async def export_feedback(
     Export feedback data for analysis.
     
     Query parameters:
-    - format: Export format (json, csv) - currently only json supported
+    - format: Export format (json, jsonl, csv) - jsonl and csv are streamed
     - days: Number of days to export (default: 30)
     """
     try:
-        if format not in ["json"]:
-            raise HTTPException(status_code=400, detail="Only JSON format is currently supported")
+        if format not in ["json", "jsonl", "csv"]:
+            raise HTTPException(status_code=400, detail="Supported formats: json, jsonl, csv")
         
         if days > 365:
             raise HTTPException(status_code=400, detail="Days cannot exceed 365")
         
+        if format in ["jsonl", "csv"]:
+            media_type = "application/x-ndjson" if format == "jsonl" else "text/csv"
+            return StreamingResponse(
+                master.stream_feedback_export(format=format, days=days),
+                media_type=media_type,
+                headers={"Content-Disposition": f"attachment; filename=feedback_{days}d.{format}"}
+            )
+        
         export_data = await master.export_feedback_data(format=format, days=days)
         return export_data
         
@@ -324,6 +333,20 @@ async def get_feedback_stats(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 # Batch operations
+MAX_BATCH_SIZE = 1000
+
+def _batch_response(statuses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Summarize per-item batch statuses into the batch endpoint response."""
+    results = [s for s in statuses if s["status"] == "recorded"]
+    errors = [s for s in statuses if s["status"] != "recorded"]
+    return {
+        "successful": len(results),
+        "failed": len(errors),
+        "results": results,
+        "errors": errors,
+        "items": statuses
+    }
+
 @router.post("/feedback/batch/user")
 async def submit_batch_user_feedback(
     requests: List[UserFeedbackRequest],
@@ -333,36 +356,24 @@ async def submit_batch_user_feedback(
     Submit multiple user feedback records in batch.
     
     Useful for bulk feedback submission from surveys or batch processing.
+    The batch is written in a single transaction and the response carries a
+    per-item status in input order.
     """
     try:
-        if len(requests) > 100:
-            raise HTTPException(status_code=400, detail="Batch size cannot exceed 100")
-        
-        results = []
-        errors = []
-        
-        for i, request in enumerate(requests):
-            try:
-                result = await master.record_user_feedback(
-                    task_id=request.task_id,
-                    rating=request.rating,
-                    comments=request.comments,
-                    metadata=request.metadata
-                )
-                results.append(result)
-            except Exception as e:
-                errors.append({
-                    "index": i,
-                    "task_id": request.task_id,
-                    "error": str(e)
-                })
-        
-        return {
-            "successful": len(results),
-            "failed": len(errors),
-            "results": results,
-            "errors": errors
-        }
+        if len(requests) > MAX_BATCH_SIZE:
+            raise HTTPException(status_code=400, detail=f"Batch size cannot exceed {MAX_BATCH_SIZE}")
+        
+        statuses = await master.record_feedback_batch([
+            FeedbackRecord(
+                task_id=request.task_id,
+                source="user",
+                rating=request.rating,
+                comments=request.comments,
+                metadata=request.metadata
+            )
+            for request in requests
+        ])
+        return _batch_response(statuses)
         
     except HTTPException:
         raise
@@ -379,35 +390,23 @@ async def submit_batch_agent_feedback(
     Submit multiple agent feedback records in batch.
     
     Useful for bulk outcome reporting from batch processing or system monitoring.
+    The batch is written in a single transaction and the response carries a
+    per-item status in input order.
     """
     try:
-        if len(requests) > 100:
-            raise HTTPException(status_code=400, detail="Batch size cannot exceed 100")
-        
-        results = []
-        errors = []
-        
-        for i, request in enumerate(requests):
-            try:
-                result = await master.record_agent_feedback(
-                    task_id=request.task_id,
-                    outcome=request.outcome,
-                    metadata=request.metadata
-                )
-                results.append(result)
-            except Exception as e:
-                errors.append({
-                    "index": i,
-                    "task_id": request.task_id,
-                    "error": str(e)
-                })
-        
-        return {
-            "successful": len(results),
-            "failed": len(errors),
-            "results": results,
-            "errors": errors
-        }
+        if len(requests) > MAX_BATCH_SIZE:
+            raise HTTPException(status_code=400, detail=f"Batch size cannot exceed {MAX_BATCH_SIZE}")
+        
+        statuses = await master.record_feedback_batch([
+            FeedbackRecord(
+                task_id=request.task_id,
+                source="agent",
+                outcome=request.outcome,
+                metadata=request.metadata
+            )
+            for request in requests
+        ])
+        return _batch_response(statuses)
         
     except HTTPException:
         raise
@@ -11,6 +11,8 @@ from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 import asyncio
 
+from libs.tracing import traced
+
 logger = logging.getLogger(__name__)
 
 # Pydantic models
@@ -171,6 +173,7 @@ async def store_embedding(
         raise HTTPException(status_code=500, detail=f"Embedding storage failed: {str(e)}")
 
 @router.post("/search", response_model=SearchResponse)
+@traced("vector.search", **{"db.system": "qdrant"})
 async def search_embeddings(
     request: SearchRequest,
     qdrant_client = Depends(get_qdrant_client),
@@ -25,6 +25,10 @@ from fastapi import APIRouter, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
+from libs.context import ContextPacker, Passage
+from libs.metrics import instrument_httpx_client
+from libs.tracing import TracingTransport, traced
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -88,6 +92,10 @@ DAILY_REQUEST_LIMITS = {
 
 request_counts = {source: 0 for source in DAILY_REQUEST_LIMITS.keys()}
 
+# Summary prompt: model and the token budget for packed source content
+SUMMARY_MODEL = os.getenv("RESEARCH_SUMMARY_MODEL", "gpt-4")
+SUMMARY_CONTEXT_TOKENS = int(os.getenv("RESEARCH_SUMMARY_CONTEXT_TOKENS", "1500"))
+
 def check_budget(source: str) -> bool:
     """Check if source is within daily budget"""
     return request_counts.get(source, 0) < DAILY_REQUEST_LIMITS.get(source, 1000)
@@ -211,6 +219,7 @@ async def search_endpoint(request: SearchRequest):
         created_at=datetime.utcnow().isoformat() + "Z"
     )
 
+@traced("research.serper")
 async def search_serper_robust(query: str, max_results: int) -> List[ResearchSource]:
     """Robust Serper search with error handling"""
     try:
@@ -222,7 +231,7 @@ async def search_serper_robust(query: str, max_results: int) -> List[ResearchSou
         headers = {"X-API-KEY": api_key, "Content-Type": "application/json"}
         payload = {"q": query, "num": max_results}
         
-        async with httpx.AsyncClient() as client:
+        async with instrument_httpx_client(httpx.AsyncClient(transport=TracingTransport())) as client:
             response = await client.post(url, headers=headers, json=payload, timeout=15.0)
             response.raise_for_status()
             data = response.json()
@@ -247,6 +256,7 @@ async def search_serper_robust(query: str, max_results: int) -> List[ResearchSou
         logger.error(f"Serper search failed: {e}")
         raise
 
+@traced("research.tavily")
 async def search_tavily_robust(query: str, max_results: int) -> List[ResearchSource]:
     """Robust Tavily search with error handling"""
     try:
@@ -265,7 +275,7 @@ async def search_tavily_robust(query: str, max_results: int) -> List[ResearchSou
             "max_results": max_results
         }
         
-        async with httpx.AsyncClient() as client:
+        async with instrument_httpx_client(httpx.AsyncClient(transport=TracingTransport())) as client:
             response = await client.post(url, headers=headers, json=payload, timeout=20.0)
             response.raise_for_status()
             data = response.json()
@@ -291,6 +301,7 @@ async def search_tavily_robust(query: str, max_results: int) -> List[ResearchSou
         logger.error(f"Tavily search failed: {e}")
         raise
 
+@traced("research.zenrows")
 async def search_zenrows_robust(query: str, max_results: int) -> List[ResearchSource]:
     """Robust ZenRows search with multiple parsing strategies"""
     try:
@@ -352,7 +363,7 @@ async def _zenrows_google_search(query: str, api_key: str, max_results: int) ->
         })
     }
     
-    async with httpx.AsyncClient() as client:
+    async with instrument_httpx_client(httpx.AsyncClient(transport=TracingTransport())) as client:
         response = await client.get(
             "https://api.zenrows.com/v1/",
             params=params,
@@ -483,7 +494,7 @@ async def _zenrows_reddit_scraping(query: str, api_key: str) -> List[ResearchSou
         "wait": "3000"
     }
     
-    async with httpx.AsyncClient() as client:
+    async with instrument_httpx_client(httpx.AsyncClient(transport=TracingTransport())) as client:
         response = await client.get(
             "https://api.zenrows.com/v1/",
             params=params,
@@ -542,7 +553,7 @@ async def _zenrows_news_scraping(query: str, api_key: str) -> List[ResearchSourc
                 "wait": "2000"
             }
             
-            async with httpx.AsyncClient() as client:
+            async with instrument_httpx_client(httpx.AsyncClient(transport=TracingTransport())) as client:
                 response = await client.get(
                     "https://api.zenrows.com/v1/",
                     params=params,
@@ -604,7 +615,7 @@ async def _zenrows_fallback_search(query: str, api_key: str, max_results: int) -
             "wait": "2000"
         }
         
-        async with httpx.AsyncClient() as client:
+        async with instrument_httpx_client(httpx.AsyncClient(transport=TracingTransport())) as client:
             response = await client.get(
                 "https://api.zenrows.com/v1/",
                 params=params,
@@ -634,6 +645,7 @@ async def _zenrows_fallback_search(query: str, api_key: str, max_results: int) -
     
     return sources
 
+@traced("research.apify")
 async def search_apify_robust(query: str, max_results: int) -> List[ResearchSource]:
     """Robust Apify search with enhanced error handling"""
     try:
@@ -685,7 +697,7 @@ async def _apify_google_search(query: str, api_token: str, max_results: int) ->
         "includeUnfilteredResults": False
     }
     
-    async with httpx.AsyncClient() as client:
+    async with instrument_httpx_client(httpx.AsyncClient(transport=TracingTransport())) as client:
         response = await client.post(
             apify_url,
             headers=headers,
@@ -762,7 +774,7 @@ async def _apify_news_scraping(query: str, api_token: str) -> List[ResearchSourc
             "country": "US"
         }
         
-        async with httpx.AsyncClient() as client:
+        async with instrument_httpx_client(httpx.AsyncClient(transport=TracingTransport())) as client:
             response = await client.post(
                 apify_url,
                 headers=headers,
@@ -810,7 +822,7 @@ async def generate_summary_robust(query: str, sources: List[ResearchSource]) ->
             return SummaryResult(
                 text=llm_summary,
                 confidence=0.9,
-                model="gpt-4",
+                model=SUMMARY_MODEL,
                 method="llm",
                 sources_used=len(sources)
             )
@@ -846,14 +858,17 @@ async def _generate_llm_summary(query: str, sources: List[ResearchSource]) -> st
     try:
         import openai
         
-        # Prepare context from sources
-        context_parts = []
-        for i, source in enumerate(sources[:5]):  # Limit to top 5 sources
-            content = source.content or source.snippet
-            if content:
-                context_parts.append(f"Source {i+1} ({source.name}): {content[:300]}")
-        
-        context = "\n\n".join(context_parts)
+        # Pack the most relevant, distinct source content into the token budget
+        packer = ContextPacker(
+            max_tokens=SUMMARY_CONTEXT_TOKENS,
+            model=SUMMARY_MODEL,
+            template="Source {index} ({source}): {text}"
+        )
+        context = packer.pack(
+            [Passage(text=source.content or source.snippet, score=source.relevance_score, source=source.name)
+             for source in sources],
+            query=query
+        ).text
         
         prompt = f"""Based on the following research sources, provide a comprehensive summary for the query: "{query}"
 
@@ -871,7 +886,7 @@ Summary:"""
         client = openai.AsyncOpenAI()
         
         response = await client.chat.completions.create(
-            model="gpt-4",
+            model=SUMMARY_MODEL,
             messages=[
                 {"role": "system", "content": "You are a research analyst providing comprehensive summaries based on multiple sources."},
                 {"role": "user", "content": prompt}
@@ -15,23 +15,89 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from sophia.core.feedback_master import SOPHIAFeedbackMaster, FeedbackSummary
-from sophia.core.performance_monitor import SOPHIAPerformanceMonitor
+from sophia.core.performance_monitor import SOPHIAPerformanceMonitor, ServiceStats
+from sophia.core.metrics_rollup import RollupStore, get_rollup_store
 
 logger = logging.getLogger(__name__)
 
+HOUR = 3600
+DAY = 86400
+
 class SOPHIAReportGenerator:
     """
     Generate comprehensive reports combining feedback and performance data.
     Outputs JSON and text reports for consumption by Grafana and other tools.
+    
+    Reports read hourly/daily performance rollups (SOPHIA_ROLLUP_URL) and the
+    feedback master's daily feedback rollup rather than raw metrics and
+    feedback rows, so they cost the same at any traffic level and cover data
+    recorded before a restart.
     """
     
-    def __init__(self):
-        """Initialize report generator."""
+    def __init__(
+        self,
+        rollup_store: Optional[RollupStore] = None,
+        performance_monitor: Optional[SOPHIAPerformanceMonitor] = None
+    ):
+        """
+        Initialize report generator.
+        
+        Args:
+            rollup_store: Store to report from (default: the process-wide store
+                the agent's performance monitor feeds)
+            performance_monitor: Live monitor whose recent in-memory metrics add
+                error details to service reports
+        """
         self.feedback_master = SOPHIAFeedbackMaster()
-        self.performance_monitor = SOPHIAPerformanceMonitor()
+        self.rollups = rollup_store or get_rollup_store()
+        self.performance_monitor = performance_monitor or SOPHIAPerformanceMonitor()
         
         logger.info("Initialized SOPHIAReportGenerator")
     
+    async def refresh_rollups(self):
+        """Flush pending performance metrics so reports include them."""
+        await self.rollups.flush()
+    
+    async def _window_data(self, start: float, end: float, period: str):
+        """Performance summary, feedback summary and health status for a time window."""
+        performance_summary, feedback_totals = await asyncio.gather(
+            self.rollups.performance_summary(start, end),
+            self.feedback_master.feedback_totals(start, end)
+        )
+        health_status = SOPHIAPerformanceMonitor.health_from_stats(self._service_stats(performance_summary))
+        return performance_summary, self._feedback_summary(feedback_totals, period), health_status
+    
+    def _service_stats(self, performance_summary: Dict[str, Any]) -> Dict[str, ServiceStats]:
+        """Per-service statistics from a rollup performance summary."""
+        return {
+            service: ServiceStats(
+                service=service,
+                total_calls=stats["calls"],
+                successful_calls=stats["successful"],
+                failed_calls=stats["failed"],
+                average_duration_ms=stats["average_duration_ms"],
+                total_tokens=stats["total_tokens"],
+                error_rate=stats["error_rate"],
+                uptime_percentage=100 - stats["error_rate"]
+            )
+            for service, stats in performance_summary["services"].items()
+        }
+    
+    def _feedback_summary(self, totals: Dict[str, Any], period: str) -> FeedbackSummary:
+        """Feedback summary from rollup totals."""
+        issue_counts = totals["issue_counts"]
+        common_issues = sorted(issue_counts, key=lambda issue: issue_counts[issue], reverse=True)[:5]
+        return FeedbackSummary(
+            total_feedback=totals["total_feedback"],
+            average_rating=totals["average_rating"],
+            rating_distribution=totals["rating_distribution"],
+            common_issues=common_issues,
+            improvement_suggestions=self.feedback_master._generate_improvement_suggestions(
+                totals["average_rating"], totals["rating_distribution"], common_issues
+            ),
+            time_period=period
+        )
+    
     async def generate_daily_report(self, date: Optional[datetime] = None) -> Dict[str, Any]:
         """
         Generate comprehensive daily report.
@@ -46,14 +112,12 @@ class SOPHIAReportGenerator:
             date = datetime.now(timezone.utc) - timedelta(days=1)
         
         try:
-            # Get feedback summary for the day
-            feedback_summary = await self.feedback_master.aggregate_feedback(days=1)
+            await self.refresh_rollups()
             
-            # Get performance summary for the day
-            performance_summary = self.performance_monitor.get_performance_summary(hours=24)
-            
-            # Get service health status
-            health_status = self.performance_monitor.get_health_status()
+            day_start = datetime(date.year, date.month, date.day, tzinfo=timezone.utc).timestamp()
+            performance_summary, feedback_summary, health_status = await self._window_data(
+                day_start, day_start + DAY - 1, date.strftime("%Y-%m-%d")
+            )
             
             # Generate insights and recommendations
             insights = self._generate_insights(feedback_summary, performance_summary, health_status)
@@ -93,14 +157,12 @@ class SOPHIAReportGenerator:
     async def generate_weekly_report(self) -> Dict[str, Any]:
         """Generate comprehensive weekly report."""
         try:
-            # Get feedback summary for the week
-            feedback_summary = await self.feedback_master.aggregate_feedback(days=7)
-            
-            # Get performance summary for the week
-            performance_summary = self.performance_monitor.get_performance_summary(hours=168)  # 7 days
+            await self.refresh_rollups()
             
-            # Get service health status
-            health_status = self.performance_monitor.get_health_status()
+            now = datetime.now(timezone.utc).timestamp()
+            performance_summary, feedback_summary, health_status = await self._window_data(
+                now - 7 * DAY, now, "Last 7 days"
+            )
             
             # Get trends over the week
             trends = await self._calculate_weekly_trends()
@@ -150,30 +212,33 @@ class SOPHIAReportGenerator:
             Service-specific report
         """
         try:
-            # Get service performance stats
-            service_stats = self.performance_monitor.get_service_stats(service)
-            
-            # Get service metrics
-            service_metrics = self.performance_monitor.get_metrics(service=service, limit=1000)
+            await self.refresh_rollups()
+            
+            now = datetime.now(timezone.utc).timestamp()
+            start = now - days * DAY
+            performance_summary, buckets, error_counts = await asyncio.gather(
+                self.rollups.performance_summary(start, now, service=service),
+                self.rollups.perf_buckets(start, now, service=service),
+                self.rollups.error_counts(start, now, service=service)
+            )
             
             # Get feedback for tasks related to this service (if available)
             # This would require task-service mapping in production
             
-            if not service_stats:
+            if not performance_summary["total_calls"]:
                 return {
                     "service": service,
                     "status": "no_data",
                     "message": f"No performance data available for service {service}"
                 }
             
-            stats = service_stats[service]
+            stats = self._service_stats(performance_summary)[service]
             
-            # Calculate service-specific insights
-            recent_metrics = [m for m in service_metrics if 
-                            (datetime.now(timezone.utc) - m.timestamp).days <= days]
-            
-            error_trends = self._calculate_error_trends(recent_metrics)
-            performance_trends = self._calculate_performance_trends(recent_metrics)
+            # Individual error details are only kept in memory for recent calls
+            recent_metrics = [
+                m for m in self.performance_monitor.get_metrics(service=service, limit=1000)
+                if (datetime.now(timezone.utc) - m.timestamp).days <= days
+            ]
             
             report = {
                 "service": service,
@@ -185,17 +250,18 @@ class SOPHIAReportGenerator:
                     "failed_calls": stats.failed_calls,
                     "success_rate": ((stats.successful_calls / stats.total_calls) * 100) if stats.total_calls > 0 else 0,
                     "average_duration_ms": stats.average_duration_ms,
+                    "p95_duration_ms": performance_summary["services"][service]["p95_duration_ms"],
                     "total_tokens": stats.total_tokens,
                     "error_rate": stats.error_rate,
                     "uptime_percentage": stats.uptime_percentage,
-                    "last_call": stats.last_call.isoformat() if stats.last_call else None
+                    "last_call": datetime.fromtimestamp(buckets[-1]["bucket_start"], timezone.utc).isoformat() if buckets else None
                 },
                 "trends": {
-                    "error_trend": error_trends,
-                    "performance_trend": performance_trends
+                    "error_trend": self._calculate_error_trends(buckets),
+                    "performance_trend": self._calculate_performance_trends(buckets)
                 },
                 "recent_errors": self._get_recent_errors(recent_metrics),
-                "recommendations": self._generate_service_recommendations(service, stats, recent_metrics)
+                "recommendations": self._generate_service_recommendations(service, stats, error_counts.get(service, {}))
             }
             
             logger.info(f"Generated service report for {service}")
@@ -213,14 +279,17 @@ class SOPHIAReportGenerator:
             Grafana-compatible metrics
         """
         try:
-            # Get current performance summary
-            performance_summary = self.performance_monitor.get_performance_summary(hours=1)
-            
-            # Get feedback summary
-            feedback_summary = await self.feedback_master.aggregate_feedback(days=1)
+            await self.refresh_rollups()
             
-            # Get health status
-            health_status = self.performance_monitor.get_health_status()
+            now = datetime.now(timezone.utc).timestamp()
+            performance_summary, day_summary, feedback_totals = await asyncio.gather(
+                self.rollups.performance_summary(now - HOUR, now),
+                self.rollups.performance_summary(now - DAY, now),
+                self.feedback_master.feedback_totals(now - DAY, now)
+            )
+            feedback_summary = self._feedback_summary(feedback_totals, "Last 1 days")
+            service_stats = self._service_stats(day_summary)
+            health_status = SOPHIAPerformanceMonitor.health_from_stats(service_stats)
             
             # Format for Grafana
             grafana_metrics = {
@@ -244,6 +313,12 @@ class SOPHIAReportGenerator:
                         "type": "gauge",
                         "help": "Average response time in milliseconds"
                     },
+                    {
+                        "name": "sophia_p95_response_time",
+                        "value": performance_summary.get("p95_duration_ms") or 0,
+                        "type": "gauge",
+                        "help": "95th percentile response time in milliseconds (histogram bucket bound)"
+                    },
                     {
                         "name": "sophia_total_feedback",
                         "value": feedback_summary.total_feedback,
@@ -267,7 +342,7 @@ class SOPHIAReportGenerator:
             }
             
             # Add per-service metrics
-            for service, stats in self.performance_monitor.get_service_stats().items():
+            for service, stats in service_stats.items():
                 grafana_metrics["service_metrics"].extend([
                     {
                         "name": f"sophia_service_calls",
@@ -370,7 +445,7 @@ class SOPHIAReportGenerator:
         self,
         service: str,
         stats: Any,
-        recent_metrics: List[Any]
+        error_types: Dict[str, int]
     ) -> List[str]:
         """Generate service-specific recommendations."""
         recommendations = []
@@ -385,11 +460,6 @@ class SOPHIAReportGenerator:
             recommendations.append(f"Service {service} appears to be unused - consider deprecation")
         
         # Analyze error patterns
-        error_types = {}
-        for metric in recent_metrics:
-            if not metric.success and metric.error_type:
-                error_types[metric.error_type] = error_types.get(metric.error_type, 0) + 1
-        
         if error_types:
             most_common_error = max(error_types.keys(), key=lambda x: error_types[x])
             recommendations.append(f"Address common {most_common_error} errors in {service}")
@@ -397,60 +467,96 @@ class SOPHIAReportGenerator:
         return recommendations
     
     async def _calculate_weekly_trends(self) -> Dict[str, Any]:
-        """Calculate trends over the past week."""
-        # This is a simplified implementation
-        # In production, you'd want more sophisticated trend analysis
-        
-        current_week = await self.feedback_master.aggregate_feedback(days=7)
-        previous_week = await self.feedback_master.aggregate_feedback(days=14)  # Last 14 days
+        """Calculate week-over-week trends from daily rollups."""
+        # Day-aligned windows so the two weeks never share a bucket
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+        now = datetime.now(timezone.utc).timestamp()
+        current_start, previous_start = today - 6 * DAY, today - 13 * DAY
+        
+        current_week, previous_week, current_perf, previous_perf = await asyncio.gather(
+            self.feedback_master.feedback_totals(current_start, now),
+            self.feedback_master.feedback_totals(previous_start, current_start - 1),
+            self.rollups.performance_summary(current_start, now),
+            self.rollups.performance_summary(previous_start, current_start - 1)
+        )
         
         # Calculate changes
-        rating_change = current_week.average_rating - (previous_week.average_rating if previous_week.total_feedback > 0 else current_week.average_rating)
-        feedback_change = current_week.total_feedback - previous_week.total_feedback
+        rating_change = current_week["average_rating"] - (
+            previous_week["average_rating"] if previous_week["total_feedback"] > 0 else current_week["average_rating"]
+        )
+        feedback_change = current_week["total_feedback"] - previous_week["total_feedback"]
         
-        return {
+        trends = {
             "rating_trend": "improving" if rating_change > 0.1 else "declining" if rating_change < -0.1 else "stable",
             "rating_change": rating_change,
             "feedback_volume_trend": "increasing" if feedback_change > 0 else "decreasing" if feedback_change < 0 else "stable",
             "feedback_volume_change": feedback_change
         }
+        
+        if current_perf["total_calls"] and previous_perf["total_calls"]:
+            trends["error_trend"] = self._compare_rates(
+                100 - previous_perf["success_rate"], 100 - current_perf["success_rate"], "increasing", "decreasing"
+            )
+            trends["performance_trend"] = self._compare_rates(
+                previous_perf["average_duration_ms"], current_perf["average_duration_ms"], "degrading", "improving"
+            )
+        
+        return trends
     
-    def _calculate_error_trends(self, metrics: List[Any]) -> str:
-        """Calculate error trend from metrics."""
-        if len(metrics) < 10:
+    @staticmethod
+    def _compare_rates(before: float, after: float, up: str, down: str) -> str:
+        if after > before * 1.2:
+            return up
+        elif after < before * 0.8:
+            return down
+        else:
+            return "stable"
+    
+    @staticmethod
+    def _split_buckets(buckets: List[Dict[str, Any]]):
+        """Merge rows per bucket and split the series into an earlier and a later half."""
+        per_bucket: Dict[int, Dict[str, float]] = {}
+        for row in buckets:
+            totals = per_bucket.setdefault(row["bucket_start"], {"calls": 0, "failures": 0, "duration_sum": 0.0})
+            totals["calls"] += row["calls"]
+            totals["failures"] += row["failures"]
+            totals["duration_sum"] += row["duration_sum"]
+        
+        series = [per_bucket[start] for start in sorted(per_bucket)]
+        if len(series) < 2 or sum(b["calls"] for b in series) < 10:
+            return None
+        
+        mid_point = len(series) // 2
+        halves = []
+        for half in (series[:mid_point], series[mid_point:]):
+            halves.append({key: sum(b[key] for b in half) for key in ("calls", "failures", "duration_sum")})
+        return halves
+    
+    def _calculate_error_trends(self, buckets: List[Dict[str, Any]]) -> str:
+        """Calculate error trend from rollup buckets."""
+        halves = self._split_buckets(buckets)
+        if halves is None:
             return "insufficient_data"
         
         # Simple trend calculation - compare first and second half
-        mid_point = len(metrics) // 2
-        first_half_errors = sum(1 for m in metrics[:mid_point] if not m.success)
-        second_half_errors = sum(1 for m in metrics[mid_point:] if not m.success)
-        
-        first_half_rate = first_half_errors / mid_point if mid_point > 0 else 0
-        second_half_rate = second_half_errors / (len(metrics) - mid_point) if (len(metrics) - mid_point) > 0 else 0
+        first, second = halves
+        first_half_rate = first["failures"] / first["calls"] if first["calls"] else 0
+        second_half_rate = second["failures"] / second["calls"] if second["calls"] else 0
         
-        if second_half_rate > first_half_rate * 1.2:
-            return "increasing"
-        elif second_half_rate < first_half_rate * 0.8:
-            return "decreasing"
-        else:
-            return "stable"
+        return self._compare_rates(first_half_rate, second_half_rate, "increasing", "decreasing")
     
-    def _calculate_performance_trends(self, metrics: List[Any]) -> str:
-        """Calculate performance trend from metrics."""
-        if len(metrics) < 10:
+    def _calculate_performance_trends(self, buckets: List[Dict[str, Any]]) -> str:
+        """Calculate performance trend from rollup buckets."""
+        halves = self._split_buckets(buckets)
+        if halves is None:
             return "insufficient_data"
         
         # Simple trend calculation - compare first and second half
-        mid_point = len(metrics) // 2
-        first_half_avg = sum(m.duration_ms for m in metrics[:mid_point]) / mid_point
-        second_half_avg = sum(m.duration_ms for m in metrics[mid_point:]) / (len(metrics) - mid_point)
-        
-        if second_half_avg > first_half_avg * 1.2:
-            return "degrading"
-        elif second_half_avg < first_half_avg * 0.8:
-            return "improving"
-        else:
-            return "stable"
+        first, second = halves
+        first_half_avg = first["duration_sum"] / first["calls"] if first["calls"] else 0
+        second_half_avg = second["duration_sum"] / second["calls"] if second["calls"] else 0
+        
+        return self._compare_rates(first_half_avg, second_half_avg, "degrading", "improving")
     
     def _get_recent_errors(self, metrics: List[Any], limit: int = 10) -> List[Dict[str, Any]]:
         """Get recent error details."""
@@ -9,11 +9,13 @@ import json
 import os
 import sys
 import time
+import statistics
 import psutil
 import docker
+from collections import deque
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union, Awaitable, Deque
 from dataclasses import dataclass, asdict
 from enum import Enum
 
@@ -56,20 +58,96 @@ class SystemMetrics:
     timestamp: str
 
 
+@dataclass
+class ProbeSample:
+    """One probe result kept in the latency history"""
+    timestamp: float
+    status: str
+    response_time_ms: Optional[float] = None
+
+
+class ProbeHistory:
+    """Rolling per-component probe history for spotting degradation trends"""
+    
+    def __init__(self, max_samples: int = 120):
+        self.max_samples = max_samples
+        self._samples: Dict[str, Deque[ProbeSample]] = {}
+    
+    def record(self, component: ComponentHealth) -> None:
+        samples = self._samples.setdefault(component.name, deque(maxlen=self.max_samples))
+        samples.append(ProbeSample(time.time(), component.status.value, component.response_time_ms))
+    
+    def samples(self, name: str) -> List[ProbeSample]:
+        return list(self._samples.get(name, ()))
+    
+    def summary(self, name: str) -> Dict[str, Any]:
+        """Latency percentiles, availability and trend for one component"""
+        samples = self.samples(name)
+        latencies = [s.response_time_ms for s in samples if s.response_time_ms is not None]
+        result: Dict[str, Any] = {
+            "samples": len(samples),
+            "availability": (
+                sum(1 for s in samples if s.status == HealthStatus.HEALTHY.value) / len(samples) if samples else None
+            ),
+        }
+        if latencies:
+            ordered = sorted(latencies)
+            result.update({
+                "last_ms": latencies[-1],
+                "p50_ms": ordered[len(ordered) // 2],
+                "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                "trend": self._trend(latencies),
+            })
+        return result
+    
+    @staticmethod
+    def _trend(latencies: List[float]) -> str:
+        """Compare the median of the newer half of the window with the older half"""
+        if len(latencies) < 6:
+            return "insufficient_data"
+        half = len(latencies) // 2
+        older, newer = statistics.median(latencies[:half]), statistics.median(latencies[half:])
+        if older > 0 and newer > older * 1.5:
+            return "degrading"
+        if newer < older / 1.5:
+            return "improving"
+        return "stable"
+    
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {name: self.summary(name) for name in self._samples}
+
+
 class SophiaIntelMonitor:
     """Comprehensive monitoring system for Sophia Intel platform"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        probe_timeout: float = 5.0,
+        collection_interval: float = 30.0,
+        history_size: int = 120,
+        process_rescan_interval: float = 300.0
+    ):
         self.docker_client = None
         self.session = None
         self.monitoring_results = {}
         
+        # Background collection state; health endpoints read the cached snapshot
+        self.probe_timeout = probe_timeout
+        self.collection_interval = collection_interval
+        self.process_rescan_interval = process_rescan_interval
+        self.history = ProbeHistory(history_size)
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self.snapshot_time: Optional[float] = None
+        self._collector_task: Optional[asyncio.Task] = None
+        self._mcp_pids: Dict[int, Dict[str, Any]] = {}
+        self._mcp_scan_time = 0.0
+        
         # Component endpoints
         self.endpoints = {
             "airbyte_server": "http://localhost:8000/api/v1/health",
             "airbyte_webapp": "http://localhost:8080",
             "minio": "http://localhost:9000/minio/health/live",
-            "qdrant": os.getenv('QDRANT_URL', 'https://a2a5dc3b-bf37-4907-9398-d49f5c6813ed.us-west-2-0.aws.cloud.qdrant.io'),
+            # qdrant has its own probe (check_qdrant_vector_db)
             "neon_postgres": None,  # Will be checked via connection
             "redis": None  # Will be checked via connection
         }
@@ -88,13 +166,16 @@ class SophiaIntelMonitor:
         """Async context manager entry"""
         self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
         try:
-            self.docker_client = docker.from_env()
+            self.docker_client = await asyncio.to_thread(docker.from_env)
         except Exception as e:
             logger.warning(f"Docker client initialization failed: {e}")
+        # Prime the CPU counter so later non-blocking samples cover the time since now
+        psutil.cpu_percent(interval=None)
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
+        await self.stop()
         if self.session:
             await self.session.close()
         if self.docker_client:
@@ -211,111 +292,125 @@ class SophiaIntelMonitor:
         
         return container_health
     
+    async def check_docker_containers_async(self) -> List[ComponentHealth]:
+        """Check Docker container health without blocking the event loop"""
+        return await asyncio.to_thread(self.check_docker_containers)
+    
     async def check_database_connections(self) -> List[ComponentHealth]:
         """Check database connections"""
-        db_health = []
+        checks = [self._check_neon_postgres()]
+        
+        # Check Redis (if configured)
+        if os.getenv('REDIS_HOST'):
+            checks.append(self._check_redis())
         
-        # Check Neon PostgreSQL
+        return list(await asyncio.gather(*checks))
+    
+    async def _check_neon_postgres(self) -> ComponentHealth:
+        """Check Neon PostgreSQL"""
         try:
             import asyncpg
-            
-            neon_host = os.getenv('NEON_HOST', 'ep-rough-voice-a5xp7uy8.us-east-2.aws.neon.tech')
-            neon_database = os.getenv('NEON_DATABASE', 'neondb')
-            neon_username = os.getenv('NEON_USERNAME', 'neondb_owner')
-            neon_password = os.getenv('NEON_PASSWORD', 'npg_xxxxxxxxx')
-            
-            start_time = time.time()
+        except ImportError:
+            return ComponentHealth(
+                name="neon_postgres",
+                status=HealthStatus.UNKNOWN,
+                last_check=datetime.utcnow().isoformat(),
+                error_message="asyncpg not available"
+            )
+        
+        neon_host = os.getenv('NEON_HOST', 'ep-rough-voice-a5xp7uy8.us-east-2.aws.neon.tech')
+        neon_database = os.getenv('NEON_DATABASE', 'neondb')
+        neon_username = os.getenv('NEON_USERNAME', 'neondb_owner')
+        neon_password = os.getenv('NEON_PASSWORD', 'npg_xxxxxxxxx')
+        
+        start_time = time.time()
+        
+        try:
+            conn = await asyncpg.connect(
+                host=neon_host,
+                database=neon_database,
+                user=neon_username,
+                password=neon_password,
+                ssl='require',
+                timeout=self.probe_timeout
+            )
             
             try:
-                conn = await asyncpg.connect(
-                    host=neon_host,
-                    database=neon_database,
-                    user=neon_username,
-                    password=neon_password,
-                    ssl='require'
-                )
-                
                 # Simple query to test connection
-                result = await conn.fetchval('SELECT 1')
+                await conn.fetchval('SELECT 1')
+            finally:
                 await conn.close()
-                
-                response_time = (time.time() - start_time) * 1000
-                
-                db_health.append(ComponentHealth(
-                    name="neon_postgres",
-                    status=HealthStatus.HEALTHY,
-                    response_time_ms=response_time,
-                    last_check=datetime.utcnow().isoformat(),
-                    metadata={"host": neon_host, "database": neon_database}
-                ))
-                
-            except Exception as e:
-                db_health.append(ComponentHealth(
-                    name="neon_postgres",
-                    status=HealthStatus.UNHEALTHY,
-                    last_check=datetime.utcnow().isoformat(),
-                    error_message=str(e),
-                    metadata={"host": neon_host, "database": neon_database}
-                ))
-                
-        except ImportError:
-            db_health.append(ComponentHealth(
+            
+            response_time = (time.time() - start_time) * 1000
+            
+            return ComponentHealth(
                 name="neon_postgres",
+                status=HealthStatus.HEALTHY,
+                response_time_ms=response_time,
+                last_check=datetime.utcnow().isoformat(),
+                metadata={"host": neon_host, "database": neon_database}
+            )
+            
+        except Exception as e:
+            return ComponentHealth(
+                name="neon_postgres",
+                status=HealthStatus.UNHEALTHY,
+                last_check=datetime.utcnow().isoformat(),
+                error_message=str(e),
+                metadata={"host": neon_host, "database": neon_database}
+            )
+    
+    async def _check_redis(self) -> ComponentHealth:
+        """Check Redis"""
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            return ComponentHealth(
+                name="redis",
                 status=HealthStatus.UNKNOWN,
                 last_check=datetime.utcnow().isoformat(),
-                error_message="asyncpg not available"
-            ))
+                error_message="redis not available"
+            )
         
-        # Check Redis (if configured)
         redis_host = os.getenv('REDIS_HOST')
-        if redis_host:
+        redis_port = int(os.getenv('REDIS_PORT', '6379'))
+        redis_password = os.getenv('REDIS_PASSWORD')
+        
+        start_time = time.time()
+        
+        try:
+            r = redis.Redis(
+                host=redis_host,
+                port=redis_port,
+                password=redis_password,
+                ssl=True if 'upstash' in redis_host else False,
+                socket_connect_timeout=self.probe_timeout,
+                socket_timeout=self.probe_timeout
+            )
+            
             try:
-                import redis.asyncio as redis
-                
-                redis_port = int(os.getenv('REDIS_PORT', '6379'))
-                redis_password = os.getenv('REDIS_PASSWORD')
-                
-                start_time = time.time()
-                
-                try:
-                    r = redis.Redis(
-                        host=redis_host,
-                        port=redis_port,
-                        password=redis_password,
-                        ssl=True if 'upstash' in redis_host else False
-                    )
-                    
-                    await r.ping()
-                    await r.close()
-                    
-                    response_time = (time.time() - start_time) * 1000
-                    
-                    db_health.append(ComponentHealth(
-                        name="redis",
-                        status=HealthStatus.HEALTHY,
-                        response_time_ms=response_time,
-                        last_check=datetime.utcnow().isoformat(),
-                        metadata={"host": redis_host, "port": redis_port}
-                    ))
-                    
-                except Exception as e:
-                    db_health.append(ComponentHealth(
-                        name="redis",
-                        status=HealthStatus.UNHEALTHY,
-                        last_check=datetime.utcnow().isoformat(),
-                        error_message=str(e),
-                        metadata={"host": redis_host, "port": redis_port}
-                    ))
-                    
-            except ImportError:
-                db_health.append(ComponentHealth(
-                    name="redis",
-                    status=HealthStatus.UNKNOWN,
-                    last_check=datetime.utcnow().isoformat(),
-                    error_message="redis not available"
-                ))
-        
-        return db_health
+                await r.ping()
+            finally:
+                await r.close()
+            
+            response_time = (time.time() - start_time) * 1000
+            
+            return ComponentHealth(
+                name="redis",
+                status=HealthStatus.HEALTHY,
+                response_time_ms=response_time,
+                last_check=datetime.utcnow().isoformat(),
+                metadata={"host": redis_host, "port": redis_port}
+            )
+            
+        except Exception as e:
+            return ComponentHealth(
+                name="redis",
+                status=HealthStatus.UNHEALTHY,
+                last_check=datetime.utcnow().isoformat(),
+                error_message=str(e),
+                metadata={"host": redis_host, "port": redis_port}
+            )
     
     async def check_qdrant_vector_db(self) -> ComponentHealth:
         """Check Qdrant vector database"""
@@ -377,8 +472,8 @@ class SophiaIntelMonitor:
     def get_system_metrics(self) -> SystemMetrics:
         """Get system-level metrics"""
         try:
-            # CPU usage
-            cpu_percent = psutil.cpu_percent(interval=1)
+            # CPU usage since the previous call (non-blocking)
+            cpu_percent = psutil.cpu_percent(interval=None)
             
             # Memory usage
             memory = psutil.virtual_memory()
@@ -426,22 +521,52 @@ class SophiaIntelMonitor:
                 timestamp=datetime.utcnow().isoformat()
             )
     
-    async def check_mcp_servers(self) -> List[ComponentHealth]:
-        """Check MCP server health"""
-        mcp_health = []
-        
-        # Check if MCP server processes are running
-        mcp_processes = []
-        for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
+    def _scan_mcp_processes(self) -> Dict[int, Dict[str, Any]]:
+        """Walk the process table for MCP servers (expensive; done rarely)"""
+        found = {}
+        for proc in psutil.process_iter(['pid', 'name', 'cmdline', 'create_time']):
             try:
                 cmdline = ' '.join(proc.info['cmdline'] or [])
                 if 'mcp_server' in cmdline or 'code_mcp' in cmdline:
-                    mcp_processes.append(proc.info)
+                    found[proc.info['pid']] = {
+                        "pid": proc.info['pid'],
+                        "name": proc.info['name'],
+                        "cmdline": proc.info['cmdline'],
+                        "create_time": proc.info['create_time']
+                    }
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return found
+    
+    def _find_mcp_processes(self) -> List[Dict[str, Any]]:
+        """Known MCP server processes, rescanning only when one exits or the cache is stale"""
+        alive = {}
+        for pid, info in self._mcp_pids.items():
+            try:
+                if psutil.Process(pid).create_time() == info["create_time"]:
+                    alive[pid] = info
             except (psutil.NoSuchProcess, psutil.AccessDenied):
                 continue
         
+        # With nothing known yet, look for newly started servers more often
+        rescan_after = self.process_rescan_interval if alive else min(60.0, self.process_rescan_interval)
+        stale = time.time() - self._mcp_scan_time > rescan_after
+        if stale or len(alive) < len(self._mcp_pids):
+            alive = self._scan_mcp_processes()
+            self._mcp_scan_time = time.time()
+        
+        self._mcp_pids = alive
+        return [
+            {"pid": info["pid"], "name": info["name"], "cmdline": info["cmdline"]}
+            for info in alive.values()
+        ]
+    
+    async def check_mcp_servers(self) -> List[ComponentHealth]:
+        """Check MCP server health"""
+        mcp_processes = await asyncio.to_thread(self._find_mcp_processes)
+        
         if mcp_processes:
-            mcp_health.append(ComponentHealth(
+            return [ComponentHealth(
                 name="mcp_servers",
                 status=HealthStatus.HEALTHY,
                 last_check=datetime.utcnow().isoformat(),
@@ -449,24 +574,60 @@ class SophiaIntelMonitor:
                     "process_count": len(mcp_processes),
                     "processes": mcp_processes
                 }
-            ))
-        else:
-            mcp_health.append(ComponentHealth(
-                name="mcp_servers",
-                status=HealthStatus.UNKNOWN,
-                last_check=datetime.utcnow().isoformat(),
-                error_message="No MCP server processes found"
-            ))
+            )]
         
-        return mcp_health
+        return [ComponentHealth(
+            name="mcp_servers",
+            status=HealthStatus.UNKNOWN,
+            last_check=datetime.utcnow().isoformat(),
+            error_message="No MCP server processes found"
+        )]
+    
+    async def _run_probe(self, name: str, probe: Awaitable) -> List[ComponentHealth]:
+        """Run one probe under the per-probe timeout; always returns component results"""
+        start_time = time.time()
+        try:
+            result = await asyncio.wait_for(probe, timeout=self.probe_timeout)
+        except asyncio.TimeoutError:
+            result = ComponentHealth(
+                name=name,
+                status=HealthStatus.UNHEALTHY,
+                response_time_ms=(time.time() - start_time) * 1000,
+                last_check=datetime.utcnow().isoformat(),
+                error_message=f"Probe timed out after {self.probe_timeout:.1f}s"
+            )
+        except Exception as e:
+            result = ComponentHealth(
+                name=name,
+                status=HealthStatus.UNHEALTHY,
+                last_check=datetime.utcnow().isoformat(),
+                error_message=f"Probe failed: {e}"
+            )
+        return result if isinstance(result, list) else [result]
     
     async def run_comprehensive_health_check(self) -> Dict[str, Any]:
-        """Run comprehensive health check of all components"""
+        """Run comprehensive health check of all components, probing everything concurrently"""
         logger.info("🔍 Starting comprehensive health check...")
         
+        probes = [
+            self._run_probe(name, self.check_http_endpoint(name, url))
+            for name, url in self.endpoints.items()
+            if url
+        ]
+        probes += [
+            self._run_probe("docker_containers", self.check_docker_containers_async()),
+            self._run_probe("neon_postgres", self._check_neon_postgres()),
+            self._run_probe("qdrant", self.check_qdrant_vector_db()),
+            *([self._run_probe("redis", self._check_redis())] if os.getenv('REDIS_HOST') else []),
+            self._run_probe("mcp_servers", self.check_mcp_servers()),
+            asyncio.to_thread(self.get_system_metrics),
+        ]
+        
+        *component_lists, system_metrics = await asyncio.gather(*probes)
+        
         health_results = {
             "timestamp": datetime.utcnow().isoformat(),
-            "system_metrics": asdict(self.get_system_metrics()),
+            "system_metrics": asdict(system_metrics),
             "components": {},
             "summary": {
                 "total_components": 0,
@@ -477,32 +638,10 @@ class SophiaIntelMonitor:
             }
         }
         
-        all_components = []
-        
-        # Check HTTP endpoints
-        for name, url in self.endpoints.items():
-            if url:
-                component = await self.check_http_endpoint(name, url)
-                all_components.append(component)
-        
-        # Check Docker containers
-        container_health = self.check_docker_containers()
-        all_components.extend(container_health)
-        
-        # Check databases
-        db_health = await self.check_database_connections()
-        all_components.extend(db_health)
-        
-        # Check Qdrant
-        qdrant_health = await self.check_qdrant_vector_db()
-        all_components.append(qdrant_health)
-        
-        # Check MCP servers
-        mcp_health = await self.check_mcp_servers()
-        all_components.extend(mcp_health)
-        
         # Process results
-        for component in all_components:
+        for component in (c for components in component_lists for c in components):
+            self.history.record(component)
+            
             # Convert enum to string for JSON serialization
             component_dict = asdict(component)
             component_dict['status'] = component.status.value
@@ -528,12 +667,57 @@ class SophiaIntelMonitor:
         else:
             health_results["summary"]["overall_health_score"] = 0
         
+        health_results["latency_history"] = self.history.to_dict()
+        
+        self.snapshot = health_results
+        self.snapshot_time = time.time()
+        
         logger.info("✅ Health check completed")
         return health_results
     
+    # Background collection
+    
+    async def _collect_loop(self):
+        """Refresh the snapshot every collection_interval seconds"""
+        while True:
+            try:
+                await self.run_comprehensive_health_check()
+            except Exception as e:
+                logger.error(f"Health collection failed: {e}")
+            await asyncio.sleep(self.collection_interval)
+    
+    def start(self) -> asyncio.Task:
+        """Start the background health collector (idempotent)"""
+        if self._collector_task is None or self._collector_task.done():
+            self._collector_task = asyncio.create_task(self._collect_loop())
+        return self._collector_task
+    
+    async def stop(self):
+        """Stop the background health collector"""
+        if self._collector_task is not None:
+            self._collector_task.cancel()
+            try:
+                await self._collector_task
+            except asyncio.CancelledError:
+                pass
+            self._collector_task = None
+    
+    async def get_snapshot(self, max_age: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Latest health snapshot for health endpoints.
+        
+        Returns the cached snapshot immediately; a fresh check only runs when
+        there is no snapshot yet or it is older than max_age seconds.
+        """
+        age = time.time() - self.snapshot_time if self.snapshot_time else None
+        if self.snapshot is None or (max_age is not None and age > max_age):
+            await self.run_comprehensive_health_check()
+            age = 0.0
+        return {**self.snapshot, "snapshot_age_seconds": age}
+    
     async def generate_monitoring_report(self) -> str:
-        """Generate comprehensive monitoring report"""
-        health_data = await self.run_comprehensive_health_check()
+        """Generate comprehensive monitoring report from the latest snapshot"""
+        health_data = await self.get_snapshot()
         
         report = f"""# Sophia Intel Platform Health Report
 
@@ -593,6 +777,22 @@ class SophiaIntelMonitor:
             
             report += "\n"
         
+        # Latency trends from the probe history
+        trends = {
+            name: stats for name, stats in health_data.get('latency_history', {}).items()
+            if 'p50_ms' in stats
+        }
+        if trends:
+            report += "## ⏱️ Probe Latency Trends\n\n"
+            report += "| Component | Last | p50 | p95 | Availability | Trend |\n"
+            report += "|-----------|------|-----|-----|--------------|-------|\n"
+            for name, stats in sorted(trends.items()):
+                report += (
+                    f"| {name} | {stats['last_ms']:.0f}ms | {stats['p50_ms']:.0f}ms | {stats['p95_ms']:.0f}ms "
+                    f"| {stats['availability'] * 100:.0f}% | {stats['trend']} |\n"
+                )
+            report += "\n"
+        
         # Add recommendations
         report += """## 🎯 Recommendations
 
@@ -640,11 +840,47 @@ Full monitoring data saved to: `monitoring_results_{datetime.utcnow().strftime('
         return report
 
 
+def create_health_app(monitor: Optional[SophiaIntelMonitor] = None):
+    """
+    FastAPI app serving the collector's cached snapshot.
+
+    GET /health returns the latest snapshot without probing (pass max_age to
+    force a refresh of an older one); GET /health/history returns per-component
+    latency history.
+    """
+    from contextlib import asynccontextmanager
+    from fastapi import FastAPI
+
+    monitor = monitor or SophiaIntelMonitor()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        async with monitor:
+            monitor.start()
+            yield
+
+    app = FastAPI(title="Sophia Intel Health", lifespan=lifespan)
+    app.state.monitor = monitor
+
+    @app.get("/health")
+    async def health(max_age: Optional[float] = None) -> Dict[str, Any]:
+        return await monitor.get_snapshot(max_age=max_age)
+
+    @app.get("/health/history")
+    async def health_history() -> Dict[str, Dict[str, Any]]:
+        return monitor.history.to_dict()
+
+    return app
+
+
 async def main():
     """Main monitoring execution"""
     logger.info("🚀 Sophia Intel Platform Monitor")
     
     async with SophiaIntelMonitor() as monitor:
+        # Give the CPU counter primed on entry a real interval to average over
+        await asyncio.sleep(1.0)
+        
         # Run health check
         health_results = await monitor.run_comprehensive_health_check()
         
@@ -692,6 +928,18 @@ async def main():
 
 
 if __name__ == "__main__":
-    exit_code = asyncio.run(main())
-    sys.exit(exit_code)
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Sophia Intel platform monitor")
+    parser.add_argument("--serve", action="store_true", help="serve cached health snapshots over HTTP")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("MONITOR_PORT", "8090")))
+    args = parser.parse_args()
+    
+    if args.serve:
+        import uvicorn
+        uvicorn.run(create_health_app(), host=args.host, port=args.port)
+    else:
+        exit_code = asyncio.run(main())
+        sys.exit(exit_code)
 
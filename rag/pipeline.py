@@ -5,6 +5,8 @@ Provides multi-service context retrieval with intelligent routing and fallbacks
 import os
 import json
 import asyncio
+import concurrent.futures
+import threading
 import time
 from functools import lru_cache
 from typing import Dict, Any, List, Optional, Union
@@ -20,6 +22,11 @@ except ImportError:
     get_client_manager = None
     SearchResult = None
 
+try:
+    from libs.retrieval import get_reranker
+except ImportError:
+    get_reranker = None
+
 
 class EnhancedRAGPipeline:
     """
@@ -30,12 +37,16 @@ class EnhancedRAGPipeline:
     - Intelligent routing based on query context and Swarm stage
     - Fallback chains: New MCP → Legacy MCP → Qdrant → Mock
     - Context fusion from multiple sources
+    - Optional cross-encoder reranking of the top candidates
     - Performance monitoring and caching
     - Swarm-aware context prioritization
     """
 
-    def __init__(self):
+    def __init__(self, hybrid_index=None, reranker=None):
         self.client_manager = None
+        self.hybrid_index = hybrid_index
+        # Optional cross-encoder stage: over-fetch candidates, rerank, keep the top k
+        self.reranker = reranker if reranker is not None else (get_reranker() if get_reranker else None)
         self.search_cache = {}
         self.cache_ttl = 300  # 5 minutes
         self.performance_metrics = {
@@ -62,7 +73,8 @@ class EnhancedRAGPipeline:
         k: int = 8,
         swarm_stage: Optional[str] = None,
         services: Optional[List[str]] = None,
-        enable_fusion: bool = True
+        enable_fusion: bool = True,
+        filters: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
         """
         Search across multiple MCP services with intelligent routing
@@ -73,6 +85,8 @@ class EnhancedRAGPipeline:
             swarm_stage: Current Swarm stage for context-aware routing
             services: Specific services to search (None = auto-detect)
             enable_fusion: Whether to fuse results from multiple services
+            filters: Payload filters (e.g. repo, path, knowledge_type; a list means any of).
+                MCP services cannot apply them, so filtered queries go straight to Qdrant.
 
         Returns:
             List of search results with unified format
@@ -81,7 +95,7 @@ class EnhancedRAGPipeline:
         self.performance_metrics["total_queries"] += 1
 
         # Check cache first
-        cache_key = f"{query}_{k}_{swarm_stage}_{services}"
+        cache_key = f"{query}_{k}_{swarm_stage}_{services}_{json.dumps(filters, sort_keys=True, default=str)}"
         if cache_key in self.search_cache:
             cache_entry = self.search_cache[cache_key]
             if time.time() - cache_entry["timestamp"] < self.cache_ttl:
@@ -89,32 +103,38 @@ class EnhancedRAGPipeline:
                 logger.debug(f"Cache hit for query: {query[:50]}...")
                 return cache_entry["results"]
 
-        try:
-            # Try new MCP architecture first
-            results = await self._search_new_mcp(query, k, swarm_stage, services)
-            if results:
-                self.performance_metrics["fallback_usage"]["new_mcp"] += 1
-                logger.info(f"New MCP returned {len(results)} results")
-                return self._cache_and_return(cache_key, results, start_time)
-        except Exception as e:
-            logger.warning(f"New MCP search failed: {e}")
-
-        # Fall back to legacy MCP
-        try:
-            results = await self._search_legacy_mcp(query, k, swarm_stage)
-            if results:
-                self.performance_metrics["fallback_usage"]["legacy_mcp"] += 1
-                logger.info(f"Legacy MCP returned {len(results)} results")
-                return self._cache_and_return(cache_key, results, start_time)
-        except Exception as e:
-            logger.warning(f"Legacy MCP search failed: {e}")
+        fetch_k = max(k, self.reranker.top_n) if self.reranker else k
+
+        if not filters:
+            try:
+                # Try new MCP architecture first
+                results = await self._search_new_mcp(query, fetch_k, swarm_stage, services)
+                if results:
+                    self.performance_metrics["fallback_usage"]["new_mcp"] += 1
+                    logger.info(f"New MCP returned {len(results)} results")
+                    results = await self._rerank(query, results, k)
+                    return self._cache_and_return(cache_key, results, start_time)
+            except Exception as e:
+                logger.warning(f"New MCP search failed: {e}")
+
+            # Fall back to legacy MCP
+            try:
+                results = await self._search_legacy_mcp(query, fetch_k, swarm_stage)
+                if results:
+                    self.performance_metrics["fallback_usage"]["legacy_mcp"] += 1
+                    logger.info(f"Legacy MCP returned {len(results)} results")
+                    results = await self._rerank(query, results, k)
+                    return self._cache_and_return(cache_key, results, start_time)
+            except Exception as e:
+                logger.warning(f"Legacy MCP search failed: {e}")
 
         # Fall back to Qdrant
         try:
-            results = await self._search_qdrant_fallback(query, k)
+            results = await self._search_qdrant_fallback(query, fetch_k, filters)
             if results:
                 self.performance_metrics["fallback_usage"]["qdrant"] += 1
                 logger.info(f"Qdrant fallback returned {len(results)} results")
+                results = await self._rerank(query, results, k)
                 return self._cache_and_return(cache_key, results, start_time)
         except Exception as e:
             logger.warning(f"Qdrant search failed: {e}")
@@ -125,6 +145,16 @@ class EnhancedRAGPipeline:
         logger.info(f"Using mock results for query: {query[:50]}...")
         return self._cache_and_return(cache_key, results, start_time)
 
+    async def _rerank(self, query: str, results: List[Dict[str, Any]], k: int) -> List[Dict[str, Any]]:
+        """Rerank candidates with the cross-encoder (fused order if it is off or over budget)"""
+        if not self.reranker:
+            return results[:k]
+        try:
+            return await self.reranker.rerank(query, results, k)
+        except Exception as e:
+            logger.warning(f"Reranking failed: {e}")
+            return results[:k]
+
     async def _search_new_mcp(
         self,
         query: str,
@@ -192,41 +222,23 @@ class EnhancedRAGPipeline:
             return standardized
         return []
 
-    async def _search_qdrant_fallback(self, query: str, k: int) -> List[Dict[str, Any]]:
-        """Fallback Qdrant search without Haystack dependencies"""
-        try:
-            import qdrant_client
-            from qdrant_client.models import Filter, FieldCondition, MatchValue
-
-            client = qdrant_client.QdrantClient(
-                url=os.getenv("QDRANT_URL"),
-                api_key=os.getenv("QDRANT_API_KEY")
-            )
-
-            collection = os.getenv("QDRANT_COLLECTION", "repo_docs")
-
-            # Simple text search without embeddings
-            results = client.scroll(
-                collection_name=collection,
-                limit=k,
-                with_payload=True,
-                with_vectors=False
-            )
-
-            docs = []
-            for point in results[0]:
-                payload = point.payload or {}
-                docs.append({
-                    "id": f"qdrant_{point.id}",
-                    "path": payload.get("path", ""),
-                    "content": payload.get("content", "")[:800],
-                    "score": 0.5,  # Default score since we can't do semantic search
-                    "source": "qdrant_fallback",
-                    "metadata": payload,
-                    "timestamp": time.time()
-                })
+    def _get_hybrid_index(self):
+        """Lazy hybrid (dense + BM25) index over the repository collection"""
+        if self.hybrid_index is None:
+            from libs.embeddings import get_embedder
+
+            self.hybrid_index = _create_hybrid_index(get_embedder())
+        return self.hybrid_index
 
-            return docs[:k]
+    async def _search_qdrant_fallback(
+        self,
+        query: str,
+        k: int,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Hybrid Qdrant search: dense and BM25 legs with filters pushed down, fused with RRF"""
+        try:
+            return await _hybrid_search(self._get_hybrid_index(), query, k, filters)
         except Exception as e:
             logger.error(f"Qdrant fallback failed: {e}")
             return []
@@ -329,6 +341,9 @@ class EnhancedRAGPipeline:
         else:
             metrics["cache_hit_rate"] = 0.0
 
+        if self.reranker:
+            metrics["reranker"] = self.reranker.stats()
+
         return metrics
 
     async def intelligent_routing(
@@ -401,38 +416,87 @@ async def get_rag_pipeline() -> EnhancedRAGPipeline:
 # Backward compatibility functions for existing Swarm system
 
 
-def _qdrant_search_fallback(query: str, k: int = 8):
-    """Fallback Qdrant search without Haystack dependencies - legacy function"""
+def _create_hybrid_index(embedder):
+    """Hybrid index on the hybrid collection (QDRANT_HYBRID_COLLECTION), not the legacy repo_docs"""
+    import qdrant_client
+    from libs.retrieval import QdrantHybridIndex, hybrid_collection
+
+    client = qdrant_client.QdrantClient(
+        url=os.getenv("QDRANT_URL"),
+        api_key=os.getenv("QDRANT_API_KEY")
+    )
+    return QdrantHybridIndex(client, hybrid_collection(), embedder)
+
+
+async def _hybrid_search(index, query: str, k: int, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    hits = await index.search(query, k, filters)
+    return [{
+        "id": f"qdrant_{hit.id}",
+        "path": hit.payload.get("path", ""),
+        "content": hit.payload.get("content", "")[:800],
+        "score": hit.score,  # RRF score
+        "source": "qdrant_hybrid",
+        "metadata": {**hit.payload, "dense_rank": hit.dense_rank, "sparse_rank": hit.sparse_rank},
+        "timestamp": time.time()
+    } for hit in hits]
+
+
+_fallback_loop: Optional[asyncio.AbstractEventLoop] = None
+_fallback_index = None
+_fallback_lock = threading.Lock()
+# Seconds a sync caller waits for the fallback search before giving up
+FALLBACK_TIMEOUT = float(os.getenv("RAG_FALLBACK_TIMEOUT", "10"))
+
+
+def _fallback_runtime():
+    """
+    Event loop thread and hybrid index owned by the sync fallback.
+
+    The embedder and HTTP clients bind to the loop they first run on, so the
+    fallback gets its own, started once, instead of borrowing the pipeline's
+    from a fresh loop on every call. Its embedder wraps the process-wide
+    embedder's backend, so the local model is loaded only once.
+    """
+    global _fallback_loop, _fallback_index
+    with _fallback_lock:
+        if _fallback_loop is None:
+            from libs.embeddings import Embedder, MCPEmbeddingBackend, get_embedder
+
+            backend = get_embedder().backend
+            if isinstance(backend, MCPEmbeddingBackend):
+                # its HTTP client belongs to the pipeline's loop; a second client is cheap
+                backend = MCPEmbeddingBackend(backend.base_url, backend.model_id, backend.dimensions)
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="qdrant-fallback", daemon=True).start()
+            _fallback_index = _create_hybrid_index(Embedder(backend))
+            _fallback_loop = loop
+    return _fallback_loop, _fallback_index
+
+
+def _qdrant_search_fallback(query: str, k: int = 8, filters: Optional[Dict[str, Any]] = None):
+    """
+    Hybrid Qdrant search for sync callers - legacy function
+
+    The search runs on the fallback's own loop thread, but this call blocks
+    the calling thread for up to FALLBACK_TIMEOUT seconds; async code must
+    call it through asyncio.to_thread.
+    """
     try:
-        import qdrant_client
-        from qdrant_client.models import Filter, FieldCondition, MatchValue
-
-        client = qdrant_client.QdrantClient(
-            url=os.getenv("QDRANT_URL"),
-            api_key=os.getenv("QDRANT_API_KEY")
-        )
-
-        collection = os.getenv("QDRANT_COLLECTION", "repo_docs")
-
-        # Simple text search without embeddings - basic implementation
-        results = client.scroll(
-            collection_name=collection,
-            limit=k,
-            with_payload=True,
-            with_vectors=False
-        )
-
-        docs = []
-        for point in results[0]:
-            payload = point.payload or {}
-            docs.append({
-                "path": payload.get("path", ""),
-                "content": payload.get("content", "")[:800],
-                "score": 0.5,  # Default score since we can't do semantic search
-                "source": "qdrant_fallback"
-            })
-
-        return docs[:k]
+        loop, index = _fallback_runtime()
+        future = asyncio.run_coroutine_threadsafe(_hybrid_search(index, query, k, filters), loop)
+        try:
+            results = future.result(timeout=FALLBACK_TIMEOUT)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            logger.warning(f"Qdrant fallback timed out after {FALLBACK_TIMEOUT}s")
+            return []
+
+        return [{
+            "path": result["path"],
+            "content": result["content"],
+            "score": result["score"],
+            "source": result["source"]
+        } for result in results]
     except Exception as e:
         print(f"Qdrant fallback failed: {e}")
         return []
@@ -551,7 +615,8 @@ async def multi_service_search(
     query: str,
     k: int = 8,
     swarm_stage: Optional[str] = None,
-    services: Optional[List[str]] = None
+    services: Optional[List[str]] = None,
+    filters: Optional[Dict[str, Any]] = None
 ) -> List[Dict[str, Any]]:
     """
     Advanced multi-service search with intelligent routing
@@ -561,6 +626,7 @@ async def multi_service_search(
         k: Number of results to return
         swarm_stage: Current Swarm stage for context-aware routing
         services: Specific services to search (None = auto-route)
+        filters: Payload filters for the Qdrant hybrid search (repo, path, knowledge_type)
 
     Returns:
         List of search results from multiple services
@@ -570,7 +636,7 @@ async def multi_service_search(
     if services is None:
         services = await pipeline.intelligent_routing(query, swarm_stage)
 
-    return await pipeline.search_multi_service(query, k, swarm_stage, services)
+    return await pipeline.search_multi_service(query, k, swarm_stage, services, filters=filters)
 
 
 async def get_rag_metrics() -> Dict[str, Any]:
@@ -3,9 +3,10 @@ from typing import List, Dict, Any
 from haystack import Pipeline
 from haystack_integrations.document_stores.qdrant import QdrantDocumentStore
 from haystack.dataclasses import Document
-from haystack.components.preprocessors import DocumentSplitter
 from haystack.components.writers import DocumentWriter
-from haystack.components.embedders import SentenceTransformersTextEmbedder
+from haystack.components.embedders import SentenceTransformersDocumentEmbedder
+
+from libs.chunking import Chunker
 
 ROOT = os.getenv("INDEX_ROOT", ".")
 COLL = os.getenv("QDRANT_COLLECTION", "repo_docs")
@@ -67,30 +68,25 @@ def create_enhanced_pipeline():
         embedding_dim=384  # for all-MiniLM-L6-v2
     )
     
-    embedder = SentenceTransformersTextEmbedder(
+    embedder = SentenceTransformersDocumentEmbedder(
         model=os.getenv("EMBEDDER_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
     )
     
-    splitter = DocumentSplitter(
-        split_by="token", 
-        split_length=CHUNK_SIZE, 
-        split_overlap=CHUNK_OVERLAP
-    )
-    
     writer = DocumentWriter(document_store=store)
     
+    # Documents arrive already chunked by the shared chunker (see process_files_batch)
     pipe = Pipeline()
     pipe.add_component("embed", embedder)
-    pipe.add_component("split", splitter)  
     pipe.add_component("write", writer)
     
-    pipe.connect("embed", "split")
-    pipe.connect("split", "write")
+    pipe.connect("embed", "write")
     
     return pipe
 
+CHUNKER = Chunker(max_tokens=CHUNK_SIZE, overlap_tokens=CHUNK_OVERLAP)
+
 def process_files_batch(files: List[str]) -> List[Document]:
-    """Process files into documents with enhanced metadata"""
+    """Process files into chunk documents with enhanced metadata"""
     docs = []
     
     for file_path in files:
@@ -107,21 +103,23 @@ def process_files_batch(files: List[str]) -> List[Document]:
             # Extract metrics
             metrics = extract_code_metrics(content, file_path)
             
-            # Create document with rich metadata
-            doc = Document(
-                content=content,
-                meta={
-                    "path": str(path_obj.resolve()),
-                    "filename": path_obj.name,
-                    "extension": file_ext,
-                    "file_type": file_type,
-                    "size": len(content),
-                    "modified_time": path_obj.stat().st_mtime,
-                    "indexed_time": time.time(),
-                    **metrics
-                }
-            )
-            docs.append(doc)
+            # One document per chunk, with rich file metadata
+            file_meta = {
+                "path": str(path_obj.resolve()),
+                "filename": path_obj.name,
+                "extension": file_ext,
+                "file_type": file_type,
+                "size": len(content),
+                "modified_time": path_obj.stat().st_mtime,
+                "indexed_time": time.time(),
+                **metrics
+            }
+            for chunk in CHUNKER.chunk(content, source=str(file_path)):
+                docs.append(Document(
+                    id=chunk.id,
+                    content=chunk.text,
+                    meta={**file_meta, **chunk.to_metadata()}
+                ))
             
         except Exception as e:
             print(f"Error processing {file_path}: {e}")
@@ -6,7 +6,7 @@ Core package for the ultimate AI orchestrator.
 from .core.ultimate_model_router import UltimateModelRouter, ModelConfig, TaskType
 from .core.api_manager import SOPHIAAPIManager, ServiceClient
 from .core.sophia_base_agent import SOPHIABaseAgent
-from .core.github_master import SOPHIAGitHubMaster, GitHubRepoInfo, GitHubCommitInfo, GitHubPRInfo
+from .core.github_master import SOPHIAGitHubMaster, GitHubRepoInfo, GitHubCommitInfo, GitHubPRInfo, GitHubBulkCommitResult
 from .core.fly_master import SOPHIAFlyMaster, FlyAppInfo, FlyReleaseInfo, FlyMachineInfo
 from .core.research_master import SOPHIAResearchMaster
 from .core.business_master import SOPHIABusinessMaster
@@ -24,7 +24,7 @@ from .core.action_engine import ActionEngine, ActionResult, ActionStatus, Resear
 from .integrations.asana_client import AsanaClient, AsanaProject, AsanaTask
 from .integrations.linear_client import LinearClient, LinearTeam, LinearIssue
 from .integrations.notion_client import NotionClient, NotionDatabase, NotionPage
-from .integrations.gong_client import GongClient, GongCall, GongCallSummary
+from .integrations.gong_client import GongClient, GongCall
 
 __version__ = "4.2.0"
 __author__ = "SOPHIA AI Team"
@@ -40,6 +40,7 @@ __all__ = [
     "GitHubRepoInfo",
     "GitHubCommitInfo", 
     "GitHubPRInfo",
+    "GitHubBulkCommitResult",
     "SOPHIAFlyMaster",
     "FlyAppInfo",
     "FlyReleaseInfo",
@@ -36,6 +36,7 @@ class SOPHIAAPIManager:
         self.postgres_pool = None
         self.redis_client = None
         self.qdrant_client = None
+        self.vector_writer = None
         self.weaviate_client = None
         self.neo4j_driver = None
         self.mem0_client = None
@@ -368,21 +369,45 @@ class SOPHIAAPIManager:
             logger.error(f"PostgreSQL query failed: {e}")
             raise
 
-    def upsert_qdrant(self, collection: str, vectors: list, payloads: list):
+    def _qdrant_points(self, collection: str, vectors: list, payloads: list, ids: Optional[list] = None) -> list:
+        """Points with caller ids, or ids derived from the payload so repeated upserts overwrite."""
+        from libs.vectors import point_id
+
+        if ids is None:
+            ids = [point_id(collection, json.dumps(payload, sort_keys=True, default=str)) for payload in payloads]
+        return [
+            {"id": point_id_, "vector": vec, "payload": payload}
+            for point_id_, vec, payload in zip(ids, vectors, payloads)
+        ]
+
+    def upsert_qdrant(self, collection: str, vectors: list, payloads: list, ids: Optional[list] = None):
         """Upsert vectors into Qdrant."""
         if not self.qdrant_client:
             raise RuntimeError("Qdrant not configured")
         
         try:
-            points = [
-                {"id": idx, "vector": vec, "payload": payloads[idx]} 
-                for idx, vec in enumerate(vectors)
-            ]
+            points = self._qdrant_points(collection, vectors, payloads, ids)
             return self.qdrant_client.upsert(collection_name=collection, points=points)
         except Exception as e:
             logger.error(f"Qdrant upsert failed: {e}")
             raise
 
+    async def upsert_qdrant_async(self, collection: str, vectors: list, payloads: list, ids: Optional[list] = None):
+        """Upsert vectors through the process-wide batching writer; returns Qdrant's UpdateResult once stored."""
+        if not self.qdrant_client:
+            raise RuntimeError("Qdrant not configured")
+        
+        if self.vector_writer is None:
+            from libs.vectors import get_vector_writer
+
+            self.vector_writer = get_vector_writer(self.qdrant_client)
+        try:
+            points = self._qdrant_points(collection, vectors, payloads, ids)
+            return await self.vector_writer.write(collection, points)
+        except Exception as e:
+            logger.error(f"Qdrant upsert failed: {e}")
+            raise
+
     def get_redis(self, key: str):
         """Retrieve a value from Redis."""
         if not self.redis_client:
@@ -13,6 +13,8 @@ from .api_manager import SOPHIAAPIManager
 from .ultimate_model_router import UltimateModelRouter
 from .mcp_client import SOPHIAMCPClient
 from .memory_master import SOPHIAMemoryMaster
+from .call_summarizer import TranscriptSummarizer
+from .gong_ingestion import GongIngestionPipeline, FileCheckpointStore, IngestionResult, normalize_call
 from ..integrations.gong_client import GongClient, GongCall
 from ..integrations.asana_client import AsanaClient, AsanaTask
 from ..integrations.linear_client import LinearClient, LinearIssue
@@ -39,6 +41,9 @@ class SOPHIABusinessMaster:
         self.linear = LinearClient()
         self.notion = NotionClient()
         
+        # Map-reduce summarizer for long call transcripts
+        self.summarizer = TranscriptSummarizer(self.model_router, task_type="analysis")
+        
         # Business configuration
         self.supported_sources = ["gong", "hubspot", "slack", "salesforce", "notion", "asana", "linear"]
         self.default_date_range = 30  # days
@@ -618,28 +623,44 @@ Report:
             logger.error(f"Integration status check failed: {e}")
             raise
     
-    async def ingest_recent_calls(self, since: str, until: str) -> List[Dict[str, Any]]:
+    async def ingest_gong_calls(
+        self,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        incremental: bool = False,
+        collect: bool = False
+    ) -> IngestionResult:
         """
-        Ingest recent Gong calls and store in memory.
+        Ingest every Gong call in a window, following the API cursor.
         
         Args:
-            since: Start date (ISO format: 2025-08-01T00:00:00Z)
-            until: End date (ISO format: 2025-08-20T23:59:59Z)
+            since: Start date (ISO format: 2025-08-01T00:00:00Z); optional when incremental
+            until: End date (ISO format: 2025-08-20T23:59:59Z); defaults to now
+            incremental: Continue from the last checkpoint (for scheduled runs)
+            collect: Return the normalized records in the result
         """
+        pipeline = GongIngestionPipeline(
+            self.gong,
+            self.memory,
+            FileCheckpointStore(os.getenv("GONG_INGEST_CHECKPOINT", "gong_ingest_checkpoint.json"))
+        )
         try:
-            calls = await self.gong.list_calls(since, until, limit=100)
-            normalized = self._normalize_calls(calls)
-            
-            # Store to memory (Qdrant + Mem0)
-            await self.memory.store_business_artifacts("gong_calls", normalized)
-            
-            logger.info(f"Ingested {len(normalized)} Gong calls")
-            return normalized
-            
+            return await pipeline.run(since=since, until=until, incremental=incremental, collect=collect)
         except Exception as e:
             logger.error(f"Failed to ingest Gong calls: {e}")
             raise
     
+    async def ingest_recent_calls(self, since: str, until: str) -> List[Dict[str, Any]]:
+        """
+        Ingest recent Gong calls and store in memory.
+        
+        Args:
+            since: Start date (ISO format: 2025-08-01T00:00:00Z)
+            until: End date (ISO format: 2025-08-20T23:59:59Z)
+        """
+        result = await self.ingest_gong_calls(since, until, collect=True)
+        return result.records
+    
     async def summarize_call(self, call_id: str) -> str:
         """
         Summarize a Gong call using approved AI models.
@@ -656,28 +677,13 @@ Report:
             if not call.transcript:
                 return f"No transcript available for call: {call.title}"
             
-            # Use approved high-quality model for analysis
-            model = self.model_router.select_model("analysis")
-            
-            prompt = f"""
-            Analyze this sales call transcript and provide a comprehensive summary:
-            
-            Call: {call.title}
-            Duration: {call.duration} seconds
-            Participants: {', '.join(call.participants)}
-            
-            Transcript:
-            {call.transcript}
-            
-            Please provide:
-            1. Key discussion points
-            2. Customer pain points and needs
-            3. Next steps and action items
-            4. Deal status and opportunities
-            5. Risk factors or concerns
-            """
-            
-            summary = await self.model_router.call_model(model, prompt)
+            # Long transcripts are chunked on speaker turns and summarized map-reduce style
+            summary = await self.summarizer.summarize(
+                call.transcript,
+                title=call.title,
+                duration=call.duration,
+                participants=call.participants
+            )
             
             # Store summary in memory
             summary_data = [{
@@ -699,21 +705,62 @@ Report:
             logger.error(f"Failed to summarize call {call_id}: {e}")
             raise
     
+    async def ask_about_call(self, call_id: str, question: str) -> str:
+        """
+        Answer a follow-up question about a Gong call.
+        
+        Reuses the cached chunk summaries from summarize_call, so follow-ups on a
+        long call only pay for the question itself.
+        """
+        call = await self.gong.get_call(call_id)
+        if not call.transcript:
+            return f"No transcript available for call: {call.title}"
+        return await self.summarizer.answer(call.transcript, question, title=call.title)
+    
+    async def summarize_calls(self, since: str, until: str, max_workers: int = 4) -> Dict[str, Any]:
+        """
+        Summarize every Gong call in a date range.
+        
+        Args:
+            since: Start date (ISO format: 2025-08-01T00:00:00Z)
+            until: End date (ISO format: 2025-08-20T23:59:59Z)
+            max_workers: Calls summarized at the same time
+            
+        Returns:
+            Summaries keyed by call ID, plus per-call errors
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max_workers * 2)
+        summaries: Dict[str, str] = {}
+        errors: Dict[str, str] = {}
+        
+        async def worker():
+            while True:
+                call_id = await queue.get()
+                try:
+                    if call_id is None:
+                        return
+                    summaries[call_id] = await self.summarize_call(call_id)
+                except Exception as e:
+                    errors[call_id] = str(e)
+                finally:
+                    queue.task_done()
+        
+        workers = [asyncio.create_task(worker()) for _ in range(max_workers)]
+        try:
+            async for calls, _ in self.gong.iter_calls(since, until):
+                for call in calls:
+                    await queue.put(call.call_id)
+        finally:
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        
+        logger.info(f"Summarized {len(summaries)} Gong calls ({len(errors)} failed) from {since} to {until}")
+        return {"summaries": summaries, "errors": errors, "cache": self.summarizer.cache.stats()}
+    
     def _normalize_calls(self, calls: List[GongCall]) -> List[Dict[str, Any]]:
         """Normalize Gong calls for memory storage"""
-        normalized = []
-        for call in calls:
-            normalized.append({
-                "id": call.call_id,
-                "title": call.title,
-                "started": call.started.isoformat(),
-                "duration": call.duration,
-                "participants": call.participants,
-                "url": call.url,
-                "source": "gong",
-                "type": "call_record"
-            })
-        return normalized
+        return [normalize_call(call) for call in calls]
     
     def _extract_transcript(self, call: GongCall) -> str:
         """Extract transcript text from call data"""
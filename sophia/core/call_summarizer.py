@@ -0,0 +1,278 @@
+"""
+SOPHIA Call Summarizer
+Map-reduce summarization for long call transcripts: transcripts are split on
+speaker turns, chunks are summarized concurrently and the partial summaries
+are reduced hierarchically into one. Every model call is cached by content
+hash so repeated summaries and follow-up questions reuse earlier work.
+"""
+
+import re
+import hashlib
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from .ultimate_model_router import UltimateModelRouter, ModelConfig
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except ImportError:
+    _ENCODING = None
+
+logger = logging.getLogger(__name__)
+
+# "Name: text" or "[00:01:23] Name: text" at the start of a line
+SPEAKER_TURN = re.compile(r"^\s*(?:\[[\d:.]+\]\s*)?[^\s:][^:\n]{0,60}:\s", re.MULTILINE)
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+# Tokens kept free for the instructions wrapped around each chunk
+PROMPT_OVERHEAD_TOKENS = 512
+
+CHUNK_PROMPT = """
+You are summarizing part {index} of {total} of a sales call transcript.
+
+Call: {title}
+
+Transcript excerpt:
+{text}
+
+Summarize this excerpt in concise bullet points covering discussion points,
+customer pain points and needs, commitments or next steps, deal signals and
+risks. Keep speaker attributions. Do not invent anything not in the excerpt.
+"""
+
+REDUCE_PROMPT = """
+Combine these partial summaries of consecutive parts of the sales call "{title}"
+into one set of bullet points. Merge duplicates, keep chronology and keep every
+commitment, objection and risk.
+
+{text}
+"""
+
+FINAL_PROMPT = """
+Analyze this sales call and provide a comprehensive summary:
+
+Call: {title}
+Duration: {duration} seconds
+Participants: {participants}
+
+{label}:
+{text}
+
+Please provide:
+1. Key discussion points
+2. Customer pain points and needs
+3. Next steps and action items
+4. Deal status and opportunities
+5. Risk factors or concerns
+"""
+
+QUESTION_PROMPT = """
+Answer the question about the sales call "{title}" using only the notes below.
+If the notes do not contain the answer, say so.
+
+Notes:
+{text}
+
+Question: {question}
+"""
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count with tiktoken when available, otherwise ~4 characters per token."""
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def split_turns(transcript: str) -> List[str]:
+    """Split a transcript into speaker turns (falls back to paragraphs)."""
+    starts = [m.start() for m in SPEAKER_TURN.finditer(transcript)]
+    if len(starts) < 2:
+        return [p for p in re.split(r"\n\s*\n", transcript) if p.strip()]
+    if starts[0] != 0:
+        starts.insert(0, 0)
+    bounds = starts + [len(transcript)]
+    return [transcript[a:b].strip() for a, b in zip(bounds, bounds[1:]) if transcript[a:b].strip()]
+
+
+def _split_oversized(turn: str, max_tokens: int) -> List[str]:
+    pieces, current = [], ""
+    for sentence in SENTENCE_END.split(turn):
+        while estimate_tokens(sentence) > max_tokens:
+            cut = max_tokens * 4
+            pieces.append(sentence[:cut])
+            sentence = sentence[cut:]
+        candidate = f"{current} {sentence}".strip()
+        if current and estimate_tokens(candidate) > max_tokens:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = candidate
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_transcript(transcript: str, max_tokens: int) -> List[str]:
+    """
+    Pack whole speaker turns into chunks of at most max_tokens.
+
+    Turns are never split unless a single turn exceeds the budget, in which
+    case it is split on sentence boundaries.
+    """
+    chunks, current, current_tokens = [], [], 0
+    for turn in split_turns(transcript):
+        turn_tokens = estimate_tokens(turn)
+        if turn_tokens > max_tokens:
+            pieces = _split_oversized(turn, max_tokens)
+        else:
+            pieces = [turn]
+        for piece in pieces:
+            piece_tokens = estimate_tokens(piece) if len(pieces) > 1 else turn_tokens
+            if current and current_tokens + piece_tokens > max_tokens:
+                chunks.append("\n".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += piece_tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+class SummaryCache:
+    """LRU cache of model outputs keyed by a hash of model and prompt."""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(model: ModelConfig, prompt: str) -> str:
+        digest = hashlib.sha256(f"{model.provider}:{model.model_name}\n{prompt}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: str) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class TranscriptSummarizer:
+    """
+    Chunked map-reduce summarizer on top of UltimateModelRouter.
+
+    Short transcripts go to the model in one prompt, exactly as before. Longer
+    ones are chunked to `chunk_tokens` (capped by the model's window), the
+    chunks are summarized concurrently and the summaries are reduced
+    `reduce_fan_in` at a time until they fit in a single final prompt.
+    """
+
+    def __init__(
+        self,
+        router: UltimateModelRouter,
+        task_type: str = "analysis",
+        chunk_tokens: int = 3000,
+        max_concurrency: int = 4,
+        reduce_fan_in: int = 6,
+        cache: Optional[SummaryCache] = None
+    ):
+        self.router = router
+        self.task_type = task_type
+        self.chunk_tokens = chunk_tokens
+        self.reduce_fan_in = max(2, reduce_fan_in)
+        self.cache = cache or SummaryCache()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    def _budget(self, model: ModelConfig) -> int:
+        # Whatever the context window holds after the model's answer and the prompt template
+        return max(256, min(self.chunk_tokens, model.input_budget() - PROMPT_OVERHEAD_TOKENS))
+
+    async def _call(self, model: ModelConfig, prompt: str) -> str:
+        key = self.cache.key(model, prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        async with self._semaphore:
+            result = await self.router.call_model(model, prompt)
+        self.cache.put(key, result)
+        return result
+
+    async def chunk_summaries(self, transcript: str, title: str = "", model: Optional[ModelConfig] = None) -> List[str]:
+        """Summaries of each transcript chunk (the map step)."""
+        model = model or self.router.select_model(self.task_type)
+        chunks = chunk_transcript(transcript, self._budget(model))
+        return await asyncio.gather(*(
+            self._call(model, CHUNK_PROMPT.format(index=i + 1, total=len(chunks), title=title, text=chunk))
+            for i, chunk in enumerate(chunks)
+        ))
+
+    async def _combine(self, group: List[str], title: str, model: ModelConfig) -> str:
+        if len(group) == 1:
+            return group[0]
+        return await self._call(model, REDUCE_PROMPT.format(title=title, text="\n\n".join(group)))
+
+    async def _reduce(self, summaries: List[str], title: str, model: ModelConfig) -> str:
+        budget = self._budget(model)
+        level = 0
+        while len(summaries) > 1 and estimate_tokens("\n\n".join(summaries)) > budget:
+            groups, current = [], []
+            for summary in summaries:
+                if current and (len(current) >= self.reduce_fan_in
+                                or estimate_tokens("\n\n".join(current + [summary])) > budget):
+                    groups.append(current)
+                    current = []
+                current.append(summary)
+            groups.append(current)
+            if len(groups) == len(summaries):
+                # Nothing could be combined; stop rather than loop forever
+                break
+            level += 1
+            logger.debug(f"Reducing {len(summaries)} summaries into {len(groups)} (level {level})")
+            summaries = await asyncio.gather(*(self._combine(group, title, model) for group in groups))
+        return "\n\n".join(summaries)
+
+    async def summarize(
+        self,
+        transcript: str,
+        title: str = "",
+        duration: int = 0,
+        participants: Optional[List[str]] = None
+    ) -> str:
+        """Summarize a transcript of any length."""
+        model = self.router.select_model(self.task_type)
+        header = {"title": title, "duration": duration, "participants": ", ".join(participants or [])}
+
+        if estimate_tokens(transcript) <= self._budget(model):
+            return await self._call(model, FINAL_PROMPT.format(label="Transcript", text=transcript, **header))
+
+        summaries = await self.chunk_summaries(transcript, title, model)
+        notes = await self._reduce(summaries, title, model)
+        logger.info(f"Summarized '{title}' from {len(summaries)} chunks")
+        return await self._call(model, FINAL_PROMPT.format(label="Notes from each part of the call", text=notes, **header))
+
+    async def answer(self, transcript: str, question: str, title: str = "") -> str:
+        """Answer a follow-up question from the (cached) chunk summaries."""
+        model = self.router.select_model(self.task_type)
+        if estimate_tokens(transcript) <= self._budget(model):
+            notes = transcript
+        else:
+            notes = await self._reduce(await self.chunk_summaries(transcript, title, model), title, model)
+        return await self._call(model, QUESTION_PROMPT.format(title=title, text=notes, question=question))
@@ -4,7 +4,6 @@ Handles both natural language parsing and explicit commands for SOPHIA.
 """
 
 import os
-import re
 import json
 import asyncio
 import logging
@@ -15,6 +14,8 @@ from enum import Enum
 
 from .ultimate_model_router import UltimateModelRouter
 from .constants import APPROVED_MODELS
+from .intent_engine import CompiledIntentMatcher, IntentCache, LocalIntentClassifier
+from libs.tracing import traced
 
 logger = logging.getLogger(__name__)
 
@@ -52,7 +53,15 @@ class SOPHIAChatOpsRouter:
     Supports both conversational AI and explicit command interfaces.
     """
     
-    def __init__(self, model_router: Optional[UltimateModelRouter] = None):
+    # Intents the local classifier may route on its own; the rest need LLM-extracted parameters
+    LOCAL_INTENTS = {"gong_summary", "create_task", "research", "status", "chat"}
+    
+    def __init__(
+        self,
+        model_router: Optional[UltimateModelRouter] = None,
+        local_classifier: Optional[LocalIntentClassifier] = None,
+        local_confidence_threshold: float = 0.85
+    ):
         self.model_router = model_router or UltimateModelRouter()
         self.mode = ChatMode.HYBRID
         self.pending_plans: Dict[str, ExecutionPlan] = {}
@@ -99,6 +108,15 @@ class SOPHIAChatOpsRouter:
             "/help": r"^/help(?:\s+(.+))?$"
         }
         
+        # Precompiled matchers and the tiers in front of the LLM classifier
+        self.command_matcher = CompiledIntentMatcher(
+            {command: [pattern] for command, pattern in self.command_patterns.items()}, search=False
+        )
+        self.intent_matcher = CompiledIntentMatcher(self.intent_patterns)
+        self.intent_cache = IntentCache()
+        self.local_classifier = local_classifier or LocalIntentClassifier(log_path=os.getenv("SOPHIA_INTENT_LOG"))
+        self.local_confidence_threshold = local_confidence_threshold
+        
         logger.info("Initialized SOPHIAChatOpsRouter in hybrid mode")
     
     def set_mode(self, mode: ChatMode) -> str:
@@ -114,6 +132,7 @@ class SOPHIAChatOpsRouter:
         
         return mode_descriptions[mode]
     
+    @traced("chatops.parse_input")
     async def parse_input(self, user_input: str) -> Tuple[str, ParsedIntent]:
         """
         Parse user input and determine intent.
@@ -122,10 +141,10 @@ class SOPHIAChatOpsRouter:
         user_input = user_input.strip()
         
         # Check for explicit commands first
-        for command, pattern in self.command_patterns.items():
-            match = re.match(pattern, user_input, re.IGNORECASE)
-            if match:
-                return await self._handle_command(command, match.groups())
+        if user_input.startswith("/"):
+            matched = self.command_matcher.match(user_input)
+            if matched:
+                return await self._handle_command(*matched)
         
         # If in command-only mode and no command found, guide user
         if self.mode == ChatMode.COMMAND:
@@ -198,18 +217,31 @@ class SOPHIAChatOpsRouter:
     async def _parse_natural_language(self, text: str) -> Tuple[str, ParsedIntent]:
         """Parse natural language using AI models"""
         # First, try pattern matching for common intents
-        for intent_type, patterns in self.intent_patterns.items():
-            for pattern in patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    return await self._handle_pattern_match(intent_type, match, text)
-        
-        # If no pattern matches, use AI for intent classification
+        matched = self.intent_matcher.match(text)
+        if matched:
+            return await self._handle_pattern_match(*matched, text)
+        
+        # Then messages we have already classified
+        cached = self.intent_cache.get(text)
+        if cached:
+            return await self._route_classification(cached, text)
+        
+        # Then the local classifier trained on earlier AI classifications
+        prediction = self.local_classifier.predict(text)
+        if prediction:
+            intent_type, confidence = prediction
+            if intent_type in self.LOCAL_INTENTS and confidence >= self.local_confidence_threshold:
+                result = {"intent": intent_type, "confidence": confidence, "parameters": {}, "suggested_action": ""}
+                self.intent_cache.put(text, result)
+                return await self._route_classification(result, text)
+        
+        # If nothing local is confident, use AI for intent classification
         return await self._classify_with_ai(text)
     
-    async def _handle_pattern_match(self, intent_type: str, match, text: str) -> Tuple[str, ParsedIntent]:
+    async def _handle_pattern_match(
+        self, intent_type: str, groups: Tuple[Optional[str], ...], text: str
+    ) -> Tuple[str, ParsedIntent]:
         """Handle pattern-matched intents"""
-        groups = match.groups()
         
         if intent_type == "deploy":
             service = groups[0] if groups else "unknown"
@@ -244,6 +276,7 @@ class SOPHIAChatOpsRouter:
             raw_text=text
         )
     
+    @traced("chatops.classify_with_ai")
     async def _classify_with_ai(self, text: str) -> Tuple[str, ParsedIntent]:
         """Use AI model to classify intent"""
         try:
@@ -283,22 +316,15 @@ Respond with JSON:
             # Parse AI response
             try:
                 result = json.loads(response.strip())
+                self.intent_cache.put(text, result)
                 intent_type = result.get("intent", "unclear")
-                confidence = result.get("confidence", 0.5)
-                parameters = result.get("parameters", {})
-                suggested_action = result.get("suggested_action", "")
-                
-                if intent_type == "unclear" or confidence < 0.6:
-                    return "clarification", ParsedIntent(
-                        intent_type="unclear",
-                        action="clarify",
-                        parameters={"suggestion": suggested_action},
-                        confidence=confidence,
-                        raw_text=text
-                    )
+                if intent_type != "unclear" and result.get("confidence", 0.5) >= 0.6:
+                    # Log the label so similar phrasings can be routed locally next time;
+                    # the model is refitted in the background, never while the user waits
+                    if self.local_classifier.add_example(text, intent_type):
+                        self.local_classifier.schedule_retrain()
                 
-                # Create execution plan based on classified intent
-                return await self._create_plan_from_intent(intent_type, parameters, text)
+                return await self._route_classification(result, text)
                 
             except json.JSONDecodeError:
                 logger.warning(f"Failed to parse AI intent classification: {response}")
@@ -320,6 +346,23 @@ Respond with JSON:
                 raw_text=text
             )
     
+    async def _route_classification(self, result: Dict[str, Any], text: str) -> Tuple[str, ParsedIntent]:
+        """Turn a classification result into a clarification request or a plan"""
+        intent_type = result.get("intent", "unclear")
+        confidence = result.get("confidence", 0.5)
+        
+        if intent_type == "unclear" or confidence < 0.6:
+            return "clarification", ParsedIntent(
+                intent_type="unclear",
+                action="clarify",
+                parameters={"suggestion": result.get("suggested_action", "")},
+                confidence=confidence,
+                raw_text=text
+            )
+        
+        # Create execution plan based on classified intent
+        return await self._create_plan_from_intent(intent_type, result.get("parameters", {}), text)
+    
     async def _create_plan_from_intent(self, intent_type: str, parameters: Dict, text: str) -> Tuple[str, ParsedIntent]:
         """Create execution plan from classified intent"""
         if intent_type == "deploy":
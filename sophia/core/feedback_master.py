@@ -4,8 +4,10 @@ Collects and manages user and agent feedback for continuous learning.
 """
 
 import os
+import io
+import csv
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, AsyncIterator
 import asyncio
 from datetime import datetime, timezone
 import asyncpg
@@ -16,6 +18,31 @@ from .api_manager import SOPHIAAPIManager
 
 logger = logging.getLogger(__name__)
 
+# Keyword-based issue detection for feedback comments
+ISSUE_KEYWORDS = {
+    "slow": "Performance issues",
+    "error": "Error handling",
+    "confusing": "User experience",
+    "wrong": "Accuracy issues",
+    "incomplete": "Completeness issues",
+    "timeout": "Timeout issues",
+    "crash": "Stability issues"
+}
+
+# Redis list holding the most recent feedback items
+RECENT_FEEDBACK_KEY = "sophia:feedback:recent"
+RECENT_FEEDBACK_LIMIT = 100
+
+def count_issues(comments: List[str]) -> Dict[str, int]:
+    """Count comments mentioning each issue type."""
+    issue_counts: Dict[str, int] = {}
+    for comment in comments:
+        comment_lower = comment.lower()
+        for keyword, issue_type in ISSUE_KEYWORDS.items():
+            if keyword in comment_lower:
+                issue_counts[issue_type] = issue_counts.get(issue_type, 0) + 1
+    return issue_counts
+
 @dataclass
 class FeedbackRecord:
     """Feedback record data structure."""
@@ -100,14 +127,245 @@ class SOPHIAFeedbackMaster:
                     CREATE INDEX IF NOT EXISTS idx_feedback_source ON feedback(source);
                     CREATE INDEX IF NOT EXISTS idx_feedback_rating ON feedback(rating);
                     CREATE INDEX IF NOT EXISTS idx_feedback_timestamp ON feedback(timestamp);
+                    CREATE INDEX IF NOT EXISTS idx_feedback_timestamp_source ON feedback(timestamp, source);
+                """)
+                
+                # Daily rollups, maintained on insert, back aggregate_feedback
+                await conn.execute("""
+                    CREATE TABLE IF NOT EXISTS feedback_daily (
+                        day DATE NOT NULL,
+                        source VARCHAR(50) NOT NULL,
+                        total INTEGER NOT NULL DEFAULT 0,
+                        rating_count INTEGER NOT NULL DEFAULT 0,
+                        rating_sum BIGINT NOT NULL DEFAULT 0,
+                        r1 INTEGER NOT NULL DEFAULT 0,
+                        r2 INTEGER NOT NULL DEFAULT 0,
+                        r3 INTEGER NOT NULL DEFAULT 0,
+                        r4 INTEGER NOT NULL DEFAULT 0,
+                        r5 INTEGER NOT NULL DEFAULT 0,
+                        PRIMARY KEY (day, source)
+                    );
+                    CREATE TABLE IF NOT EXISTS feedback_daily_issues (
+                        day DATE NOT NULL,
+                        source VARCHAR(50) NOT NULL,
+                        issue VARCHAR(64) NOT NULL,
+                        count INTEGER NOT NULL DEFAULT 0,
+                        PRIMARY KEY (day, source, issue)
+                    );
                 """)
                 
-                logger.info("Feedback table and indexes ensured")
+                # Backfill rollups the first time they are created over existing feedback
+                needs_backfill = await conn.fetchval("""
+                    SELECT NOT EXISTS (SELECT 1 FROM feedback_daily) AND EXISTS (SELECT 1 FROM feedback)
+                """)
+                if needs_backfill:
+                    await self._rebuild_daily_rollups(conn)
+                
+                logger.info("Feedback table, indexes and rollups ensured")
                 
         except Exception as e:
             logger.error(f"Failed to ensure feedback table: {e}")
             raise
     
+    async def _apply_rollups(self, conn: asyncpg.Connection, records: List[FeedbackRecord]):
+        """Add newly inserted feedback records to the daily rollup tables."""
+        daily: Dict[Tuple[Any, str], List[int]] = {}
+        issues: Dict[Tuple[Any, str, str], int] = {}
+        for record in records:
+            key = (record.timestamp.astimezone(timezone.utc).date(), record.source)
+            counts = daily.setdefault(key, [0] * 8)
+            counts[0] += 1
+            if record.rating:
+                counts[1] += 1
+                counts[2] += record.rating
+                counts[2 + record.rating] += 1
+            for issue, count in count_issues([record.comments] if record.comments else []).items():
+                issues[key + (issue,)] = issues.get(key + (issue,), 0) + count
+        
+        await conn.executemany("""
+            INSERT INTO feedback_daily (day, source, total, rating_count, rating_sum, r1, r2, r3, r4, r5)
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+            ON CONFLICT (day, source) DO UPDATE SET
+                total = feedback_daily.total + EXCLUDED.total,
+                rating_count = feedback_daily.rating_count + EXCLUDED.rating_count,
+                rating_sum = feedback_daily.rating_sum + EXCLUDED.rating_sum,
+                r1 = feedback_daily.r1 + EXCLUDED.r1,
+                r2 = feedback_daily.r2 + EXCLUDED.r2,
+                r3 = feedback_daily.r3 + EXCLUDED.r3,
+                r4 = feedback_daily.r4 + EXCLUDED.r4,
+                r5 = feedback_daily.r5 + EXCLUDED.r5
+        """, [key + tuple(counts) for key, counts in daily.items()])
+        
+        if issues:
+            await conn.executemany("""
+                INSERT INTO feedback_daily_issues (day, source, issue, count)
+                VALUES ($1, $2, $3, $4)
+                ON CONFLICT (day, source, issue) DO UPDATE SET count = feedback_daily_issues.count + EXCLUDED.count
+            """, [key + (count,) for key, count in issues.items()])
+    
+    async def _insert_feedback(
+        self,
+        conn: asyncpg.Connection,
+        task_id: str,
+        source: str,
+        rating: Optional[int] = None,
+        comments: Optional[str] = None,
+        outcome: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        timestamp: Optional[datetime] = None
+    ) -> int:
+        """Insert one feedback row and update its daily rollup in the same transaction."""
+        timestamp = timestamp or datetime.now(timezone.utc)
+        async with conn.transaction():
+            feedback_id = await conn.fetchval("""
+                INSERT INTO feedback (task_id, source, rating, comments, outcome, metadata, timestamp)
+                VALUES ($1, $2, $3, $4, $5, $6, $7)
+                RETURNING id
+            """, task_id, source, rating, comments, outcome, json.dumps(metadata) if metadata else None, timestamp)
+            
+            await self._apply_rollups(conn, [FeedbackRecord(
+                id=feedback_id, task_id=task_id, source=source, rating=rating,
+                comments=comments, outcome=outcome, timestamp=timestamp
+            )])
+        
+        return feedback_id
+    
+    @staticmethod
+    def _validate_feedback(record: FeedbackRecord) -> Optional[str]:
+        """Return a validation error for a feedback record, or None if it is valid."""
+        if not record.task_id:
+            return "task_id is required"
+        if record.source == "user":
+            if record.rating is None or not 1 <= record.rating <= 5:
+                return "Rating must be between 1 and 5"
+        elif record.source == "agent":
+            if not record.outcome:
+                return "outcome is required for agent feedback"
+        elif record.source != "system":
+            return f"Unknown feedback source: {record.source}"
+        return None
+    
+    async def record_feedback_batch(self, records: List[FeedbackRecord]) -> List[Dict[str, Any]]:
+        """
+        Record many feedback records in a single transaction.
+        
+        The batch is validated up front; valid records are written with one
+        COPY plus one rollup upsert per (day, source), and cached with a single
+        Redis pipeline. Invalid records are reported and skipped.
+        
+        Args:
+            records: Feedback records to store (id and timestamp are assigned here)
+            
+        Returns:
+            One status dict per input record, in input order
+        """
+        statuses: List[Dict[str, Any]] = []
+        valid: List[FeedbackRecord] = []
+        now = datetime.now(timezone.utc)
+        for index, record in enumerate(records):
+            error = self._validate_feedback(record)
+            status = {"index": index, "task_id": record.task_id, "source": record.source}
+            if error:
+                status.update(status="invalid", error=error)
+            else:
+                record.timestamp = record.timestamp or now
+                valid.append(record)
+                status["status"] = "recorded"
+            statuses.append(status)
+        
+        if not valid:
+            return statuses
+        
+        try:
+            pool = await self._get_db_pool()
+            async with pool.acquire() as conn:
+                async with conn.transaction():
+                    # COPY cannot return generated keys, so reserve them from the sequence first
+                    ids = await conn.fetch(
+                        "SELECT nextval(pg_get_serial_sequence('feedback', 'id')) FROM generate_series(1, $1)",
+                        len(valid)
+                    )
+                    for record, row in zip(valid, ids):
+                        record.id = row[0]
+                    
+                    await conn.copy_records_to_table(
+                        "feedback",
+                        columns=["id", "task_id", "source", "rating", "comments", "outcome", "metadata", "timestamp"],
+                        records=[
+                            (r.id, r.task_id, r.source, r.rating, r.comments, r.outcome,
+                             json.dumps(r.metadata) if r.metadata else None, r.timestamp)
+                            for r in valid
+                        ]
+                    )
+                    await self._apply_rollups(conn, valid)
+        except Exception as e:
+            logger.error(f"Failed to record feedback batch of {len(valid)}: {e}")
+            raise
+        
+        by_index = iter(valid)
+        for status in statuses:
+            if status["status"] == "recorded":
+                status["feedback_id"] = next(by_index).id
+        
+        await self._cache_feedback_batch([
+            {
+                "feedback_id": r.id,
+                "task_id": r.task_id,
+                "source": r.source,
+                "rating": r.rating,
+                "comments": r.comments,
+                "outcome": r.outcome,
+                "metadata": r.metadata,
+                "status": "recorded"
+            }
+            for r in valid
+        ])
+        
+        logger.info(f"Recorded feedback batch: {len(valid)} stored, {len(records) - len(valid)} invalid")
+        return statuses
+    
+    async def _rebuild_daily_rollups(self, conn: asyncpg.Connection, days: Optional[int] = None):
+        """Recompute daily rollups from the feedback table (all history, or the last N days)."""
+        since = "WHERE timestamp >= ((NOW() AT TIME ZONE 'UTC')::date - $1::int)::timestamp AT TIME ZONE 'UTC'" if days else ""
+        day_filter = "WHERE day >= (NOW() AT TIME ZONE 'UTC')::date - $1::int" if days else ""
+        params = [days] if days else []
+        keywords, issues = list(ISSUE_KEYWORDS), list(ISSUE_KEYWORDS.values())
+        
+        async with conn.transaction():
+            await conn.execute(f"DELETE FROM feedback_daily {day_filter}", *params)
+            await conn.execute(f"DELETE FROM feedback_daily_issues {day_filter}", *params)
+            await conn.execute(f"""
+                INSERT INTO feedback_daily (day, source, total, rating_count, rating_sum, r1, r2, r3, r4, r5)
+                SELECT (timestamp AT TIME ZONE 'UTC')::date, source, COUNT(*), COUNT(rating), COALESCE(SUM(rating), 0),
+                       COUNT(*) FILTER (WHERE rating = 1), COUNT(*) FILTER (WHERE rating = 2),
+                       COUNT(*) FILTER (WHERE rating = 3), COUNT(*) FILTER (WHERE rating = 4),
+                       COUNT(*) FILTER (WHERE rating = 5)
+                FROM feedback {since}
+                GROUP BY 1, 2
+            """, *params)
+            await conn.execute(f"""
+                INSERT INTO feedback_daily_issues (day, source, issue, count)
+                SELECT (timestamp AT TIME ZONE 'UTC')::date, source, k.issue, COUNT(*)
+                FROM feedback
+                JOIN unnest(${len(params) + 1}::text[], ${len(params) + 2}::text[]) AS k(keyword, issue)
+                    ON feedback.comments ILIKE '%' || k.keyword || '%'
+                {since}
+                GROUP BY 1, 2, 3
+            """, *params, keywords, issues)
+        
+        logger.info(f"Rebuilt feedback daily rollups ({f'last {days} days' if days else 'all history'})")
+    
+    async def rebuild_daily_rollups(self, days: Optional[int] = None):
+        """
+        Recompute the daily rollup tables from raw feedback.
+        
+        Only needed after rows are written to the feedback table without going
+        through this class.
+        """
+        pool = await self._get_db_pool()
+        async with pool.acquire() as conn:
+            await self._rebuild_daily_rollups(conn, days)
+    
     async def record_user_feedback(
         self,
         task_id: str,
@@ -133,11 +391,9 @@ class SOPHIAFeedbackMaster:
             
             pool = await self._get_db_pool()
             async with pool.acquire() as conn:
-                feedback_id = await conn.fetchval("""
-                    INSERT INTO feedback (task_id, source, rating, comments, metadata, timestamp)
-                    VALUES ($1, $2, $3, $4, $5, $6)
-                    RETURNING id
-                """, task_id, "user", rating, comments, json.dumps(metadata) if metadata else None, datetime.now(timezone.utc))
+                feedback_id = await self._insert_feedback(
+                    conn, task_id, "user", rating=rating, comments=comments, metadata=metadata
+                )
                 
                 result = {
                     "feedback_id": feedback_id,
@@ -180,11 +436,9 @@ class SOPHIAFeedbackMaster:
         try:
             pool = await self._get_db_pool()
             async with pool.acquire() as conn:
-                feedback_id = await conn.fetchval("""
-                    INSERT INTO feedback (task_id, source, outcome, metadata, timestamp)
-                    VALUES ($1, $2, $3, $4, $5)
-                    RETURNING id
-                """, task_id, "agent", outcome, json.dumps(metadata) if metadata else None, datetime.now(timezone.utc))
+                feedback_id = await self._insert_feedback(
+                    conn, task_id, "agent", outcome=outcome, metadata=metadata
+                )
                 
                 result = {
                     "feedback_id": feedback_id,
@@ -268,6 +522,61 @@ class SOPHIAFeedbackMaster:
             logger.error(f"Failed to retrieve feedback: {e}")
             raise
     
+    async def feedback_totals(
+        self,
+        start: float,
+        end: float,
+        source: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Feedback count, average rating, rating distribution and issue counts
+        for the UTC days touched by [start, end] (epoch seconds).
+        
+        Reads the daily rollup tables in a single query, so the cost depends on
+        the number of days and sources rather than the number of feedback rows.
+        """
+        first_day = datetime.fromtimestamp(start, timezone.utc).date()
+        last_day = datetime.fromtimestamp(end, timezone.utc).date()
+        try:
+            pool = await self._get_db_pool()
+            async with pool.acquire() as conn:
+                row = await conn.fetchrow("""
+                    WITH daily AS (
+                        SELECT
+                            COALESCE(SUM(total), 0) AS total,
+                            COALESCE(SUM(rating_count), 0) AS rating_count,
+                            COALESCE(SUM(rating_sum), 0) AS rating_sum,
+                            COALESCE(SUM(r1), 0) AS r1, COALESCE(SUM(r2), 0) AS r2,
+                            COALESCE(SUM(r3), 0) AS r3, COALESCE(SUM(r4), 0) AS r4,
+                            COALESCE(SUM(r5), 0) AS r5
+                        FROM feedback_daily
+                        WHERE day BETWEEN $1 AND $2
+                          AND ($3::text IS NULL OR source = $3)
+                    ),
+                    issues AS (
+                        SELECT json_object_agg(issue, count) AS counts
+                        FROM (
+                            SELECT issue, SUM(count) AS count
+                            FROM feedback_daily_issues
+                            WHERE day BETWEEN $1 AND $2
+                              AND ($3::text IS NULL OR source = $3)
+                            GROUP BY issue
+                        ) grouped
+                    )
+                    SELECT daily.*, issues.counts AS issue_counts FROM daily, issues
+                """, first_day, last_day, source)
+                
+                return {
+                    "total_feedback": row['total'],
+                    "average_rating": row['rating_sum'] / row['rating_count'] if row['rating_count'] else 0.0,
+                    "rating_distribution": {r: row[f'r{r}'] for r in range(1, 6) if row[f'r{r}']},
+                    "issue_counts": json.loads(row['issue_counts']) if row['issue_counts'] else {},
+                }
+                
+        except Exception as e:
+            logger.error(f"Failed to read feedback rollups: {e}")
+            raise
+    
     async def aggregate_feedback(
         self,
         days: int = 30,
@@ -277,76 +586,37 @@ class SOPHIAFeedbackMaster:
         Aggregate feedback metrics over a time period.
         
         Args:
-            days: Number of days to look back
+            days: Number of days to look back (including today)
             source: Filter by feedback source
             
         Returns:
             Aggregated feedback summary
         """
-        try:
-            pool = await self._get_db_pool()
-            async with pool.acquire() as conn:
-                # Base query conditions
-                query_conditions = "WHERE timestamp >= NOW() - INTERVAL '%s days'"
-                params = [days]
-                
-                if source:
-                    query_conditions += " AND source = $2"
-                    params.append(source)
-                
-                # Get total feedback count
-                total_query = f"SELECT COUNT(*) FROM feedback {query_conditions}"
-                total_feedback = await conn.fetchval(total_query, *params)
-                
-                # Get average rating (only for user feedback with ratings)
-                rating_query = f"""
-                    SELECT AVG(rating)::FLOAT, COUNT(rating)
-                    FROM feedback 
-                    {query_conditions} AND rating IS NOT NULL
-                """
-                rating_result = await conn.fetchrow(rating_query, *params)
-                average_rating = rating_result[0] or 0.0
-                
-                # Get rating distribution
-                distribution_query = f"""
-                    SELECT rating, COUNT(*) 
-                    FROM feedback 
-                    {query_conditions} AND rating IS NOT NULL
-                    GROUP BY rating
-                    ORDER BY rating
-                """
-                distribution_rows = await conn.fetch(distribution_query, *params)
-                rating_distribution = {row[0]: row[1] for row in distribution_rows}
-                
-                # Get common issues from comments (simple keyword analysis)
-                comments_query = f"""
-                    SELECT comments 
-                    FROM feedback 
-                    {query_conditions} AND comments IS NOT NULL AND comments != ''
-                """
-                comments_rows = await conn.fetch(comments_query, *params)
-                common_issues = self._extract_common_issues([row[0] for row in comments_rows])
-                
-                # Get improvement suggestions
-                improvement_suggestions = self._generate_improvement_suggestions(
-                    average_rating, rating_distribution, common_issues
-                )
-                
-                summary = FeedbackSummary(
-                    total_feedback=total_feedback,
-                    average_rating=average_rating,
-                    rating_distribution=rating_distribution,
-                    common_issues=common_issues,
-                    improvement_suggestions=improvement_suggestions,
-                    time_period=f"Last {days} days"
-                )
-                
-                logger.info(f"Generated feedback summary for {days} days: {total_feedback} records, avg rating {average_rating:.2f}")
-                return summary
-                
-        except Exception as e:
-            logger.error(f"Failed to aggregate feedback: {e}")
-            raise
+        now = datetime.now(timezone.utc).timestamp()
+        totals = await self.feedback_totals(now - (days - 1) * 86400, now, source)
+        
+        total_feedback = totals["total_feedback"]
+        average_rating = totals["average_rating"]
+        rating_distribution = totals["rating_distribution"]
+        issue_counts = totals["issue_counts"]
+        common_issues = sorted(issue_counts, key=lambda x: issue_counts[x], reverse=True)[:5]
+        
+        # Get improvement suggestions
+        improvement_suggestions = self._generate_improvement_suggestions(
+            average_rating, rating_distribution, common_issues
+        )
+        
+        summary = FeedbackSummary(
+            total_feedback=total_feedback,
+            average_rating=average_rating,
+            rating_distribution=rating_distribution,
+            common_issues=common_issues,
+            improvement_suggestions=improvement_suggestions,
+            time_period=f"Last {days} days"
+        )
+        
+        logger.info(f"Generated feedback summary for {days} days: {total_feedback} records, avg rating {average_rating:.2f}")
+        return summary
     
     async def get_task_feedback_summary(self, task_id: str) -> Dict[str, Any]:
         """
@@ -359,9 +629,24 @@ class SOPHIAFeedbackMaster:
             Task-specific feedback summary
         """
         try:
-            feedback_records = await self.get_feedback(task_id=task_id)
+            pool = await self._get_db_pool()
+            async with pool.acquire() as conn:
+                row = await conn.fetchrow("""
+                    SELECT
+                        COUNT(*) AS total,
+                        COUNT(*) FILTER (WHERE source = 'user') AS user_count,
+                        COUNT(*) FILTER (WHERE source = 'agent') AS agent_count,
+                        AVG(rating) FILTER (WHERE source = 'user')::FLOAT AS average_rating,
+                        MAX(timestamp) AS latest,
+                        array_agg(comments ORDER BY timestamp DESC)
+                            FILTER (WHERE source = 'user' AND comments IS NOT NULL AND comments != '') AS user_comments,
+                        array_agg(outcome ORDER BY timestamp DESC)
+                            FILTER (WHERE source = 'agent' AND outcome IS NOT NULL AND outcome != '') AS agent_outcomes
+                    FROM feedback
+                    WHERE task_id = $1
+                """, task_id)
             
-            if not feedback_records:
+            if not row or not row['total']:
                 return {
                     "task_id": task_id,
                     "total_feedback": 0,
@@ -370,22 +655,15 @@ class SOPHIAFeedbackMaster:
                     "average_rating": None
                 }
             
-            user_feedback = [r for r in feedback_records if r.source == "user"]
-            agent_feedback = [r for r in feedback_records if r.source == "agent"]
-            
-            # Calculate average rating from user feedback
-            ratings = [r.rating for r in user_feedback if r.rating is not None]
-            average_rating = sum(ratings) / len(ratings) if ratings else None
-            
             return {
                 "task_id": task_id,
-                "total_feedback": len(feedback_records),
-                "user_feedback": len(user_feedback),
-                "agent_feedback": len(agent_feedback),
-                "average_rating": average_rating,
-                "latest_feedback": feedback_records[0].timestamp if feedback_records else None,
-                "user_comments": [r.comments for r in user_feedback if r.comments],
-                "agent_outcomes": [r.outcome for r in agent_feedback if r.outcome]
+                "total_feedback": row['total'],
+                "user_feedback": row['user_count'],
+                "agent_feedback": row['agent_count'],
+                "average_rating": row['average_rating'],
+                "latest_feedback": row['latest'],
+                "user_comments": list(row['user_comments'] or []),
+                "agent_outcomes": list(row['agent_outcomes'] or [])
             }
             
         except Exception as e:
@@ -397,23 +675,7 @@ class SOPHIAFeedbackMaster:
         if not comments:
             return []
         
-        # Simple keyword-based issue detection
-        issue_keywords = {
-            "slow": "Performance issues",
-            "error": "Error handling",
-            "confusing": "User experience",
-            "wrong": "Accuracy issues",
-            "incomplete": "Completeness issues",
-            "timeout": "Timeout issues",
-            "crash": "Stability issues"
-        }
-        
-        issue_counts = {}
-        for comment in comments:
-            comment_lower = comment.lower()
-            for keyword, issue_type in issue_keywords.items():
-                if keyword in comment_lower:
-                    issue_counts[issue_type] = issue_counts.get(issue_type, 0) + 1
+        issue_counts = count_issues(comments)
         
         # Return top 5 most common issues
         return sorted(issue_counts.keys(), key=lambda x: issue_counts[x], reverse=True)[:5]
@@ -454,17 +716,133 @@ class SOPHIAFeedbackMaster:
     
     async def _cache_feedback(self, feedback: Dict[str, Any]):
         """Cache recent feedback in Redis for quick access."""
+        await self._cache_feedback_batch([feedback])
+    
+    async def _cache_feedback_batch(self, feedbacks: List[Dict[str, Any]]):
+        """Push feedback onto the recent-feedback list in one Redis round trip."""
         try:
-            if not self.redis_url:
+            if not self.redis_url or not feedbacks:
                 return
             
-            # Simple caching - store last 100 feedback items
-            # In production, you might want to use a proper Redis client
-            logger.debug(f"Would cache feedback {feedback['feedback_id']} in Redis")
+            if self.redis_client is None:
+                import redis.asyncio as redis
+                self.redis_client = redis.from_url(self.redis_url)
+            
+            # Keep the last RECENT_FEEDBACK_LIMIT feedback items
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.lpush(RECENT_FEEDBACK_KEY, *(json.dumps(f, default=str) for f in feedbacks))
+            pipe.ltrim(RECENT_FEEDBACK_KEY, 0, RECENT_FEEDBACK_LIMIT - 1)
+            await pipe.execute()
             
         except Exception as e:
             logger.warning(f"Failed to cache feedback: {e}")
     
+    async def iter_feedback(
+        self,
+        days: Optional[int] = None,
+        source: Optional[str] = None,
+        batch_size: int = 1000
+    ) -> AsyncIterator[List[FeedbackRecord]]:
+        """
+        Stream feedback records in ID order, one batch at a time.
+        
+        Uses keyset pagination on the primary key, so each batch is an index
+        range scan and memory stays bounded regardless of the export size.
+        
+        Args:
+            days: Only include feedback from the last N days
+            source: Filter by feedback source
+            batch_size: Number of records fetched per query
+        """
+        pool = await self._get_db_pool()
+        last_id = 0
+        while True:
+            async with pool.acquire() as conn:
+                rows = await conn.fetch("""
+                    SELECT id, task_id, source, rating, comments, outcome, metadata, timestamp
+                    FROM feedback
+                    WHERE id > $1
+                      AND ($2::int IS NULL OR timestamp >= NOW() - make_interval(days => $2::int))
+                      AND ($3::text IS NULL OR source = $3)
+                    ORDER BY id
+                    LIMIT $4
+                """, last_id, days, source, batch_size)
+            
+            if not rows:
+                return
+            
+            yield [
+                FeedbackRecord(
+                    id=row['id'],
+                    task_id=row['task_id'],
+                    source=row['source'],
+                    rating=row['rating'],
+                    comments=row['comments'],
+                    outcome=row['outcome'],
+                    metadata=json.loads(row['metadata']) if row['metadata'] else None,
+                    timestamp=row['timestamp']
+                )
+                for row in rows
+            ]
+            
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1]['id']
+    
+    @staticmethod
+    def _export_record(record: FeedbackRecord) -> Dict[str, Any]:
+        """Convert a feedback record to its export representation."""
+        return {
+            "id": record.id,
+            "task_id": record.task_id,
+            "source": record.source,
+            "rating": record.rating,
+            "comments": record.comments,
+            "outcome": record.outcome,
+            "metadata": record.metadata,
+            "timestamp": record.timestamp.isoformat() if record.timestamp else None
+        }
+    
+    async def stream_feedback_export(
+        self,
+        format: str = "jsonl",
+        days: int = 30,
+        batch_size: int = 1000
+    ) -> AsyncIterator[str]:
+        """
+        Stream feedback records as JSON Lines or CSV text chunks.
+        
+        Args:
+            format: Export format (jsonl, csv)
+            days: Number of days to export
+            batch_size: Number of records fetched and emitted per chunk
+            
+        Yields:
+            Text chunks ready to be written to a file or HTTP response
+        """
+        if format not in ("jsonl", "csv"):
+            raise ValueError(f"Unsupported streaming export format: {format}")
+        
+        fields = ["id", "task_id", "source", "rating", "comments", "outcome", "metadata", "timestamp"]
+        if format == "csv":
+            yield ",".join(fields) + "\r\n"
+        
+        exported = 0
+        async for batch in self.iter_feedback(days=days, batch_size=batch_size):
+            records = [self._export_record(record) for record in batch]
+            if format == "jsonl":
+                yield "".join(json.dumps(record) + "\n" for record in records)
+            else:
+                buffer = io.StringIO()
+                writer = csv.DictWriter(buffer, fieldnames=fields)
+                for record in records:
+                    record["metadata"] = json.dumps(record["metadata"]) if record["metadata"] else ""
+                    writer.writerow(record)
+                yield buffer.getvalue()
+            exported += len(records)
+        
+        logger.info(f"Streamed {exported} feedback records as {format}")
+    
     async def export_feedback_data(
         self,
         format: str = "json",
@@ -473,6 +851,9 @@ class SOPHIAFeedbackMaster:
         """
         Export feedback data for analysis.
         
+        Builds the whole export in memory; use stream_feedback_export for
+        large time ranges.
+        
         Args:
             format: Export format (json, csv)
             days: Number of days to export
@@ -481,7 +862,6 @@ class SOPHIAFeedbackMaster:
             Exported feedback data
         """
         try:
-            feedback_records = await self.get_feedback(limit=10000)  # Large limit for export
             summary = await self.aggregate_feedback(days=days)
             
             export_data = {
@@ -497,19 +877,10 @@ class SOPHIAFeedbackMaster:
                 "records": []
             }
             
-            for record in feedback_records:
-                export_data["records"].append({
-                    "id": record.id,
-                    "task_id": record.task_id,
-                    "source": record.source,
-                    "rating": record.rating,
-                    "comments": record.comments,
-                    "outcome": record.outcome,
-                    "metadata": record.metadata,
-                    "timestamp": record.timestamp.isoformat() if record.timestamp else None
-                })
+            async for batch in self.iter_feedback(days=days):
+                export_data["records"].extend(self._export_record(record) for record in batch)
             
-            logger.info(f"Exported {len(feedback_records)} feedback records")
+            logger.info(f"Exported {len(export_data['records'])} feedback records")
             return export_data
             
         except Exception as e:
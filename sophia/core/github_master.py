@@ -5,15 +5,31 @@ Uses personal access token stored in the environment (GITHUB_TOKEN).
 """
 
 import os
+import time
+import asyncio
 import logging
 import base64
-from dataclasses import dataclass
-from typing import Optional, Dict, List, Any
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional, Dict, List, Any, Tuple
 
+import httpx
 import requests
 
 logger = logging.getLogger(__name__)
 
+# Files at or below this size are sent inline in the create-tree call instead of
+# getting their own blob request.
+INLINE_CONTENT_LIMIT = 32 * 1024
+
+# Below this many remaining requests, bulk commits fall back to one blob at a time.
+RATE_LIMIT_RESERVE = 100
+
+# Longest we will sleep waiting for a primary or secondary rate limit to reset.
+MAX_RATE_LIMIT_WAIT = 60.0
+
+ETAG_CACHE_SIZE = 256
+
 @dataclass
 class GitHubRepoInfo:
     """Information about a GitHub repository."""
@@ -40,6 +56,16 @@ class GitHubPRInfo:
     head_branch: str
     base_branch: str
 
+@dataclass
+class GitHubBulkCommitResult:
+    """Result of a bulk commit made through the git data API."""
+    commit_sha: str
+    tree_sha: str
+    files_committed: int
+    blobs_created: int
+    files_inlined: int
+    rate_limit: Dict[str, Any] = field(default_factory=dict)
+
 class SOPHIAGitHubMaster:
     """
     Manages GitHub operations: branch creation, commits, pushes, PRs.
@@ -75,6 +101,11 @@ class SOPHIAGitHubMaster:
             "X-GitHub-Api-Version": "2022-11-28"
         }
         
+        # Last rate-limit state seen on any response
+        self.rate_limit: Dict[str, Optional[int]] = {"limit": None, "remaining": None, "reset": None, "used": None}
+        # url -> (etag, parsed body) for conditional GETs
+        self._etag_cache: "OrderedDict[str, Tuple[str, Any]]" = OrderedDict()
+        
         logger.info(f"Initialized GitHub master for {repo_info.owner}/{repo_info.repo}")
 
     def get_repository_info(self) -> Dict[str, Any]:
@@ -360,10 +391,7 @@ class SOPHIAGitHubMaster:
         try:
             url = f"{self.api_base}/repos/{self.repo_info.owner}/{self.repo_info.repo}/branches"
             
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            
-            branches = [branch["name"] for branch in response.json()]
+            branches = [branch["name"] for branch in self._conditional_get(url)]
             logger.info(f"Retrieved {len(branches)} branches")
             return branches
             
@@ -460,10 +488,7 @@ class SOPHIAGitHubMaster:
             url = f"{self.api_base}/repos/{self.repo_info.owner}/{self.repo_info.repo}/contents/{file_path}"
             params = {"ref": branch}
             
-            response = requests.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
-            
-            file_data = response.json()
+            file_data = self._conditional_get(url, params=params)
             if file_data["encoding"] == "base64":
                 content = base64.b64decode(file_data["content"]).decode("utf-8")
             else:
@@ -493,6 +518,9 @@ class SOPHIAGitHubMaster:
             response.raise_for_status()
             
             rate_limit_data = response.json()
+            self.rate_limit.update({
+                key: rate_limit_data["rate"].get(key) for key in ("limit", "remaining", "reset", "used")
+            })
             return {
                 "limit": rate_limit_data["rate"]["limit"],
                 "remaining": rate_limit_data["rate"]["remaining"],
@@ -504,3 +532,232 @@ class SOPHIAGitHubMaster:
             logger.error(f"Failed to check rate limit: {e}")
             raise
 
+    # ------------------------------------------------------------------
+    # Rate limits and conditional requests
+    # ------------------------------------------------------------------
+
+    def _record_rate_limit(self, headers) -> None:
+        """Update the last-seen rate-limit state from response headers."""
+        for key in ("limit", "remaining", "reset", "used"):
+            value = headers.get(f"X-RateLimit-{key.capitalize()}")
+            if value is None:
+                continue
+            try:
+                self.rate_limit[key] = int(value)
+            except (TypeError, ValueError):
+                pass
+
+    def rate_limit_headroom(self) -> Dict[str, Any]:
+        """
+        Return the rate-limit state from the most recent response, without an API call.
+        
+        Returns:
+            Dictionary with limit, remaining, used, reset and reset_in (seconds)
+        """
+        headroom = dict(self.rate_limit)
+        reset = headroom.get("reset")
+        headroom["reset_in"] = max(0, int(reset - time.time())) if reset else None
+        return headroom
+
+    def _log_rate_limit(self, stage: str) -> Dict[str, Any]:
+        headroom = self.rate_limit_headroom()
+        if headroom["remaining"] is not None:
+            logger.info(
+                f"GitHub rate limit after {stage}: {headroom['remaining']}/{headroom['limit']} remaining, "
+                f"resets in {headroom['reset_in']}s"
+            )
+        return headroom
+
+    def _conditional_get(self, url: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        GET a resource with If-None-Match, reusing the cached body on 304.
+        
+        Conditional requests answered with 304 do not count against the
+        GitHub rate limit, so repeated reads of unchanged files and branch
+        lists are effectively free.
+        """
+        cache_key = url if not params else f"{url}?{sorted(params.items())}"
+        cached = self._etag_cache.get(cache_key)
+        headers = dict(self.headers)
+        if cached:
+            headers["If-None-Match"] = cached[0]
+
+        response = requests.get(url, headers=headers, params=params)
+        self._record_rate_limit(response.headers)
+        if cached and response.status_code == 304:
+            self._etag_cache.move_to_end(cache_key)
+            return cached[1]
+        response.raise_for_status()
+
+        data = response.json()
+        etag = response.headers.get("ETag")
+        if etag:
+            self._etag_cache[cache_key] = (etag, data)
+            self._etag_cache.move_to_end(cache_key)
+            while len(self._etag_cache) > ETAG_CACHE_SIZE:
+                self._etag_cache.popitem(last=False)
+        return data
+
+    def _retry_delay(self, response: httpx.Response) -> Optional[float]:
+        """Seconds to wait before retrying a rate-limited response, or None if it is not one."""
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), MAX_RATE_LIMIT_WAIT)
+            except ValueError:
+                return None
+        if response.headers.get("X-RateLimit-Remaining") == "0":
+            reset = int(response.headers.get("X-RateLimit-Reset", "0") or 0)
+            return min(max(reset - time.time(), 1.0), MAX_RATE_LIMIT_WAIT)
+        return None
+
+    async def _request_async(
+        self, client: httpx.AsyncClient, method: str, url: str, max_retries: int = 3, **kwargs
+    ) -> httpx.Response:
+        """Send a request, waiting out primary/secondary rate limits before retrying."""
+        for attempt in range(max_retries + 1):
+            response = await client.request(method, url, headers=self.headers, **kwargs)
+            self._record_rate_limit(response.headers)
+            if response.status_code in (403, 429) and attempt < max_retries:
+                delay = self._retry_delay(response)
+                if delay is not None:
+                    logger.warning(f"GitHub rate limited {method} {url}; retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                    continue
+            response.raise_for_status()
+            return response
+        raise RuntimeError("unreachable")
+
+    def _blob_concurrency(self, max_concurrency: int, pending: int) -> int:
+        remaining = self.rate_limit.get("remaining")
+        if remaining is None:
+            return max_concurrency
+        if remaining < pending + RATE_LIMIT_RESERVE:
+            logger.warning(
+                f"Only {remaining} GitHub requests left for {pending} blobs; creating them one at a time"
+            )
+            return 1
+        return max_concurrency
+
+    # ------------------------------------------------------------------
+    # Bulk commits
+    # ------------------------------------------------------------------
+
+    async def commit_files_async(
+        self,
+        branch_name: str,
+        files: Dict[str, str],
+        commit_message: str,
+        author_name: str = "SOPHIA AI",
+        author_email: str = "sophia@ai-cherry.com",
+        max_concurrency: int = 8,
+        inline_limit: int = INLINE_CONTENT_LIMIT,
+        client: Optional[httpx.AsyncClient] = None,
+    ) -> GitHubBulkCommitResult:
+        """
+        Commit many files to a branch with as few serial round trips as possible.
+        
+        Files up to ``inline_limit`` bytes are embedded in the create-tree call;
+        larger files get blobs created concurrently, bounded by a semaphore that
+        shrinks to one when rate-limit headroom is low. The ref and base commit
+        lookups, tree, commit and ref update remain sequential because each
+        depends on the previous one.
+        
+        Args:
+            branch_name: Name of the branch to commit to
+            files: Mapping of file paths to their new content (string)
+            commit_message: Commit message
+            author_name: Name of the commit author
+            author_email: Email of the commit author
+            max_concurrency: Maximum number of concurrent blob requests
+            inline_limit: Largest file size in bytes sent inline in the tree
+            client: Optional httpx client to reuse
+            
+        Returns:
+            GitHubBulkCommitResult with the new commit SHA and rate-limit headroom
+            
+        Raises:
+            httpx.HTTPStatusError: If API call fails
+        """
+        repo_url = f"{self.api_base}/repos/{self.repo_info.owner}/{self.repo_info.repo}"
+        owns_client = client is None
+        if owns_client:
+            client = httpx.AsyncClient(timeout=30.0)
+
+        try:
+            # Step 1: Resolve the branch head and its tree
+            ref_resp = await self._request_async(client, "GET", f"{repo_url}/git/ref/heads/{branch_name}")
+            commit_sha = ref_resp.json()["object"]["sha"]
+            commit_resp = await self._request_async(client, "GET", f"{repo_url}/git/commits/{commit_sha}")
+            base_tree_sha = commit_resp.json()["tree"]["sha"]
+
+            # Step 2: Inline small files, create blobs for the rest concurrently
+            tree_items: List[Dict[str, Any]] = []
+            large_files: Dict[str, str] = {}
+            for path, content in files.items():
+                if len(content.encode("utf-8")) <= inline_limit:
+                    tree_items.append({"path": path, "mode": "100644", "type": "blob", "content": content})
+                else:
+                    large_files[path] = content
+
+            if large_files:
+                semaphore = asyncio.Semaphore(self._blob_concurrency(max_concurrency, len(large_files)))
+
+                async def create_blob(path: str, content: str) -> Dict[str, Any]:
+                    async with semaphore:
+                        blob_resp = await self._request_async(
+                            client, "POST", f"{repo_url}/git/blobs",
+                            json={"content": content, "encoding": "utf-8"},
+                        )
+                    return {"path": path, "mode": "100644", "type": "blob", "sha": blob_resp.json()["sha"]}
+
+                tree_items.extend(await asyncio.gather(*(
+                    create_blob(path, content) for path, content in large_files.items()
+                )))
+                logger.info(f"Created {len(large_files)} blobs for {branch_name}")
+                self._log_rate_limit("blob batch")
+
+            # Step 3: Tree, commit and ref update
+            tree_resp = await self._request_async(
+                client, "POST", f"{repo_url}/git/trees",
+                json={"base_tree": base_tree_sha, "tree": tree_items},
+            )
+            new_tree_sha = tree_resp.json()["sha"]
+
+            signature = {"name": author_name, "email": author_email}
+            new_commit_resp = await self._request_async(
+                client, "POST", f"{repo_url}/git/commits",
+                json={
+                    "message": commit_message,
+                    "tree": new_tree_sha,
+                    "parents": [commit_sha],
+                    "author": signature,
+                    "committer": signature,
+                },
+            )
+            new_commit_sha = new_commit_resp.json()["sha"]
+
+            await self._request_async(
+                client, "PATCH", f"{repo_url}/git/refs/heads/{branch_name}",
+                json={"sha": new_commit_sha, "force": False},
+            )
+
+            logger.info(
+                f"Pushed commit {new_commit_sha} to {branch_name} "
+                f"({len(files)} files, {len(large_files)} blobs, {len(files) - len(large_files)} inlined)"
+            )
+            return GitHubBulkCommitResult(
+                commit_sha=new_commit_sha,
+                tree_sha=new_tree_sha,
+                files_committed=len(files),
+                blobs_created=len(large_files),
+                files_inlined=len(files) - len(large_files),
+                rate_limit=self._log_rate_limit("commit"),
+            )
+
+        except httpx.HTTPError as e:
+            logger.error(f"Failed to bulk commit to {branch_name}: {e}")
+            raise
+        finally:
+            if owns_client:
+                await client.aclose()
@@ -0,0 +1,241 @@
+"""
+SOPHIA Gong Ingestion
+Streams every Gong call in a date range into memory, following the API cursor
+and checkpointing progress so interrupted or scheduled runs pick up where the
+last one stopped.
+"""
+
+import os
+import json
+import asyncio
+import logging
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timezone, timedelta
+from typing import Dict, List, Optional, Any
+
+from ..integrations.gong_client import GongClient, GongCall
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_call(call: GongCall) -> Dict[str, Any]:
+    """Normalize a Gong call for memory storage"""
+    record = {
+        "id": call.call_id,
+        "title": call.title,
+        "started": call.started.isoformat(),
+        "duration": call.duration,
+        "participants": call.participants,
+        "url": call.url,
+        "source": "gong",
+        "type": "call_record"
+    }
+    if call.transcript:
+        record["transcript"] = call.transcript
+    return record
+
+
+def _isoformat(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _parse(value: str) -> datetime:
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def _later(first: Optional[str], second: str) -> str:
+    """The later of two ISO timestamps (first may be unset)."""
+    if first is None or _parse(second) > _parse(first):
+        return second
+    return first
+
+
+@dataclass
+class IngestionCheckpoint:
+    """Progress of the Gong ingestion job."""
+    high_water_mark: Optional[str] = None  # latest `until` of a completed incremental run
+    since: Optional[str] = None  # window of the in-progress run
+    until: Optional[str] = None
+    cursor: Optional[str] = None  # next page of the in-progress run
+    ingested_total: int = 0
+    updated_at: Optional[str] = None
+
+
+class FileCheckpointStore:
+    """Keeps the checkpoint in a JSON file, replaced atomically on every save."""
+
+    def __init__(self, path: str = "gong_ingest_checkpoint.json"):
+        self.path = path
+
+    def _load(self) -> IngestionCheckpoint:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return IngestionCheckpoint(**json.load(f))
+        except FileNotFoundError:
+            return IngestionCheckpoint()
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable Gong checkpoint {self.path}: {e}")
+            return IngestionCheckpoint()
+
+    def _save(self, checkpoint: IngestionCheckpoint) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(asdict(checkpoint), f)
+        os.replace(tmp_path, self.path)
+
+    async def load(self) -> IngestionCheckpoint:
+        return await asyncio.to_thread(self._load)
+
+    async def save(self, checkpoint: IngestionCheckpoint) -> None:
+        checkpoint.updated_at = datetime.now(timezone.utc).isoformat()
+        await asyncio.to_thread(self._save, checkpoint)
+
+
+@dataclass
+class IngestionResult:
+    """Outcome of one ingestion run."""
+    since: str
+    until: str
+    resumed: bool = False
+    pages: int = 0
+    calls_ingested: int = 0
+    transcripts_fetched: int = 0
+    transcript_failures: int = 0
+    batches_written: int = 0
+    records: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class GongIngestionPipeline:
+    """
+    Cursor-following Gong ingestion.
+
+    Pages are pulled one at a time, transcripts for each page are fetched
+    concurrently (bounded, and paced by the shared Gong rate limiter), and
+    records are written to memory in batches. The checkpoint cursor only
+    advances after every record of a batch is stored, so a crash or a failed
+    store re-reads at most one batch. Only incremental runs move the
+    high-water mark; backfills of older windows leave it alone.
+    """
+
+    def __init__(
+        self,
+        gong: GongClient,
+        memory,
+        checkpoint_store: Optional[FileCheckpointStore] = None,
+        batch_size: int = 50,
+        transcript_concurrency: int = 5,
+        include_transcripts: bool = True,
+        default_lookback_days: int = 7
+    ):
+        self.gong = gong
+        self.memory = memory
+        self.checkpoints = checkpoint_store or FileCheckpointStore(
+            os.getenv("GONG_INGEST_CHECKPOINT", "gong_ingest_checkpoint.json")
+        )
+        self.batch_size = batch_size
+        self.transcript_concurrency = transcript_concurrency
+        self.include_transcripts = include_transcripts
+        self.default_lookback_days = default_lookback_days
+
+    async def run(
+        self,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        incremental: bool = False,
+        collect: bool = False
+    ) -> IngestionResult:
+        """
+        Ingest all calls in a window.
+
+        Args:
+            since: Window start (ISO format); required unless incremental
+            until: Window end (ISO format); defaults to now
+            incremental: Start from the last completed run's high-water mark, or
+                resume an interrupted run from its saved cursor; only incremental
+                runs advance the high-water mark
+            collect: Also return every normalized record in the result
+
+        Returns:
+            IngestionResult with counts (and records when collect=True)
+        """
+        checkpoint = await self.checkpoints.load()
+        cursor = None
+
+        if incremental and checkpoint.cursor and checkpoint.since:
+            since, until, cursor = checkpoint.since, checkpoint.until, checkpoint.cursor
+        elif incremental:
+            since = checkpoint.high_water_mark or _isoformat(
+                datetime.now(timezone.utc) - timedelta(days=self.default_lookback_days)
+            )
+        elif since is None:
+            raise ValueError("since is required unless incremental=True")
+
+        until = until or _isoformat(datetime.now(timezone.utc))
+        if not cursor and checkpoint.cursor and (checkpoint.since, checkpoint.until) == (since, until):
+            cursor = checkpoint.cursor
+
+        result = IngestionResult(since=since, until=until, resumed=cursor is not None)
+        if result.resumed:
+            logger.info(f"Resuming Gong ingestion {since} → {until} from saved cursor")
+
+        checkpoint.since, checkpoint.until, checkpoint.cursor = since, until, cursor
+        seen = set()
+        buffer: List[Dict[str, Any]] = []
+
+        async for calls, next_cursor in self.gong.iter_calls(since, until, cursor=cursor):
+            result.pages += 1
+            calls = [call for call in calls if call.call_id not in seen]
+            seen.update(call.call_id for call in calls)
+
+            if self.include_transcripts:
+                await self._attach_transcripts(calls, result)
+            buffer.extend(normalize_call(call) for call in calls)
+
+            if len(buffer) >= self.batch_size:
+                await self._write_batch(buffer, result, collect)
+                checkpoint.ingested_total += len(buffer)
+                checkpoint.cursor = next_cursor
+                await self.checkpoints.save(checkpoint)
+                buffer = []
+
+        if buffer:
+            await self._write_batch(buffer, result, collect)
+            checkpoint.ingested_total += len(buffer)
+
+        if incremental:
+            checkpoint.high_water_mark = _later(checkpoint.high_water_mark, until)
+        checkpoint.since = checkpoint.until = checkpoint.cursor = None
+        await self.checkpoints.save(checkpoint)
+
+        logger.info(
+            f"Ingested {result.calls_ingested} Gong calls from {result.pages} pages "
+            f"in {result.batches_written} batches ({since} → {until})"
+        )
+        return result
+
+    async def _attach_transcripts(self, calls: List[GongCall], result: IngestionResult) -> None:
+        semaphore = asyncio.Semaphore(self.transcript_concurrency)
+
+        async def fetch(call: GongCall) -> None:
+            async with semaphore:
+                call.transcript = await self.gong.get_transcript(call.call_id)
+            if call.transcript is None:
+                result.transcript_failures += 1
+            else:
+                result.transcripts_fetched += 1
+
+        await asyncio.gather(*(fetch(call) for call in calls))
+
+    async def _write_batch(self, records: List[Dict[str, Any]], result: IngestionResult, collect: bool) -> None:
+        stored = await self.memory.store_business_artifacts("gong_calls", records)
+        if stored.get("failed"):
+            # stop before the checkpoint moves past this batch; the next run re-reads it
+            raise RuntimeError(
+                f"Failed to store {stored['failed']}/{len(records)} Gong calls; "
+                f"checkpoint left at the last fully stored batch"
+            )
+        result.calls_ingested += len(records)
+        result.batches_written += 1
+        if collect:
+            result.records.extend(records)
@@ -0,0 +1,337 @@
+"""
+Intent Engine - fast local intent routing for the ChatOps router
+Compiled pattern matching, a normalized-text cache and a lightweight
+TF-IDF + softmax classifier trained from logged LLM classifications.
+Training runs off the request path, in a worker process.
+"""
+
+import os
+import re
+import json
+import math
+import asyncio
+import logging
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, List, Optional, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[a-z0-9']+")
+
+
+def normalize_text(text: str) -> str:
+    """Normalize a chat message for caching and classification (case, punctuation, spacing)."""
+    return " ".join(_TOKEN.findall(text.lower()))
+
+
+class CompiledIntentMatcher:
+    """
+    Matches text against many named regex patterns with a single compiled regex.
+
+    Patterns are combined into one alternation, one named group per pattern.
+    In search mode every alternative is prefixed with a lazy ``.*?`` so that
+    the regex engine tries the alternatives in declaration order, exactly like
+    looping over ``re.search`` calls, but in a single C-level match.
+    """
+
+    def __init__(self, patterns: Dict[str, List[str]], search: bool = True, flags: int = re.IGNORECASE):
+        self._slots: Dict[str, Tuple[str, int, int]] = {}
+        alternatives = []
+        group_index = 1
+        for slot, (name, pattern) in enumerate((n, p) for n, ps in patterns.items() for p in ps):
+            inner_groups = re.compile(pattern, flags).groups
+            key = f"p{slot}"
+            prefix = "(?s:.*?)" if search else ""
+            alternatives.append(f"{prefix}(?P<{key}>{pattern})")
+            self._slots[key] = (name, group_index + 1, inner_groups)
+            group_index += 1 + inner_groups
+        self._regex = re.compile("|".join(f"(?:{alt})" for alt in alternatives), flags)
+
+    def match(self, text: str) -> Optional[Tuple[str, Tuple[Optional[str], ...]]]:
+        """Return (name, groups) for the first matching pattern, or None."""
+        match = self._regex.match(text)
+        if not match:
+            return None
+        key = match.lastgroup if match.lastgroup in self._slots else next(
+            k for k in self._slots if match.group(k) is not None
+        )
+        name, first, count = self._slots[key]
+        return name, tuple(match.group(i) for i in range(first, first + count))
+
+
+class IntentCache:
+    """LRU cache of normalized text -> classified intent."""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text: str) -> Optional[Dict[str, Any]]:
+        key = normalize_text(text)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, text: str, result: Dict[str, Any]):
+        key = normalize_text(text)
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def _features(text: str) -> Counter:
+    """Unigram and bigram counts for a normalized message."""
+    tokens = normalize_text(text).split()
+    return Counter(tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])])
+
+
+def _vectorize(text: str, idf: Dict[str, float]) -> Dict[str, float]:
+    counts = _features(text)
+    vector = {term: (1 + math.log(count)) * idf[term] for term, count in counts.items() if term in idf}
+    norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+    return {term: v / norm for term, v in vector.items()}
+
+
+def _probabilities(
+    vector: Dict[str, float], weights: Dict[str, Dict[str, float]], bias: Dict[str, float]
+) -> Dict[str, float]:
+    scores = {
+        cls: bias[cls] + sum(class_weights.get(term, 0.0) * v for term, v in vector.items())
+        for cls, class_weights in weights.items()
+    }
+    top = max(scores.values())
+    exps = {cls: math.exp(s - top) for cls, s in scores.items()}
+    total = sum(exps.values())
+    return {cls: e / total for cls, e in exps.items()}
+
+
+def fit_intent_model(
+    examples: List[Tuple[str, str]],
+    epochs: int = 10,
+    learning_rate: float = 0.5,
+    l2: float = 1e-4
+) -> Dict[str, Any]:
+    """
+    Fit TF-IDF + multinomial logistic regression on (text, intent) pairs.
+
+    A pure function of its arguments so it can run in a worker process; the
+    returned model (idf, classes, weights, bias) is plain JSON-serializable data.
+    """
+    classes = sorted({intent for _, intent in examples})
+    doc_freq: Counter = Counter()
+    for text, _ in examples:
+        doc_freq.update(_features(text).keys())
+    n_docs = len(examples)
+    idf = {term: math.log((1 + n_docs) / (1 + df)) + 1 for term, df in doc_freq.items()}
+
+    weights: Dict[str, Dict[str, float]] = {cls: {} for cls in classes}
+    bias = {cls: 0.0 for cls in classes}
+    data = [(_vectorize(text, idf), intent) for text, intent in examples]
+    for epoch in range(epochs):
+        rate = learning_rate / (1 + epoch * 0.1)
+        for vector, intent in data:
+            probs = _probabilities(vector, weights, bias)
+            for cls in classes:
+                gradient = probs[cls] - (1.0 if cls == intent else 0.0)
+                class_weights = weights[cls]
+                for term, v in vector.items():
+                    w = class_weights.get(term, 0.0)
+                    class_weights[term] = w - rate * (gradient * v + l2 * w)
+                bias[cls] -= rate * gradient
+
+    return {"idf": idf, "classes": classes, "weights": weights, "bias": bias}
+
+
+_training_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_training_pool() -> ProcessPoolExecutor:
+    """Single worker process shared by all classifiers, so training never holds the event loop's GIL."""
+    global _training_pool
+    if _training_pool is None:
+        _training_pool = ProcessPoolExecutor(max_workers=1)
+    return _training_pool
+
+
+class LocalIntentClassifier:
+    """
+    TF-IDF + multinomial logistic regression intent classifier.
+
+    Trained from (text, intent) pairs logged from LLM classifications, so
+    phrasings the LLM has already seen are routed locally. The model is small
+    and dependency-free; prediction is a sparse dot product per class.
+
+    add_example only records the example (and appends it to log_path); once
+    retrain_every new examples have accumulated, schedule_retrain fits a new
+    model on the most recent train_examples in a worker process, at most once
+    per retrain_delay seconds. The fitted model is saved to model_path and
+    loaded at startup, so constructing a classifier never trains.
+    """
+
+    def __init__(
+        self,
+        log_path: Optional[str] = None,
+        model_path: Optional[str] = None,
+        min_examples: int = 20,
+        max_examples: int = 5000,
+        train_examples: int = 2000,
+        retrain_every: int = 10,
+        retrain_delay: float = 30.0,
+        epochs: int = 10,
+        learning_rate: float = 0.5,
+        l2: float = 1e-4,
+        executor: Optional[Executor] = None
+    ):
+        self.log_path = log_path
+        self.model_path = model_path or (f"{os.path.splitext(log_path)[0]}.model.json" if log_path else None)
+        self.min_examples = min_examples
+        self.max_examples = max_examples
+        self.train_examples = train_examples
+        self.retrain_every = retrain_every
+        self.retrain_delay = retrain_delay
+        self.epochs = epochs
+        self.learning_rate = learning_rate
+        self.l2 = l2
+        self.executor = executor
+        self.examples: List[Tuple[str, str]] = []
+        self.classes: List[str] = []
+        self.idf: Dict[str, float] = {}
+        self.weights: Dict[str, Dict[str, float]] = {}
+        self.bias: Dict[str, float] = {}
+        self._since_training = 0
+        self._lock = threading.Lock()
+        self._retrain_task: Optional[asyncio.Task] = None
+
+        if log_path and os.path.exists(log_path):
+            with open(log_path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self.examples.append((entry["text"], entry["intent"]))
+                    except (json.JSONDecodeError, KeyError):
+                        continue
+            self.examples = self.examples[-max_examples:]
+        self._load_model()
+
+    @property
+    def is_trained(self) -> bool:
+        return bool(self.weights)
+
+    @property
+    def needs_training(self) -> bool:
+        """Enough new examples have accumulated since the model was last fitted."""
+        with self._lock:
+            if not self.is_trained:
+                return len(self.examples) >= self.min_examples
+            return self._since_training >= self.retrain_every
+
+    def add_example(self, text: str, intent: str) -> bool:
+        """Record a labelled example; returns needs_training. Never trains."""
+        with self._lock:
+            self.examples.append((text, intent))
+            del self.examples[:-self.max_examples]
+            self._since_training += 1
+            if self.log_path:
+                try:
+                    with open(self.log_path, "a") as f:
+                        f.write(json.dumps({"text": text, "intent": intent}) + "\n")
+                except OSError as e:
+                    logger.warning(f"Failed to log intent example: {e}")
+        return self.needs_training
+
+    def _training_set(self) -> Optional[List[Tuple[str, str]]]:
+        with self._lock:
+            examples = self.examples[-self.train_examples:]
+            self._since_training = 0
+        if len(examples) < self.min_examples or len({intent for _, intent in examples}) < 2:
+            return None
+        return examples
+
+    def _install(self, model: Dict[str, Any], n_docs: int):
+        self.idf, self.classes, self.weights, self.bias = (
+            model["idf"], model["classes"], model["weights"], model["bias"]
+        )
+        logger.info(f"Trained local intent classifier on {n_docs} examples, {len(self.classes)} intents")
+        if self.model_path:
+            try:
+                tmp_path = f"{self.model_path}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(model, f)
+                os.replace(tmp_path, self.model_path)
+            except OSError as e:
+                logger.warning(f"Failed to save intent model: {e}")
+
+    def _load_model(self):
+        if not (self.model_path and os.path.exists(self.model_path)):
+            return
+        try:
+            with open(self.model_path) as f:
+                model = json.load(f)
+            self.idf, self.classes, self.weights, self.bias = (
+                model["idf"], model["classes"], model["weights"], model["bias"]
+            )
+        except (OSError, json.JSONDecodeError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable intent model {self.model_path}: {e}")
+
+    def train(self):
+        """Fit the model on the most recent examples in the calling thread."""
+        examples = self._training_set()
+        if examples:
+            self._install(fit_intent_model(examples, self.epochs, self.learning_rate, self.l2), len(examples))
+
+    async def retrain(self) -> bool:
+        """Fit the model in a worker process; predictions keep using the old model meanwhile."""
+        examples = self._training_set()
+        if not examples:
+            return False
+        loop = asyncio.get_running_loop()
+        model = await loop.run_in_executor(
+            self.executor or _get_training_pool(),
+            fit_intent_model, examples, self.epochs, self.learning_rate, self.l2
+        )
+        self._install(model, len(examples))
+        return True
+
+    def schedule_retrain(self) -> asyncio.Task:
+        """
+        Retrain in the background after retrain_delay seconds. Calls made while
+        a retrain is pending or running are coalesced into it; examples added
+        during training trigger one more pass.
+        """
+        if self._retrain_task is None or self._retrain_task.done():
+            self._retrain_task = asyncio.create_task(self._retrain_loop())
+        return self._retrain_task
+
+    async def _retrain_loop(self):
+        while True:
+            await asyncio.sleep(self.retrain_delay)
+            try:
+                trained = await self.retrain()
+            except Exception as e:
+                logger.warning(f"Intent classifier retrain failed: {e}")
+                return
+            if not trained or not self.needs_training:
+                return
+
+    def predict(self, text: str) -> Optional[Tuple[str, float]]:
+        """Return (intent, probability) for the most likely intent, or None if untrained."""
+        if not self.is_trained:
+            return None
+        vector = _vectorize(text, self.idf)
+        if not vector:
+            return None
+        probs = _probabilities(vector, self.weights, self.bias)
+        intent = max(probs, key=probs.get)
+        return intent, probs[intent]
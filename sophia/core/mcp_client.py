@@ -9,6 +9,8 @@ from typing import Dict, List, Optional, Any
 import httpx
 import asyncio
 
+from libs.tracing import TracingTransport
+
 logger = logging.getLogger(__name__)
 
 class SOPHIAMCPClient:
@@ -25,7 +27,8 @@ class SOPHIAMCPClient:
             base_url: Base URL of MCP server (defaults to MCP_SERVER_URL env var)
         """
         self.base_url = base_url or os.getenv("MCP_SERVER_URL", "http://localhost:8000")
-        self.client = httpx.AsyncClient(timeout=30.0)
+        # TracingTransport propagates trace context to the MCP servers
+        self.client = httpx.AsyncClient(timeout=30.0, transport=TracingTransport())
         
         logger.info(f"Initialized MCP client with base URL: {self.base_url}")
     
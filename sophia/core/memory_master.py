@@ -12,6 +12,8 @@ from datetime import datetime, timezone
 from .api_manager import SOPHIAAPIManager
 from .ultimate_model_router import UltimateModelRouter
 from .mcp_client import SOPHIAMCPClient
+from libs.retrieval import get_reranker
+from libs.tracing import traced
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +28,7 @@ class SOPHIAMemoryMaster:
         self.api_manager = SOPHIAAPIManager()
         self.model_router = UltimateModelRouter()
         self.mcp_client = None  # Will be initialized when needed
+        self.reranker = get_reranker()  # None when reranking is disabled or unavailable
         
         # Memory configuration
         self.default_collection = "default"
@@ -108,6 +111,51 @@ class SOPHIAMemoryMaster:
             logger.error(f"Knowledge storage failed: {e}")
             raise
     
+    async def store_business_artifacts(
+        self,
+        artifact_type: str,
+        records: List[Dict[str, Any]],
+        max_concurrency: int = 8
+    ) -> Dict[str, Any]:
+        """
+        Store a batch of business records (calls, tasks, pages) as knowledge.
+        
+        Records are stored concurrently with bounded parallelism; one failed
+        record is logged and counted rather than failing the whole batch.
+        
+        Args:
+            artifact_type: Record kind, e.g. "gong_calls" or "asana_tasks"
+            records: Flat dictionaries to store
+            max_concurrency: Maximum concurrent store operations
+            
+        Returns:
+            Counts of stored and failed records
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def store(record: Dict[str, Any]) -> Dict[str, Any]:
+            content = "\n".join(
+                f"{key}: {', '.join(map(str, value)) if isinstance(value, list) else value}"
+                for key, value in record.items()
+                if value not in (None, "", [], {})
+            )
+            metadata = {
+                key: value for key, value in record.items()
+                if isinstance(value, (str, int, float, bool)) and key not in ("transcript", "summary")
+            }
+            metadata["artifact_type"] = artifact_type
+            async with semaphore:
+                return await self.store_knowledge(content=content, knowledge_type="business", metadata=metadata)
+        
+        results = await asyncio.gather(*(store(record) for record in records), return_exceptions=True)
+        failed = [r for r in results if isinstance(r, Exception)]
+        if failed:
+            logger.error(f"Failed to store {len(failed)}/{len(records)} {artifact_type} records: {failed[0]}")
+        
+        logger.info(f"Stored {len(records) - len(failed)} {artifact_type} records")
+        return {"artifact_type": artifact_type, "stored": len(records) - len(failed), "failed": len(failed)}
+    
+    @traced("memory.retrieve_knowledge")
     async def retrieve_knowledge(
         self,
         query: str,
@@ -115,7 +163,8 @@ class SOPHIAMemoryMaster:
         collection: str = None,
         limit: int = 10,
         score_threshold: float = 0.7,
-        session_id: Optional[str] = None
+        session_id: Optional[str] = None,
+        rerank: bool = True
     ) -> Dict[str, Any]:
         """
         Retrieve knowledge using semantic search.
@@ -127,6 +176,7 @@ class SOPHIAMemoryMaster:
             limit: Maximum results to return
             score_threshold: Minimum similarity score
             session_id: Filter by session ID
+            rerank: Rerank merged candidates with the cross-encoder (when one is configured)
             
         Returns:
             Retrieved knowledge with relevance scores
@@ -136,12 +186,15 @@ class SOPHIAMemoryMaster:
             
             mcp_client = await self._get_mcp_client()
             collection = collection or self.default_collection
+            reranker = self.reranker if rerank else None
+            # With a reranker, over-fetch candidates and let it pick the best `limit`
+            fetch_limit = max(limit, reranker.top_n) if reranker else limit
             
             # Search embeddings for semantic similarity
             embedding_results = await mcp_client.search_embeddings(
                 query=query,
                 collection_name=collection,
-                top_k=limit,
+                top_k=fetch_limit,
                 score_threshold=score_threshold
             )
             
@@ -154,7 +207,7 @@ class SOPHIAMemoryMaster:
                             query=query,
                             memory_type=knowledge_type,
                             session_id=session_id,
-                            limit=limit // len(knowledge_types) if len(knowledge_types) > 1 else limit
+                            limit=fetch_limit // len(knowledge_types) if len(knowledge_types) > 1 else fetch_limit
                         )
                     )
             else:
@@ -162,7 +215,7 @@ class SOPHIAMemoryMaster:
                     mcp_client.retrieve_memories(
                         query=query,
                         session_id=session_id,
-                        limit=limit
+                        limit=fetch_limit
                     )
                 )
             
@@ -184,9 +237,14 @@ class SOPHIAMemoryMaster:
                 query
             )
             
+            if reranker:
+                top_results = await reranker.rerank(query, combined_results, limit)
+            else:
+                top_results = combined_results[:limit]
+            
             result = {
                 "query": query,
-                "results": combined_results[:limit],
+                "results": top_results,
                 "total_found": len(combined_results),
                 "search_types": ["embeddings", "memories"],
                 "knowledge_types": knowledge_types,
@@ -0,0 +1,443 @@
+"""
+SOPHIA Metrics Rollups
+Incrementally aggregates performance metrics into hourly and daily buckets
+(counts, sums and latency histograms) persisted in SQLite or Postgres, so
+reports read a bounded number of rows regardless of traffic and survive
+restarts. Feedback has its own daily rollup, maintained by
+SOPHIAFeedbackMaster in the same transaction as each insert.
+"""
+
+import os
+import time
+import asyncio
+import logging
+import sqlite3
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple, Iterable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROLLUP_URL = "sqlite:///sophia_rollups.db"
+
+GRANULARITIES = {"hour": 3600, "day": 86400}
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+DURATION_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+HISTOGRAM_COLUMNS = [f"h{i}" for i in range(len(DURATION_BUCKETS_MS) + 1)]
+
+# Performance accumulator layout: additive counters, then min/max, then histogram
+PERF_KEYS = ("granularity", "bucket_start", "service", "operation")
+PERF_SUMS = ("calls", "successes", "failures", "duration_sum", "tokens")
+PERF_COLUMNS = PERF_SUMS + ("duration_min", "duration_max") + tuple(HISTOGRAM_COLUMNS)
+
+ERROR_KEYS = ("granularity", "bucket_start", "service", "error_type")
+
+
+def bucket_start(timestamp: float, granularity: str) -> int:
+    """Start (epoch seconds, UTC) of the bucket containing timestamp."""
+    size = GRANULARITIES[granularity]
+    return int(timestamp // size * size)
+
+
+def histogram_index(duration_ms: float) -> int:
+    for i, bound in enumerate(DURATION_BUCKETS_MS):
+        if duration_ms <= bound:
+            return i
+    return len(DURATION_BUCKETS_MS)
+
+
+def histogram_percentile(histogram: List[int], quantile: float) -> Optional[float]:
+    """Upper bound of the bucket holding the given quantile (None for the open bucket or no data)."""
+    total = sum(histogram)
+    if total == 0:
+        return None
+    threshold = quantile * total
+    running = 0
+    for i, count in enumerate(histogram):
+        running += count
+        if running >= threshold:
+            return float(DURATION_BUCKETS_MS[i]) if i < len(DURATION_BUCKETS_MS) else None
+    return None
+
+
+def _new_perf() -> List[float]:
+    return [0, 0, 0, 0.0, 0, float("inf"), 0.0] + [0] * len(HISTOGRAM_COLUMNS)
+
+
+def _merge_perf(target: List[float], source: List[float]) -> None:
+    for i in range(len(PERF_SUMS)):
+        target[i] += source[i]
+    target[5] = min(target[5], source[5])
+    target[6] = max(target[6], source[6])
+    for i in range(7, len(target)):
+        target[i] += source[i]
+
+
+def _add_counts(target: Dict[Any, List[float]], key: Any, values: Iterable[float]) -> None:
+    row = target.get(key)
+    if row is None:
+        target[key] = list(values)
+    else:
+        for i, value in enumerate(values):
+            row[i] += value
+
+
+def _upsert_sql(table: str, keys: Tuple[str, ...], columns: Tuple[str, ...], least: str, greatest: str) -> str:
+    updates = []
+    for column in columns:
+        if column == "duration_min":
+            updates.append(f"{column} = {least}({table}.{column}, excluded.{column})")
+        elif column == "duration_max":
+            updates.append(f"{column} = {greatest}({table}.{column}, excluded.{column})")
+        else:
+            updates.append(f"{column} = {table}.{column} + excluded.{column}")
+    all_columns = keys + columns
+    return (
+        f"INSERT INTO {table} ({', '.join(all_columns)}) VALUES ({', '.join('?' for _ in all_columns)}) "
+        f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {', '.join(updates)}"
+    )
+
+
+def _schema(integer: str, real: str, text: str) -> str:
+    perf_columns = ", ".join(
+        f"{c} {real if c.startswith('duration') else integer} NOT NULL DEFAULT 0" for c in PERF_COLUMNS
+    )
+    return f"""
+        CREATE TABLE IF NOT EXISTS perf_rollups (
+            granularity {text} NOT NULL, bucket_start {integer} NOT NULL,
+            service {text} NOT NULL, operation {text} NOT NULL,
+            {perf_columns},
+            PRIMARY KEY (granularity, bucket_start, service, operation)
+        );
+        CREATE TABLE IF NOT EXISTS perf_error_rollups (
+            granularity {text} NOT NULL, bucket_start {integer} NOT NULL,
+            service {text} NOT NULL, error_type {text} NOT NULL,
+            count {integer} NOT NULL DEFAULT 0,
+            PRIMARY KEY (granularity, bucket_start, service, error_type)
+        );
+    """
+
+
+class RollupStore:
+    """
+    Hourly/daily rollups of performance metrics.
+
+    record_metric() only updates in-memory accumulators;
+    flush() merges them into the database with additive upserts, so any number
+    of processes can write to the same store. Queries pick hourly buckets for
+    windows up to two days and daily buckets beyond that.
+    """
+
+    LEAST = "MIN"
+    GREATEST = "MAX"
+
+    def __init__(self, flush_interval: float = 10.0, flush_threshold: int = 500):
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._perf: Dict[Tuple, List[float]] = {}
+        self._errors: Dict[Tuple, List[float]] = {}
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self._flush_lock = asyncio.Lock()
+
+    # Backend hooks
+
+    async def _write(self, statements: List[Tuple[str, List[Tuple]]]) -> None:
+        """Execute (sql, rows) pairs in one transaction."""
+        raise NotImplementedError
+
+    async def _fetch(self, sql: str, params: Tuple) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+    # Recording
+
+    def record_metric(self, metric) -> None:
+        """Add a PerformanceMetric to the pending hourly and daily buckets."""
+        ts = metric.timestamp.timestamp()
+        values = _new_perf()
+        values[0] = 1
+        values[1] = 1 if metric.success else 0
+        values[2] = 0 if metric.success else 1
+        values[3] = metric.duration_ms
+        values[4] = metric.tokens_used or 0
+        values[5] = values[6] = metric.duration_ms
+        values[7 + histogram_index(metric.duration_ms)] = 1
+
+        for granularity in GRANULARITIES:
+            start = bucket_start(ts, granularity)
+            key = (granularity, start, metric.service, metric.operation)
+            if key in self._perf:
+                _merge_perf(self._perf[key], values)
+            else:
+                self._perf[key] = list(values)
+            if not metric.success:
+                _add_counts(self._errors, (granularity, start, metric.service, metric.error_type or "unknown"), [1])
+        self._pending += 1
+
+    async def maybe_flush(self) -> None:
+        """Flush when enough records are pending or the flush interval has passed."""
+        if self._pending and (
+            self._pending >= self.flush_threshold
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Write pending buckets atomically.
+
+        Returns:
+            Number of records flushed
+        """
+        async with self._flush_lock:
+            perf, errors = self._perf, self._errors
+            pending = self._pending
+            self._perf, self._errors = {}, {}
+            self._pending = 0
+            self._last_flush = time.monotonic()
+            if not pending:
+                return 0
+
+            statements = []
+            if perf:
+                statements.append((
+                    _upsert_sql("perf_rollups", PERF_KEYS, PERF_COLUMNS, self.LEAST, self.GREATEST),
+                    [key + tuple(values) for key, values in perf.items()],
+                ))
+            if errors:
+                statements.append((
+                    _upsert_sql("perf_error_rollups", ERROR_KEYS, ("count",), self.LEAST, self.GREATEST),
+                    [key + tuple(values) for key, values in errors.items()],
+                ))
+
+            try:
+                await self._write(statements)
+            except Exception:
+                # Put the counts back so the next flush retries them
+                for key, values in perf.items():
+                    if key in self._perf:
+                        _merge_perf(self._perf[key], values)
+                    else:
+                        self._perf[key] = values
+                for key, values in errors.items():
+                    _add_counts(self._errors, key, values)
+                self._pending += pending
+                raise
+
+            logger.debug(f"Flushed {pending} records into {sum(len(rows) for _, rows in statements)} rollup rows")
+            return pending
+
+    # Queries
+
+    @staticmethod
+    def granularity_for(seconds: float) -> str:
+        return "hour" if seconds <= 2 * 86400 else "day"
+
+    def _window(self, start: float, end: float, granularity: Optional[str]) -> Tuple[str, int, int]:
+        granularity = granularity or self.granularity_for(end - start)
+        return granularity, bucket_start(start, granularity), bucket_start(end, granularity)
+
+    async def perf_buckets(
+        self,
+        start: float,
+        end: float,
+        service: Optional[str] = None,
+        granularity: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Raw performance rows (one per bucket/service/operation) covering [start, end]."""
+        granularity, first, last = self._window(start, end, granularity)
+        sql = (
+            f"SELECT bucket_start, service, operation, {', '.join(PERF_COLUMNS)} FROM perf_rollups "
+            "WHERE granularity = ? AND bucket_start >= ? AND bucket_start <= ?"
+        )
+        params: Tuple = (granularity, first, last)
+        if service:
+            sql += " AND service = ?"
+            params += (service,)
+        return await self._fetch(sql + " ORDER BY bucket_start", params)
+
+    async def error_counts(self, start: float, end: float, service: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        """Error counts by service and error type."""
+        granularity, first, last = self._window(start, end, None)
+        sql = (
+            "SELECT service, error_type, SUM(count) AS count FROM perf_error_rollups "
+            "WHERE granularity = ? AND bucket_start >= ? AND bucket_start <= ?"
+        )
+        params: Tuple = (granularity, first, last)
+        if service:
+            sql += " AND service = ?"
+            params += (service,)
+        result: Dict[str, Dict[str, int]] = {}
+        for row in await self._fetch(sql + " GROUP BY service, error_type", params):
+            result.setdefault(row["service"], {})[row["error_type"]] = int(row["count"])
+        return result
+
+    async def performance_summary(self, start: float, end: float, service: Optional[str] = None) -> Dict[str, Any]:
+        """Performance summary in the shape of SOPHIAPerformanceMonitor.get_performance_summary."""
+        rows = await self.perf_buckets(start, end, service)
+        hours = round((end - start) / 3600)
+        if not rows:
+            return {"time_period": f"Last {hours} hours", "total_calls": 0, "services": {}, "overall_stats": {}}
+
+        services: Dict[str, Dict[str, Any]] = {}
+        histogram = [0] * len(HISTOGRAM_COLUMNS)
+        operations = set()
+        fastest, slowest = float("inf"), 0.0
+        for row in rows:
+            stats = services.setdefault(row["service"], {
+                "calls": 0, "successful": 0, "failed": 0, "total_duration": 0.0, "total_tokens": 0,
+                "operations": set(), "histogram": [0] * len(HISTOGRAM_COLUMNS)
+            })
+            stats["calls"] += row["calls"]
+            stats["successful"] += row["successes"]
+            stats["failed"] += row["failures"]
+            stats["total_duration"] += row["duration_sum"]
+            stats["total_tokens"] += row["tokens"]
+            stats["operations"].add(row["operation"])
+            operations.add(row["operation"])
+            for i, column in enumerate(HISTOGRAM_COLUMNS):
+                stats["histogram"][i] += row[column]
+                histogram[i] += row[column]
+            fastest = min(fastest, row["duration_min"])
+            slowest = max(slowest, row["duration_max"])
+
+        total_calls = sum(s["calls"] for s in services.values())
+        successful = sum(s["successful"] for s in services.values())
+        total_duration = sum(s["total_duration"] for s in services.values())
+        for stats in services.values():
+            stats["average_duration_ms"] = stats["total_duration"] / stats["calls"]
+            stats["error_rate"] = (stats["failed"] / stats["calls"]) * 100
+            stats["p95_duration_ms"] = histogram_percentile(stats.pop("histogram"), 0.95)
+            stats["operations"] = sorted(stats["operations"])
+            del stats["total_duration"]
+
+        return {
+            "time_period": f"Last {hours} hours",
+            "total_calls": total_calls,
+            "successful_calls": successful,
+            "failed_calls": total_calls - successful,
+            "success_rate": (successful / total_calls) * 100,
+            "average_duration_ms": total_duration / total_calls,
+            "p50_duration_ms": histogram_percentile(histogram, 0.5),
+            "p95_duration_ms": histogram_percentile(histogram, 0.95),
+            "total_tokens_used": sum(s["total_tokens"] for s in services.values()),
+            "services": services,
+            "overall_stats": {
+                "fastest_call_ms": fastest,
+                "slowest_call_ms": slowest,
+                "unique_services": len(services),
+                "unique_operations": len(operations)
+            }
+        }
+
+
+class SQLiteRollupStore(RollupStore):
+    """SQLite backend. Queries run in a worker thread so the event loop never blocks."""
+
+    def __init__(self, path: str = "sophia_rollups.db", **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            if self.path != ":memory:":
+                conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_schema("INTEGER", "REAL", "TEXT"))
+            self._conn = conn
+        return self._conn
+
+    async def _run(self, fn, *args):
+        def call():
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    return fn(conn, *args)
+        return await asyncio.to_thread(call)
+
+    async def _write(self, statements: List[Tuple[str, List[Tuple]]]) -> None:
+        def write(conn):
+            for sql, rows in statements:
+                conn.executemany(sql, rows)
+        await self._run(write)
+
+    async def _fetch(self, sql: str, params: Tuple) -> List[Dict[str, Any]]:
+        def fetch(conn):
+            return [dict(row) for row in conn.execute(sql, params).fetchall()]
+        return await self._run(fetch)
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            await asyncio.to_thread(conn.close)
+
+
+def _numbered(sql: str) -> str:
+    """Turn ? placeholders into asyncpg's $1, $2, ..."""
+    parts = sql.split("?")
+    return "".join(part + (f"${i + 1}" if i < len(parts) - 1 else "") for i, part in enumerate(parts))
+
+
+class PostgresRollupStore(RollupStore):
+    """Postgres backend using an asyncpg pool."""
+
+    LEAST = "LEAST"
+    GREATEST = "GREATEST"
+
+    def __init__(self, dsn: str, **kwargs):
+        super().__init__(**kwargs)
+        self.dsn = dsn
+        self._pool = None
+
+    async def _get_pool(self):
+        if self._pool is None:
+            import asyncpg
+
+            self._pool = await asyncpg.create_pool(self.dsn, min_size=1, max_size=5, command_timeout=30)
+            async with self._pool.acquire() as conn:
+                await conn.execute(_schema("BIGINT", "DOUBLE PRECISION", "TEXT"))
+        return self._pool
+
+    async def _write(self, statements: List[Tuple[str, List[Tuple]]]) -> None:
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                for sql, rows in statements:
+                    await conn.executemany(_numbered(sql), rows)
+
+    async def _fetch(self, sql: str, params: Tuple) -> List[Dict[str, Any]]:
+        pool = await self._get_pool()
+        return [dict(row) for row in await pool.fetch(_numbered(sql), *params)]
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+
+def create_rollup_store(url: Optional[str] = None, **kwargs) -> RollupStore:
+    """
+    Build a store from a URL (default: SOPHIA_ROLLUP_URL, else a local SQLite file).
+
+    ``sqlite:///path/to/file.db`` or ``sqlite:///:memory:`` select SQLite;
+    ``postgres://`` / ``postgresql://`` DSNs select Postgres.
+    """
+    url = url or os.getenv("SOPHIA_ROLLUP_URL", DEFAULT_ROLLUP_URL)
+    if url.startswith("sqlite:///"):
+        return SQLiteRollupStore(url[len("sqlite:///"):], **kwargs)
+    if url.startswith(("postgres://", "postgresql://")):
+        return PostgresRollupStore(url, **kwargs)
+    raise ValueError(f"Unsupported rollup store URL: {url}")
+
+
+@lru_cache(maxsize=None)
+def get_rollup_store() -> RollupStore:
+    """Process-wide store from SOPHIA_ROLLUP_URL, shared by the agent's monitor and reports."""
+    return create_rollup_store()
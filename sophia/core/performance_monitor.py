@@ -51,11 +51,17 @@ class SOPHIAPerformanceMonitor:
     Provides metrics collection, analysis, and export capabilities.
     """
     
-    def __init__(self):
-        """Initialize performance monitor."""
+    def __init__(self, rollup_store=None):
+        """
+        Initialize performance monitor.
+        
+        Args:
+            rollup_store: Optional RollupStore that persists hourly/daily aggregates
+        """
         self.api_manager = SOPHIAAPIManager()
         self.metrics: List[PerformanceMetric] = []
         self.max_metrics = 10000  # Keep last 10k metrics in memory
+        self.rollup_store = rollup_store
         
         # Configuration
         self.prometheus_pushgateway_url = os.getenv("PROMETHEUS_PUSHGATEWAY_URL")
@@ -192,6 +198,8 @@ class SOPHIAPerformanceMonitor:
         try:
             self._store_metric(metric)
             self._update_service_stats(metric)
+            if self.rollup_store is not None:
+                await self.rollup_store.maybe_flush()
             
             # Send to external monitoring systems
             await self._send_to_prometheus(metric)
@@ -205,6 +213,8 @@ class SOPHIAPerformanceMonitor:
     def _store_metric(self, metric: PerformanceMetric):
         """Store metric in memory with rotation."""
         self.metrics.append(metric)
+        if self.rollup_store is not None:
+            self.rollup_store.record_metric(metric)
         
         # Rotate metrics if we exceed max size
         if len(self.metrics) > self.max_metrics:
@@ -535,13 +545,18 @@ sophia_tokens_used_total{{service="{metric.service}",operation="{metric.operatio
     
     def get_health_status(self) -> Dict[str, Any]:
         """Get health status of monitored services."""
+        return self.health_from_stats(self.service_stats)
+    
+    @staticmethod
+    def health_from_stats(service_stats: Dict[str, ServiceStats]) -> Dict[str, Any]:
+        """Derive health status and alerts from per-service statistics."""
         health_status = {
             "overall_health": "healthy",
             "services": {},
             "alerts": []
         }
         
-        for service, stats in self.service_stats.items():
+        for service, stats in service_stats.items():
             service_health = "healthy"
             
             # Check error rate
@@ -9,6 +9,8 @@ from typing import Dict, List, Optional, Any
 import asyncio
 from datetime import datetime, timezone
 
+from libs.context import pack_sources
+
 from .api_manager import SOPHIAAPIManager
 from .ultimate_model_router import UltimateModelRouter
 from .mcp_client import SOPHIAMCPClient
@@ -31,6 +33,9 @@ class SOPHIAResearchMaster:
         self.default_sources = ["serper", "tavily", "zenrows"]
         self.max_concurrent_searches = 5
         self.default_max_results = 10
+        # Token budgets for source content packed into summary prompts
+        self.summary_context_tokens = int(os.getenv("RESEARCH_SUMMARY_CONTEXT_TOKENS", "3000"))
+        self.deep_summary_context_tokens = int(os.getenv("RESEARCH_DEEP_SUMMARY_CONTEXT_TOKENS", "6000"))
         
         logger.info("Initialized SOPHIAResearchMaster")
     
@@ -311,16 +316,19 @@ class SOPHIAResearchMaster:
     async def _generate_summary(self, query: str, sources: List[Dict[str, Any]]) -> str:
         """Generate research summary using approved models."""
         try:
-            # Prepare content for summarization
-            content = f"Research Query: {query}\n\n"
-            for i, source in enumerate(sources[:10], 1):
-                content += f"{i}. {source.get('title', 'No title')}\n"
-                content += f"   URL: {source.get('url', 'No URL')}\n"
-                content += f"   Summary: {source.get('snippet', 'No summary')}\n\n"
-            
             # Use approved model for summarization
             model_config = self.model_router.select_model("research")
             
+            # Prepare content for summarization
+            content = f"Research Query: {query}\n\n"
+            content += pack_sources(
+                sources,
+                self.summary_context_tokens,
+                query=query,
+                model=getattr(model_config, "model_name", None),
+                template="{index}. {title}\n   URL: {url}\n   Summary: {text}"
+            ).text + "\n\n"
+            
             summary_prompt = f"""
 Analyze the following research results and provide a comprehensive summary:
 
@@ -355,13 +363,14 @@ Summary:
             content = f"Deep Research Topic: {topic}\n\n"
             content += f"Total Sources Analyzed: {len(sources)}\n\n"
             
-            for i, source in enumerate(sources[:15], 1):
-                content += f"{i}. {source.get('title', 'No title')}\n"
-                content += f"   Source: {source.get('name', 'Unknown').upper()}\n"
-                content += f"   URL: {source.get('url', 'No URL')}\n"
-                content += f"   Content: {source.get('snippet', 'No content')}\n\n"
-            
             model_config = self.model_router.select_model("research")
+            content += pack_sources(
+                sources,
+                self.deep_summary_context_tokens,
+                query=topic,
+                model=getattr(model_config, "model_name", None),
+                template="{index}. {title}\n   Source: {source}\n   URL: {url}\n   Content: {text}"
+            ).text + "\n\n"
             
             summary_prompt = f"""
 Conduct a comprehensive analysis of the following research data:
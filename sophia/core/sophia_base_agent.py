@@ -5,6 +5,7 @@ Extends the existing BaseAgent to add model router and API manager capabilities.
 
 import asyncio
 import logging
+from datetime import datetime, timezone
 from typing import Any, Dict, Optional
 
 # Import existing BaseAgent
@@ -13,6 +14,8 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
 from agents.base_agent import BaseAgent, Status
+from libs.context import pack_sources
+from libs.tracing import get_tracer
 from .ultimate_model_router import UltimateModelRouter, TaskType
 from .api_manager import SOPHIAAPIManager
 from .github_master import SOPHIAGitHubMaster, GitHubRepoInfo
@@ -23,6 +26,7 @@ from .memory_master import SOPHIAMemoryMaster
 from .mcp_client import SOPHIAMCPClient
 from .feedback_master import SOPHIAFeedbackMaster
 from .performance_monitor import SOPHIAPerformanceMonitor
+from .metrics_rollup import get_rollup_store
 
 logger = logging.getLogger(__name__)
 
@@ -120,7 +124,7 @@ class SOPHIABaseAgent(BaseAgent):
         
         # Initialize Performance monitor
         try:
-            self.performance_monitor = SOPHIAPerformanceMonitor()
+            self.performance_monitor = SOPHIAPerformanceMonitor(rollup_store=get_rollup_store())
             logger.info("Performance monitor initialized")
         except Exception as e:
             logger.error(f"Failed to initialize Performance monitor: {e}")
@@ -131,6 +135,9 @@ class SOPHIABaseAgent(BaseAgent):
         self.api_calls = 0
         self.successful_model_calls = 0
         self.successful_api_calls = 0
+        
+        # Token budget for research findings packed into synthesis prompts
+        self.research_context_tokens = int(os.getenv("SOPHIA_RESEARCH_CONTEXT_TOKENS", "2000"))
 
     async def route_task(self, task_type: str, prompt: str, **kwargs) -> str:
         """
@@ -152,29 +159,34 @@ class SOPHIABaseAgent(BaseAgent):
         
         self.model_calls += 1
         
-        try:
-            # Select the best model for the task
-            model_config = self.model_router.select_model(task_type)
-            logger.info(f"Selected {model_config.provider}:{model_config.model_name} for {task_type}")
-            
-            # Monitor the model call performance
-            if self.performance_monitor:
-                async with self.performance_monitor.monitor_operation(
-                    service=model_config.provider,
-                    operation=f"model_call_{task_type}"
-                ):
+        with get_tracer().start_span(
+            "route_task",
+            attributes={"agent.name": self.name, "task.type": task_type},
+        ) as span:
+            try:
+                # Select the best model for the task
+                model_config = self.model_router.select_model(task_type)
+                logger.info(f"Selected {model_config.provider}:{model_config.model_name} for {task_type}")
+                span.set_attributes({"llm.provider": model_config.provider, "llm.model": model_config.model_name})
+                
+                # Monitor the model call performance
+                if self.performance_monitor:
+                    async with self.performance_monitor.monitor_operation(
+                        service=model_config.provider,
+                        operation=f"model_call_{task_type}"
+                    ):
+                        response = await self.model_router.call_model(model_config, prompt, **kwargs)
+                else:
                     response = await self.model_router.call_model(model_config, prompt, **kwargs)
-            else:
-                response = await self.model_router.call_model(model_config, prompt, **kwargs)
-            
-            self.successful_model_calls += 1
-            logger.info(f"Model call successful for {task_type}")
-            
-            return response
-            
-        except Exception as e:
-            logger.error(f"Model routing failed for {task_type}: {e}")
-            raise RuntimeError(f"Model routing failed: {e}")
+                
+                self.successful_model_calls += 1
+                logger.info(f"Model call successful for {task_type}")
+                
+                return response
+                
+            except Exception as e:
+                logger.error(f"Model routing failed for {task_type}: {e}")
+                raise RuntimeError(f"Model routing failed: {e}")
 
     async def call_service(self, service_name: str, method: str, **kwargs) -> Any:
         """
@@ -201,10 +213,11 @@ class SOPHIABaseAgent(BaseAgent):
             if service_name == "postgres" and method == "query":
                 result = await self.api_manager.query_postgres(kwargs.get("sql"), *kwargs.get("params", []))
             elif service_name == "qdrant" and method == "upsert":
-                result = self.api_manager.upsert_qdrant(
+                result = await self.api_manager.upsert_qdrant_async(
                     kwargs.get("collection"),
                     kwargs.get("vectors"),
-                    kwargs.get("payloads")
+                    kwargs.get("payloads"),
+                    kwargs.get("ids")
                 )
             elif service_name == "redis" and method == "get":
                 result = self.api_manager.get_redis(kwargs.get("key"))
@@ -413,15 +426,16 @@ Guidelines:
             branch_sha = self.github_master.create_branch(branch_name)
             logger.info(f"Created branch {branch_name}")
             
-            # Commit and push files
-            commit_sha = self.github_master.commit_and_push(branch_name, files, commit_message)
+            # Commit and push files (small files inlined, blobs created concurrently)
+            commit = await self.github_master.commit_files_async(branch_name, files, commit_message)
             logger.info(f"Committed changes to {branch_name}")
             
             result = {
                 "branch_name": branch_name,
                 "branch_sha": branch_sha,
-                "commit_sha": commit_sha,
-                "files_committed": len(files)
+                "commit_sha": commit.commit_sha,
+                "files_committed": commit.files_committed,
+                "rate_limit": commit.rate_limit
             }
             
             # Create PR if requested
@@ -1090,17 +1104,23 @@ Guidelines:
             
             # Step 2: Synthesize findings
             logger.info("Step 2: Synthesizing research findings")
-            synthesis_prompt = f"Synthesize these research findings into a concise summary for business stakeholders:\n\n{research_results}"
+            sources = [source for source in research_results.get("sources", []) if isinstance(source, dict)]
+            model_config = self.model_router.select_model("analysis")
+            context = pack_sources(
+                sources,
+                self.research_context_tokens,
+                query=research_query,
+                model=getattr(model_config, "model_name", None)
+            ).text
+            if research_results.get("summary"):
+                context = f"Summary: {research_results['summary']}\n\nSources:\n{context}"
+            synthesis_prompt = f"Synthesize these research findings into a concise summary for business stakeholders:\n\n{context}"
             
-            synthesis = await self.model_router.call_model(
-                task_type="analysis",
-                prompt=synthesis_prompt,
-                max_tokens=500
-            )
+            synthesis = await self.model_router.call_model(model_config, synthesis_prompt, max_tokens=500)
             
             results["steps"]["synthesis"] = {
                 "success": True,
-                "summary_length": len(synthesis.get("content", ""))
+                "summary_length": len(synthesis)
             }
             
             # Step 3: Take action based on findings
@@ -1111,7 +1131,7 @@ Guidelines:
             if action_type == "slack_post":
                 action_result = await self.business_master.post_slack_message(
                     channel=target_channel,
-                    message=f"🔍 Research Update: {research_query}\n\n{synthesis.get('content', '')}\n\n_Automated by SOPHIA AI Orchestrator_"
+                    message=f"🔍 Research Update: {research_query}\n\n{synthesis}\n\n_Automated by SOPHIA AI Orchestrator_"
                 )
                 results["steps"]["action"] = {
                     "success": True,
@@ -10,18 +10,60 @@ from dataclasses import dataclass
 from typing import Dict, List, Optional, Any
 from enum import Enum
 
+from libs.tracing import get_tracer
+
 logger = logging.getLogger(__name__)
 
+# Context windows (prompt + completion tokens) of the approved models
+MODEL_CONTEXT_WINDOWS = {
+    "gpt-5": 400_000,
+    "gpt-5-mini": 400_000,
+    "gpt-4.1": 1_047_576,
+    "gpt-4o-mini": 128_000,
+    "gpt-oss-120b": 131_072,
+    "claude-sonnet-4": 200_000,
+    "claude-3.7-sonnet": 200_000,
+    "gemini-2.5-pro": 1_048_576,
+    "gemini-2.5-flash": 1_048_576,
+    "gemini-2.5-flash-lite": 1_048_576,
+    "gemini-2.0-flash": 1_048_576,
+    "deepseek-v3-0324": 64_000,
+    "deepseek-v3-0324-free": 64_000,
+    "r1-0528-free": 64_000,
+    "r1-free": 64_000,
+    "qwen3-coder": 262_144,
+    "qwen3-coder-free": 262_144,
+    "kimi-k2": 131_072,
+    "mistral-nemo": 128_000,
+    "glm-4.5": 128_000,
+}
+DEFAULT_CONTEXT_WINDOW = 8_192
+DEFAULT_OUTPUT_TOKENS = 4096
+
 @dataclass
 class ModelConfig:
     """Metadata and configuration for each LLM provider/model."""
     provider: str
     model_name: str
     quality_rank: int  # 1=highest
-    max_tokens: int
+    max_tokens: int  # completion cap
     cost_per_1k: float
     api_key_env_var: str
     temperature_default: float = 0.3
+    context_window: Optional[int] = None  # defaults to MODEL_CONTEXT_WINDOWS
+
+    @property
+    def context_tokens(self) -> int:
+        """Prompt + completion tokens the model accepts."""
+        return self.context_window or MODEL_CONTEXT_WINDOWS.get(self.model_name, DEFAULT_CONTEXT_WINDOW)
+
+    def output_tokens(self, requested: Optional[int] = None) -> int:
+        """Completion tokens reserved for a call that asked for `requested`."""
+        return min(self.max_tokens, requested or DEFAULT_OUTPUT_TOKENS)
+
+    def input_budget(self, requested_output: Optional[int] = None) -> int:
+        """Prompt tokens that fit alongside the reserved completion."""
+        return max(0, self.context_tokens - self.output_tokens(requested_output))
 
 class TaskType(Enum):
     """Supported task types for model routing."""
@@ -161,31 +203,41 @@ class UltimateModelRouter:
 
         # Extract parameters with defaults
         temperature = kwargs.get("temperature", model_config.temperature_default)
-        max_tokens = min(model_config.max_tokens, kwargs.get("max_tokens", 4096))
+        max_tokens = model_config.output_tokens(kwargs.get("max_tokens"))
         system_prompt = kwargs.get("system_prompt", "")
 
-        try:
-            if model_config.provider == "openai":
-                return await self._call_openai(model_config, prompt, system_prompt, temperature, max_tokens)
-            elif model_config.provider == "anthropic":
-                return await self._call_anthropic(model_config, prompt, system_prompt, temperature, max_tokens)
-            elif model_config.provider == "google":
-                return await self._call_google(model_config, prompt, system_prompt, temperature, max_tokens)
-            elif model_config.provider == "deepseek":
-                return await self._call_deepseek(model_config, prompt, system_prompt, temperature, max_tokens)
-            elif model_config.provider == "qwen":
-                return await self._call_qwen(model_config, prompt, system_prompt, temperature, max_tokens)
-            elif model_config.provider == "moonshot":
-                return await self._call_moonshot(model_config, prompt, system_prompt, temperature, max_tokens)
-            elif model_config.provider == "mistral":
-                return await self._call_mistral(model_config, prompt, system_prompt, temperature, max_tokens)
-            elif model_config.provider == "zhipu":
-                return await self._call_zhipu(model_config, prompt, system_prompt, temperature, max_tokens)
-            else:
-                raise NotImplementedError(f"Provider {model_config.provider} not yet implemented")
-        except Exception as e:
-            logger.error(f"Failed to call {model_config.provider}:{model_config.model_name}: {e}")
-            raise RuntimeError(f"Failed to call {model_config.provider}:{model_config.model_name}: {e}")
+        with get_tracer().start_span(
+            "call_model",
+            kind="CLIENT",
+            attributes={
+                "llm.provider": model_config.provider,
+                "llm.model": model_config.model_name,
+                "llm.max_tokens": max_tokens,
+                "llm.prompt_chars": len(prompt),
+            },
+        ):
+            try:
+                if model_config.provider == "openai":
+                    return await self._call_openai(model_config, prompt, system_prompt, temperature, max_tokens)
+                elif model_config.provider == "anthropic":
+                    return await self._call_anthropic(model_config, prompt, system_prompt, temperature, max_tokens)
+                elif model_config.provider == "google":
+                    return await self._call_google(model_config, prompt, system_prompt, temperature, max_tokens)
+                elif model_config.provider == "deepseek":
+                    return await self._call_deepseek(model_config, prompt, system_prompt, temperature, max_tokens)
+                elif model_config.provider == "qwen":
+                    return await self._call_qwen(model_config, prompt, system_prompt, temperature, max_tokens)
+                elif model_config.provider == "moonshot":
+                    return await self._call_moonshot(model_config, prompt, system_prompt, temperature, max_tokens)
+                elif model_config.provider == "mistral":
+                    return await self._call_mistral(model_config, prompt, system_prompt, temperature, max_tokens)
+                elif model_config.provider == "zhipu":
+                    return await self._call_zhipu(model_config, prompt, system_prompt, temperature, max_tokens)
+                else:
+                    raise NotImplementedError(f"Provider {model_config.provider} not yet implemented")
+            except Exception as e:
+                logger.error(f"Failed to call {model_config.provider}:{model_config.model_name}: {e}")
+                raise RuntimeError(f"Failed to call {model_config.provider}:{model_config.model_name}: {e}")
 
     async def _call_openai(self, config: ModelConfig, prompt: str, system_prompt: str, temperature: float, max_tokens: int) -> str:
         """Call OpenAI API."""
@@ -6,11 +6,12 @@ Production-ready client for Gong.io integration with SOPHIA.
 import os
 import asyncio
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, AsyncIterator, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 
 import httpx
+from libs.ratelimit import get_limiter, send_with_retry
 from sophia.core.constants import ENV_VARS, SERVICE_ENDPOINTS, TIMEOUTS, RATE_LIMITS
 
 logger = logging.getLogger(__name__)
@@ -75,24 +76,8 @@ class GongClient:
             }
         )
         
-        # Rate limiting
-        self._request_times: List[float] = []
-        self._lock = asyncio.Lock()
-    
-    async def _rate_limit_check(self) -> None:
-        """Enforce rate limiting"""
-        async with self._lock:
-            now = asyncio.get_event_loop().time()
-            # Remove requests older than 1 minute
-            self._request_times = [t for t in self._request_times if now - t < 60]
-            
-            if len(self._request_times) >= self.rate_limit:
-                sleep_time = 60 - (now - self._request_times[0])
-                if sleep_time > 0:
-                    logger.warning(f"Rate limit reached, sleeping for {sleep_time:.2f}s")
-                    await asyncio.sleep(sleep_time)
-            
-            self._request_times.append(now)
+        # Rate limiting, shared by every GongClient in the process
+        self._limiter = get_limiter("gong", rate=self.rate_limit, period=60, burst=10, default_retry_after=60)
     
     async def _make_request(
         self, 
@@ -102,42 +87,20 @@ class GongClient:
         json_data: Optional[Dict] = None,
         retries: int = 3
     ) -> Dict[str, Any]:
-        """Make HTTP request with retries and error handling"""
-        await self._rate_limit_check()
-        
+        """Make HTTP request through the shared rate limiter, with retries"""
         url = f"{self.base_url}{endpoint}"
+        response = await send_with_retry(
+            self._limiter,
+            lambda: self._client.request(method=method, url=url, params=params, json=json_data),
+            retries=retries
+        )
         
-        for attempt in range(retries + 1):
-            try:
-                response = await self._client.request(
-                    method=method,
-                    url=url,
-                    params=params,
-                    json=json_data
-                )
-                
-                if response.status_code == 429:  # Rate limited
-                    retry_after = int(response.headers.get("Retry-After", 60))
-                    logger.warning(f"Rate limited, retrying after {retry_after}s")
-                    await asyncio.sleep(retry_after)
-                    continue
-                
-                response.raise_for_status()
-                return response.json()
-                
-            except httpx.HTTPStatusError as e:
-                if attempt == retries:
-                    logger.error(f"HTTP error after {retries} retries: {e}")
-                    raise
-                await asyncio.sleep(2 ** attempt)  # Exponential backoff
-                
-            except httpx.RequestError as e:
-                if attempt == retries:
-                    logger.error(f"Request error after {retries} retries: {e}")
-                    raise
-                await asyncio.sleep(2 ** attempt)
-        
-        raise Exception("Max retries exceeded")
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error after {retries} retries: {e}")
+            raise
+        return response.json()
     
     async def get_me(self) -> Dict[str, Any]:
         """Get current user information (health check)"""
@@ -147,21 +110,37 @@ class GongClient:
             logger.error(f"Failed to get user info: {e}")
             raise
     
-    async def list_calls(
-        self, 
-        since: str, 
-        until: str, 
-        limit: int = 50,
+    def _parse_call(self, call_data: Dict[str, Any], transcript: Optional[str] = None) -> GongCall:
+        return GongCall(
+            call_id=call_data["id"],
+            title=call_data.get("title", "Untitled Call"),
+            started=datetime.fromisoformat(call_data["started"].replace("Z", "+00:00")),
+            duration=call_data.get("duration", 0),
+            participants=[p.get("name", "Unknown") for p in call_data.get("participants", [])],
+            transcript=transcript,
+            url=call_data.get("url")
+        )
+    
+    async def list_calls_page(
+        self,
+        since: str,
+        until: str,
+        cursor: Optional[str] = None,
+        limit: int = 100,
         workspace_id: Optional[str] = None
-    ) -> List[GongCall]:
+    ) -> Tuple[List[GongCall], Optional[str]]:
         """
-        List calls within date range
+        Fetch one page of calls within a date range
         
         Args:
             since: Start date (ISO format: 2025-08-01T00:00:00Z)
             until: End date (ISO format: 2025-08-20T23:59:59Z)
-            limit: Maximum number of calls to return
+            cursor: Cursor returned with the previous page
+            limit: Page size (Gong caps this at 100)
             workspace_id: Optional workspace ID filter
+            
+        Returns:
+            The page of calls and the cursor for the next page (None on the last page)
         """
         params = {
             "fromDateTime": since,
@@ -169,55 +148,76 @@ class GongClient:
             "limit": min(limit, 100)  # Gong API limit
         }
         
+        if cursor:
+            params["cursor"] = cursor
         if workspace_id:
             params["workspaceId"] = workspace_id
         
         try:
             data = await self._make_request("GET", "/v2/calls", params=params)
-            
-            calls = []
-            for call_data in data.get("calls", []):
-                call = GongCall(
-                    call_id=call_data["id"],
-                    title=call_data.get("title", "Untitled Call"),
-                    started=datetime.fromisoformat(call_data["started"].replace("Z", "+00:00")),
-                    duration=call_data.get("duration", 0),
-                    participants=[p.get("name", "Unknown") for p in call_data.get("participants", [])],
-                    url=call_data.get("url")
-                )
-                calls.append(call)
-            
-            return calls
+            calls = [self._parse_call(call_data) for call_data in data.get("calls", [])]
+            return calls, data.get("records", {}).get("cursor")
             
         except Exception as e:
             logger.error(f"Failed to list calls: {e}")
             raise
     
+    async def list_calls(
+        self, 
+        since: str, 
+        until: str, 
+        limit: int = 50,
+        workspace_id: Optional[str] = None
+    ) -> List[GongCall]:
+        """
+        List calls within date range (first page only; use iter_calls for everything)
+        
+        Args:
+            since: Start date (ISO format: 2025-08-01T00:00:00Z)
+            until: End date (ISO format: 2025-08-20T23:59:59Z)
+            limit: Maximum number of calls to return
+            workspace_id: Optional workspace ID filter
+        """
+        calls, _ = await self.list_calls_page(since, until, limit=limit, workspace_id=workspace_id)
+        return calls
+    
+    async def iter_calls(
+        self,
+        since: str,
+        until: str,
+        cursor: Optional[str] = None,
+        workspace_id: Optional[str] = None
+    ) -> AsyncIterator[Tuple[List[GongCall], Optional[str]]]:
+        """
+        Follow the Gong cursor through every page of calls in a date range
+        
+        Yields each page with the cursor for the page after it, so callers can
+        checkpoint and resume from any page boundary.
+        """
+        while True:
+            calls, next_cursor = await self.list_calls_page(since, until, cursor=cursor, workspace_id=workspace_id)
+            yield calls, next_cursor
+            if not next_cursor or next_cursor == cursor:
+                return
+            cursor = next_cursor
+    
+    async def get_transcript(self, call_id: str) -> Optional[str]:
+        """Get a call transcript, or None if it is not available"""
+        try:
+            transcript_data = await self._make_request("GET", f"/v2/calls/{call_id}/transcript")
+            return transcript_data.get("transcript", "")
+        except Exception as e:
+            logger.warning(f"Could not get transcript for call {call_id}: {e}")
+            return None
+    
     async def get_call(self, call_id: str) -> GongCall:
         """Get detailed call information including transcript"""
         try:
-            # Get call details
-            call_data = await self._make_request("GET", f"/v2/calls/{call_id}")
-            
-            # Get transcript if available
-            transcript = None
-            try:
-                transcript_data = await self._make_request("GET", f"/v2/calls/{call_id}/transcript")
-                transcript = transcript_data.get("transcript", "")
-            except Exception as e:
-                logger.warning(f"Could not get transcript for call {call_id}: {e}")
-            
-            call = GongCall(
-                call_id=call_data["id"],
-                title=call_data.get("title", "Untitled Call"),
-                started=datetime.fromisoformat(call_data["started"].replace("Z", "+00:00")),
-                duration=call_data.get("duration", 0),
-                participants=[p.get("name", "Unknown") for p in call_data.get("participants", [])],
-                transcript=transcript,
-                url=call_data.get("url")
+            call_data, transcript = await asyncio.gather(
+                self._make_request("GET", f"/v2/calls/{call_id}"),
+                self.get_transcript(call_id)
             )
-            
-            return call
+            return self._parse_call(call_data, transcript)
             
         except Exception as e:
             logger.error(f"Failed to get call {call_id}: {e}")
@@ -285,7 +285,7 @@ class GongClient:
                 "user_email": user_info.get("email"),
                 "base_url": self.base_url,
                 "rate_limit": self.rate_limit,
-                "requests_in_last_minute": len(self._request_times)
+                "rate_limiter": self._limiter.stats()
             }
         except Exception as e:
             return {
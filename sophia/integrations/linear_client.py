@@ -11,6 +11,7 @@ from dataclasses import dataclass
 from datetime import datetime
 
 import httpx
+from libs.ratelimit import get_limiter, send_with_retry
 from sophia.core.constants import ENV_VARS, TIMEOUTS
 
 logger = logging.getLogger(__name__)
@@ -68,24 +69,8 @@ class LinearClient:
             }
         )
         
-        # Rate limiting
-        self._request_times: List[float] = []
-        self._lock = asyncio.Lock()
-    
-    async def _rate_limit_check(self) -> None:
-        """Enforce rate limiting (1800 requests per hour)"""
-        async with self._lock:
-            now = asyncio.get_event_loop().time()
-            # Remove requests older than 1 hour
-            self._request_times = [t for t in self._request_times if now - t < 3600]
-            
-            if len(self._request_times) >= self.rate_limit:
-                sleep_time = 3600 - (now - self._request_times[0])
-                if sleep_time > 0:
-                    logger.warning(f"Rate limit reached, sleeping for {sleep_time:.2f}s")
-                    await asyncio.sleep(sleep_time)
-            
-            self._request_times.append(now)
+        # Rate limiting, shared by every LinearClient in the process
+        self._limiter = get_limiter("linear", rate=self.rate_limit, period=3600, burst=30, default_retry_after=60)
     
     async def _make_request(
         self, 
@@ -93,48 +78,29 @@ class LinearClient:
         variables: Optional[Dict] = None,
         retries: int = 3
     ) -> Dict[str, Any]:
-        """Make GraphQL request with retries and error handling"""
-        await self._rate_limit_check()
-        
+        """Make GraphQL request through the shared rate limiter, with retries"""
         json_data = {
             "query": query,
             "variables": variables or {}
         }
         
-        for attempt in range(retries + 1):
-            try:
-                response = await self._client.post(
-                    self.base_url,
-                    json=json_data
-                )
-                
-                if response.status_code == 429:  # Rate limited
-                    retry_after = int(response.headers.get("Retry-After", 60))
-                    logger.warning(f"Rate limited, retrying after {retry_after}s")
-                    await asyncio.sleep(retry_after)
-                    continue
-                
-                response.raise_for_status()
-                result = response.json()
-                
-                if "errors" in result:
-                    raise Exception(f"GraphQL errors: {result['errors']}")
-                
-                return result
-                
-            except httpx.HTTPStatusError as e:
-                if attempt == retries:
-                    logger.error(f"HTTP error after {retries} retries: {e}")
-                    raise
-                await asyncio.sleep(2 ** attempt)  # Exponential backoff
-                
-            except httpx.RequestError as e:
-                if attempt == retries:
-                    logger.error(f"Request error after {retries} retries: {e}")
-                    raise
-                await asyncio.sleep(2 ** attempt)
+        response = await send_with_retry(
+            self._limiter,
+            lambda: self._client.post(self.base_url, json=json_data),
+            retries=retries
+        )
+        
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error after {retries} retries: {e}")
+            raise
+        
+        result = response.json()
+        if "errors" in result:
+            raise Exception(f"GraphQL errors: {result['errors']}")
         
-        raise Exception("Max retries exceeded")
+        return result
     
     async def get_viewer(self) -> Dict[str, Any]:
         """Get current user information (health check)"""
@@ -441,7 +407,7 @@ class LinearClient:
                 "user_email": viewer_info.get("email"),
                 "base_url": self.base_url,
                 "rate_limit": self.rate_limit,
-                "requests_in_last_hour": len(self._request_times)
+                "rate_limiter": self._limiter.stats()
             }
         except Exception as e:
             return {
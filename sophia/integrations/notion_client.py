@@ -11,6 +11,7 @@ from dataclasses import dataclass
 from datetime import datetime
 
 import httpx
+from libs.ratelimit import get_limiter, send_with_retry
 from sophia.core.constants import ENV_VARS, TIMEOUTS
 
 logger = logging.getLogger(__name__)
@@ -66,24 +67,8 @@ class NotionClient:
             }
         )
         
-        # Rate limiting (3 requests per second)
-        self._request_times: List[float] = []
-        self._lock = asyncio.Lock()
-    
-    async def _rate_limit_check(self) -> None:
-        """Enforce rate limiting (3 requests per second)"""
-        async with self._lock:
-            now = asyncio.get_event_loop().time()
-            # Remove requests older than 1 second
-            self._request_times = [t for t in self._request_times if now - t < 1]
-            
-            if len(self._request_times) >= self.rate_limit:
-                sleep_time = 1 - (now - self._request_times[0])
-                if sleep_time > 0:
-                    logger.warning(f"Rate limit reached, sleeping for {sleep_time:.2f}s")
-                    await asyncio.sleep(sleep_time)
-            
-            self._request_times.append(now)
+        # Rate limiting, shared by every NotionClient in the process
+        self._limiter = get_limiter("notion", rate=self.rate_limit, period=1, burst=3, default_retry_after=1)
     
     async def _make_request(
         self, 
@@ -93,42 +78,20 @@ class NotionClient:
         json_data: Optional[Dict] = None,
         retries: int = 3
     ) -> Dict[str, Any]:
-        """Make HTTP request with retries and error handling"""
-        await self._rate_limit_check()
-        
+        """Make HTTP request through the shared rate limiter, with retries"""
         url = f"{self.base_url}{endpoint}"
+        response = await send_with_retry(
+            self._limiter,
+            lambda: self._client.request(method=method, url=url, params=params, json=json_data),
+            retries=retries
+        )
         
-        for attempt in range(retries + 1):
-            try:
-                response = await self._client.request(
-                    method=method,
-                    url=url,
-                    params=params,
-                    json=json_data
-                )
-                
-                if response.status_code == 429:  # Rate limited
-                    retry_after = int(response.headers.get("Retry-After", 1))
-                    logger.warning(f"Rate limited, retrying after {retry_after}s")
-                    await asyncio.sleep(retry_after)
-                    continue
-                
-                response.raise_for_status()
-                return response.json()
-                
-            except httpx.HTTPStatusError as e:
-                if attempt == retries:
-                    logger.error(f"HTTP error after {retries} retries: {e}")
-                    raise
-                await asyncio.sleep(2 ** attempt)  # Exponential backoff
-                
-            except httpx.RequestError as e:
-                if attempt == retries:
-                    logger.error(f"Request error after {retries} retries: {e}")
-                    raise
-                await asyncio.sleep(2 ** attempt)
-        
-        raise Exception("Max retries exceeded")
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error after {retries} retries: {e}")
+            raise
+        return response.json()
     
     async def get_me(self) -> Dict[str, Any]:
         """Get bot information (health check)"""
@@ -426,7 +389,7 @@ class NotionClient:
                 "bot_type": bot_info.get("type"),
                 "base_url": self.base_url,
                 "rate_limit": self.rate_limit,
-                "requests_in_last_second": len(self._request_times)
+                "rate_limiter": self._limiter.stats()
             }
         except Exception as e:
             return {
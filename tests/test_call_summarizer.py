@@ -0,0 +1,119 @@
+"""
+Tests for map-reduce call summarization
+"""
+
+import asyncio
+
+import pytest
+
+from sophia.core.call_summarizer import TranscriptSummarizer, chunk_transcript, estimate_tokens, split_turns
+from sophia.core.ultimate_model_router import ModelConfig
+
+
+def _transcript(turns):
+    speakers = ["Alice", "Bob"]
+    return "\n".join(
+        f"{speakers[i % 2]}: turn {i} about pricing, onboarding timelines and the integration plan." for i in range(turns)
+    )
+
+
+class FakeRouter:
+    def __init__(self, max_tokens=128_000):
+        self.model = ModelConfig("openai", "gpt-5", 1, max_tokens, 0.0, "OPENAI_API_KEY")
+        self.prompts = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def select_model(self, task_type, fallback=True):
+        return self.model
+
+    async def call_model(self, model_config, prompt, **kwargs):
+        self.prompts.append(prompt)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if "Transcript excerpt" in prompt:
+            return "- chunk notes"
+        if "Combine these partial summaries" in prompt:
+            return "- combined notes"
+        return "final summary"
+
+
+class TestChunking:
+    """Test cases for transcript chunking."""
+
+    def test_chunks_respect_budget_and_turns(self):
+        """Chunks stay under budget and never split a normal speaker turn."""
+        transcript = _transcript(200)
+        turns = split_turns(transcript)
+
+        chunks = chunk_transcript(transcript, max_tokens=200)
+
+        assert len(turns) == 200
+        assert len(chunks) > 1
+        assert all(estimate_tokens(chunk) <= 200 for chunk in chunks)
+        assert sum(len(chunk.splitlines()) for chunk in chunks) == 200
+
+    def test_oversized_turn_is_split(self):
+        """A monologue longer than the budget is split on sentence boundaries."""
+        monologue = "Alice: " + " ".join(f"Sentence number {i} is here." for i in range(200))
+
+        chunks = chunk_transcript(monologue, max_tokens=100)
+
+        assert len(chunks) > 1
+        assert all(estimate_tokens(chunk) <= 100 for chunk in chunks)
+
+
+class TestTranscriptSummarizer:
+    """Test cases for TranscriptSummarizer."""
+
+    @pytest.mark.asyncio
+    async def test_short_transcript_uses_single_prompt(self):
+        router = FakeRouter()
+        summarizer = TranscriptSummarizer(router)
+
+        summary = await summarizer.summarize(_transcript(4), title="Intro call")
+
+        assert summary == "final summary"
+        assert len(router.prompts) == 1
+
+    @pytest.mark.asyncio
+    async def test_long_transcript_map_reduce_is_concurrent(self):
+        """Long transcripts are chunked, mapped concurrently and reduced to one final prompt."""
+        router = FakeRouter()
+        summarizer = TranscriptSummarizer(router, chunk_tokens=300, max_concurrency=3, reduce_fan_in=3)
+
+        summary = await summarizer.summarize(_transcript(400), title="QBR")
+
+        chunk_prompts = [p for p in router.prompts if "Transcript excerpt" in p]
+        assert summary == "final summary"
+        assert len(chunk_prompts) > 3
+        assert router.max_in_flight == 3
+        assert "Notes from each part of the call" in router.prompts[-1]
+
+    def test_budget_is_context_window_minus_reserved_output(self):
+        """Chunks are sized from the context window, not the completion cap."""
+        summarizer = TranscriptSummarizer(FakeRouter(), chunk_tokens=6000)
+        small_cap = ModelConfig("anthropic", "claude-sonnet-4", 1, 1024, 0.0, "ANTHROPIC_API_KEY")
+        small_window = ModelConfig("local", "local-8k", 1, 4096, 0.0, "LOCAL_API_KEY", context_window=8192)
+
+        assert small_cap.context_tokens == 200_000
+        assert summarizer._budget(small_cap) == 6000
+        assert summarizer._budget(small_window) == 8192 - 4096 - 512
+
+    @pytest.mark.asyncio
+    async def test_resummarize_and_follow_up_hit_cache(self):
+        """Re-summarizing costs nothing and a follow-up only pays for the question."""
+        router = FakeRouter()
+        summarizer = TranscriptSummarizer(router, chunk_tokens=300)
+        transcript = _transcript(400)
+
+        await summarizer.summarize(transcript, title="QBR")
+        calls_after_first = len(router.prompts)
+        await summarizer.summarize(transcript, title="QBR")
+        await summarizer.answer(transcript, "What did Bob commit to?", title="QBR")
+
+        assert len(router.prompts) == calls_after_first + 1
+        assert "What did Bob commit to?" in router.prompts[-1]
+        assert summarizer.cache.stats()["hits"] > 0
@@ -0,0 +1,112 @@
+"""
+Tests for the shared chunking engine
+"""
+
+import ast
+import textwrap
+
+import pytest
+
+from libs.chunking import Chunker, RegexTokenizer
+
+TOKENIZER = RegexTokenizer()
+
+
+def _function(name, statements):
+    body = "\n".join(f"    value_{i} = compute('{name}', {i})" for i in range(statements))
+    return f"def {name}():\n{body}\n    return value_0\n"
+
+
+MODULE = "import os\n\nLIMIT = 3\n\n\n" + "\n\n".join(
+    _function(name, size) for name, size in [("small_a", 2), ("small_b", 2), ("large", 40), ("small_c", 2)]
+) + "\n\nclass Service:\n" + textwrap.indent("\n\n".join(
+    _function(name, 8) for name in ["start", "stop", "status"]
+), "    ")
+
+
+def _chunker(**kwargs):
+    return Chunker(tokenizer=TOKENIZER, **kwargs)
+
+
+class TestChunker:
+    """Test cases for Chunker."""
+
+    def test_code_splits_only_at_definitions_when_they_fit(self):
+        chunks = list(_chunker(max_tokens=120, overlap_tokens=0).chunk(MODULE, source="svc.py"))
+        tree = ast.parse(MODULE)
+        spans = {node.name: (node.lineno, node.end_lineno) for node in tree.body if hasattr(node, "name")}
+        spans.update({f"Service.{node.name}": (node.lineno, node.end_lineno) for node in tree.body[-1].body})
+
+        assert all(c.token_count <= 120 for c in chunks)
+        assert chunks[0].text.startswith("import os")
+        assert chunks[0].symbols == ["small_a", "small_b"]
+        for name in ["small_a", "small_b", "small_c", "Service.start", "Service.stop", "Service.status"]:
+            start, end = spans[name]
+            holders = [c for c in chunks if c.start_line <= end and c.end_line >= start]
+            assert len(holders) == 1 and holders[0].start_line <= start and holders[0].end_line >= end
+        assert sum("large" in c.symbols for c in chunks) >= 3
+
+    def test_overlap_only_within_a_split_definition(self):
+        chunks = list(_chunker(max_tokens=120, overlap_tokens=30).chunk(MODULE, source="svc.py"))
+        large = [c for c in chunks if c.symbols[0] == "large"]
+
+        assert len(large) > 1
+        for previous, current in zip(large, large[1:]):
+            assert current.start_line <= previous.end_line
+        for previous, current in zip(chunks, chunks[1:]):
+            if current.symbols[0] in ("Service.stop", "Service.status"):
+                assert current.start_line > previous.end_line
+
+    def test_markdown_splits_at_headings_and_keeps_fences_whole(self):
+        text = textwrap.dedent("""\
+            # Guide
+
+            Intro paragraph that is long enough to stand on its own as a chunk of text here.
+
+            ## Install
+
+            ```bash
+            pip install sophia
+
+            sophia --init
+            ```
+
+            ## Usage
+
+            Run it.
+            """)
+
+        chunks = list(_chunker(max_tokens=200, min_tokens=10).chunk(text, source="guide.md"))
+
+        assert [c.symbols for c in chunks] == [["Guide"], ["Guide > Install"], ["Guide > Usage"]]
+        assert chunks[1].text.startswith("## Install\n\n```bash")
+        assert chunks[1].text.endswith("```")
+        assert (chunks[1].start_line, chunks[1].end_line) == (5, 11)
+
+    def test_ids_are_stable_and_streaming_matches_in_memory(self, tmp_path):
+        text = "\n\n".join(f"Paragraph {i}. " + "word " * 40 for i in range(30))
+        path = tmp_path / "notes.txt"
+        path.write_text(text)
+        chunker = _chunker(max_tokens=100, overlap_tokens=20)
+
+        streamed = list(chunker.chunk_file(str(path)))
+        in_memory = list(chunker.chunk(text, source=str(path)))
+        edited = list(chunker.chunk(text.replace("Paragraph 29.", "Paragraph 29!"), source=str(path)))
+
+        assert [c.id for c in streamed] == [c.id for c in in_memory]
+        assert len({c.id for c in streamed}) == len(streamed)
+        assert [c.id for c in edited][:-1] == [c.id for c in streamed][:-1]
+        assert edited[-1].id != streamed[-1].id
+
+    def test_oversized_line_is_split_by_tokens(self):
+        line = " ".join(f"w{i}" for i in range(250))
+
+        chunks = list(_chunker(max_tokens=100, overlap_tokens=0).chunk(line, kind="text"))
+
+        assert len(chunks) == 3
+        assert all(c.token_count <= 101 for c in chunks)
+        assert "".join(c.text for c in chunks).split() == line.split()
+
+    def test_rejects_overlap_not_below_budget(self):
+        with pytest.raises(ValueError):
+            Chunker(max_tokens=64, overlap_tokens=64)
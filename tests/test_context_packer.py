@@ -0,0 +1,81 @@
+"""
+Tests for token-budgeted context packing
+"""
+
+from libs.chunking import RegexTokenizer, get_tokenizer, tokenizer_for_model
+from libs.context import ContextPacker, MinHasher, Passage, pack_sources
+
+TOKENIZER = RegexTokenizer()
+
+PRICING = ("Enterprise plans are billed annually at a fixed per seat price. "
+           "Discounts apply above five hundred seats. Invoices are sent on the first business day.")
+ONBOARDING = ("New customers get a dedicated onboarding manager for the first ninety days. "
+              "Training sessions are recorded and shared with the whole team.")
+REFUNDS = ("Support tickets are answered within four hours. The office moved to a new building last spring. "
+           "Refunds for annual plans are prorated by remaining months. Holiday hours are posted in December.")
+
+
+class TestContextPacker:
+    """Test cases for ContextPacker."""
+
+    def test_minhash_estimates_similarity(self):
+        hasher = MinHasher()
+        edited = PRICING.replace("first business day", "first working day")
+
+        assert hasher.similarity(hasher.signature(PRICING), hasher.signature(PRICING)) == 1.0
+        assert hasher.similarity(hasher.signature(PRICING), hasher.signature(edited)) > 0.5
+        assert hasher.similarity(hasher.signature(PRICING), hasher.signature(ONBOARDING)) < 0.2
+
+    def test_near_duplicates_are_dropped_keeping_the_best(self):
+        packer = ContextPacker(max_tokens=1000, tokenizer=TOKENIZER)
+        mirror = PRICING + " Contact sales."
+
+        packed = packer.pack([Passage(mirror, 0.5, "mirror"), Passage(PRICING, 0.9, "docs"),
+                              Passage(ONBOARDING, 0.7, "docs")])
+
+        assert [p.text for p in packed.passages] == [PRICING, ONBOARDING]
+        assert packed.duplicates == 1
+
+    def test_packs_best_passages_whole_within_budget(self):
+        packer = ContextPacker(max_tokens=45, tokenizer=TOKENIZER, min_passage_tokens=1000)
+
+        packed = packer.pack([Passage(ONBOARDING, 0.2, "b"), Passage(PRICING, 0.9, "a"), Passage("", 1.0, "empty")])
+
+        assert [p.source for p in packed.passages] == ["a"]
+        assert packed.tokens <= 45 and packed.tokens == TOKENIZER.count(packed.text)
+        assert packed.dropped == 1
+
+    def test_overflow_is_compressed_to_query_relevant_sentences(self):
+        budget = TOKENIZER.count("a: " + PRICING) + TOKENIZER.count("b: ") + 12
+        packer = ContextPacker(max_tokens=budget, tokenizer=TOKENIZER, min_passage_tokens=10)
+
+        packed = packer.pack([Passage(PRICING, 0.9, "a"), Passage(REFUNDS, 0.5, "b")],
+                             query="refunds for annual plans")
+
+        assert packed.compressed == 1 and packed.tokens <= budget
+        compressed = packed.passages[1]
+        assert "Refunds for annual plans are prorated" in compressed.text
+        assert "office moved" not in compressed.text
+        assert compressed.metadata["compressed"] is True
+
+    def test_template_renders_index_and_metadata(self):
+        packer = ContextPacker(max_tokens=500, tokenizer=TOKENIZER, template="{index}. {title}\n{text}")
+
+        packed = packer.pack([Passage(ONBOARDING, 0.1, metadata={"title": "Onboarding"}),
+                              Passage(PRICING, 0.9, metadata={"title": "Pricing"})])
+
+        assert packed.text.startswith("1. Pricing\n") and "\n\n2. Onboarding\n" in packed.text
+
+    def test_unknown_models_fall_back_to_the_default_tokenizer(self):
+        assert tokenizer_for_model("claude-3-opus") is get_tokenizer()
+        assert ContextPacker(100, model="some-local-model").tokenizer is get_tokenizer()
+
+    def test_sources_are_packed_in_rank_order(self):
+        sources = [{"name": "serper", "title": "Pricing", "content": PRICING},
+                   {"name": "tavily", "title": "Onboarding", "snippet": ONBOARDING}]
+
+        packed = pack_sources(sources, 500, template="{index}. {title} ({source})\n{text}")
+
+        assert packed.text.startswith("1. Pricing (SERPER)\n" + PRICING)
+        assert "\n\n2. Onboarding (TAVILY)\n" + ONBOARDING in packed.text
+
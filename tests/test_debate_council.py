@@ -0,0 +1,134 @@
+"""
+Tests for adaptive debates in the planning council
+"""
+
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+
+from agents.debate import PlanningCouncil, Proposal, Vote, VoteType
+
+
+def _proposal(description="Add real-time code analysis"):
+    return Proposal(
+        id="p1",
+        title="Real-time Code Analysis",
+        description=description,
+        proposed_by="architect",
+        created_at=datetime.now(),
+        requirements=["AST parsing"],
+        risks=["Memory usage"],
+        benefits=["Faster feedback"],
+        implementation_plan={"phase1": "AST integration"},
+    )
+
+
+class ScriptedCouncil(PlanningCouncil):
+    """Council whose members answer from a script instead of OpenRouter."""
+
+    def __init__(self, initial_votes, final_votes=None, delays=None, failing=()):
+        super().__init__("")
+        self.initial_votes = initial_votes
+        self.final_votes = final_votes or {}
+        self.delays = delays or {}
+        self.failing = set(failing)
+        self.calls = []
+        self.cancelled = []
+
+    async def _get_agent_analysis(self, agent_id, proposal):
+        self.calls.append(("analysis", agent_id))
+        try:
+            await asyncio.sleep(self.delays.get(agent_id, 0.01))
+        except asyncio.CancelledError:
+            self.cancelled.append(agent_id)
+            raise
+        if agent_id in self.failing:
+            raise ConnectionError("connection refused")
+        vote = self.initial_votes.get(agent_id)
+        text = f"ASSESSMENT: fine\nINITIAL_VOTE: {vote}\nCONFIDENCE: 0.9" if vote else "ASSESSMENT: unsure"
+        return {"agent_id": agent_id, "role": agent_id, "analysis": text, "timestamp": datetime.now()}
+
+    async def _call_openrouter(self, model, prompt):
+        self.calls.append(("openrouter", model))
+        for agent_id, vote in self.final_votes.items():
+            if self.council_members[agent_id]["role"] in prompt:
+                if agent_id in self.failing and "final vote" in prompt:
+                    raise ConnectionError("connection refused")
+                return json.dumps({"vote": vote, "reasoning": "scripted", "confidence": 0.9})
+        return "cross-examination notes"
+
+
+MEMBERS = ["architect", "security_critic", "performance_critic", "user_advocate", "maintainer"]
+
+
+class TestAdaptiveDebate:
+    """Test cases for early consensus, streaming and caching."""
+
+    @pytest.mark.asyncio
+    async def test_unanimous_analyses_skip_later_phases(self):
+        council = ScriptedCouncil({m: "APPROVE" for m in MEMBERS}, delays={"maintainer": 5.0})
+
+        session = await council.conduct_debate(await council.start_debate(_proposal()))
+
+        assert session.final_decision == VoteType.APPROVE
+        assert session.early_stop_phase == "analysis"
+        assert len(session.votes) == 4
+        assert council.cancelled == ["maintainer"]
+        assert not any(kind == "openrouter" for kind, _ in council.calls)
+
+    @pytest.mark.asyncio
+    async def test_split_council_runs_full_debate(self):
+        initial = {"architect": "APPROVE", "security_critic": "REJECT", "performance_critic": "MODIFY"}
+        final = {m: "MODIFY" for m in MEMBERS}
+        council = ScriptedCouncil(initial, final)
+
+        session = await council.conduct_debate(await council.start_debate(_proposal()), adaptive=False)
+
+        assert session.final_decision == VoteType.MODIFY
+        assert session.early_stop_phase is None
+        assert len(session.votes) == 5
+        assert [v.agent_id for v in session.votes] == MEMBERS
+
+    @pytest.mark.asyncio
+    async def test_rerun_on_unchanged_proposal_is_free(self):
+        council = ScriptedCouncil({"architect": "APPROVE"}, {m: "REJECT" for m in MEMBERS})
+
+        first = await council.conduct_debate(await council.start_debate(_proposal()))
+        calls_after_first = len(council.calls)
+        second = await council.conduct_debate(await council.start_debate(_proposal()))
+        calls_after_second = len(council.calls)
+        await council.conduct_debate(await council.start_debate(_proposal("A different proposal")))
+
+        assert first.final_decision == second.final_decision == VoteType.REJECT
+        assert ("analysis", "architect") not in council.calls[calls_after_first:calls_after_second]
+        assert calls_after_second - calls_after_first <= 1
+        assert sum(kind == "analysis" for kind, _ in council.calls[calls_after_second:]) == 5
+
+    @pytest.mark.asyncio
+    async def test_failed_member_abstains_and_the_debate_continues(self):
+        council = ScriptedCouncil(
+            {"architect": "APPROVE", "security_critic": "REJECT"},
+            {m: "MODIFY" for m in MEMBERS},
+            failing=["maintainer"],
+        )
+
+        session = await council.conduct_debate(await council.start_debate(_proposal()), adaptive=False)
+
+        assert ("analysis", "maintainer") in council.calls
+        assert session.final_decision == VoteType.MODIFY
+        assert [v.agent_id for v in session.votes] == MEMBERS
+        failed = session.votes[-1]
+        assert failed.vote_type == VoteType.ABSTAIN and failed.confidence == 0.0
+        assert "connection refused" in failed.reasoning
+
+    def test_decided_outcome_bounds(self):
+        council = PlanningCouncil("")
+
+        approvals = [Vote(m, VoteType.APPROVE, "", confidence=1.0) for m in MEMBERS[:3]]
+        assert council._decided_outcome(approvals, 5, 0.7) is None
+        assert council._decided_outcome(approvals + [Vote("x", VoteType.APPROVE, "", confidence=0.6)], 5, 0.7) == VoteType.APPROVE
+        split = [Vote("a", VoteType.MODIFY, "", 0.9), Vote("b", VoteType.REJECT, "", 0.9)]
+        assert council._decided_outcome(split + [Vote("c", VoteType.APPROVE, "", 0.9)], 5, 0.7) == VoteType.MODIFY
+        assert council._decided_outcome(split, 5, 0.5) is None
@@ -0,0 +1,161 @@
+"""
+Tests for rollup-backed feedback analytics and streaming export
+"""
+
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
+import pytest
+
+from sophia.core.feedback_master import FeedbackRecord, SOPHIAFeedbackMaster
+
+NOW = datetime.now(timezone.utc)
+
+
+class FakeConnection:
+    def __init__(self, rows=None, fetchrow_result=None):
+        self.rows = rows or []
+        self.fetchrow_result = fetchrow_result
+        self.queries = []
+        self.executemany_args = []
+        self.fetchrow_args = []
+        self.copied = []
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def fetchval(self, query, *args):
+        self.queries.append(query)
+        return 42
+
+    async def execute(self, query, *args):
+        self.queries.append(query)
+
+    async def executemany(self, query, args):
+        self.queries.append(query)
+        self.executemany_args.extend(args)
+
+    async def fetchrow(self, query, *args):
+        self.queries.append(query)
+        self.fetchrow_args.append(args)
+        return self.fetchrow_result
+
+    async def fetch(self, query, *args):
+        self.queries.append(query)
+        if "nextval" in query:
+            return [(100 + i,) for i in range(args[0])]
+        last_id, days, source, limit = args
+        return [row for row in self.rows if row["id"] > last_id][:limit]
+
+    async def copy_records_to_table(self, table, columns, records):
+        self.queries.append(f"COPY {table}")
+        self.copied.extend(dict(zip(columns, record)) for record in records)
+
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+def _master(conn):
+    master = SOPHIAFeedbackMaster()
+    master.db_pool = FakePool(conn)
+    return master
+
+
+def _row(i):
+    return {
+        "id": i, "task_id": f"task-{i}", "source": "user", "rating": 4, "comments": "ok, sure",
+        "outcome": None, "metadata": json.dumps({"n": i}), "timestamp": NOW,
+    }
+
+
+class TestFeedbackAnalytics:
+    """Test cases for feedback aggregation and export."""
+
+    @pytest.mark.asyncio
+    async def test_insert_updates_daily_rollup_in_same_transaction(self):
+        conn = FakeConnection()
+        master = _master(conn)
+
+        result = await master.record_user_feedback("task-1", 2, comments="Too slow and it crashed")
+
+        assert result["feedback_id"] == 42
+        assert any("INSERT INTO feedback_daily " in q for q in conn.queries)
+        issue_rows = [args for args in conn.executemany_args if len(args) == 4]
+        assert sorted(issue for _, _, issue, _ in issue_rows) == ["Performance issues", "Stability issues"]
+
+    @pytest.mark.asyncio
+    async def test_aggregate_is_a_single_rollup_query(self):
+        conn = FakeConnection(fetchrow_result={
+            "total": 10, "rating_count": 8, "rating_sum": 24,
+            "r1": 2, "r2": 0, "r3": 2, "r4": 2, "r5": 2,
+            "issue_counts": json.dumps({"Performance issues": 3, "Error handling": 5}),
+        })
+        master = _master(conn)
+
+        summary = await master.aggregate_feedback(days=90)
+
+        assert len(conn.queries) == 1
+        assert "feedback_daily" in conn.queries[0]
+        first_day, last_day, source = conn.fetchrow_args[0]
+        assert (last_day - first_day).days == 89 and source is None
+        assert summary.total_feedback == 10
+        assert summary.average_rating == pytest.approx(3.0)
+        assert summary.rating_distribution == {1: 2, 3: 2, 4: 2, 5: 2}
+        assert summary.common_issues == ["Error handling", "Performance issues"]
+
+    @pytest.mark.asyncio
+    async def test_streaming_export_pages_by_id(self):
+        """Export reads fixed-size keyset pages and emits one chunk per page."""
+        conn = FakeConnection(rows=[_row(i) for i in range(1, 6)])
+        master = _master(conn)
+
+        jsonl = [chunk async for chunk in master.stream_feedback_export("jsonl", days=7, batch_size=2)]
+        csv_chunks = [chunk async for chunk in master.stream_feedback_export("csv", days=7, batch_size=2)]
+
+        lines = "".join(jsonl).splitlines()
+        assert len(jsonl) == 3
+        assert [json.loads(line)["id"] for line in lines] == [1, 2, 3, 4, 5]
+        assert csv_chunks[0].startswith("id,task_id,source")
+        assert '"ok, sure"' in csv_chunks[1]
+        assert len("".join(csv_chunks).splitlines()) == 6
+
+
+class TestFeedbackBatch:
+    """Test cases for bulk feedback ingestion."""
+
+    @pytest.mark.asyncio
+    async def test_batch_is_one_copy_with_per_item_status(self):
+        conn = FakeConnection()
+        master = _master(conn)
+        records = [FeedbackRecord(task_id=f"task-{i}", source="agent", outcome="success") for i in range(50)]
+        records.insert(3, FeedbackRecord(task_id="bad", source="user", rating=9))
+        records.append(FeedbackRecord(task_id="slow", source="user", rating=2, comments="slow"))
+
+        statuses = await master.record_feedback_batch(records)
+
+        assert len(statuses) == 52
+        assert statuses[3] == {"index": 3, "task_id": "bad", "source": "user", "status": "invalid",
+                               "error": "Rating must be between 1 and 5"}
+        assert [s["feedback_id"] for s in statuses if s["status"] == "recorded"] == list(range(100, 151))
+        assert len(conn.copied) == 51
+        assert sum("COPY" in q for q in conn.queries) == 1
+        daily_rows = [args for args in conn.executemany_args if len(args) == 10]
+        assert sorted((source, total) for _, source, total, *_ in daily_rows) == [("agent", 50), ("user", 1)]
+
+    @pytest.mark.asyncio
+    async def test_invalid_only_batch_skips_database(self):
+        conn = FakeConnection()
+        master = _master(conn)
+
+        statuses = await master.record_feedback_batch([FeedbackRecord(task_id="t", source="agent")])
+
+        assert statuses[0]["status"] == "invalid"
+        assert conn.queries == []
@@ -3,10 +3,13 @@ Tests for SOPHIAGitHubMaster
 """
 
 import os
+import json
+import asyncio
 import pytest
 from unittest.mock import patch, MagicMock
+import httpx
 import requests
-from sophia.core.github_master import SOPHIAGitHubMaster, GitHubRepoInfo, GitHubCommitInfo, GitHubPRInfo
+from sophia.core.github_master import SOPHIAGitHubMaster, GitHubRepoInfo, GitHubCommitInfo, GitHubPRInfo, GitHubBulkCommitResult
 
 class TestSOPHIAGitHubMaster:
     """Test cases for SOPHIAGitHubMaster."""
@@ -311,3 +314,124 @@ class TestSOPHIAGitHubMaster:
         assert pr_info.head_branch == "feature"
         assert pr_info.base_branch == "main"
 
+
+class FakeGitHub:
+    """Minimal git data API served through httpx.MockTransport."""
+
+    def __init__(self, blob_delay=0.0, rate_limited_once=False):
+        self.blob_delay = blob_delay
+        self.rate_limited_once = rate_limited_once
+        self.requests = []
+        self.trees = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.remaining = 5000
+
+    async def handler(self, request):
+        self.requests.append((request.method, request.url.path))
+        self.remaining -= 1
+        headers = {"X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": str(self.remaining), "X-RateLimit-Reset": "0"}
+        path = request.url.path
+
+        if path.endswith("/git/blobs"):
+            if self.rate_limited_once:
+                self.rate_limited_once = False
+                return httpx.Response(403, headers={**headers, "Retry-After": "0"})
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(self.blob_delay)
+            self.in_flight -= 1
+            return httpx.Response(201, headers=headers, json={"sha": f"blob-{len(self.requests)}"})
+        if "/git/ref/heads/" in path:
+            return httpx.Response(200, headers=headers, json={"object": {"sha": "head_sha"}})
+        if "/git/commits/" in path:
+            return httpx.Response(200, headers=headers, json={"tree": {"sha": "base_tree"}})
+        if path.endswith("/git/trees"):
+            self.trees.append(json.loads(request.content))
+            return httpx.Response(201, headers=headers, json={"sha": "new_tree"})
+        if path.endswith("/git/commits"):
+            return httpx.Response(201, headers=headers, json={"sha": "new_commit"})
+        if "/git/refs/heads/" in path:
+            return httpx.Response(200, headers=headers, json={})
+        return httpx.Response(404, headers=headers)
+
+
+class TestSOPHIAGitHubMasterBulkCommit:
+    """Test cases for the async bulk commit path and conditional requests."""
+
+    @pytest.fixture
+    def master(self):
+        with patch.dict(os.environ, {"GITHUB_TOKEN": "test_token"}):
+            return SOPHIAGitHubMaster(GitHubRepoInfo(owner="ai-cherry", repo="sophia-intel"))
+
+    @pytest.mark.asyncio
+    async def test_small_files_are_inlined(self, master):
+        """Small files go straight into the tree without blob requests."""
+        github = FakeGitHub()
+        client = httpx.AsyncClient(transport=httpx.MockTransport(github.handler))
+
+        result = await master.commit_files_async(
+            "feature", {"a.py": "a = 1", "b.py": "b = 2"}, "Add files", client=client
+        )
+
+        assert isinstance(result, GitHubBulkCommitResult)
+        assert result.commit_sha == "new_commit"
+        assert result.files_inlined == 2 and result.blobs_created == 0
+        assert not any(path.endswith("/git/blobs") for _, path in github.requests)
+        assert {item["content"] for item in github.trees[0]["tree"]} == {"a = 1", "b = 2"}
+        assert result.rate_limit["remaining"] == github.remaining
+
+    @pytest.mark.asyncio
+    async def test_large_blobs_created_concurrently(self, master):
+        """Blobs for large files overlap, bounded by max_concurrency."""
+        github = FakeGitHub(blob_delay=0.05)
+        client = httpx.AsyncClient(transport=httpx.MockTransport(github.handler))
+        files = {f"big_{i}.txt": "x" * 100 for i in range(6)}
+
+        result = await master.commit_files_async(
+            "feature", files, "Big files", max_concurrency=3, inline_limit=10, client=client
+        )
+
+        assert result.blobs_created == 6
+        assert github.max_in_flight == 3
+        assert all("sha" in item for item in github.trees[0]["tree"])
+
+    @pytest.mark.asyncio
+    async def test_low_headroom_serializes_blobs(self, master):
+        """Blob creation drops to one at a time when few requests remain."""
+        github = FakeGitHub(blob_delay=0.01)
+        client = httpx.AsyncClient(transport=httpx.MockTransport(github.handler))
+        github.remaining = 10
+
+        await master.commit_files_async(
+            "feature", {f"big_{i}.txt": "x" * 100 for i in range(4)}, "Big files", inline_limit=10, client=client
+        )
+
+        assert github.max_in_flight == 1
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_blob_is_retried(self, master):
+        """A 403 with Retry-After is waited out and retried."""
+        github = FakeGitHub(rate_limited_once=True)
+        client = httpx.AsyncClient(transport=httpx.MockTransport(github.handler))
+
+        result = await master.commit_files_async(
+            "feature", {"big.txt": "x" * 100}, "Big file", inline_limit=10, client=client
+        )
+
+        assert result.blobs_created == 1
+        assert sum(1 for _, path in github.requests if path.endswith("/git/blobs")) == 2
+
+    @patch('requests.get')
+    def test_get_file_content_uses_etag_cache(self, mock_get, master):
+        """A 304 reply reuses the cached content and sends If-None-Match."""
+        first = MagicMock(status_code=200, headers={"ETag": '"abc"'})
+        first.json.return_value = {"encoding": "base64", "content": "aGVsbG8="}
+        not_modified = MagicMock(status_code=304, headers={})
+        mock_get.side_effect = [first, not_modified]
+
+        assert master.get_file_content("README.md") == "hello"
+        assert master.get_file_content("README.md") == "hello"
+
+        assert mock_get.call_args_list[1].kwargs["headers"]["If-None-Match"] == '"abc"'
+        not_modified.json.assert_not_called()
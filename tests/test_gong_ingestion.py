@@ -0,0 +1,162 @@
+"""
+Tests for the cursor-following Gong ingestion pipeline
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from sophia.core.gong_ingestion import FileCheckpointStore, GongIngestionPipeline, IngestionCheckpoint
+from sophia.integrations.gong_client import GongCall
+
+
+def _call(i):
+    return GongCall(
+        call_id=f"call_{i}",
+        title=f"Call {i}",
+        started=datetime(2025, 8, 1, tzinfo=timezone.utc),
+        duration=600,
+        participants=["Alice", "Bob"],
+    )
+
+
+class FakeGong:
+    """Serves `total` calls in pages of `page_size`, with integer cursors."""
+
+    def __init__(self, total, page_size=10, fail_on_page=None):
+        self.total = total
+        self.page_size = page_size
+        self.fail_on_page = fail_on_page
+        self.requested_cursors = []
+        self.transcript_requests = 0
+
+    async def iter_calls(self, since, until, cursor=None, workspace_id=None):
+        while True:
+            self.requested_cursors.append(cursor)
+            start = int(cursor or 0)
+            if self.fail_on_page is not None and start // self.page_size == self.fail_on_page:
+                raise RuntimeError("Gong went away")
+            end = min(start + self.page_size, self.total)
+            next_cursor = str(end) if end < self.total else None
+            yield [_call(i) for i in range(start, end)], next_cursor
+            if not next_cursor:
+                return
+            cursor = next_cursor
+
+    async def get_transcript(self, call_id):
+        self.transcript_requests += 1
+        return None if call_id == "call_3" else f"transcript of {call_id}"
+
+
+class FakeMemory:
+    def __init__(self, failing_ids=()):
+        self.batches = []
+        self.failing_ids = set(failing_ids)
+
+    async def store_business_artifacts(self, artifact_type, records, max_concurrency=8):
+        self.batches.append([record["id"] for record in records])
+        failed = sum(1 for record in records if record["id"] in self.failing_ids)
+        return {"artifact_type": artifact_type, "stored": len(records) - failed, "failed": failed}
+
+
+@pytest.fixture
+def checkpoints(tmp_path):
+    return FileCheckpointStore(str(tmp_path / "checkpoint.json"))
+
+
+class TestGongIngestionPipeline:
+    """Test cases for GongIngestionPipeline."""
+
+    @pytest.mark.asyncio
+    async def test_follows_cursor_past_first_page(self, checkpoints):
+        """All pages are ingested in batches, not just the first 100 calls."""
+        gong, memory = FakeGong(total=250, page_size=100), FakeMemory()
+        pipeline = GongIngestionPipeline(gong, memory, checkpoints, batch_size=100)
+
+        result = await pipeline.run("2025-08-01T00:00:00Z", "2025-08-08T00:00:00Z", collect=True)
+
+        assert result.calls_ingested == 250
+        assert result.pages == 3
+        assert [len(batch) for batch in memory.batches] == [100, 100, 50]
+        assert result.transcripts_fetched == 249
+        assert result.transcript_failures == 1
+        assert result.records[0]["transcript"] == "transcript of call_0"
+        assert "transcript" not in result.records[3]
+
+    @pytest.mark.asyncio
+    async def test_resumes_from_checkpoint_after_crash(self, checkpoints):
+        """A crashed run restarts from the last written batch instead of the beginning."""
+        memory = FakeMemory()
+        crashing = GongIngestionPipeline(FakeGong(total=50, fail_on_page=3), memory, checkpoints, batch_size=20)
+        with pytest.raises(RuntimeError):
+            await crashing.run("2025-08-01T00:00:00Z", "2025-08-08T00:00:00Z")
+
+        saved = await checkpoints.load()
+        assert saved.cursor == "20"
+        assert saved.ingested_total == 20
+
+        gong = FakeGong(total=50)
+        result = await GongIngestionPipeline(gong, memory, checkpoints, batch_size=20).run(incremental=True)
+
+        assert result.resumed
+        assert gong.requested_cursors[0] == "20"
+        assert result.calls_ingested == 30
+        assert (await checkpoints.load()).ingested_total == 50
+
+    @pytest.mark.asyncio
+    async def test_failed_store_keeps_checkpoint_before_the_batch(self, checkpoints):
+        """A batch the store reports failures for is re-read on the next run, not skipped."""
+        await checkpoints.save(IngestionCheckpoint(high_water_mark="2025-08-01T00:00:00Z"))
+        failing = GongIngestionPipeline(FakeGong(total=50), FakeMemory(failing_ids={"call_25"}), checkpoints,
+                                        batch_size=20, include_transcripts=False)
+        with pytest.raises(RuntimeError):
+            await failing.run(until="2025-08-08T00:00:00Z", incremental=True)
+
+        saved = await checkpoints.load()
+        assert saved.cursor == "20"
+        assert saved.high_water_mark == "2025-08-01T00:00:00Z"
+
+        gong, memory = FakeGong(total=50), FakeMemory()
+        await GongIngestionPipeline(gong, memory, checkpoints, batch_size=20).run(incremental=True)
+
+        assert gong.requested_cursors[0] == "20"
+        assert "call_25" in memory.batches[0]
+        assert (await checkpoints.load()).high_water_mark == "2025-08-08T00:00:00Z"
+
+    @pytest.mark.asyncio
+    async def test_incremental_run_starts_at_high_water_mark(self, checkpoints):
+        """A completed incremental run leaves a high-water mark that the next scheduled run starts from."""
+        memory = FakeMemory()
+        await checkpoints.save(IngestionCheckpoint(high_water_mark="2025-08-01T00:00:00Z"))
+        await GongIngestionPipeline(FakeGong(total=5), memory, checkpoints).run(
+            until="2025-08-08T00:00:00Z", incremental=True
+        )
+
+        saved = await checkpoints.load()
+        result = await GongIngestionPipeline(FakeGong(total=0), memory, checkpoints).run(incremental=True)
+
+        assert saved.high_water_mark == "2025-08-08T00:00:00Z"
+        assert saved.cursor is None
+        assert result.since == "2025-08-08T00:00:00Z"
+        assert result.calls_ingested == 0
+
+    @pytest.mark.asyncio
+    async def test_backfills_do_not_move_the_high_water_mark(self, checkpoints):
+        """Full-window runs leave the watermark alone, and it never moves backwards."""
+        await checkpoints.save(IngestionCheckpoint(high_water_mark="2025-08-08T00:00:00Z"))
+
+        await GongIngestionPipeline(FakeGong(total=5), FakeMemory(), checkpoints).run(
+            "2025-09-01T00:00:00Z", "2025-09-08T00:00:00Z"
+        )
+        assert (await checkpoints.load()).high_water_mark == "2025-08-08T00:00:00Z"
+
+        await GongIngestionPipeline(FakeGong(total=5), FakeMemory(), checkpoints).run(
+            until="2025-08-05T00:00:00Z", incremental=True
+        )
+        assert (await checkpoints.load()).high_water_mark == "2025-08-08T00:00:00Z"
+
+    @pytest.mark.asyncio
+    async def test_since_required_for_full_runs(self, checkpoints):
+        pipeline = GongIngestionPipeline(FakeGong(total=1), FakeMemory(), checkpoints)
+        with pytest.raises(ValueError):
+            await pipeline.run()
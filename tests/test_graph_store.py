@@ -0,0 +1,87 @@
+"""
+Tests for the graph access layer
+"""
+
+import pytest
+
+from libs.graph import InMemoryGraphStore, create_graph_store
+from libs.graph.store import _chunks
+
+
+def _entity(name, type_="Metric"):
+    return {"name": name, "type": type_, "description": name, "confidence": 0.9, "data_sources": ["crm"]}
+
+
+def _rel(source, target, rel_type="DRIVES", strength=0.8):
+    return {"source": source, "target": target, "rel_type": rel_type, "strength": strength, "evidence_count": 3}
+
+
+class CountingStore(InMemoryGraphStore):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.fetched = []
+
+    async def _fetch_neighborhoods(self, names):
+        self.fetched.append(list(names))
+        return await super()._fetch_neighborhoods(names)
+
+
+class TestGraphStore:
+    """Test cases for graph stores and the neighborhood cache."""
+
+    @pytest.mark.asyncio
+    async def test_neighborhoods_match_neo4j_shape(self):
+        store = InMemoryGraphStore()
+        await store.upsert_entities([_entity("revenue"), _entity("customers", "Customer"), _entity("churn")])
+        await store.upsert_relationships([_rel("customers", "revenue"), _rel("churn", "revenue", "REDUCES", 0.6),
+                                          _rel("revenue", "missing")])
+
+        context = await store.neighborhoods(["revenue", "unknown", "churn"])
+
+        assert [item["entity"] for item in context] == ["revenue", "churn"]
+        assert sorted((r["name"], r["relationship"], r["strength"]) for r in context[0]["related_entities"]) == [
+            ("churn", "REDUCES", 0.6), ("customers", "DRIVES", 0.8)
+        ]
+        assert context[1]["related_entities"] == [
+            {"name": "revenue", "type": "Metric", "relationship": "REDUCES", "strength": 0.6}
+        ]
+
+    @pytest.mark.asyncio
+    async def test_cached_neighborhoods_skip_backend(self):
+        store = CountingStore()
+        await store.upsert_entities([_entity("revenue"), _entity("sales")])
+        await store.upsert_relationships([_rel("sales", "revenue")])
+
+        await store.neighborhoods(["revenue", "ghost"])
+        await store.neighborhoods(["revenue", "ghost"])
+        await store.neighborhoods(["sales", "revenue"])
+
+        assert store.fetched == [["revenue", "ghost"], ["sales"]]
+        assert store.cache.stats()["hits"] == 3
+
+    @pytest.mark.asyncio
+    async def test_writes_invalidate_only_affected_neighborhoods(self):
+        """Updating an entity drops its own and its neighbors' cached neighborhoods."""
+        store = CountingStore()
+        await store.upsert_entities([_entity("revenue"), _entity("sales"), _entity("costs")])
+        await store.upsert_relationships([_rel("sales", "revenue")])
+        await store.neighborhoods(["revenue", "sales", "costs", "budget"])
+
+        await store.upsert_entities([_entity("sales", "Process"), _entity("budget")])
+        context = await store.neighborhoods(["revenue", "sales", "costs", "budget"])
+
+        assert store.fetched[-1] == ["revenue", "sales", "budget"]
+        assert context[0]["related_entities"][0]["type"] == "Process"
+        assert [item["entity"] for item in context] == ["revenue", "sales", "costs", "budget"]
+
+    def test_factory_and_chunking(self):
+        assert create_graph_store(None) is None
+        assert isinstance(create_graph_store("memory://"), InMemoryGraphStore)
+        assert [len(batch) for batch in _chunks(list(range(2500)), 1000)] == [1000, 1000, 500]
+
+    def test_memory_store_accepts_the_rag_pipeline_options(self):
+        """GraphEnhancedRAG passes Neo4j tuning options whichever backend the URI selects."""
+        store = create_graph_store("memory://", None, None, batch_size=1000, cache_size=16)
+
+        assert isinstance(store, InMemoryGraphStore)
+        assert store.cache.max_entries == 16
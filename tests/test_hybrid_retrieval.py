@@ -0,0 +1,188 @@
+"""
+Tests for hybrid dense + sparse retrieval
+"""
+
+import asyncio
+import time
+
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, VectorParams
+
+from libs.embeddings import Embedder, EmbeddingBackend, get_embedder
+from libs.retrieval import (
+    BM25Encoder,
+    InMemoryHybridIndex,
+    QdrantHybridIndex,
+    reciprocal_rank_fusion,
+    tokenize,
+)
+from rag import pipeline as pipeline_module
+from rag.pipeline import EnhancedRAGPipeline
+
+TOPICS = ["payment", "invoice", "login", "deploy"]
+
+
+class TopicBackend(EmbeddingBackend):
+    """
+    Stand-in for a semantic model: only topic words count, so identifiers and
+    codes are invisible to it. Documents below all point in distinct directions
+    so that neither leg has ties.
+    """
+
+    name = "topics"
+    dimensions = len(TOPICS)
+
+    async def embed(self, texts):
+        return [[float(text.lower().count(topic)) + 0.01 * i for i, topic in enumerate(TOPICS)] for text in texts]
+
+
+DOCUMENTS = [
+    ("1", "Payment retries back off after a failure.", {"repo": "api", "path": "payments/retry.py"}),
+    ("2", "Payment errors: E4021 means the issuer declined the payment, so no invoice is sent.",
+     {"repo": "api", "path": "docs/errors.md"}),
+    ("3", "Payment webhooks update the invoice state.", {"repo": "api", "path": "payments/webhooks.py"}),
+    ("4", "def get_rag_pipeline(): the deploy pipeline behind payment search", {"repo": "web", "path": "rag/pipeline.py"}),
+    ("5", "Login sessions expire after an hour.", {"repo": "web", "path": "auth/session.py",
+                                                    "knowledge_type": "security"}),
+]
+
+
+class WideBackend(TopicBackend):
+    dimensions = len(TOPICS) + 1
+
+
+def _embedder():
+    return Embedder(TopicBackend())
+
+
+async def _in_memory():
+    index = InMemoryHybridIndex(_embedder())
+    await index.upsert([(str(i), text, payload) for i, text, payload in DOCUMENTS])
+    return index
+
+
+async def _qdrant():
+    index = QdrantHybridIndex(QdrantClient(":memory:"), "docs", _embedder())
+    await index.ensure_collection()
+    ids = {i: f"00000000-0000-0000-0000-00000000000{i}" for i, _, _ in DOCUMENTS}
+    await index.upsert([(ids[i], text, {**payload, "key": i}) for i, text, payload in DOCUMENTS])
+    return index
+
+
+class TestHybridRetrieval:
+    """Test cases for hybrid retrieval."""
+
+    def test_rrf_rewards_agreement_between_rankings(self):
+        fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "d"]], k=60)
+
+        assert [doc_id for doc_id, _ in fused] == ["b", "a", "d", "c"]
+        assert fused[0][1] == pytest.approx(1 / 62 + 1 / 61)
+
+    def test_tokenize_splits_identifiers(self):
+        assert tokenize("getRagPipeline E4021") == ["getragpipeline", "get", "rag", "pipeline", "e4021", "e", "4021"]
+        assert BM25Encoder().encode_query("get_rag_pipeline") == BM25Encoder().encode_query("get_rag_pipeline rag")
+
+    @pytest.mark.asyncio
+    async def test_sparse_leg_finds_exact_codes_the_dense_leg_misses(self):
+        index = await _in_memory()
+
+        hits = await index.search("payment declined E4021", k=3)
+
+        assert hits[0].id == "2"
+        assert hits[0].sparse_rank == 1
+        assert (await index.search("get_rag_pipeline", k=1))[0].id == "4"
+
+    @pytest.mark.asyncio
+    async def test_filters_apply_inside_both_legs(self):
+        index = await _in_memory()
+
+        hits = await index.search("payment", k=10, filters={"repo": "web"})
+        security = await index.search("payment", k=10, filters={"knowledge_type": ["security", "ops"]})
+
+        assert {hit.id for hit in hits} == {"4", "5"}
+        assert [hit.id for hit in security] == ["5"]
+
+    @pytest.mark.asyncio
+    async def test_qdrant_and_in_memory_rank_identically(self):
+        memory, qdrant = await _in_memory(), await _qdrant()
+
+        for query, filters in [("payment declined E4021", None), ("invoice webhooks", None),
+                               ("payment", {"repo": "api"}), ("session login", {"path": ["auth/session.py"]})]:
+            expected = [hit.id for hit in await memory.search(query, k=4, filters=filters)]
+            actual = [hit.payload["key"] for hit in await qdrant.search(query, k=4, filters=filters)]
+            assert actual == expected, query
+
+    @pytest.mark.asyncio
+    async def test_pipeline_routes_filtered_queries_to_hybrid_search(self):
+        pipeline = EnhancedRAGPipeline(hybrid_index=await _in_memory())
+
+        mcp_calls = []
+
+        async def mcp_search(*args, **kwargs):
+            mcp_calls.append(args)
+            return [{"content": "unfiltered", "score": 0.9}]
+
+        pipeline._search_new_mcp = mcp_search
+        pipeline._search_legacy_mcp = mcp_search
+
+        results = await pipeline.search_multi_service("E4021", k=2, filters={"repo": "api"})
+
+        assert mcp_calls == []  # MCP services cannot apply payload filters
+        assert results[0]["path"] == "docs/errors.md"
+        assert results[0]["source"] == "qdrant_hybrid"
+        assert all(r["metadata"]["repo"] == "api" for r in results)
+
+    @pytest.mark.asyncio
+    async def test_hybrid_index_refuses_a_legacy_collection(self):
+        """A collection of unnamed vectors (as the legacy indexers write) is never reused."""
+        client = QdrantClient(":memory:")
+        client.create_collection("repo_docs", vectors_config=VectorParams(size=384, distance=Distance.COSINE))
+
+        with pytest.raises(ValueError, match="not a hybrid collection"):
+            await QdrantHybridIndex(client, "repo_docs", _embedder()).ensure_collection()
+
+        index = QdrantHybridIndex(client, "docs", _embedder())
+        await index.ensure_collection()
+        await QdrantHybridIndex(client, "docs", _embedder()).validate_collection()
+        with pytest.raises(ValueError, match="dense vectors"):
+            await QdrantHybridIndex(client, "docs", Embedder(WideBackend())).ensure_collection()
+
+    @pytest.mark.asyncio
+    async def test_sync_fallback_runs_on_one_dedicated_loop(self, monkeypatch):
+        """Every call, including from inside a running loop, searches on the same fallback loop."""
+        index = await _in_memory()
+        loops = []
+        search = index.search
+
+        async def recording_search(*args, **kwargs):
+            loops.append(asyncio.get_running_loop())
+            return await search(*args, **kwargs)
+
+        index.search = recording_search
+        embedders = []
+        monkeypatch.setattr(pipeline_module, "_fallback_loop", None)
+        monkeypatch.setattr(pipeline_module, "_create_hybrid_index", lambda embedder: embedders.append(embedder) or index)
+
+        first = pipeline_module._qdrant_search_fallback("E4021", k=2)
+        second = await asyncio.to_thread(pipeline_module._qdrant_search_fallback, "invoice webhooks", k=2)
+
+        assert first[0]["path"] == "docs/errors.md" and second
+        assert len(loops) == 2 and loops[0] is loops[1] is not asyncio.get_running_loop()
+        assert embedders[0].backend is get_embedder().backend
+        pipeline_module._fallback_loop.call_soon_threadsafe(pipeline_module._fallback_loop.stop)
+
+    def test_sync_fallback_gives_up_after_its_timeout(self, monkeypatch):
+        class StalledIndex:
+            async def search(self, query, k, filters=None):
+                await asyncio.sleep(5)
+
+        monkeypatch.setattr(pipeline_module, "_fallback_loop", None)
+        monkeypatch.setattr(pipeline_module, "_create_hybrid_index", lambda embedder: StalledIndex())
+        monkeypatch.setattr(pipeline_module, "FALLBACK_TIMEOUT", 0.05)
+
+        started = time.monotonic()
+        assert pipeline_module._qdrant_search_fallback("E4021") == []
+        assert time.monotonic() - started < 1.0
+        time.sleep(0.05)  # let the cancelled search unwind before stopping the loop
+        pipeline_module._fallback_loop.call_soon_threadsafe(pipeline_module._fallback_loop.stop)
@@ -0,0 +1,96 @@
+"""
+Tests for checkpointed, batched file ingestion
+"""
+
+import pytest
+
+from libs.ingestion import CheckpointedBatcher, IngestionCheckpoint
+
+
+class FlakyIndex:
+    """Index writer that fails on a chosen batch."""
+
+    def __init__(self, fail_on_batch=None):
+        self.fail_on_batch = fail_on_batch
+        self.batches = []
+
+    async def write(self, batch):
+        if len(self.batches) + 1 == self.fail_on_batch:
+            self.fail_on_batch = None
+            raise RuntimeError("index unavailable")
+        self.batches.append(list(batch))
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for name, count in (("a.txt", 3), ("b.txt", 3), ("c.txt", 2)):
+        path = tmp_path / name
+        path.write_text("x" * count)
+        paths.append((str(path), [f"{name}-{i}" for i in range(count)]))
+    return paths
+
+
+async def _ingest(files, checkpoint, index, batch_size=4):
+    batcher = CheckpointedBatcher(index.write, batch_size, checkpoint)
+    for file_path, documents in files:
+        if not checkpoint.is_done(file_path):
+            await batcher.add_file(file_path, documents)
+    await batcher.flush()
+
+
+class TestCheckpointedBatcher:
+    """Test cases for CheckpointedBatcher."""
+
+    @pytest.mark.asyncio
+    async def test_files_are_done_only_after_their_last_batch_is_written(self, files, tmp_path):
+        checkpoint = IngestionCheckpoint(str(tmp_path / "checkpoint.jsonl"))
+        index = FlakyIndex()
+        batcher = CheckpointedBatcher(index.write, 4, checkpoint)
+
+        await batcher.add_file(*files[0])
+        assert index.batches == [] and not checkpoint.is_done(files[0][0])
+
+        # b's fourth document fills the batch, which also holds all of a
+        await batcher.add_file(*files[1])
+        assert len(index.batches) == 1
+        assert checkpoint.is_done(files[0][0]) and not checkpoint.is_done(files[1][0])
+
+        await batcher.flush()
+        assert checkpoint.is_done(files[1][0])
+        assert batcher.written == 6
+
+    @pytest.mark.asyncio
+    async def test_resume_after_an_interrupted_batch(self, files, tmp_path):
+        """Files whose documents were in the failed batch are ingested again on the next run."""
+        checkpoint_path = str(tmp_path / "checkpoint.jsonl")
+        index = FlakyIndex(fail_on_batch=2)
+
+        with pytest.raises(RuntimeError):
+            await _ingest(files, IngestionCheckpoint(checkpoint_path), index)
+
+        resumed = IngestionCheckpoint(checkpoint_path)
+        assert [resumed.is_done(path) for path, _ in files] == [True, False, False]
+
+        await _ingest(files, resumed, index)
+
+        indexed = [doc for batch in index.batches for doc in batch]
+        assert indexed[:4] == ["a.txt-0", "a.txt-1", "a.txt-2", "b.txt-0"]
+        assert sorted(set(indexed[4:])) == sorted(files[1][1] + files[2][1])
+        assert all(IngestionCheckpoint(checkpoint_path).is_done(path) for path, _ in files)
+
+    @pytest.mark.asyncio
+    async def test_files_added_in_pieces_wait_for_their_last_piece(self, files, tmp_path):
+        checkpoint = IngestionCheckpoint(str(tmp_path / "checkpoint.jsonl"))
+        index = FlakyIndex()
+        batcher = CheckpointedBatcher(index.write, 2, checkpoint)
+        path, documents = files[0]
+
+        await batcher.add_file(path, documents[:2], complete=False)
+        await batcher.flush()
+        assert not checkpoint.is_done(path)
+
+        await batcher.add_file(path, documents[2:], complete=True)
+        await batcher.flush()
+        assert checkpoint.is_done(path)
+        assert IngestionCheckpoint(checkpoint.path).completed[path] == checkpoint.signature(path)
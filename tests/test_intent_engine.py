@@ -0,0 +1,145 @@
+"""
+Tests for the compiled intent engine behind the ChatOps router
+"""
+
+import re
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from sophia.core.chatops_router import SOPHIAChatOpsRouter
+from sophia.core.intent_engine import CompiledIntentMatcher, IntentCache, LocalIntentClassifier
+from sophia.core.ultimate_model_router import UltimateModelRouter
+
+MESSAGES = [
+    "deploy the api service to staging",
+    "please ship dashboard",
+    "can you check the deploy status",
+    "summarize yesterday's gong calls",
+    "create an asana task for follow-up",
+    "research vector databases",
+    "how are the workers doing",
+    "good morning sophia",
+    "Look up the pricing page\nand more",
+]
+
+TRAINING = [
+    ("what went on with customers this week", "gong_summary"),
+    ("any highlights from customer conversations", "gong_summary"),
+    ("recap the sales conversations", "gong_summary"),
+    ("tell me about the customer conversations today", "gong_summary"),
+    ("what did customers say this week", "gong_summary"),
+    ("thanks that was helpful", "chat"),
+    ("hello there", "chat"),
+    ("thanks a lot", "chat"),
+    ("hi how are you", "chat"),
+    ("that was helpful thanks", "chat"),
+    ("remind me to email the vendor", "create_task"),
+    ("make a ticket to fix login", "create_task"),
+    ("make a ticket for the billing bug", "create_task"),
+    ("remind me to call the vendor", "create_task"),
+    ("make a reminder to email finance", "create_task"),
+]
+
+
+@pytest.fixture
+def model_router():
+    router = MagicMock(spec=UltimateModelRouter)
+    router.select_model.return_value = "claude-sonnet-4"
+    router.call_model = AsyncMock(
+        return_value='{"intent": "chat", "confidence": 0.9, "parameters": {}, "suggested_action": "reply"}'
+    )
+    return router
+
+
+class TestCompiledIntentMatcher:
+    """Test cases for CompiledIntentMatcher."""
+
+    def test_matches_like_sequential_search(self):
+        """The combined regex picks the same pattern and groups as looping over re.search."""
+        router = SOPHIAChatOpsRouter(model_router=MagicMock())
+        matcher = CompiledIntentMatcher(router.intent_patterns)
+
+        for text in MESSAGES:
+            expected = None
+            for intent, patterns in router.intent_patterns.items():
+                for pattern in patterns:
+                    match = re.search(pattern, text, re.IGNORECASE)
+                    if match and expected is None:
+                        expected = (intent, match.groups())
+            assert matcher.match(text) == expected, text
+
+    def test_routing_is_sub_millisecond(self):
+        router = SOPHIAChatOpsRouter(model_router=MagicMock())
+        start = time.perf_counter()
+        for _ in range(1000):
+            for text in MESSAGES:
+                router.intent_matcher.match(text)
+        per_message = (time.perf_counter() - start) / (1000 * len(MESSAGES))
+        assert per_message < 0.001
+
+
+class TestIntentTiers:
+    """Test cases for the cache and local classifier in front of the LLM."""
+
+    def test_cache_normalizes_and_evicts(self):
+        cache = IntentCache(max_entries=2)
+        cache.put("Hello  there!", {"intent": "chat"})
+        cache.put("b", {"intent": "status"})
+        assert cache.get("hello there") == {"intent": "chat"}
+        cache.put("c", {"intent": "research"})
+        assert cache.get("b") is None
+        assert cache.stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_repeated_message_skips_llm(self, model_router):
+        router = SOPHIAChatOpsRouter(model_router=model_router)
+
+        first = await router.parse_input("Good evening, Sophia")
+        second = await router.parse_input("good evening sophia!")
+
+        assert first[0] == second[0] == "chat"
+        model_router.call_model.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_local_classifier_routes_logged_phrasings(self, model_router, tmp_path):
+        """Once trained from logged LLM labels, similar messages never reach the LLM."""
+        log_path = str(tmp_path / "intents.jsonl")
+        classifier = LocalIntentClassifier(log_path=log_path, min_examples=10, retrain_every=5)
+        for text, intent in TRAINING:
+            classifier.add_example(text, intent)
+        assert not classifier.is_trained
+        classifier.train()
+
+        reloaded = LocalIntentClassifier(log_path=log_path, min_examples=10)
+        router = SOPHIAChatOpsRouter(model_router=model_router, local_classifier=reloaded, local_confidence_threshold=0.5)
+
+        response_type, intent = await router.parse_input("what did customers say in conversations today")
+
+        assert reloaded.is_trained
+        assert reloaded.predict("thanks hello")[0] == "chat"
+        assert response_type == "plan"
+        assert intent.title == "Summarize Recent Gong Calls"
+        model_router.call_model.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_ai_labels_retrain_in_the_background(self, model_router, tmp_path):
+        """Logging an LLM label never trains inline; one debounced retrain runs afterwards."""
+        log_path = str(tmp_path / "intents.jsonl")
+        seed = LocalIntentClassifier(log_path=log_path)
+        for text, intent in TRAINING[:-1]:
+            seed.add_example(text, intent)
+
+        classifier = LocalIntentClassifier(log_path=log_path, min_examples=15, retrain_delay=0.05)
+        router = SOPHIAChatOpsRouter(model_router=model_router, local_classifier=classifier)
+        assert not classifier.is_trained and not (tmp_path / "intents.model.json").exists()
+
+        await router.parse_input("good evening, is anyone around")
+
+        assert not classifier.is_trained
+        await classifier._retrain_task
+        assert classifier.is_trained
+        assert (tmp_path / "intents.model.json").exists()
+        assert LocalIntentClassifier(log_path=log_path).is_trained
+
@@ -0,0 +1,136 @@
+"""
+Tests for batched knowledge persistence in the continuous learning orchestrator
+"""
+
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from qdrant_client import QdrantClient
+
+from KNOWLEDGE_ENHANCEMENT_IMPLEMENTATION import (
+    EMBEDDING_DIMENSIONS,
+    BusinessEntity,
+    ConfidenceLevel,
+    ContinuousLearningOrchestrator,
+    KnowledgeItem,
+    KnowledgeType,
+    merge_duplicate_entities,
+)
+
+MESSAGE = "Our ARR and churn rate dropped after the Salesforce and Gong rollout; ARR matters most."
+
+
+class FakeConnection:
+    def __init__(self):
+        self.queries = []
+        self.entity_args = None
+        self.transactions = []
+
+    @asynccontextmanager
+    async def transaction(self):
+        state = {"committed": False}
+        self.transactions.append(state)
+        yield
+        state["committed"] = True
+
+    async def fetch(self, query, *args):
+        self.queries.append(query)
+        self.entity_args = args
+        types, names = args[0], args[1]
+        return [{"id": i + 1, "entity_type": t, "entity_name": n} for i, (t, n) in enumerate(zip(types, names))]
+
+    async def fetchrow(self, query, *args):
+        self.queries.append(query)
+        return {"id": 7}
+
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.calls = []
+
+    async def create(self, model, input):
+        self.calls.append(list(input))
+        data = [SimpleNamespace(index=i, embedding=[float(i + 1)] + [0.0] * (EMBEDDING_DIMENSIONS - 1))
+                for i in range(len(input))]
+        return SimpleNamespace(data=list(reversed(data)))
+
+
+class FakeExtractor:
+    async def extract_knowledge(self, text, entities, context):
+        return [
+            KnowledgeItem(content=f"fact {i}", knowledge_type=KnowledgeType.BUSINESS_PROCESS,
+                          entities_mentioned=["arr"], confidence_level=ConfidenceLevel.HIGH,
+                          source_interaction_id="", metadata={})
+            for i in range(3)
+        ]
+
+
+def _orchestrator(conn):
+    orchestrator = ContinuousLearningOrchestrator({
+        "openai_api_key": "test-key", "database_url": "postgresql://unused", "qdrant_url": "http://unused",
+    })
+    orchestrator.knowledge_extractor = FakeExtractor()
+    orchestrator.embedding_client = SimpleNamespace(embeddings=FakeEmbeddings())
+    orchestrator.database.pool = FakePool(conn)
+    orchestrator.vector_client = QdrantClient(":memory:")
+    return orchestrator
+
+
+class TestKnowledgePipeline:
+    """Test cases for process_user_interaction persistence."""
+
+    @pytest.mark.asyncio
+    async def test_interaction_is_one_embedding_call_and_one_entity_upsert(self):
+        conn = FakeConnection()
+        orchestrator = _orchestrator(conn)
+        await orchestrator.setup_vector_collections()
+
+        result = await orchestrator.process_user_interaction("s1", MESSAGE, {}, user_id="u1")
+
+        assert result["processing_status"] == "success"
+        assert result["interaction_id"] == 7
+        calls = orchestrator.embedding_client.embeddings.calls
+        assert len(calls) == 1
+        assert len(calls[0]) == result["entities_extracted"] + 3
+        assert sum("INSERT INTO business_entities" in q for q in conn.queries) == 1
+        assert len(set(zip(conn.entity_args[0], conn.entity_args[1]))) == len(conn.entity_args[0])
+        assert conn.transactions == [{"committed": True}]
+        knowledge = orchestrator.vector_client.count("knowledge_items").count
+        entities = orchestrator.vector_client.count("pay_ready_entities").count
+        assert knowledge == 3
+        assert entities == len({e["name"] for e in result["entities"]})
+
+    @pytest.mark.asyncio
+    async def test_vector_failure_rolls_back_transaction(self):
+        """Vectors are written inside the transaction, so a Qdrant failure aborts the rows too."""
+        conn = FakeConnection()
+        orchestrator = _orchestrator(conn)  # collections never created
+
+        result = await orchestrator.process_user_interaction("s1", MESSAGE, {})
+
+        assert result["processing_status"] == "failed"
+        assert conn.transactions == [{"committed": False}]
+
+    def test_duplicate_entities_merge_like_the_upsert(self):
+        def entity(confidence, sources, attributes):
+            return BusinessEntity(name="arr", entity_type="metrics", description="d", attributes=attributes,
+                                  data_sources=sources, confidence_score=confidence, relationships=[])
+
+        first = entity(0.7, ["conversation"], {"a": 1})
+        merged = merge_duplicate_entities([first, entity(0.9, ["gong"], {"b": 2})])
+
+        assert len(merged) == 1
+        assert merged[0].confidence_score == 0.9
+        assert merged[0].data_sources == ["conversation", "gong"]
+        assert merged[0].attributes == {"a": 1, "b": 2}
+        assert first.attributes == {"a": 1}
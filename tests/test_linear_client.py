@@ -3,10 +3,11 @@ Tests for Linear API Client
 """
 
 import pytest
-import asyncio
 from unittest.mock import AsyncMock, patch, MagicMock
 import httpx
 
+from libs.ratelimit import reset_limiters
+
 from sophia.integrations.linear_client import LinearClient, LinearTeam, LinearIssue
 
 
@@ -19,6 +20,7 @@ class TestLinearClient:
     
     @pytest.fixture
     def linear_client(self, mock_api_key):
+        reset_limiters()
         with patch.dict('os.environ', {'LINEAR_API_KEY': mock_api_key}):
             return LinearClient()
     
@@ -99,17 +101,16 @@ class TestLinearClient:
     @pytest.mark.asyncio
     async def test_rate_limiting(self, linear_client):
         """Test rate limiting functionality"""
-        # Fill up the rate limit
-        current_time = asyncio.get_event_loop().time()
-        linear_client._request_times = [current_time - 1800] * 1800  # Fill to limit
+        limiter = linear_client._limiter
+        assert limiter.rate == 1800
+        assert limiter.period == 3600
         
-        # This should trigger rate limiting
-        start_time = asyncio.get_event_loop().time()
-        await linear_client._rate_limit_check()
-        end_time = asyncio.get_event_loop().time()
+        # Once the burst allowance is used up, the next slot is one emission interval out
+        for _ in range(limiter.burst):
+            await limiter.backend.reserve()
+        delay = await limiter.backend.reserve()
         
-        # Should have waited
-        assert end_time - start_time >= 0  # At least some delay
+        assert delay > 0
     
     @pytest.mark.asyncio
     async def test_get_viewer_success(self, linear_client, mock_viewer_response):
@@ -318,7 +319,8 @@ class TestLinearClient:
                 result = await linear_client._make_request("query { viewer { id } }")
                 
                 assert result == {"data": {"viewer": {"id": "user123"}}}
-                mock_sleep.assert_called_once_with(1)
+                mock_sleep.assert_called_once()
+                assert mock_sleep.call_args.args[0] == pytest.approx(1, abs=0.1)
     
     @pytest.mark.asyncio
     async def test_health_check_success(self, linear_client, mock_viewer_response):
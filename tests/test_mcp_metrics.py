@@ -0,0 +1,128 @@
+"""
+Tests for the shared MCP metrics instrumentation
+"""
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from flask import Flask
+from prometheus_client import REGISTRY
+
+from libs.metrics import (
+    UNMATCHED_ROUTE,
+    init_metrics,
+    init_wsgi_metrics,
+    instrument_httpx_client,
+    track_dependency,
+)
+
+
+def _sample(name, labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestASGIMetrics:
+    """Test cases for the FastAPI adapter."""
+
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+
+        @app.get("/code/plans/{plan_id}")
+        def get_plan(plan_id: str):
+            return {"plan_id": plan_id}
+
+        init_metrics(app, "test-asgi")
+        return TestClient(app)
+
+    def test_labels_by_route_template(self, client):
+        """Different plan ids share one series keyed by the template."""
+        labels = {"service": "test-asgi", "method": "GET", "path": "/code/plans/{plan_id}", "status": "200"}
+        before = _sample("sophia_requests_total", labels)
+
+        client.get("/code/plans/abc")
+        client.get("/code/plans/def")
+
+        assert _sample("sophia_requests_total", labels) == before + 2
+        assert _sample("sophia_requests_total", {**labels, "path": "/code/plans/abc"}) == 0.0
+
+    def test_unmatched_paths_collapse(self, client):
+        """404s are grouped under a single unmatched label."""
+        labels = {"service": "test-asgi", "method": "GET", "path": UNMATCHED_ROUTE, "status": "404"}
+        before = _sample("sophia_requests_total", labels)
+
+        client.get("/wp-admin/setup.php")
+
+        assert _sample("sophia_requests_total", labels) == before + 1
+
+    def test_metrics_endpoint_and_in_flight(self, client):
+        """/metrics serves the text format and in-flight returns to zero."""
+        client.get("/code/plans/abc")
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert "sophia_response_size_bytes" in response.text
+        assert _sample("sophia_requests_in_flight", {"service": "test-asgi"}) == 0.0
+
+    def test_code_app_is_instrumented_once(self):
+        """create_app("code") returns the shared code app without stacking middleware."""
+        from mcp_servers.app import create_app
+
+        app = create_app("code")
+        middleware = len(app.user_middleware)
+
+        assert create_app("code") is app
+        assert len(app.user_middleware) == middleware
+
+
+class TestWSGIMetrics:
+    """Test cases for the Flask adapter."""
+
+    def test_labels_by_url_rule(self):
+        """Flask requests are labelled by their URL rule."""
+        app = Flask(__name__)
+
+        @app.route("/api/v1/items/<item_id>")
+        def get_item(item_id):
+            return {"id": item_id}
+
+        init_wsgi_metrics(app, "test-wsgi")
+        client = app.test_client()
+        labels = {"service": "test-wsgi", "method": "GET", "path": "/api/v1/items/<item_id>", "status": "200"}
+        before = _sample("sophia_requests_total", labels)
+
+        client.get("/api/v1/items/1")
+        client.get("/api/v1/items/2")
+        response = client.get("/metrics")
+
+        assert _sample("sophia_requests_total", labels) == before + 2
+        assert response.status_code == 200
+        assert b"sophia_requests_in_flight" in response.data
+        assert _sample("sophia_requests_in_flight", {"service": "test-wsgi"}) == 0.0
+
+
+class TestOutboundMetrics:
+    """Test cases for dependency latency instrumentation."""
+
+    def test_httpx_client_hooks(self):
+        """httpx responses are recorded by dependency and status class."""
+        transport = httpx.MockTransport(lambda request: httpx.Response(503))
+        client = instrument_httpx_client(httpx.Client(transport=transport), "serper")
+        labels = {"dependency": "serper", "method": "POST", "status": "5xx"}
+        before = _sample("sophia_dependency_latency_seconds_count", labels)
+
+        client.post("https://google.serper.dev/search")
+
+        assert _sample("sophia_dependency_latency_seconds_count", labels) == before + 1
+
+    def test_track_dependency_records_errors(self):
+        """Exceptions inside track_dependency are labelled as errors and re-raised."""
+        labels = {"dependency": "qdrant", "method": "SEARCH", "status": "error"}
+        before = _sample("sophia_dependency_latency_seconds_count", labels)
+
+        with pytest.raises(RuntimeError):
+            with track_dependency("qdrant", "search"):
+                raise RuntimeError("boom")
+
+        assert _sample("sophia_dependency_latency_seconds_count", labels) == before + 1
@@ -0,0 +1,157 @@
+"""
+Tests for the metrics rollup store and rollup-backed reports
+"""
+
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+from monitoring.report import SOPHIAReportGenerator
+from sophia.core.metrics_rollup import SQLiteRollupStore, bucket_start, create_rollup_store, get_rollup_store
+from sophia.core.performance_monitor import PerformanceMetric, SOPHIAPerformanceMonitor
+from sophia.core.sophia_base_agent import SOPHIABaseAgent
+from sophia.core.ultimate_model_router import ModelConfig
+
+NOW = datetime.now(timezone.utc)
+
+
+def _metric(service="openai", duration_ms=100.0, success=True, hours_ago=0, error_type=None):
+    return PerformanceMetric(
+        timestamp=NOW - timedelta(hours=hours_ago),
+        service=service,
+        operation="chat",
+        duration_ms=duration_ms,
+        tokens_used=10,
+        success=success,
+        error_type=error_type,
+    )
+
+
+class FakeFeedbackMaster:
+    def __init__(self, totals=None):
+        self.totals = totals or {"total_feedback": 0, "average_rating": 0.0, "rating_distribution": {}, "issue_counts": {}}
+        self.windows = []
+
+    async def feedback_totals(self, start, end, source=None):
+        self.windows.append((start, end))
+        return self.totals
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "rollups.db")
+
+
+class TestRollupStore:
+    """Test cases for RollupStore."""
+
+    @pytest.mark.asyncio
+    async def test_summary_matches_raw_metrics(self, db_path):
+        store = SQLiteRollupStore(db_path)
+        for i in range(20):
+            store.record_metric(_metric(duration_ms=100 + i, success=i % 5 != 0, error_type="Timeout" if i % 5 == 0 else None))
+        store.record_metric(_metric(service="github", duration_ms=3000))
+        await store.flush()
+
+        now = NOW.timestamp()
+        summary = await store.performance_summary(now - 86400, now)
+        errors = await store.error_counts(now - 86400, now)
+
+        assert summary["total_calls"] == 21
+        assert summary["failed_calls"] == 4
+        assert summary["services"]["openai"]["error_rate"] == pytest.approx(20.0)
+        assert summary["overall_stats"]["slowest_call_ms"] == 3000
+        assert summary["total_tokens_used"] == 210
+        assert summary["p50_duration_ms"] == 250
+        assert errors == {"openai": {"Timeout": 4}}
+
+    @pytest.mark.asyncio
+    async def test_rollups_survive_restart_and_merge(self, db_path):
+        """A new store on the same database sees earlier buckets and adds to them."""
+        store = SQLiteRollupStore(db_path)
+        store.record_metric(_metric(duration_ms=50))
+        await store.flush()
+        await store.close()
+
+        restarted = create_rollup_store(f"sqlite:///{db_path}")
+        restarted.record_metric(_metric(duration_ms=500))
+        await restarted.flush()
+
+        now = NOW.timestamp()
+        summary = await restarted.performance_summary(now - 3600, now)
+        assert summary["total_calls"] == 2
+        assert summary["overall_stats"]["fastest_call_ms"] == 50
+        assert summary["overall_stats"]["slowest_call_ms"] == 500
+
+    @pytest.mark.asyncio
+    async def test_week_reads_daily_buckets(self, db_path):
+        """Weekly windows read one row per day, not one per hour or per call."""
+        store = SQLiteRollupStore(db_path)
+        for hours_ago in range(0, 24 * 7, 2):
+            store.record_metric(_metric(hours_ago=hours_ago))
+        await store.flush()
+
+        now = NOW.timestamp()
+        rows = await store.perf_buckets(now - 7 * 86400, now)
+
+        assert len(rows) <= 8
+        assert sum(row["calls"] for row in rows) == 84
+        assert all(row["bucket_start"] == bucket_start(row["bucket_start"], "day") for row in rows)
+
+
+class TestRollupReports:
+    """Test cases for reports served from rollups."""
+
+    @pytest.mark.asyncio
+    async def test_monitor_feeds_rollups_and_reports_read_them(self, db_path):
+        store = SQLiteRollupStore(db_path)
+        monitor = SOPHIAPerformanceMonitor(rollup_store=store)
+        for i in range(12):
+            await monitor.log_metric(_metric(success=i % 3 != 0, error_type="RateLimit" if i % 3 == 0 else None))
+
+        generator = SOPHIAReportGenerator(rollup_store=SQLiteRollupStore(db_path))
+        feedback = FakeFeedbackMaster({"total_feedback": 3, "average_rating": 4.0,
+                                       "rating_distribution": {4: 3}, "issue_counts": {}})
+        generator.feedback_master.feedback_totals = feedback.feedback_totals
+        await store.flush()
+
+        weekly = await generator.generate_weekly_report()
+        service = await generator.generate_service_report("openai")
+        grafana = await generator.generate_grafana_metrics()
+
+        assert weekly["summary"]["total_api_calls"] == 12
+        assert weekly["health"]["services"]["openai"]["status"] == "unhealthy"
+        assert service["summary"]["failed_calls"] == 4
+        assert "Address common RateLimit errors in openai" in service["recommendations"]
+        assert grafana["metrics"][0]["value"] == 12
+        assert weekly["summary"]["total_feedback"] == 3
+        assert feedback.windows
+
+    @pytest.mark.asyncio
+    async def test_agent_model_calls_land_in_the_shared_store(self, db_path, monkeypatch):
+        """route_task is recorded by the agent's monitor into the process-wide rollup store."""
+        class Agent(SOPHIABaseAgent):
+            async def _process_task_impl(self, task_id, task_data):
+                return {}
+
+        async def call_model(model_config, prompt, **kwargs):
+            return "ok"
+
+        monkeypatch.setenv("SOPHIA_ROLLUP_URL", f"sqlite:///{db_path}")
+        get_rollup_store.cache_clear()
+        try:
+            agent = Agent("rollup-test")
+            model = ModelConfig("openai", "gpt-5", 1, 128_000, 0.0, "OPENAI_API_KEY")
+            monkeypatch.setattr(agent.model_router, "select_model", lambda task_type: model)
+            monkeypatch.setattr(agent.model_router, "call_model", call_model)
+
+            await agent.route_task("analysis", "hello")
+            await get_rollup_store().flush()
+
+            now = datetime.now(timezone.utc).timestamp()
+            summary = await SQLiteRollupStore(db_path).performance_summary(now - 3600, now + 3600)
+            assert agent.performance_monitor.rollup_store is get_rollup_store()
+            assert summary["total_calls"] == 1
+            assert "openai" in summary["services"]
+        finally:
+            get_rollup_store.cache_clear()
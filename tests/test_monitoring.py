@@ -0,0 +1,114 @@
+"""
+Tests for the concurrent health collector in ops/monitoring.py
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from fastapi.testclient import TestClient
+
+from ops.monitoring import ComponentHealth, HealthStatus, ProbeHistory, SophiaIntelMonitor, create_health_app
+
+
+def _slow_probe(name, delay, status=HealthStatus.HEALTHY):
+    async def probe(*args, **kwargs):
+        await asyncio.sleep(delay)
+        return ComponentHealth(name=name, status=status, response_time_ms=delay * 1000)
+    return probe
+
+
+@pytest.fixture
+def monitor(monkeypatch):
+    monkeypatch.delenv("REDIS_HOST", raising=False)
+    monitor = SophiaIntelMonitor(probe_timeout=0.3)
+    monitor.endpoints = {"api": "http://api", "webapp": "http://webapp"}
+    monitor.check_http_endpoint = lambda name, url: _slow_probe(name, 0.2)()
+    monitor._check_neon_postgres = _slow_probe("neon_postgres", 0.2)
+    monitor.check_qdrant_vector_db = _slow_probe("qdrant", 0.2)
+
+    async def containers():
+        await asyncio.sleep(0.2)
+        return [ComponentHealth(name="airbyte-minio-1", status=HealthStatus.HEALTHY)]
+
+    async def mcp():
+        return [ComponentHealth(name="mcp_servers", status=HealthStatus.HEALTHY)]
+
+    monitor.check_docker_containers_async = containers
+    monitor.check_mcp_servers = mcp
+    return monitor
+
+
+class TestSophiaIntelMonitor:
+    """Test cases for concurrent probing and cached snapshots."""
+
+    @pytest.mark.asyncio
+    async def test_probes_run_concurrently(self, monitor):
+        """Five 200ms probes finish in about 200ms, not a second."""
+        start = time.perf_counter()
+        results = await monitor.run_comprehensive_health_check()
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.6
+        assert results["summary"]["healthy"] == 6
+        assert "cpu_percent" in results["system_metrics"]
+
+    @pytest.mark.asyncio
+    async def test_slow_probe_times_out_without_blocking_others(self, monitor):
+        monitor.check_qdrant_vector_db = _slow_probe("qdrant", 5.0)
+
+        start = time.perf_counter()
+        results = await monitor.run_comprehensive_health_check()
+
+        assert time.perf_counter() - start < 1.0
+        assert results["components"]["qdrant"]["status"] == "unhealthy"
+        assert "timed out" in results["components"]["qdrant"]["error_message"]
+        assert results["components"]["api"]["status"] == "healthy"
+
+    @pytest.mark.asyncio
+    async def test_snapshot_is_served_from_cache(self, monitor):
+        """Health endpoints get the cached snapshot instantly once the collector has run."""
+        monitor.collection_interval = 60
+        monitor.start()
+        await asyncio.sleep(0.4)
+
+        start = time.perf_counter()
+        snapshot = await monitor.get_snapshot()
+        elapsed = time.perf_counter() - start
+        await monitor.stop()
+
+        assert elapsed < 0.05
+        assert snapshot["summary"]["total_components"] == 6
+        assert snapshot["latency_history"]["api"]["samples"] == 1
+
+    def test_qdrant_is_probed_once(self, monkeypatch):
+        monkeypatch.setenv("QDRANT_URL", "http://qdrant:6333")
+
+        assert "qdrant" not in SophiaIntelMonitor().endpoints
+
+    def test_health_endpoint_serves_snapshot(self, monitor):
+        """The health app starts the collector and serves its snapshot and history."""
+        with TestClient(create_health_app(monitor)) as client:
+            snapshot = client.get("/health").json()
+            history = client.get("/health/history").json()
+
+        assert snapshot["summary"]["total_components"] == 6
+        assert "snapshot_age_seconds" in snapshot
+        assert history["qdrant"]["samples"] >= 1
+
+
+class TestProbeHistory:
+    """Test cases for latency history and trends."""
+
+    def test_degrading_trend_is_detected(self):
+        history = ProbeHistory(max_samples=10)
+        for latency in [10, 11, 10, 12, 10, 40, 45, 50, 42, 48, 55]:
+            history.record(ComponentHealth("api", HealthStatus.HEALTHY, response_time_ms=latency))
+
+        summary = history.summary("api")
+
+        assert summary["samples"] == 10
+        assert summary["trend"] == "degrading"
+        assert summary["availability"] == 1.0
+        assert summary["last_ms"] == 55
@@ -3,10 +3,11 @@ Tests for Notion API Client
 """
 
 import pytest
-import asyncio
 from unittest.mock import AsyncMock, patch, MagicMock
 import httpx
 
+from libs.ratelimit import reset_limiters
+
 from sophia.integrations.notion_client import NotionClient, NotionDatabase, NotionPage
 
 
@@ -19,6 +20,7 @@ class TestNotionClient:
     
     @pytest.fixture
     def notion_client(self, mock_token):
+        reset_limiters()
         with patch.dict('os.environ', {'NOTION_API_KEY': mock_token}):
             return NotionClient()
     
@@ -86,17 +88,16 @@ class TestNotionClient:
     @pytest.mark.asyncio
     async def test_rate_limiting(self, notion_client):
         """Test rate limiting functionality (3 requests per second)"""
-        # Fill up the rate limit
-        current_time = asyncio.get_event_loop().time()
-        notion_client._request_times = [current_time - 0.5] * 3  # Fill to limit
+        limiter = notion_client._limiter
+        assert limiter.rate == 3
+        assert limiter.period == 1
         
-        # This should trigger rate limiting
-        start_time = asyncio.get_event_loop().time()
-        await notion_client._rate_limit_check()
-        end_time = asyncio.get_event_loop().time()
+        # Once the burst allowance is used up, the next slot is one emission interval out
+        for _ in range(limiter.burst):
+            await limiter.backend.reserve()
+        delay = await limiter.backend.reserve()
         
-        # Should have waited
-        assert end_time - start_time >= 0  # At least some delay
+        assert delay > 0
     
     @pytest.mark.asyncio
     async def test_get_me_success(self, notion_client, mock_bot_response):
@@ -281,7 +282,8 @@ class TestNotionClient:
                 result = await notion_client._make_request("GET", "/test")
                 
                 assert result == {"id": "success"}
-                mock_sleep.assert_called_once_with(1)
+                mock_sleep.assert_called_once()
+                assert mock_sleep.call_args.args[0] == pytest.approx(1, abs=0.1)
     
     @pytest.mark.asyncio
     async def test_health_check_success(self, notion_client, mock_bot_response):
@@ -0,0 +1,174 @@
+"""
+Tests for embedding-backed persona context
+"""
+
+import asyncio
+import sys
+import types
+
+import pytest
+from qdrant_client import QdrantClient
+
+from agents.persona_manager import PersonaManager, embedding_space
+from libs.embeddings import Embedder, HashingBackend, VectorIndex, create_backend
+
+
+class CountingBackend(HashingBackend):
+    def __init__(self):
+        super().__init__(dimensions=64)
+        self.batches = []
+
+    async def embed(self, texts):
+        self.batches.append(list(texts))
+        return await super().embed(texts)
+
+
+class CountingQdrant:
+    """In-memory Qdrant that counts calls."""
+
+    def __init__(self):
+        self.client = QdrantClient(":memory:")
+        self.calls = []
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if callable(attr):
+            def wrapper(*args, **kwargs):
+                self.calls.append(name)
+                return attr(*args, **kwargs)
+            return wrapper
+        return attr
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    async def get(self, key):
+        return self.data.get(key)
+
+
+@pytest.fixture
+def manager():
+    embedder = Embedder(CountingBackend())
+    manager = PersonaManager(embedder=embedder, qdrant=CountingQdrant(), redis_client=FakeRedis(), context_window=5)
+    asyncio.run(manager.initialize_collections())
+    return manager
+
+
+class TestEmbedder:
+    """Test cases for the batched embedding cache."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_are_coalesced_and_cached(self):
+        backend = CountingBackend()
+        embedder = Embedder(backend, max_wait=0.01)
+
+        vectors = await asyncio.gather(*(embedder.embed_one(f"text {i % 5}") for i in range(20)))
+        again = await embedder.embed(["text 1", "text 2"])
+
+        assert len(backend.batches) == 1
+        assert sorted(backend.batches[0]) == [f"text {i}" for i in range(5)]
+        assert again == [vectors[1], vectors[2]]
+        assert embedder.stats()["hits"] == 2
+
+    def test_local_model_reports_its_dimension_before_encoding(self, monkeypatch):
+        class FakeSentenceTransformer:
+            def __init__(self, model_name, device=None):
+                self.model_name = model_name
+
+            def get_sentence_embedding_dimension(self):
+                return 768
+
+        monkeypatch.setitem(
+            sys.modules, "sentence_transformers", types.SimpleNamespace(SentenceTransformer=FakeSentenceTransformer)
+        )
+        monkeypatch.delenv("SOPHIA_EMBEDDING_URL", raising=False)
+        monkeypatch.setenv("SOPHIA_EMBEDDING_MODEL", "BAAI/bge-base-en-v1.5")
+
+        embedder = Embedder(create_backend())
+
+        assert embedder.dimensions == 768
+        assert embedding_space(embedder) == "baai_bge_base_en_v1_5_768"
+        assert VectorIndex(embedder.dimensions).dimensions == 768
+
+    def test_hashing_vectors_reflect_word_overlap(self):
+        backend = HashingBackend(dimensions=256)
+        a, b, c = asyncio.run(backend.embed(["deploy the api", "deploy the api now", "quarterly sales numbers"]))
+        dot = lambda x, y: sum(i * j for i, j in zip(x, y))
+        assert dot(a, b) > 0.5 > dot(a, c)
+
+
+class TestVectorIndex:
+    """Test cases for the in-memory vector index."""
+
+    def test_ring_buffer_keeps_latest(self):
+        index = VectorIndex(dimensions=2, capacity=3)
+        for i in range(5):
+            index.add([1.0, 0.0] if i % 2 else [0.0, 1.0], {"i": i})
+
+        assert len(index) == 3
+        assert [p["i"] for p in index.latest(3)] == [4, 3, 2]
+        assert [p["i"] for _, p in index.search([1.0, 0.0], limit=2)] == [3, 4]
+        assert [p["i"] for _, p in index.search([0.0, 1.0], limit=1, skip_latest=1)] == [2]
+
+
+class TestPersonaContext:
+    """Test cases for PersonaManager context retrieval."""
+
+    @pytest.mark.asyncio
+    async def test_active_user_context_needs_no_qdrant_calls(self, manager):
+        await manager.get_context("u1", "warm up")
+        for query in ["deploy the billing api", "gong call notes for acme", "rotate the redis password"]:
+            await manager.store_interaction("u1", query, {"answer": "done"})
+        calls_before = len(manager.qdrant.calls)
+
+        context = await manager.get_context("u1", "deploy the billing service")
+
+        assert manager.qdrant.calls[calls_before:] == []
+        assert context[0]["query"] == "rotate the redis password"
+        assert context[1]["query"] == "deploy the billing api"
+
+    @pytest.mark.asyncio
+    async def test_cold_user_is_loaded_once_from_qdrant(self, manager):
+        for i in range(8):
+            await manager.store_interaction("u2", f"question {i} about pricing", {"n": i})
+
+        fresh = PersonaManager(
+            embedder=manager.embedder, qdrant=manager.qdrant, redis_client=FakeRedis(), context_window=5
+        )
+        first = await fresh.get_context("u2", "pricing")
+        scrolls = manager.qdrant.calls.count("scroll")
+        await fresh.get_context("u2", "pricing again")
+
+        assert first[0]["query"] == "question 7 about pricing"
+        assert len(first) == 4
+        assert manager.qdrant.calls.count("scroll") == scrolls == 1
+
+    @pytest.mark.asyncio
+    async def test_cold_load_reads_the_latest_interactions_by_timestamp(self, manager):
+        """Only the newest context_window points are fetched, whatever their IDs."""
+        for i in range(40):
+            await manager.store_interaction("u3", f"question {i} about pricing", {"n": i})
+
+        fresh = PersonaManager(
+            embedder=manager.embedder, qdrant=manager.qdrant, redis_client=FakeRedis(), context_window=5
+        )
+        index = await fresh._get_user_index("u3")
+
+        assert [p["query"] for p in index.latest(5)] == [f"question {i} about pricing" for i in range(39, 34, -1)]
+
+    @pytest.mark.asyncio
+    async def test_embedders_of_another_size_never_share_vectors(self, manager):
+        """A different embedder gets its own interactions collection; mismatched profiles fail clearly."""
+        wide = PersonaManager(
+            embedder=Embedder(HashingBackend(dimensions=128)), qdrant=manager.qdrant, redis_client=FakeRedis()
+        )
+
+        assert wide.interactions_collection != manager.interactions_collection
+        with pytest.raises(ValueError, match="user_profiles"):
+            await wide.initialize_collections()
+        assert manager.qdrant.collection_exists(wide.interactions_collection)
@@ -0,0 +1,154 @@
+"""
+Tests for the shared rate limiter and retry loop
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from libs.ratelimit import GCRA, AdaptiveConcurrency, RateLimiter, parse_retry_after, send_with_retry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestGCRA:
+    """Test cases for the GCRA quota."""
+
+    def test_burst_then_even_spacing(self):
+        """The first `burst` requests are free, later ones are spaced by the emission interval."""
+        clock = FakeClock()
+        gcra = GCRA(rate=10, period=1.0, burst=3, clock=clock)
+
+        delays = [gcra.reserve_nowait() for _ in range(5)]
+
+        assert delays[:3] == [0.0, 0.0, 0.0]
+        assert delays[3] == pytest.approx(0.1)
+        assert delays[4] == pytest.approx(0.2)
+
+    def test_quota_refills_over_time(self):
+        """Idle time restores the burst allowance."""
+        clock = FakeClock()
+        gcra = GCRA(rate=10, period=1.0, burst=2, clock=clock)
+        gcra.reserve_nowait()
+        gcra.reserve_nowait()
+
+        clock.now += 1.0
+
+        assert gcra.reserve_nowait() == 0.0
+
+    def test_penalize_blocks_all_slots(self):
+        """A Retry-After penalty pushes the next slot out by that long."""
+        clock = FakeClock()
+        gcra = GCRA(rate=10, period=1.0, burst=5, clock=clock)
+
+        gcra.penalize_nowait(2.0)
+
+        assert gcra.reserve_nowait() == pytest.approx(2.0)
+
+
+class TestRetryAfter:
+    """Test cases for Retry-After parsing."""
+
+    def test_delta_seconds_and_missing(self):
+        assert parse_retry_after({"Retry-After": "7"}) == 7.0
+        assert parse_retry_after({}) is None
+        assert parse_retry_after({"Retry-After": "soon"}) is None
+
+    def test_http_date(self):
+        delay = parse_retry_after({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})
+        assert delay == 0.0  # dates in the past mean "now"
+
+
+class TestAdaptiveConcurrency:
+    """Test cases for the AIMD concurrency limit."""
+
+    def test_throttle_halves_and_success_recovers(self):
+        concurrency = AdaptiveConcurrency(8, minimum=1)
+
+        concurrency.on_throttle()
+        assert int(concurrency.limit) == 4
+        for _ in range(3):
+            concurrency.on_throttle()
+        assert int(concurrency.limit) == 1
+
+        async def recover():
+            for _ in range(20):
+                await concurrency.on_success()
+
+        asyncio.run(recover())
+        assert 1 < concurrency.limit <= 8
+
+
+class TestSendWithRetry:
+    """Test cases for the retry loop."""
+
+    @pytest.mark.asyncio
+    async def test_429_is_retried_after_retry_after(self):
+        """A 429 blocks the quota for Retry-After, shrinks concurrency and is retried."""
+        limiter = RateLimiter("test-429", rate=1000, burst=100, max_concurrency=4)
+        responses = [httpx.Response(429, headers={"Retry-After": "0.05"}), httpx.Response(200, json={"ok": True})]
+
+        async def send():
+            return responses.pop(0)
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        response = await send_with_retry(limiter, send)
+
+        assert response.status_code == 200
+        assert loop.time() - start >= 0.05
+        assert limiter.throttled == 1
+        assert int(limiter.concurrency.limit) == 2
+
+    @pytest.mark.asyncio
+    async def test_server_errors_shrink_concurrency(self):
+        """5xx responses are retried and treated as congestion, not success."""
+        limiter = RateLimiter("test-5xx", rate=1000, burst=100, max_concurrency=8)
+        responses = [httpx.Response(503), httpx.Response(500), httpx.Response(200)]
+
+        async def send():
+            return responses.pop(0)
+
+        response = await send_with_retry(limiter, send, backoff_base=0.001)
+
+        assert response.status_code == 200
+        assert limiter.server_errors == 2 and limiter.throttled == 0
+        assert int(limiter.concurrency.limit) == 2
+
+    @pytest.mark.asyncio
+    async def test_client_errors_are_not_retried(self):
+        """Non-throttle 4xx responses are returned straight away."""
+        limiter = RateLimiter("test-404", rate=1000, burst=100)
+        calls = []
+
+        async def send():
+            calls.append(1)
+            return httpx.Response(404)
+
+        response = await send_with_retry(limiter, send)
+
+        assert response.status_code == 404
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_burst_is_spread_not_overslept(self):
+        """Twenty concurrent calls at 100/s with burst 10 take about 0.1s, not a full window."""
+        limiter = RateLimiter("test-burst", rate=100, burst=10, max_concurrency=20)
+
+        async def send():
+            return httpx.Response(200)
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.gather(*(send_with_retry(limiter, send) for _ in range(20)))
+        elapsed = loop.time() - start
+
+        assert 0.08 <= elapsed < 0.5
+        assert limiter.stats()["requests"] == 20
@@ -0,0 +1,124 @@
+"""
+Tests for the incremental repository indexer
+"""
+
+import json
+import subprocess
+
+import pytest
+from qdrant_client import QdrantClient
+
+from libs.chunking import Chunker, RegexTokenizer
+from libs.embeddings import Embedder, HashingBackend
+from tools.index_repo import RepoIndexer, parse_name_status
+
+
+class CountingBackend(HashingBackend):
+    def __init__(self):
+        super().__init__(64)
+        self.texts = []
+
+    async def embed(self, texts):
+        self.texts.extend(texts)
+        return await super().embed(texts)
+
+
+def _git(root, *args):
+    subprocess.run(["git", *args], cwd=root, check=True, capture_output=True)
+
+
+def _commit(root, message):
+    _git(root, "add", "-A")
+    _git(root, "-c", "user.name=test", "-c", "user.email=test@example.com", "commit", "-qm", message)
+
+
+def _paragraphs(prefix, count):
+    return "\n\n".join(f"{prefix} paragraph {i}. " + "word " * 30 for i in range(count))
+
+
+@pytest.fixture
+def repo(tmp_path):
+    root = tmp_path / "repo"
+    root.mkdir()
+    _git(root, "init", "-q")
+    (root / ".gitignore").write_text("ignored/\n")
+    (root / "docs").mkdir()
+    (root / "docs" / "guide.md").write_text(_paragraphs("Guide", 6))
+    (root / "app.py").write_text("def main():\n    return 1\n")
+    (root / "old.txt").write_text(_paragraphs("Old", 2))
+    (root / "ignored").mkdir()
+    (root / "ignored" / "secret.md").write_text("not for the index")
+    (root / "image.png").write_bytes(b"\x89PNG\0\0")
+    _commit(root, "initial")
+    return root
+
+
+def _indexer(root, client, backend):
+    return RepoIndexer(
+        str(root), client, Embedder(backend),
+        chunker=Chunker(max_tokens=60, overlap_tokens=0, tokenizer=RegexTokenizer()),
+        batch_size=4
+    )
+
+
+def _paths(client):
+    points, _ = client.scroll("repo_hybrid", limit=1000, with_payload=True)
+    return {p.payload["path"] for p in points}
+
+
+class TestRepoIndexer:
+    """Test cases for RepoIndexer."""
+
+    def test_parse_name_status(self):
+        output = "M\ta.py\nA\tb.md\nD\tc.txt\nR087\told.py\tnew.py\nC100\tsrc.py\tcopy.py\n"
+
+        assert parse_name_status(output) == (["a.py", "b.md", "new.py", "copy.py"], ["c.txt", "old.py"])
+
+    @pytest.mark.asyncio
+    async def test_changed_mode_embeds_only_the_diff(self, repo):
+        client = QdrantClient(":memory:")
+        backend = CountingBackend()
+
+        full = await _indexer(repo, client, backend).run("changed")
+
+        assert full["mode"] == "full"
+        assert _paths(client) == {"docs/guide.md", "app.py", "old.txt"}
+        total = client.count("repo_hybrid").count
+        assert full["chunks_embedded"] == total == len(backend.texts)
+
+        guide = (repo / "docs" / "guide.md").read_text()
+        (repo / "docs" / "guide.md").write_text(guide.replace("Guide paragraph 5.", "Guide paragraph five."))
+        (repo / "old.txt").unlink()
+        (repo / "new.md").write_text("# New\n\nFresh content.")
+        _commit(repo, "edit")
+        backend.texts.clear()
+
+        changed = await _indexer(repo, client, backend).run("changed")
+
+        assert changed["mode"] == "changed"
+        assert changed["since"] == full["commit"]
+        assert changed["files_indexed"] == 2
+        assert changed["files_deleted"] == 1
+        assert len(backend.texts) == changed["chunks_embedded"] == 2
+        assert any("paragraph five" in text for text in backend.texts)
+        assert _paths(client) == {"docs/guide.md", "app.py", "new.md"}
+        points, _ = client.scroll("repo_hybrid", limit=1000, with_payload=True)
+        guide_text = "\n\n".join(p.payload["content"] for p in sorted(
+            (p for p in points if p.payload["path"] == "docs/guide.md"), key=lambda p: p.payload["chunk_index"]))
+        assert "Guide paragraph 5." not in guide_text
+
+        state = json.loads((repo / ".git" / "sophia_index_state.json").read_text())
+        assert state["repo_hybrid"]["commit"] == changed["commit"] != full["commit"]
+
+    @pytest.mark.asyncio
+    async def test_full_mode_removes_vectors_of_missing_files(self, repo):
+        client = QdrantClient(":memory:")
+        await _indexer(repo, client, CountingBackend()).run("full")
+        (repo / "old.txt").unlink()
+        backend = CountingBackend()
+
+        stats = await _indexer(repo, client, backend).run("full")
+
+        assert stats["files_deleted"] == 1
+        assert stats["chunks_embedded"] == 0 and backend.texts == []
+        assert _paths(client) == {"docs/guide.md", "app.py"}
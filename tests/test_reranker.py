@@ -0,0 +1,142 @@
+"""
+Tests for the cross-encoder reranking stage
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from libs.embeddings import Embedder, HashingBackend
+from libs.retrieval import CrossEncoderScorer, InMemoryHybridIndex, Reranker, get_reranker
+from rag.pipeline import EnhancedRAGPipeline
+
+
+class OverlapScorer(CrossEncoderScorer):
+    """Scores by query-word overlap; records every batch it is asked to score."""
+
+    name = "overlap"
+
+    def __init__(self, delay=0.0):
+        self.batches = []
+        self.delay = delay
+
+    def score(self, query, documents):
+        self.batches.append(list(documents))
+        time.sleep(self.delay)
+        words = set(query.lower().split())
+        return [float(len(words & set(document.lower().split()))) for document in documents]
+
+
+CANDIDATES = [
+    {"id": "a", "content": "unrelated text"},
+    {"id": "b", "content": "refund policy for annual plans"},
+    {"id": "c", "content": "annual refund"},
+    {"id": "d", "content": "refund"},
+]
+
+
+class TestReranker:
+    """Test cases for Reranker."""
+
+    @pytest.mark.asyncio
+    async def test_reorders_top_n_in_one_batch_and_keeps_the_tail(self):
+        scorer = OverlapScorer()
+        reranker = Reranker(scorer, top_n=3)
+
+        results = await reranker.rerank("annual refund policy", CANDIDATES, k=4)
+
+        assert [r["id"] for r in results] == ["b", "c", "a", "d"]
+        assert results[0]["rerank_score"] == 3.0 and "rerank_score" not in results[3]
+        assert len(scorer.batches) == 1 and len(scorer.batches[0]) == 3
+
+    @pytest.mark.asyncio
+    async def test_scores_are_cached_per_query_and_content(self):
+        scorer = OverlapScorer()
+        reranker = Reranker(scorer, top_n=10)
+
+        await reranker.rerank("annual refund", CANDIDATES)
+        moved = [{**c, "id": c["id"] + "2"} for c in reversed(CANDIDATES)]
+        second = await reranker.rerank("annual refund", moved + [{"id": "e", "content": "annual"}], k=2)
+        await reranker.rerank("other query", CANDIDATES[:2])
+
+        assert [r["id"] for r in second] == ["c2", "b2"]
+        assert [len(batch) for batch in scorer.batches] == [4, 1, 2]
+        assert reranker.stats()["cache_hits"] == 4
+
+    @pytest.mark.asyncio
+    async def test_over_budget_returns_fused_order_and_still_fills_cache(self):
+        scorer = OverlapScorer(delay=0.2)
+        reranker = Reranker(scorer, top_n=10, time_budget=0.02)
+
+        results = await reranker.rerank("annual refund policy", CANDIDATES, k=2)
+
+        assert [r["id"] for r in results] == ["a", "b"]
+        assert reranker.stats()["timeouts"] == 1
+        await asyncio.sleep(0.3)  # the background pass completes and caches its scores
+        assert [r["id"] for r in await reranker.rerank("annual refund policy", CANDIDATES, k=2)] == ["b", "c"]
+        assert len(scorer.batches) == 1
+
+    @pytest.mark.asyncio
+    async def test_calls_during_a_running_pass_fall_back_without_queueing(self):
+        scorer = OverlapScorer(delay=0.2)
+        reranker = Reranker(scorer, top_n=10, time_budget=0.02)
+
+        await reranker.rerank("annual refund policy", CANDIDATES)
+        results = await asyncio.gather(*(reranker.rerank(f"query {i}", CANDIDATES, k=2) for i in range(5)))
+
+        assert all([r["id"] for r in result] == ["a", "b"] for result in results)
+        assert len(scorer.batches) == 1
+        assert reranker.stats()["skipped"] == 5
+        await asyncio.sleep(0.3)
+        assert not reranker.busy
+
+    @pytest.mark.asyncio
+    async def test_warm_up_runs_on_the_worker_before_the_first_query(self):
+        scorer = OverlapScorer(delay=0.2)
+        reranker = Reranker(scorer, top_n=10, time_budget=0.1)
+
+        warming = reranker.warm()
+        assert reranker.warm() is warming
+        assert await reranker.rerank("annual refund", CANDIDATES, k=2) == CANDIDATES[:2]
+
+        await asyncio.wrap_future(warming)
+        scorer.delay = 0.0
+        assert [r["id"] for r in await reranker.rerank("annual refund", CANDIDATES, k=2)] == ["b", "c"]
+        assert scorer.batches[0] == ["warm up"] and len(scorer.batches) == 2
+
+    def test_reranking_is_opt_in(self, monkeypatch):
+        """Without SOPHIA_RERANK=true no cross-encoder is loaded."""
+        monkeypatch.delenv("SOPHIA_RERANK", raising=False)
+        get_reranker.cache_clear()
+        try:
+            assert get_reranker() is None
+            assert EnhancedRAGPipeline(hybrid_index=object()).reranker is None
+        finally:
+            get_reranker.cache_clear()
+
+    @pytest.mark.asyncio
+    async def test_scorer_failure_keeps_fused_order(self):
+        class Broken(CrossEncoderScorer):
+            def score(self, query, documents):
+                raise RuntimeError("model missing")
+
+        reranker = Reranker(Broken())
+
+        assert await reranker.rerank("refund", CANDIDATES, k=3) == CANDIDATES[:3]
+        assert reranker.stats()["failures"] == 1
+
+    @pytest.mark.asyncio
+    async def test_pipeline_overfetches_and_reranks_to_k(self):
+        index = InMemoryHybridIndex(Embedder(HashingBackend(64)))
+        await index.upsert([(str(i), c["content"], {"path": f"{c['id']}.md", "content": c["content"]})
+                            for i, c in enumerate(CANDIDATES)])
+        scorer = OverlapScorer()
+        pipeline = EnhancedRAGPipeline(hybrid_index=index, reranker=Reranker(scorer, top_n=4))
+
+        paths = [f"{c['id']}.md" for c in CANDIDATES]
+        results = await pipeline.search_multi_service("annual refund policy", k=2, filters={"path": paths})
+
+        assert [r["path"] for r in results] == ["b.md", "c.md"]
+        assert len(scorer.batches[0]) == 4
+        assert pipeline.get_performance_metrics()["reranker"]["calls"] == 1
@@ -0,0 +1,79 @@
+"""
+Tests for the research synthesis step of the autonomous research-and-act cycle
+"""
+
+import pytest
+
+from libs.context import packer as packer_module
+from sophia.core.sophia_base_agent import SOPHIABaseAgent
+from sophia.core.ultimate_model_router import ModelConfig
+
+ANALYSIS_MODEL = ModelConfig("openai", "gpt-5", 1, 128_000, 0.0, "OPENAI_API_KEY")
+
+
+class FakeResearchMaster:
+    """Returns research results shaped like SOPHIAResearchMaster._direct_research."""
+
+    async def conduct_research(self, query, sources=None, max_results=10, **kwargs):
+        return {
+            "query": query,
+            "sources": [
+                {"name": "serper", "title": "Churn report", "url": "https://a.example",
+                 "content": "Churn fell to four percent after the onboarding change."},
+                {"name": "tavily", "title": "Pricing study", "url": "https://b.example",
+                 "snippet": "Annual plans convert better than monthly ones."},
+            ],
+            "summary": "Retention improved across mid-market accounts.",
+        }
+
+
+class FakeModelRouter:
+    """Selects one analysis model and records the prompts sent to it."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def select_model(self, task_type, fallback=True):
+        return ANALYSIS_MODEL
+
+    async def call_model(self, model_config, prompt, **kwargs):
+        assert model_config is ANALYSIS_MODEL
+        self.prompts.append(prompt)
+        return "synthesized"
+
+
+class FakeBusinessMaster:
+    async def post_slack_message(self, channel, message):
+        return {"ts": "1"}
+
+
+class TestResearchSynthesis:
+    """Test cases for autonomous_research_and_act synthesis."""
+
+    @pytest.mark.asyncio
+    async def test_synthesis_prompt_contains_sources_and_summary(self, monkeypatch):
+        class Agent(SOPHIABaseAgent):
+            async def _process_task_impl(self, task_id, task_data):
+                return {}
+
+        agent = Agent("synthesis-test")
+        agent.research_master = FakeResearchMaster()
+        agent.model_router = FakeModelRouter()
+        agent.business_master = FakeBusinessMaster()
+        agent.memory_master = None
+        tokenizer_models = []
+        tokenizer_for_model = packer_module.tokenizer_for_model
+        monkeypatch.setattr(
+            packer_module, "tokenizer_for_model", lambda model: tokenizer_models.append(model) or tokenizer_for_model(model)
+        )
+
+        result = await agent.autonomous_research_and_act("customer retention")
+
+        assert result["overall_success"] is True
+        assert tokenizer_models == ["gpt-5"]
+        assert result["steps"]["synthesis"]["summary_length"] == len("synthesized")
+        prompt = agent.model_router.prompts[0]
+        assert "Retention improved across mid-market accounts." in prompt
+        assert "Churn report: Churn fell to four percent" in prompt
+        assert "Pricing study: Annual plans convert better" in prompt
+        assert prompt.index("Churn report") < prompt.index("Pricing study")
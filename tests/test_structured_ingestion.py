@@ -0,0 +1,71 @@
+"""
+Tests for chunked structured-data ingestion
+"""
+
+import pandas as pd
+import pytest
+
+from libs.ingestion import classify_columns, iter_structured_frames, iter_structured_records
+
+
+def _rows(chunks):
+    return [record for chunk in chunks[:-1] for record in chunk]
+
+
+class TestStructuredIngestion:
+    """Test cases for structured file parsing."""
+
+    def test_csv_records_are_yielded_per_chunk(self, tmp_path):
+        path = tmp_path / "deals.csv"
+        pd.DataFrame({"deal": [f"d{i}" for i in range(10)], "revenue": [1000 * i for i in range(10)]}).to_csv(
+            path, index=False
+        )
+
+        chunks = list(iter_structured_records(str(path), rows_per_document=2, chunk_rows=4))
+
+        assert [len(chunk) for chunk in chunks] == [2, 2, 1, 1]
+        assert [(r["metadata"]["row_start"], r["metadata"]["row_end"]) for r in _rows(chunks)] == [
+            (0, 1), (2, 3), (4, 5), (6, 7), (8, 9)
+        ]
+        assert "Data Record 10 from deals.csv" in _rows(chunks)[-1]["text"]
+        assert "• revenue: $9,000.00" in _rows(chunks)[-1]["text"]
+        summary = chunks[-1][0]
+        assert summary["metadata"]["document_type"] == "structured_summary"
+        assert summary["metadata"]["record_count"] == 10
+
+    def test_max_rows_stops_reading(self, tmp_path):
+        path = tmp_path / "deals.csv"
+        pd.DataFrame({"deal": range(10)}).to_csv(path, index=False)
+
+        chunks = list(iter_structured_records(str(path), rows_per_document=1, chunk_rows=4, max_rows=6))
+
+        assert [r["metadata"]["row_index"] for r in _rows(chunks)] == [0, 1, 2, 3, 4, 5]
+        assert chunks[-1][0]["metadata"]["record_count"] == 6
+
+    def test_parquet_is_read_in_batches(self, tmp_path):
+        pytest.importorskip("pyarrow")
+        path = tmp_path / "deals.parquet"
+        pd.DataFrame({"deal": [f"d{i}" for i in range(6)], "win_rate": [10 * i for i in range(6)]}).to_parquet(
+            path, row_group_size=3
+        )
+
+        chunks = list(iter_structured_records(str(path), rows_per_document=1, chunk_rows=3))
+
+        assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+        assert [r["metadata"]["row_index"] for r in _rows(chunks)] == list(range(6))
+        assert "• win_rate: 50%" in _rows(chunks)[-1]["text"]
+
+    def test_column_kinds_are_rechecked_per_chunk(self, tmp_path):
+        """A currency column that turns into text mid-file keeps formatting its numbers."""
+        path = tmp_path / "mixed.csv"
+        path.write_text("deal,amount\na,1200\nb,3400\nc,tbd\nd,5600\n")
+
+        chunks = list(iter_structured_records(str(path), rows_per_document=1, chunk_rows=2))
+        texts = [r["text"] for r in _rows(chunks)]
+        frames = list(iter_structured_frames(str(path), chunk_rows=2))
+
+        assert classify_columns(frames[0])["amount"] == "currency"
+        assert classify_columns(frames[1])["amount"] == "mixed_currency"
+        assert "• amount: $1,200.00" in texts[0]
+        assert "• amount: tbd" in texts[2]
+        assert "• amount: $5,600.00" in texts[3]
@@ -0,0 +1,115 @@
+"""
+Tests for concurrent task execution in the swarm BaseAgent
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from agents.swarm.base_agent import AgentCapability, AgentTask, AgentType, BaseAgent, Priority, TaskStatus
+
+
+class SleepyAgent(BaseAgent):
+    """Agent whose tasks just sleep for task.requirements['delay'] seconds."""
+
+    def __init__(self, **kwargs):
+        capability = AgentCapability(
+            name="sleep",
+            description="Sleeps",
+            input_types=["sleep"],
+            output_types=["nothing"],
+            estimated_duration=1,
+            confidence_score=1.0,
+        )
+        super().__init__(AgentType.CODER, "sleepy", "Sleeps on request", [capability], **kwargs)
+        self.started_order = []
+
+    async def execute_task(self, task):
+        self.started_order.append(task.description)
+        await asyncio.sleep(task.requirements.get("delay", 0.0))
+        if task.requirements.get("fail"):
+            raise ValueError("requested failure")
+        return {"slept": task.requirements.get("delay", 0.0)}
+
+
+def _task(description, delay=0.0, priority=Priority.MEDIUM, **extra):
+    return AgentTask(type="sleep", description=description, priority=priority, requirements={"delay": delay, **extra})
+
+
+class TestSwarmBaseAgentConcurrency:
+    """Test cases for the concurrent executor."""
+
+    @pytest.mark.asyncio
+    async def test_independent_tasks_run_concurrently(self):
+        """Ten 0.2s tasks finish in roughly the time of one, not ten."""
+        agent = SleepyAgent(max_concurrency=10)
+        for i in range(10):
+            await agent.assign_task(_task(f"t{i}", delay=0.2))
+
+        start = time.perf_counter()
+        await agent.process_tasks()
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 1.0
+        assert agent.metrics["tasks_completed"] == 10
+        assert not agent.current_tasks
+
+    @pytest.mark.asyncio
+    async def test_priority_order_preserved_at_dispatch(self):
+        """With one slot, tasks start highest priority first."""
+        agent = SleepyAgent(max_concurrency=1)
+        await agent.assign_task(_task("low", priority=Priority.LOW))
+        await agent.assign_task(_task("critical", priority=Priority.CRITICAL))
+        await agent.assign_task(_task("medium", priority=Priority.MEDIUM))
+
+        await agent.process_tasks()
+
+        assert agent.started_order == ["critical", "medium", "low"]
+
+    @pytest.mark.asyncio
+    async def test_per_task_timeout(self):
+        """A task exceeding its timeout fails without blocking the others."""
+        agent = SleepyAgent(max_concurrency=2, task_timeout=5.0)
+        slow = _task("slow", delay=5.0)
+        slow.timeout = 0.05
+        await agent.assign_task(slow)
+        await agent.assign_task(_task("fast", delay=0.01))
+
+        await agent.process_tasks()
+
+        assert slow.status == TaskStatus.FAILED
+        assert "timed out" in slow.error
+        assert agent.metrics["tasks_timed_out"] == 1
+        assert agent.metrics["tasks_completed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancel_running_task(self):
+        """Cancelling a running task marks it failed and frees its slot."""
+        agent = SleepyAgent(max_concurrency=1)
+        task = _task("long", delay=5.0)
+        await agent.assign_task(task)
+
+        processing = asyncio.create_task(agent.process_tasks())
+        await asyncio.sleep(0.05)
+        assert await agent.cancel_task(task.id) is True
+        await processing
+
+        assert task.status == TaskStatus.FAILED
+        assert task.error == "Task cancelled"
+        assert agent.metrics["tasks_cancelled"] == 1
+        assert agent.get_status()["running_tasks"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failures_and_wait_metrics(self):
+        """Failures are isolated and queue wait is tracked separately from execution."""
+        agent = SleepyAgent(max_concurrency=1)
+        await agent.assign_task(_task("first", delay=0.1))
+        await agent.assign_task(_task("broken", fail=True))
+
+        await agent.process_tasks()
+
+        assert agent.metrics["tasks_failed"] == 1
+        assert agent.metrics["tasks_completed"] == 1
+        assert agent.metrics["average_execution_time"] > 0
+        assert agent.metrics["average_queue_wait_time"] > 0
@@ -0,0 +1,113 @@
+"""
+Tests for the swarm state store and SwarmManager persistence
+"""
+
+import time
+
+import pytest
+
+from agents.swarm_manager import SwarmManager
+from agents.swarm_store import SQLiteSwarmStore, create_swarm_store
+
+
+def _config(i, status="completed"):
+    return {
+        "coordinator_id": f"swarm_{i:04d}",
+        "task_id": f"task_{i:04d}",
+        "task": f"task {i}",
+        "objective": "test",
+        "user_id": "tester",
+        "agents": {"research": {}, "analysis": {}},
+        "created_at": f"2025-01-01T00:{i // 60:02d}:{i % 60:02d}",
+        "status": status,
+    }
+
+
+class RecordingExporter:
+    def __init__(self):
+        self.batches = []
+
+    async def export(self, configs):
+        self.batches.append([config["coordinator_id"] for config in configs])
+        return "sha"
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteSwarmStore(str(tmp_path / "swarms.db"))
+
+
+class TestSQLiteSwarmStore:
+    """Test cases for the SQLite backend."""
+
+    @pytest.mark.asyncio
+    async def test_save_get_and_upsert(self, store):
+        """Saving the same coordinator twice updates it in place."""
+        await store.save(_config(1, status="initializing"))
+        await store.save(_config(1, status="completed"))
+
+        config = await store.get("swarm_0001")
+        page = await store.list()
+
+        assert config["status"] == "completed"
+        assert len(page["swarms"]) == 1
+        assert page["swarms"][0]["agents_count"] == 2
+        assert await store.get("missing") is None
+
+    @pytest.mark.asyncio
+    async def test_keyset_pagination_and_status_filter(self, store):
+        """Pages are newest first, disjoint and filterable by status."""
+        for i in range(25):
+            await store.save(_config(i, status="failed" if i % 5 == 0 else "completed"))
+
+        seen, cursor = [], None
+        while True:
+            page = await store.list(limit=10, cursor=cursor)
+            seen.extend(swarm["coordinator_id"] for swarm in page["swarms"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        failed = await store.list(status="failed", limit=100)
+
+        assert seen == [f"swarm_{i:04d}" for i in reversed(range(25))]
+        assert [s["coordinator_id"] for s in failed["swarms"]] == [f"swarm_{i:04d}" for i in (20, 15, 10, 5, 0)]
+
+    def test_store_url_parsing(self):
+        assert isinstance(create_swarm_store("sqlite:///:memory:"), SQLiteSwarmStore)
+        with pytest.raises(ValueError):
+            create_swarm_store("mongodb://nope")
+
+
+class TestSwarmManagerPersistence:
+    """Test cases for SwarmManager on top of the store."""
+
+    @pytest.mark.asyncio
+    async def test_trigger_swarm_persists_locally(self, store):
+        """Triggered swarms are readable immediately without GitHub."""
+        manager = SwarmManager(store=store, github_export=False)
+
+        result = await manager.trigger_swarm("market scan", ["research", "analysis"], "find leads")
+        start = time.perf_counter()
+        status = await manager.get_swarm_status(result["coordinator_id"])
+        swarms = await manager.list_active_swarms()
+        lookup_time = time.perf_counter() - start
+
+        assert status["status"] == "completed"
+        assert set(status["agents"]) == {"research", "analysis"}
+        assert swarms[0]["coordinator_id"] == result["coordinator_id"]
+        assert lookup_time < 0.5
+
+    @pytest.mark.asyncio
+    async def test_github_export_is_batched(self, store):
+        """Pending configs are exported in one commit per batch and not re-exported."""
+        manager = SwarmManager(store=store, github_export=False)
+        manager.exporter = RecordingExporter()
+        manager.export_batch_size = 10
+
+        for i in range(12):
+            await store.save(_config(i))
+
+        assert await manager.flush_export() == 12
+        assert [len(batch) for batch in manager.exporter.batches] == [10, 2]
+        assert await manager.flush_export() == 0
@@ -0,0 +1,114 @@
+"""
+Tests for distributed tracing
+"""
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from libs.tracing import (
+    InMemorySpanExporter,
+    SimpleSpanProcessor,
+    TraceIdRatioSampler,
+    TracingTransport,
+    configure_tracing,
+    extract,
+    get_tracer,
+    init_tracing,
+    inject,
+    traced,
+)
+
+
+@pytest.fixture
+def exporter():
+    exporter = InMemorySpanExporter()
+    configure_tracing(service_name="test", sample_rate=1.0, processor=SimpleSpanProcessor(exporter))
+    yield exporter
+    configure_tracing(service_name="test", exporter="none")
+
+
+class TestTracer:
+    """Test cases for span creation and context propagation."""
+
+    def test_nested_spans_share_trace(self, exporter):
+        """Child spans inherit the trace id and point at their parent."""
+        tracer = get_tracer()
+        with tracer.start_span("parent") as parent:
+            with tracer.start_span("child") as child:
+                pass
+
+        assert child.context.trace_id == parent.context.trace_id
+        assert child.parent_span_id == parent.context.span_id
+        assert [span.name for span in exporter.spans] == ["child", "parent"]
+
+    @pytest.mark.asyncio
+    async def test_traced_decorator_records_errors(self, exporter):
+        """Exceptions mark the span as errored and propagate."""
+        @traced("failing_call")
+        async def failing_call():
+            raise ValueError("nope")
+
+        with pytest.raises(ValueError):
+            await failing_call()
+
+        span = exporter.spans[-1]
+        assert span.name == "failing_call"
+        assert span.status == "ERROR"
+        assert span.events[0]["attributes"]["exception.type"] == "ValueError"
+
+    def test_inject_extract_roundtrip(self, exporter):
+        """traceparent written by inject is parsed back by extract."""
+        with get_tracer().start_span("outbound") as span:
+            headers = inject({})
+
+        ctx = extract(headers)
+        assert ctx.trace_id == span.context.trace_id
+        assert ctx.span_id == span.context.span_id
+        assert ctx.sampled and ctx.remote
+
+    def test_extract_rejects_malformed(self):
+        """Malformed headers start a new trace instead of raising."""
+        assert extract({"traceparent": "garbage"}) is None
+        assert extract({"traceparent": f"00-{'0' * 32}-{'1' * 16}-01"}) is None
+
+    def test_sampler_bounds(self):
+        """Ratio 0 drops everything and ratio 1 keeps everything."""
+        trace_id = "f" * 32
+        assert TraceIdRatioSampler(1.0).should_sample(trace_id)
+        assert not TraceIdRatioSampler(0.0).should_sample(trace_id)
+
+    def test_unsampled_parent_is_respected(self, exporter):
+        """A remote decision not to sample is honoured downstream."""
+        parent = extract({"traceparent": f"00-{'a' * 32}-{'b' * 16}-00"})
+        with get_tracer().start_span("downstream", parent=parent):
+            pass
+
+        assert exporter.spans == []
+
+
+class TestPropagation:
+    """Test cases for client → server propagation."""
+
+    @pytest.mark.asyncio
+    async def test_client_span_continues_on_server(self):
+        """A CLIENT span's context becomes the parent of the server's SERVER span."""
+        server = FastAPI()
+
+        @server.get("/items/{item_id}")
+        async def get_item(item_id: str):
+            return {"item_id": item_id}
+
+        init_tracing(server, "test-server")
+        exporter = InMemorySpanExporter()
+        configure_tracing(service_name="test", processor=SimpleSpanProcessor(exporter))
+
+        transport = TracingTransport(httpx.ASGITransport(app=server))
+        async with httpx.AsyncClient(transport=transport, base_url="http://mcp") as client:
+            response = await client.get("/items/42")
+
+        spans = {span.kind: span for span in exporter.spans}
+        assert response.headers["X-Trace-Id"] == spans["CLIENT"].context.trace_id
+        assert spans["SERVER"].name == "GET /items/{item_id}"
+        assert spans["SERVER"].parent_span_id == spans["CLIENT"].context.span_id
+        configure_tracing(service_name="test", exporter="none")
@@ -0,0 +1,163 @@
+"""
+Tests for the batched async vector writer
+"""
+
+import asyncio
+
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, PointStruct, UpdateResult, UpdateStatus, VectorParams
+
+from libs.vectors import VectorWriter, get_vector_writer, point_id
+from libs.vectors import writer as writer_module
+
+
+class RecordingClient:
+    """Async-client stand-in that records batches and can fail the first attempts."""
+
+    def __init__(self, failures=0, delay=0.0):
+        self.batches = []
+        self.failures = failures
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.stored = {}
+        self.waits = []
+
+    async def upsert(self, collection_name, points, wait=True):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError("qdrant unavailable")
+            self.batches.append((collection_name, len(points)))
+            self.stored.update({(collection_name, p.id): p for p in points})
+            self.waits.append(wait)
+            return UpdateResult(operation_id=len(self.batches), status=UpdateStatus.COMPLETED)
+        finally:
+            self.active -= 1
+
+
+def _points(prefix, count):
+    return [PointStruct(id=point_id(prefix, i), vector=[float(i), 1.0], payload={"i": i}) for i in range(count)]
+
+
+class TestVectorWriter:
+    """Test cases for VectorWriter."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_writers_are_coalesced_into_batches(self):
+        client = RecordingClient(delay=0.01)
+        writer = VectorWriter(client, batch_size=50, max_wait=0.01, max_in_flight=2)
+
+        await asyncio.gather(*(writer.write("docs", _points(f"p{n}", 10)) for n in range(20)))
+        await writer.close()
+
+        assert len(client.stored) == 200
+        assert len(client.batches) == 4
+        assert client.max_active <= 2
+        stats = writer.stats()
+        assert stats["points_written"] == 200 and stats["batches_written"] == 4
+        assert stats["points_per_second"] > 0
+
+    @pytest.mark.asyncio
+    async def test_batches_are_per_collection_and_flushed_by_time(self):
+        client = RecordingClient()
+        writer = VectorWriter(client, batch_size=100, max_wait=0.01)
+
+        await writer.submit("a", _points("a", 3))
+        await writer.submit("b", _points("b", 2))
+        await asyncio.sleep(0.05)
+
+        assert sorted(client.batches) == [("a", 3), ("b", 2)]
+        await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_is_retried_idempotently(self):
+        client = RecordingClient(failures=2)
+        writer = VectorWriter(client, batch_size=10, max_wait=0.001, retries=3, backoff_base=0.001)
+
+        await writer.write("docs", _points("x", 5))
+        await writer.write("docs", _points("x", 5))
+
+        assert len(client.stored) == 5
+        assert writer.stats()["retried_batches"] == 2
+        await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_write_raises_after_retries_and_submit_counts_failures(self):
+        client = RecordingClient(failures=10)
+        writer = VectorWriter(client, batch_size=10, max_wait=0.001, retries=1, backoff_base=0.001)
+
+        with pytest.raises(ConnectionError):
+            await writer.write("docs", _points("x", 3))
+        await writer.submit("docs", _points("y", 2))
+        await writer.flush()
+
+        assert writer.stats()["failed_points"] == 5
+        await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_bounded_queue_applies_backpressure(self):
+        client = RecordingClient(delay=0.05)
+        writer = VectorWriter(client, batch_size=5, max_wait=0.001, max_in_flight=1, queue_size=5)
+
+        producer = asyncio.create_task(writer.submit("docs", _points("z", 40)))
+        await asyncio.sleep(0.02)
+
+        assert not producer.done()
+        assert writer.stats()["queued"] <= 5
+        await producer
+        await writer.close()
+        assert len(client.stored) == 40
+
+    @pytest.mark.asyncio
+    async def test_sync_client_and_dict_points(self):
+        client = QdrantClient(":memory:")
+        client.create_collection("docs", vectors_config=VectorParams(size=2, distance=Distance.COSINE))
+        writer = VectorWriter(client)
+
+        await writer.write("docs", [{"id": point_id("d", i), "vector": [1.0, float(i)]} for i in range(7)])
+        await writer.close()
+
+        assert client.count("docs").count == 7
+
+    @pytest.mark.asyncio
+    async def test_write_waits_for_qdrant_and_returns_its_result(self):
+        client = RecordingClient()
+        writer = VectorWriter(client, batch_size=10, max_wait=0.001)
+
+        result = await writer.write("docs", _points("r", 3))
+        await writer.close()
+
+        assert isinstance(result, UpdateResult) and result.status == UpdateStatus.COMPLETED
+        assert client.waits == [True]
+
+    def test_process_wide_writer_survives_event_loops(self, monkeypatch):
+        """Every component gets the same writer, which keeps working under a new event loop."""
+        client = RecordingClient()
+        monkeypatch.setattr(writer_module, "_writers", {})
+        monkeypatch.setattr(writer_module, "_default_client", client)
+        writer = get_vector_writer()
+
+        assert get_vector_writer(client) is writer
+        asyncio.run(writer.write("docs", _points("a", 2)))
+        asyncio.run(writer.write("docs", _points("b", 2)))
+        assert len(client.stored) == 4
+
+    def test_writers_are_shared_per_qdrant_server(self, monkeypatch):
+        """Clients built separately for one server share a writer; other servers never get its points."""
+        monkeypatch.setattr(writer_module, "_writers", {})
+
+        def remote(url):
+            return QdrantClient(url=url, check_compatibility=False)
+
+        shared = get_vector_writer(remote("http://qdrant-a:6333"))
+
+        assert get_vector_writer(remote("http://qdrant-a:6333")) is shared
+        assert get_vector_writer(remote("http://qdrant-b:6333")) is not shared
+        other = RecordingClient()
+        assert get_vector_writer(other).client is other
+        assert get_vector_writer(QdrantClient(":memory:")) is not get_vector_writer(QdrantClient(":memory:"))
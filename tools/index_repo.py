@@ -1,97 +1,404 @@
-import os
+"""
+Repository indexer.
+
+Chunks a local checkout with the shared chunker, embeds new chunks with the
+shared embedder and upserts them into Qdrant. Runs are incremental:
+
+- files come from git (tracked plus untracked-but-not-ignored), so .gitignore is honored;
+- in changed mode only files in ``git diff --name-status <last indexed commit>``
+  (plus untracked files) are read; removed files have their vectors deleted;
+- chunk ids are content hashes, so chunks already in the collection are not re-embedded
+  and stale chunks of a changed file are deleted;
+- the last indexed commit is kept as a watermark in a state file (inside .git by default).
+
+A changed-mode run therefore costs time proportional to the diff, not the repository.
+"""
+
 import argparse
-from typing import List
-import hashlib
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
-from services.memory_client import MemoryClient
-from connectors.github_conn import GitHubConnector
-from services.config_loader import load_config
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    FieldCondition,
+    Filter,
+    FilterSelector,
+    HasIdCondition,
+    MatchAny,
+    MatchValue,
+)
 
-def chunk_text(text: str, chunk_size: int = 120, overlap: int = 20) -> List[str]:
-    """
-    Splits a text into overlapping chunks.
-    """
-    chunks = []
-    for i in range(0, len(text), chunk_size - overlap):
-        chunks.append(text[i : i + chunk_size])
-    return chunks
+from libs.chunking import Chunker
+from libs.embeddings import Embedder, get_embedder
+from libs.retrieval import DEFAULT_HYBRID_COLLECTION, QdrantHybridIndex, hybrid_collection
 
+logger = logging.getLogger(__name__)
 
-async def index_repo(
-    owner: str,
-    repo: str,
-    mode: str = "full",
-    qdrant_url: str = None,
-    qdrant_api_key: str = None,
-):
+DEFAULT_COLLECTION = DEFAULT_HYBRID_COLLECTION
+MAX_FILE_BYTES = 1024 * 1024
+STATE_FILE = "sophia_index_state.json"
+
+EXCLUDE_DIRS = {
+    ".git", "node_modules", "__pycache__", ".venv", "venv", "dist", "build",
+    ".next", ".nuxt", "coverage", ".nyc_output", ".pytest_cache", ".mypy_cache",
+}
+
+FILE_EXTENSIONS = {
+    '.py': 'python', '.js': 'javascript', '.ts': 'typescript',
+    '.jsx': 'react', '.tsx': 'react', '.html': 'html', '.css': 'css',
+    '.scss': 'scss', '.json': 'json', '.yaml': 'yaml', '.yml': 'yaml',
+    '.md': 'markdown', '.txt': 'text', '.sql': 'sql', '.sh': 'shell',
+    '.dockerfile': 'docker', '.tf': 'terraform', '.go': 'go',
+    '.rs': 'rust', '.java': 'java', '.cpp': 'cpp', '.c': 'c'
+}
+
+
+def _git(root: str, *args: str) -> str:
+    result = subprocess.run(["git", *args], cwd=root, capture_output=True, text=True, check=True)
+    return result.stdout
+
+
+def parse_name_status(output: str) -> Tuple[List[str], List[str]]:
+    """Split ``git diff --name-status`` output into (paths to index, paths to delete)."""
+    to_index, to_delete = [], []
+    for line in output.splitlines():
+        fields = line.split("\t")
+        status = fields[0][:1]
+        if status in ("R", "C"):  # rename/copy: old path, new path
+            if status == "R":
+                to_delete.append(fields[1])
+            to_index.append(fields[2])
+        elif status == "D":
+            to_delete.append(fields[1])
+        elif status:
+            to_index.append(fields[1])
+    return to_index, to_delete
+
+
+class RepoIndexer:
     """
-    Indexes a repository by reading its files, chunking them, and upserting them into Qdrant.
+    Incremental indexer for one repository checkout and one Qdrant collection.
+
+    Embedding and upserts run as a pipeline: chunks are grouped into batches
+    of batch_size, and up to max_in_flight batches are embedded and written
+    while the next files are being chunked. Points carry dense and BM25
+    sparse vectors (see libs.retrieval) and a repo payload field (default:
+    the checkout directory name) for filtered hybrid search.
     """
-    config = load_config()
-    github_connector = GitHubConnector(config)
-    
-    # Create a dict config for MemoryClient
-    memory_config = {
-        "qdrant": {
-            "url": qdrant_url or config.qdrant.url,
-            "api_key": qdrant_api_key or config.qdrant.api_key
-        }
-    }
-    memory_client = MemoryClient(memory_config)
-
-    # In a real implementation, we would get the list of files from the repo.
-    # For this example, we'll just index the README.md.
-    files_to_index = ["README.md"]
-
-    for file_path in files_to_index:
+
+    def __init__(
+        self,
+        root: str,
+        client: QdrantClient,
+        embedder: Embedder,
+        collection: str = DEFAULT_COLLECTION,
+        chunker: Optional[Chunker] = None,
+        state_path: Optional[str] = None,
+        batch_size: int = 64,
+        max_in_flight: int = 2,
+        repo: Optional[str] = None
+    ):
+        self.root = os.path.abspath(root)
+        self.client = client
+        self.embedder = embedder
+        self.collection = collection
+        self.repo = repo or os.path.basename(self.root)
+        self.index = QdrantHybridIndex(client, collection, embedder)
+        self.chunker = chunker or Chunker()
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight
+        self.is_git = self._is_git_repo()
+        self.state_path = state_path or self._default_state_path()
+        self._pending: List[Tuple[str, str, Dict[str, Any]]] = []
+        self._in_flight: Set[asyncio.Task] = set()
+        self.stats: Dict[str, Any] = {}
+
+    def _is_git_repo(self) -> bool:
         try:
-            content_bytes = await github_connector.read_file(owner, repo, file_path)
-            content = content_bytes.decode("utf-8")
+            return _git(self.root, "rev-parse", "--is-inside-work-tree").strip() == "true"
+        except (OSError, subprocess.CalledProcessError):
+            return False
+
+    def _default_state_path(self) -> str:
+        if self.is_git:
+            git_dir = _git(self.root, "rev-parse", "--git-dir").strip()
+            return os.path.join(self.root, git_dir, STATE_FILE)
+        return os.path.join(self.root, f".{STATE_FILE}")
 
-            chunks = chunk_text(content)
+    # Watermark
 
-            metadata = [
-                {
-                    "repo": f"{owner}/{repo}",
-                    "branch": "main",  # Assuming main branch for now
-                    "path": file_path,
-                    "chunk": i,
-                    "hash": hashlib.sha256(chunk.encode()).hexdigest(),
-                    "ts": "now()",  # Placeholder for timestamp
-                }
-                for i, chunk in enumerate(chunks)
-            ]
+    def load_state(self) -> Dict[str, Any]:
+        try:
+            with open(self.state_path) as f:
+                return json.load(f).get(self.collection, {})
+        except (OSError, json.JSONDecodeError):
+            return {}
 
-            memory_client.upsert_documents(chunks, metadata)
-            print(f"Indexed {len(chunks)} chunks from {file_path}")
+    def save_state(self, commit: Optional[str]):
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            state = {}
+        state[self.collection] = {"commit": commit, "indexed_at": time.time()}
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
 
-        except Exception as e:
-            print(f"Could not index {file_path}: {e}")
+    # File selection
 
-    await github_connector.close()
+    def head_commit(self) -> Optional[str]:
+        if not self.is_git:
+            return None
+        try:
+            return _git(self.root, "rev-parse", "HEAD").strip()
+        except subprocess.CalledProcessError:
+            return None  # no commits yet
 
+    def list_files(self) -> List[str]:
+        """All indexable files, relative to root; via git when possible so .gitignore is honored."""
+        if self.is_git:
+            output = _git(self.root, "ls-files", "-z", "--cached", "--others", "--exclude-standard")
+            paths = [p for p in output.split("\0") if p]
+        else:
+            paths = []
+            for directory, dirs, files in os.walk(self.root):
+                dirs[:] = [d for d in dirs if d not in EXCLUDE_DIRS]
+                paths.extend(os.path.relpath(os.path.join(directory, f), self.root) for f in files)
+        return sorted(p.replace(os.sep, "/") for p in paths if self.should_index(p))
 
-if __name__ == "__main__":
-    import asyncio
+    def changed_files(self, since: str) -> Optional[Tuple[List[str], List[str]]]:
+        """(to index, to delete) relative to commit since, or None when since is not usable."""
+        try:
+            diff = _git(self.root, "diff", "--name-status", "-M", since)
+            untracked = _git(self.root, "ls-files", "-z", "--others", "--exclude-standard")
+        except subprocess.CalledProcessError as e:
+            logger.warning(f"Cannot diff against {since}: {e.stderr.strip()}")
+            return None
+        changed, to_delete = parse_name_status(diff)
+        changed += [p for p in untracked.split("\0") if p]
+        to_index = sorted({p for p in changed if self.should_index(p)})
+        # a changed file that is no longer indexable (e.g. grew past the size limit) loses its vectors
+        to_delete += set(changed) - set(to_index)
+        return to_index, sorted(set(to_delete))
+
+    def should_index(self, path: str) -> bool:
+        full_path = os.path.join(self.root, path)
+        if Path(path).suffix.lower() not in FILE_EXTENSIONS:
+            return False
+        if any(part in EXCLUDE_DIRS for part in Path(path).parts):
+            return False
+        try:
+            if not os.path.isfile(full_path) or os.path.getsize(full_path) > MAX_FILE_BYTES:
+                return False
+            with open(full_path, "rb") as f:
+                return b"\0" not in f.read(8192)
+        except OSError:
+            return False
 
+    # Qdrant
+
+    async def ensure_collection(self):
+        await self.index.ensure_collection()
+
+    async def delete_paths(self, paths: List[str]):
+        """Delete every vector belonging to the given files."""
+        if not paths:
+            return
+        await asyncio.to_thread(
+            self.client.delete,
+            collection_name=self.collection,
+            points_selector=FilterSelector(filter=Filter(must=[FieldCondition(key="path", match=MatchAny(any=paths))]))
+        )
+
+    async def indexed_paths(self) -> Set[str]:
+        """Paths that currently have vectors in the collection."""
+        paths: Set[str] = set()
+        offset = None
+        while True:
+            points, offset = await asyncio.to_thread(
+                self.client.scroll,
+                collection_name=self.collection,
+                limit=1000,
+                offset=offset,
+                with_payload=["path"],
+                with_vectors=False
+            )
+            paths.update(p.payload["path"] for p in points if p.payload and "path" in p.payload)
+            if offset is None:
+                return paths
+
+    # Pipeline
+
+    async def index_file(self, path: str, commit: Optional[str]):
+        """Embed the file's new chunks and drop its chunks that no longer exist."""
+        chunks = await asyncio.to_thread(
+            lambda: list(self.chunker.chunk_file(os.path.join(self.root, path), source=path))
+        )
+        chunks = list({chunk.id: chunk for chunk in chunks}.values())
+        ids = [chunk.id for chunk in chunks]
+        existing = await asyncio.to_thread(
+            self.client.retrieve, collection_name=self.collection, ids=ids, with_payload=False, with_vectors=False
+        ) if ids else []
+        existing_ids = {str(point.id) for point in existing}
+
+        # Remove chunks of this file that are not part of its current content
+        await asyncio.to_thread(
+            self.client.delete,
+            collection_name=self.collection,
+            points_selector=FilterSelector(filter=Filter(
+                must=[FieldCondition(key="path", match=MatchValue(value=path))],
+                must_not=[HasIdCondition(has_id=ids)] if ids else []
+            ))
+        )
+
+        file_type = FILE_EXTENSIONS.get(Path(path).suffix.lower(), "unknown")
+        new_chunks = [chunk for chunk in chunks if chunk.id not in existing_ids]
+        self.stats["files_indexed"] += 1
+        self.stats["chunks_total"] += len(chunks)
+        self.stats["chunks_skipped"] += len(chunks) - len(new_chunks)
+        for chunk in new_chunks:
+            payload = {**chunk.to_metadata(), "repo": self.repo, "path": path, "content": chunk.text,
+                       "file_type": file_type, "commit": commit}
+            await self._enqueue(chunk.id, chunk.text, payload)
+
+    async def _enqueue(self, point_id: str, text: str, payload: Dict[str, Any]):
+        self._pending.append((point_id, text, payload))
+        if len(self._pending) >= self.batch_size:
+            await self._launch()
+
+    async def _launch(self):
+        batch, self._pending = self._pending[:self.batch_size], self._pending[self.batch_size:]
+        if not batch:
+            return
+        while len(self._in_flight) >= self.max_in_flight:
+            done, self._in_flight = await asyncio.wait(self._in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()  # surface failures
+        self._in_flight.add(asyncio.create_task(self._write_batch(batch)))
+
+    async def _write_batch(self, batch: List[Tuple[str, str, Dict[str, Any]]]):
+        await self.index.upsert(batch)
+        self.stats["chunks_embedded"] += len(batch)
+
+    async def _drain(self):
+        while self._pending:
+            await self._launch()
+        if self._in_flight:
+            in_flight, self._in_flight = self._in_flight, set()
+            await asyncio.gather(*in_flight)
+
+    async def index_paths(self, paths: Iterable[str], commit: Optional[str]):
+        try:
+            for path in paths:
+                await self.index_file(path, commit)
+            await self._drain()
+        except BaseException:
+            for task in self._in_flight:
+                task.cancel()
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+            self._in_flight, self._pending = set(), []
+            raise
+
+    # Runs
+
+    async def run(self, mode: str = "changed") -> Dict[str, Any]:
+        """Index the repository; changed mode falls back to full when there is no usable watermark."""
+        started = time.time()
+        self.stats = {"files_indexed": 0, "files_deleted": 0, "chunks_total": 0,
+                      "chunks_embedded": 0, "chunks_skipped": 0}
+        await self.ensure_collection()
+        commit = self.head_commit()
+        since = self.load_state().get("commit") if mode == "changed" else None
+        changes = self.changed_files(since) if since and self.is_git else None
+
+        if changes is None:
+            mode = "full"
+            to_index = self.list_files()
+            to_delete = sorted(await self.indexed_paths() - set(to_index))
+        else:
+            to_index, to_delete = changes
+
+        await self.delete_paths(to_delete)
+        self.stats["files_deleted"] = len(to_delete)
+        await self.index_paths(to_index, commit)
+        self.save_state(commit)
+
+        self.stats.update({
+            "mode": mode,
+            "since": since if mode == "changed" else None,
+            "commit": commit,
+            "collection": self.collection,
+            "duration_seconds": round(time.time() - started, 3),
+        })
+        logger.info(
+            f"Indexed {self.stats['files_indexed']} files ({mode}): {self.stats['chunks_embedded']} chunks embedded, "
+            f"{self.stats['chunks_skipped']} unchanged, {len(to_delete)} files removed"
+        )
+        return self.stats
+
+
+async def index_repo(
+    root: str = ".",
+    mode: str = "changed",
+    collection: Optional[str] = None,
+    qdrant_url: Optional[str] = None,
+    qdrant_api_key: Optional[str] = None,
+    state_path: Optional[str] = None,
+    batch_size: int = 64,
+    chunk_size: int = 512,
+    chunk_overlap: int = 64
+) -> Dict[str, Any]:
+    """Index a local repository checkout into Qdrant."""
+    client = QdrantClient(
+        url=qdrant_url or os.getenv("QDRANT_URL"),
+        api_key=qdrant_api_key or os.getenv("QDRANT_API_KEY")
+    )
+    indexer = RepoIndexer(
+        root,
+        client,
+        get_embedder(),
+        collection=collection or hybrid_collection(),
+        chunker=Chunker(max_tokens=chunk_size, overlap_tokens=chunk_overlap),
+        state_path=state_path,
+        batch_size=batch_size
+    )
+    try:
+        return await indexer.run(mode)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
     parser = argparse.ArgumentParser(
-        description="Index a GitHub repository into Qdrant."
+        description="Index a local repository checkout into Qdrant."
     )
-    parser.add_argument("owner", type=str, help="The owner of the repository.")
-    parser.add_argument("repo", type=str, help="The name of the repository.")
+    parser.add_argument("root", nargs="?", default=".", help="Repository root.")
     parser.add_argument(
         "--mode",
         type=str,
-        default="full",
+        default="changed",
         choices=["full", "changed"],
-        help="Indexing mode.",
+        help="Indexing mode (changed falls back to full without a watermark).",
     )
+    parser.add_argument("--collection", type=str, default=None, help="Qdrant collection (default: QDRANT_HYBRID_COLLECTION or repo_hybrid).")
+    parser.add_argument("--state", type=str, default=None, help="Watermark file.")
+    parser.add_argument("--batch-size", type=int, default=64, help="Chunks per embedding/upsert batch.")
 
     args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
 
-    # Try to index with available config
-    try:
-        asyncio.run(index_repo(args.owner, args.repo, args.mode))
-    except Exception as e:
-        print(f"Error during indexing: {e}")
+    stats = asyncio.run(index_repo(
+        args.root, args.mode, args.collection, state_path=args.state, batch_size=args.batch_size
+    ))
+    print(json.dumps(stats, indent=2))